@@ -0,0 +1,634 @@
+#!/usr/bin/env python
+"""KarukuResize の性能計測スクリプト。
+
+使い方:
+    uv run python scripts/benchmark.py async --requests 1000 --concurrency 8
+
+各サブコマンドは合成画像を生成して計測し、結果を表形式で表示する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import mmap
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, SRC_DIR.as_posix())
+
+from PIL import Image, ImageDraw, features  # noqa: E402
+
+from karuku_resizer.async_api import resize_async  # noqa: E402
+from karuku_resizer.batch_api import ResizeOptions  # noqa: E402
+from karuku_resizer.content_analysis import quantize_for_png  # noqa: E402
+from karuku_resizer.cpu_budget import CpuBudget, available_cpu_count  # noqa: E402
+from karuku_resizer.durability import (  # noqa: E402
+    DURABILITY_MODES,
+    DirectorySyncBatcher,
+    write_with_durability,
+)
+from karuku_resizer.encoder_profiles import ENCODER_PROFILES  # noqa: E402
+from karuku_resizer.image_save_pipeline import build_encoder_save_kwargs  # noqa: E402
+from karuku_resizer.resize_core import (  # noqa: E402
+    create_directory_with_permissions,
+    get_destination_path,
+    normalize_long_path,
+    plan_destination_paths,
+    resize_and_compress_bytes,
+    resize_and_compress_image_memory,
+    retry_on_file_error,
+)
+from karuku_resizer.preview_service import PreviewService, PreviewTicket  # noqa: E402
+from karuku_resizer.ui_file_load_helpers import load_candidates_in_order  # noqa: E402
+
+
+def _synthetic_jpeg(size: tuple[int, int], seed: int = 0) -> bytes:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    if seed:
+        image = image.rotate(seed % 360)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def _print_table(rows: List[Dict[str, object]]) -> None:
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = {h: max(len(h), *(len(str(r[h])) for r in rows)) for h in headers}
+    print(" | ".join(h.ljust(widths[h]) for h in headers))
+    print("-|-".join("-" * widths[h] for h in headers))
+    for row in rows:
+        print(" | ".join(str(row[h]).ljust(widths[h]) for h in headers))
+
+
+# ---------------------------------------------------------------------------
+# async: イベントループの停止時間を計測
+# ---------------------------------------------------------------------------
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run_async_benchmark(requests: int, concurrency: int, size: int) -> Dict[str, object]:
+    payload = _synthetic_jpeg((size, size))
+    options = ResizeOptions(resize_mode="longest_side", resize_value=max(1, size // 2), output_format="jpeg")
+    limiter = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lags: List[float] = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, 0.005, lags))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(resize_async(payload, options, index=i, limiter=limiter) for i in range(requests))
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    latencies = [r.elapsed_seconds for r in results]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": sum(1 for r in results if r.success),
+        "wall_s": f"{elapsed:.2f}",
+        "req/s": f"{requests / elapsed:.0f}" if elapsed else "-",
+        "job_p50_ms": f"{statistics.median(latencies) * 1000:.1f}",
+        "loop_lag_p99_ms": f"{_percentile(lags, 99) * 1000:.1f}",
+        "loop_lag_max_ms": f"{max(lags, default=0.0) * 1000:.1f}",
+    }
+
+
+def _cmd_async(args: argparse.Namespace) -> int:
+    rows = [
+        asyncio.run(_run_async_benchmark(args.requests, concurrency, args.size))
+        for concurrency in args.concurrency
+    ]
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# memory: バイト列API と従来のメモリAPI のピークメモリ比較（tracemalloc）
+# ---------------------------------------------------------------------------
+
+
+def _legacy_memory_path(mapped: mmap.mmap, width: int) -> int:
+    source = Image.open(io.BytesIO(bytes(mapped)))
+    output = io.BytesIO()
+    ok, error = resize_and_compress_image_memory(
+        source_image=source,
+        output_buffer=output,
+        resize_mode="width",
+        resize_value=width,
+        output_format="jpeg",
+    )
+    if not ok:
+        raise RuntimeError(error)
+    return len(output.getvalue())
+
+
+def _bytes_api_path(mapped: mmap.mmap, width: int) -> int:
+    view = resize_and_compress_bytes(mapped, resize_mode="width", resize_value=width, output_format="jpeg")
+    return len(view)
+
+
+def _measure_peak(func: Callable[[], int], repeat: int) -> tuple[float, float]:
+    peaks: List[int] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tracemalloc.start()
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = (time.perf_counter() - started) / repeat
+    return statistics.median(peaks) / 1024, elapsed * 1000
+
+
+def _cmd_memory(args: argparse.Namespace) -> int:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"src_{size}.jpg"
+            path.write_bytes(_synthetic_jpeg((size, size * 3 // 4)))
+            with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                width = max(1, size // 4)
+                for label, func in (("legacy", _legacy_memory_path), ("bytes_api", _bytes_api_path)):
+                    peak_kib, ms = _measure_peak(lambda f=func: f(mapped, width), args.repeat)
+                    rows.append(
+                        {
+                            "source_px": f"{size}x{size * 3 // 4}",
+                            "input_kib": f"{path.stat().st_size / 1024:.0f}",
+                            "path": label,
+                            "py_peak_kib": f"{peak_kib:.0f}",
+                            "ms": f"{ms:.1f}",
+                        }
+                    )
+    _print_table(rows)
+    print("\n※ tracemalloc は Python ヒープ（バイト列・バッファの複製）のみを計測し、Pillow 内部の画素バッファは含まない")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# durability: 書き込み耐久性ポリシーごとの書き込み速度
+# ---------------------------------------------------------------------------
+
+
+def _cmd_durability(args: argparse.Namespace) -> int:
+    payload = _synthetic_jpeg((args.size, args.size))
+    targets = [Path(d) for d in args.dirs] or [Path(tempfile.gettempdir())]
+    rows = []
+    for target in targets:
+        for mode in DURABILITY_MODES:
+            with tempfile.TemporaryDirectory(dir=target) as tmp:
+                out_dir = Path(tmp)
+                syncer = DirectorySyncBatcher()
+
+                def _write(path: Path) -> None:
+                    path.write_bytes(payload)
+
+                started = time.perf_counter()
+                for i in range(args.files):
+                    write_with_durability(out_dir / f"{i:05d}.jpg", _write, mode, syncer=syncer)
+                syncer.flush()
+                elapsed = time.perf_counter() - started
+            rows.append(
+                {
+                    "target": str(target),
+                    "mode": mode,
+                    "files": args.files,
+                    "files/s": f"{args.files / elapsed:.0f}" if elapsed else "-",
+                    "ms/file": f"{elapsed * 1000 / args.files:.3f}",
+                    "dir_fsyncs": syncer.sync_count,
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# paths: ファイルごとのパス計算・ディレクトリ作成のオーバーヘッド
+# ---------------------------------------------------------------------------
+
+
+def _build_source_tree(root: Path, files: int, dirs: int, depth: int) -> List[Path]:
+    sources = []
+    for i in range(files):
+        bucket = i % dirs
+        parts = [f"d{bucket:04d}"] + [f"lv{level}" for level in range(1, depth)]
+        path = root.joinpath(*parts, f"img_{i:06d}.jpg")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        sources.append(path)
+    return sources
+
+
+def _legacy_per_file_paths(sources: Sequence[Path], src: Path, dest: Path) -> None:
+    """従来の resize_and_compress_image 1件あたりのパス処理を再現する。"""
+    for source in sources:
+        dst_path = get_destination_path(source, src, dest)
+        source_str = retry_on_file_error(normalize_long_path, source, remove_prefix=True)
+        retry_on_file_error(Path(source_str).exists)
+        create_directory_with_permissions(dst_path.parent)
+        Path(source_str).is_file()
+        os.access(source_str, os.R_OK)
+        os.path.exists(os.path.dirname(str(dst_path)))
+
+
+def _planned_paths(sources: Sequence[Path], src: Path, dest: Path) -> None:
+    plan = plan_destination_paths(sources, src, dest)
+    plan.create_directories()
+
+
+def _cmd_paths(args: argparse.Namespace) -> int:
+    from loguru import logger
+
+    logger.remove()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        sources = _build_source_tree(root / "in", args.files, args.dirs, args.depth)
+        for label, func in (("per-file (legacy)", _legacy_per_file_paths), ("planner", _planned_paths)):
+            dest = root / f"out_{label.split()[0]}"
+            started = time.perf_counter()
+            func(sources, root / "in", dest)
+            elapsed = time.perf_counter() - started
+            rows.append(
+                {
+                    "path": label,
+                    "files": args.files,
+                    "dirs": args.dirs,
+                    "total_s": f"{elapsed:.3f}",
+                    "us/file": f"{elapsed * 1e6 / args.files:.1f}",
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# decode: GUI読み込みのデコードプール（ワーカー数ごとのスループット）
+# ---------------------------------------------------------------------------
+
+
+def _cmd_decode(args: argparse.Namespace) -> int:
+    payload = _synthetic_jpeg((args.size, args.size))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            path = Path(tmp) / f"img_{i:05d}.jpg"
+            path.write_bytes(payload)
+            paths.append(path)
+        for workers in args.workers:
+            out_queue: "queue.Queue[Dict[str, object]]" = queue.Queue()
+            started = time.perf_counter()
+            load_candidates_in_order(
+                paths,
+                threading.Event(),
+                out_queue,
+                build_file_load_error_payload=lambda path, exc, index: {"type": "load_error"},
+                max_workers=workers,
+            )
+            elapsed = time.perf_counter() - started
+            rows.append(
+                {
+                    "workers": workers,
+                    "files": args.files,
+                    "size": args.size,
+                    "total_s": f"{elapsed:.2f}",
+                    "files/s": f"{args.files / elapsed:.1f}" if elapsed else "-",
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# preview: スライダー連続操作時のプレビュー生成（要求ごとのスレッド vs 常駐サービス）
+# ---------------------------------------------------------------------------
+
+
+def _scrub_legacy(source: Image.Image, targets: Sequence[tuple[int, int]], interval: float) -> int:
+    version = [0]
+    executed = [0]
+    threads = []
+    for target in targets:
+        version[0] += 1
+        mine = version[0]
+
+        def worker(target: tuple[int, int] = target, mine: int = mine) -> None:
+            # 旧実装と同じく、古い要求かどうかは処理後にしか判定しない
+            source.resize(target, Image.Resampling.LANCZOS)
+            executed[0] += 1
+            _ = mine != version[0]
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(interval)
+    for thread in threads:
+        thread.join()
+    return executed[0]
+
+
+def _scrub_service(source: Image.Image, targets: Sequence[tuple[int, int]], interval: float) -> int:
+    service = PreviewService()
+    executed = [0]
+    for target in targets:
+
+        def worker(ticket: PreviewTicket, target: tuple[int, int] = target) -> None:
+            if ticket.cancelled:
+                return
+            source.resize(target, Image.Resampling.LANCZOS)
+            executed[0] += 1
+
+        service.submit("render", worker)
+        time.sleep(interval)
+    while service.pending_count() or service.stats.completed < service.stats.started:
+        time.sleep(0.005)
+    service.shutdown()
+    return executed[0]
+
+
+def _cmd_preview(args: argparse.Namespace) -> int:
+    source = Image.open(io.BytesIO(_synthetic_jpeg((args.size, args.size))))
+    source.load()
+    targets = [
+        (max(1, args.size * (30 + i % 60) // 100), max(1, args.size * (30 + i % 60) // 100))
+        for i in range(args.events)
+    ]
+    rows = []
+    for label, func in (("thread-per-request", _scrub_legacy), ("service", _scrub_service)):
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        executed = func(source, targets, args.interval_ms / 1000)
+        rows.append(
+            {
+                "mode": label,
+                "events": args.events,
+                "resizes": executed,
+                "cpu_s": f"{time.process_time() - cpu_started:.2f}",
+                "wall_s": f"{time.perf_counter() - started:.2f}",
+            }
+        )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# png: フルカラー PNG と PNG8（パレット）の出力サイズ・エンコード時間
+# ---------------------------------------------------------------------------
+
+_UI_COLORS = [(245, 245, 245), (33, 150, 243), (255, 255, 255), (66, 66, 66), (200, 230, 201), (239, 83, 80)]
+
+
+def _synthetic_screenshot(size: tuple[int, int]) -> Image.Image:
+    """少数色のパネル・ボタン・文字列風の線で構成された UI スクリーンショット風の画像。"""
+    width, height = size
+    image = Image.new("RGB", size, _UI_COLORS[0])
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, height // 12), fill=_UI_COLORS[1])
+    for row in range(12):
+        top = height // 8 + row * height // 14
+        draw.rectangle((width // 20, top, width - width // 20, top + height // 18), fill=_UI_COLORS[2], outline=_UI_COLORS[3])
+        for col in range(0, width // 2, 14):
+            draw.line((width // 12 + col, top + 8, width // 12 + col + 9, top + 8), fill=_UI_COLORS[3], width=2)
+        draw.rectangle((width - width // 6, top + 4, width - width // 12, top + height // 24), fill=_UI_COLORS[4 + row % 2])
+    return image
+
+
+def _synthetic_diagram(size: tuple[int, int]) -> Image.Image:
+    """アンチエイリアスとグラデーションを含む（256色を超える）図版風の画像。"""
+    gradient = Image.linear_gradient("L").resize(size)
+    image = Image.merge("RGB", (gradient, gradient.rotate(90), Image.new("L", size, 180)))
+    shapes = Image.new("RGB", (size[0] * 2, size[1] * 2), (255, 255, 255))
+    draw = ImageDraw.Draw(shapes)
+    for i in range(20):
+        draw.ellipse((i * size[0] // 12, i * size[1] // 16, i * size[0] // 12 + size[0] // 3, i * size[1] // 16 + size[1] // 4), outline=_UI_COLORS[1 + i % 5], width=6)
+    mask = shapes.convert("L").point(lambda v: 255 - v).resize(size, Image.Resampling.LANCZOS)
+    image.paste(shapes.resize(size, Image.Resampling.LANCZOS), mask=mask)
+    return image
+
+
+def _encode_png(image: Image.Image, palette_mode: str, dither: bool) -> tuple[int, float, str]:
+    started = time.perf_counter()
+    save_img, conversion = quantize_for_png(image, palette_mode, dither=dither)
+    buffer = io.BytesIO()
+    save_img.save(buffer, format="PNG", optimize=True, compress_level=6)
+    return len(buffer.getvalue()), time.perf_counter() - started, conversion or "-"
+
+
+def _cmd_png(args: argparse.Namespace) -> int:
+    size = (args.width, args.width * 9 // 16)
+    modes = (("truecolor", "off", True), ("auto", "auto", True), ("always+dither", "always", True), ("always", "always", False))
+    rows = []
+    for name, image in (("screenshot", _synthetic_screenshot(size)), ("diagram", _synthetic_diagram(size))):
+        baseline = 0
+        for label, palette_mode, dither in modes:
+            results = [_encode_png(image, palette_mode, dither) for _ in range(args.repeat)]
+            output_bytes, _elapsed, conversion = results[0]
+            baseline = baseline or output_bytes
+            rows.append(
+                {
+                    "image": name,
+                    "mode": label,
+                    "applied": conversion,
+                    "bytes": output_bytes,
+                    "ratio": f"{output_bytes / baseline:.2f}",
+                    "encode_ms": f"{statistics.median(r[1] for r in results) * 1000:.1f}",
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# encode: エンコーダ速度プロファイルごとのスループットと出力サイズ
+# ---------------------------------------------------------------------------
+
+
+def _synthetic_photo(size: tuple[int, int]) -> Image.Image:
+    """グラデーションに粒状ノイズを重ねた写真風の画像（縮小後の写真に近い圧縮率になる）。"""
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 24)
+    base = Image.merge("RGB", (gradient, gradient.rotate(90), gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    grain = Image.merge("RGB", (noise, noise, noise))
+    return Image.blend(base, grain, 0.08)
+
+
+def _cmd_encode(args: argparse.Namespace) -> int:
+    image = _synthetic_photo((args.width, args.width * 3 // 4))
+    formats = [fmt for fmt in args.formats if fmt != "avif" or features.check("avif")]
+    rows = []
+    for output_format in formats:
+        baseline = 0
+        for profile in reversed(ENCODER_PROFILES):
+            kwargs = build_encoder_save_kwargs(output_format, args.quality, profile=profile)
+            started = time.perf_counter()
+            for _ in range(args.files):
+                buffer = io.BytesIO()
+                image.save(buffer, **kwargs)
+            elapsed = time.perf_counter() - started
+            output_bytes = len(buffer.getvalue())
+            baseline = baseline or output_bytes
+            rows.append(
+                {
+                    "format": output_format,
+                    "profile": profile,
+                    "files/s": f"{args.files / elapsed:.1f}" if elapsed else "-",
+                    "ms/file": f"{elapsed / args.files * 1000:.1f}",
+                    "bytes": output_bytes,
+                    "ratio": f"{output_bytes / baseline:.3f}",
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# threads: AVIF エンコーダのスレッド配分（Pillow 既定の全コア vs CpuBudget）
+# ---------------------------------------------------------------------------
+
+
+def _encode_avif_batch(image: Image.Image, files: int, workers: int, budget: CpuBudget | None) -> float:
+    kwargs = build_encoder_save_kwargs("avif", 80)
+
+    def encode_one(_index: int) -> None:
+        if budget is None:
+            image.save(io.BytesIO(), **kwargs)
+            return
+        with budget.lease() as threads:
+            image.save(io.BytesIO(), **kwargs, max_threads=threads)
+
+    started = time.perf_counter()
+    if budget is None:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(encode_one, range(files)))
+    else:
+        with budget.batch(workers), ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(encode_one, range(files)))
+    return time.perf_counter() - started
+
+
+def _cmd_threads(args: argparse.Namespace) -> int:
+    if not features.check("avif"):
+        print("AVIF エンコーダが利用できません")
+        return 1
+    image = _synthetic_photo((args.width, args.width * 3 // 4))
+    rows = []
+    for workers in args.workers:
+        for label, budget in (("pillow-default", None), ("cpu-budget", CpuBudget())):
+            elapsed = _encode_avif_batch(image, args.files, workers, budget)
+            rows.append(
+                {
+                    "cpus": available_cpu_count(),
+                    "workers": workers,
+                    "mode": label,
+                    "threads/job": "all" if budget is None else budget.threads_for(workers),
+                    "files/s": f"{args.files / elapsed:.2f}" if elapsed else "-",
+                }
+            )
+    _print_table(rows)
+    return 0
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="KarukuResize benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    async_parser = subparsers.add_parser("async", help="asyncio API のスループットとループ停止時間")
+    async_parser.add_argument("--requests", type=int, default=1000)
+    async_parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8])
+    async_parser.add_argument("--size", type=int, default=96, help="入力画像の一辺(px)")
+    async_parser.set_defaults(handler=_cmd_async)
+
+    memory_parser = subparsers.add_parser("memory", help="バイト列API のピークメモリ（tracemalloc）")
+    memory_parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096])
+    memory_parser.add_argument("--repeat", type=int, default=5)
+    memory_parser.set_defaults(handler=_cmd_memory)
+
+    durability_parser = subparsers.add_parser("durability", help="fast/atomic/durable の書き込み速度")
+    durability_parser.add_argument(
+        "--dirs",
+        nargs="*",
+        default=[],
+        help="計測先ディレクトリ（ローカル・NFS/SMBマウント等を並べて比較）",
+    )
+    durability_parser.add_argument("--files", type=int, default=500)
+    durability_parser.add_argument("--size", type=int, default=256, help="書き込む画像の一辺(px)")
+    durability_parser.set_defaults(handler=_cmd_durability)
+
+    paths_parser = subparsers.add_parser("paths", help="ミラー出力時のファイルごとのパス処理オーバーヘッド")
+    paths_parser.add_argument("--files", type=int, default=20000)
+    paths_parser.add_argument("--dirs", type=int, default=200, help="入力ツリーの末端ディレクトリ数")
+    paths_parser.add_argument("--depth", type=int, default=3, help="入力ツリーの深さ")
+    paths_parser.set_defaults(handler=_cmd_paths)
+
+    decode_parser = subparsers.add_parser("decode", help="GUI読み込みのデコードプールのスループット")
+    decode_parser.add_argument("--files", type=int, default=120)
+    decode_parser.add_argument("--size", type=int, default=2048, help="入力画像の一辺(px)")
+    decode_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    decode_parser.set_defaults(handler=_cmd_decode)
+
+    preview_parser = subparsers.add_parser("preview", help="スライダー連続操作時のプレビュー生成CPU時間")
+    preview_parser.add_argument("--events", type=int, default=60, help="連続して発生する設定変更の回数")
+    preview_parser.add_argument("--interval-ms", type=float, default=10.0, help="設定変更の間隔(ms)")
+    preview_parser.add_argument("--size", type=int, default=3000, help="入力画像の一辺(px)")
+    preview_parser.set_defaults(handler=_cmd_preview)
+
+    encode_parser = subparsers.add_parser("encode", help="エンコーダ速度プロファイルごとの files/s と出力サイズ")
+    encode_parser.add_argument("--files", type=int, default=20, help="プロファイルごとのエンコード回数")
+    encode_parser.add_argument("--width", type=int, default=1600, help="合成画像の幅(px)。高さは 4:3")
+    encode_parser.add_argument("--quality", type=int, default=85)
+    encode_parser.add_argument("--formats", nargs="+", default=["jpeg", "png", "webp", "avif"])
+    encode_parser.set_defaults(handler=_cmd_encode)
+
+    threads_parser = subparsers.add_parser("threads", help="AVIF エンコーダのスレッド配分ごとのスループット")
+    threads_parser.add_argument("--files", type=int, default=16)
+    threads_parser.add_argument("--width", type=int, default=1600, help="合成画像の幅(px)。高さは 4:3")
+    threads_parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    threads_parser.set_defaults(handler=_cmd_threads)
+
+    png_parser = subparsers.add_parser("png", help="フルカラー PNG と PNG8 の出力サイズ・エンコード時間")
+    png_parser.add_argument("--width", type=int, default=1920, help="合成画像の幅(px)。高さは 16:9")
+    png_parser.add_argument("--repeat", type=int, default=5)
+    png_parser.set_defaults(handler=_cmd_png)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+    handler: Callable[[argparse.Namespace], int] = args.handler
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""asyncio 向けのバッチ処理API。
+
+`batch_api.resize_one` をスレッドプールへオフロードし、イベントループを
+ブロックせずにデコード・リサイズ・エンコードを行う。戻り値は同期API と同じ
+`ResizeResult`。
+
+例:
+    >>> result = await resize_async(data, ResizeOptions(resize_value=640))
+    >>> async for result in aiter_resize(paths, options, max_concurrency=4):
+    ...     ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Set, Union
+
+from karuku_resizer.batch_api import (
+    DEFAULT_MAX_WORKERS,
+    ResizeOptions,
+    ResizeResult,
+    ResizeSource,
+    claim_output_name,
+    resize_one,
+)
+from karuku_resizer.cpu_budget import DEFAULT_CPU_BUDGET
+
+AsyncSources = Union[Iterable[ResizeSource], AsyncIterable[ResizeSource]]
+
+
+async def resize_async(
+    source: ResizeSource,
+    options: Optional[ResizeOptions] = None,
+    *,
+    index: int = 0,
+    output_name: Optional[str] = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+    executor: Optional[Executor] = None,
+) -> ResizeResult:
+    """1件をエグゼキュータ上で処理する。
+
+    多数の呼び出しを同時に発行する場合は、共通の `limiter` を渡して
+    同時実行数を制限すること。タスクが取り消された場合、未着手なら
+    エグゼキュータ側のジョブも取り消される。
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(resize_one, source, options or ResizeOptions(), index=index, output_name=output_name)
+    if limiter is None:
+        return await loop.run_in_executor(executor, call)
+    async with limiter:
+        return await loop.run_in_executor(executor, call)
+
+
+async def _aenumerate(sources: AsyncSources) -> AsyncIterator[tuple[int, ResizeSource]]:
+    index = 0
+    if isinstance(sources, AsyncIterable):
+        async for source in sources:
+            yield index, source
+            index += 1
+    else:
+        for source in sources:
+            yield index, source
+            index += 1
+
+
+async def aiter_resize(
+    sources: AsyncSources,
+    options: Optional[ResizeOptions] = None,
+    *,
+    max_concurrency: int = DEFAULT_MAX_WORKERS,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[ResizeResult]:
+    """入力を並列に処理し、完了した順に結果を返す非同期ジェネレータ。
+
+    入力はセマフォの空きができるまで読み進めないため、`sources` が
+    非同期ストリームであっても先読みは `max_concurrency` 件に収まる。
+    ジェネレータを閉じるか呼び出し元タスクが取り消されると、
+    処理中のタスクもすべて取り消される。
+    実行中は `iter_resize` と同じく `cpu_budget.DEFAULT_CPU_BUDGET` に並列数を宣言する。
+    """
+    resolved_options = options or ResizeOptions()
+    concurrency = max(1, max_concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue[Union[ResizeResult, BaseException]] = asyncio.Queue()
+    tasks: Set[asyncio.Task[None]] = set()
+    producer_error: list[BaseException] = []
+    claimed_names: Set[str] = set()
+
+    async def _run(index: int, source: ResizeSource, output_name: Optional[str]) -> None:
+        try:
+            results.put_nowait(
+                await resize_async(
+                    source, resolved_options, index=index, output_name=output_name, executor=executor
+                )
+            )
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            results.put_nowait(e)
+        finally:
+            semaphore.release()
+
+    async def _produce() -> None:
+        try:
+            async for index, source in _aenumerate(sources):
+                await semaphore.acquire()
+                output_name = None
+                if resolved_options.output_dir is not None:
+                    output_name = claim_output_name(source, index, claimed_names)
+                task = asyncio.create_task(_run(index, source, output_name))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            producer_error.append(e)
+
+    with DEFAULT_CPU_BUDGET.batch(concurrency):
+        producer = asyncio.create_task(_produce())
+        try:
+            while True:
+                if results.empty() and producer.done() and not tasks:
+                    break
+                getter = asyncio.ensure_future(results.get())
+                waiters: Set[asyncio.Future] = {getter, *tasks}
+                if not producer.done():
+                    waiters.add(producer)
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                item = getter.result()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            if producer_error:
+                raise producer_error[0]
+        finally:
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
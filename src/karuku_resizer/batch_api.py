@@ -0,0 +1,351 @@
+"""GUIに依存しないバッチ処理API。
+
+ETLなど外部プログラムから KarukuResize を組み込むための公開モジュール。
+`iter_resize` はパスまたはバイト列の iterable を受け取り、完了した順に
+`ResizeResult` を yield する。Tk を import しないため、ヘッドレス環境でも利用できる。
+
+例:
+    >>> from karuku_resizer.batch_api import ResizeOptions, iter_resize
+    >>> for result in iter_resize(paths, ResizeOptions(resize_value=1280, output_dir=out)):
+    ...     print(result.source, result.success, result.bytes_out)
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set, Tuple, Union
+
+from PIL import Image
+
+from karuku_resizer.content_analysis import DEFAULT_PNG_PALETTE, PngPaletteMode
+from karuku_resizer.cpu_budget import DEFAULT_CPU_BUDGET
+from karuku_resizer.encoder_profiles import DEFAULT_ENCODER_PROFILE, EncoderProfile
+from karuku_resizer.image_save_pipeline import (
+    ExifMode,
+    SaveFormat,
+    SaveOptions,
+    SaveResult,
+    destination_with_extension,
+    encode_image,
+    resolve_output_format,
+    save_image,
+)
+from karuku_resizer.latency_budget import EncodeChoice
+from karuku_resizer.orientation import apply_orientation, oriented_size, read_orientation, resize_oriented
+
+logger = logging.getLogger(__name__)
+
+ResizeSource = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+RESIZE_MODES = ("width", "height", "longest_side", "percentage", "none")
+DEFAULT_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+@dataclass(frozen=True)
+class ResizeOptions:
+    """バッチAPIの処理条件。
+
+    `output_dir` が None の場合はファイルを書き出さず、`ResizeResult.data` に
+    エンコード済みバイト列を格納する。
+    """
+
+    resize_mode: str = "width"
+    resize_value: Optional[int] = 1280
+    output_format: str = "auto"
+    quality: int = 85
+    exif_mode: ExifMode = "keep"
+    remove_gps: bool = False
+    webp_method: int = 6
+    webp_lossless: bool = False
+    avif_speed: int = 6
+    encoder_profile: EncoderProfile = DEFAULT_ENCODER_PROFILE
+    png_palette: PngPaletteMode = DEFAULT_PNG_PALETTE
+    png_dither: bool = False
+    allow_upscale: bool = False
+    output_dir: Optional[Path] = None
+    dry_run: bool = False
+    # 1枚あたりの処理時間の予算（秒）。読み込み・リサイズ後の残り時間をエンコードに割り当てる
+    latency_budget_seconds: Optional[float] = None
+
+    def to_save_options(self, output_format: SaveFormat) -> SaveOptions:
+        return SaveOptions(
+            output_format=output_format,
+            quality=self.quality,
+            dry_run=self.dry_run,
+            exif_mode=self.exif_mode,
+            remove_gps=self.remove_gps,
+            webp_method=self.webp_method,
+            webp_lossless=self.webp_lossless,
+            avif_speed=self.avif_speed,
+            encoder_profile=self.encoder_profile,
+            png_palette=self.png_palette,
+            png_dither=self.png_dither,
+        )
+
+
+@dataclass(frozen=True)
+class ResizeResult:
+    """1ファイル分の処理結果。"""
+
+    index: int
+    source: str
+    success: bool
+    output_path: Optional[Path] = None
+    data: Optional[bytes] = None
+    output_format: Optional[SaveFormat] = None
+    source_size: Optional[Tuple[int, int]] = None
+    output_size: Optional[Tuple[int, int]] = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+    kept_original_size: bool = False
+    exif_attached: bool = False
+    elapsed_seconds: float = 0.0
+    error: Optional[str] = None
+    save_result: Optional[SaveResult] = None
+    encode_choice: Optional[EncodeChoice] = None
+
+
+def compute_target_size(
+    original_size: Tuple[int, int],
+    resize_mode: str,
+    resize_value: Optional[int],
+    *,
+    allow_upscale: bool = False,
+) -> Tuple[int, int]:
+    """リサイズモードと値から出力サイズを求める。
+
+    Raises:
+        ValueError: モードまたは値が不正な場合
+    """
+    if resize_mode not in RESIZE_MODES:
+        raise ValueError(f"未対応のリサイズモード: {resize_mode}")
+
+    width, height = original_size
+    if resize_mode == "none":
+        return width, height
+    if resize_value is None or resize_value <= 0:
+        raise ValueError(f"無効なリサイズ値: {resize_value} (resize_mode={resize_mode})")
+
+    if resize_mode == "width":
+        target = (resize_value, round(height * resize_value / width))
+    elif resize_mode == "height":
+        target = (round(width * resize_value / height), resize_value)
+    elif resize_mode == "longest_side":
+        if width >= height:
+            target = (resize_value, round(height * resize_value / width))
+        else:
+            target = (round(width * resize_value / height), resize_value)
+    else:
+        scale = resize_value / 100.0
+        target = (round(width * scale), round(height * scale))
+
+    if not allow_upscale and (target[0] > width or target[1] > height):
+        return width, height
+    return max(1, target[0]), max(1, target[1])
+
+
+def _describe_source(source: ResizeSource, index: int) -> str:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<bytes #{index}>"
+    return os.fspath(source)
+
+
+def _output_base_path(source: ResizeSource, index: int, output_dir: Path) -> Path:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return output_dir / f"image_{index:05d}"
+    return output_dir / Path(os.fspath(source)).stem
+
+
+def claim_output_name(source: ResizeSource, index: int, claimed: Set[str]) -> str:
+    """別フォルダの同名ファイルが上書きし合わないよう、2件目以降の重複名に入力番号を付ける。"""
+    name = _output_base_path(source, index, Path()).name
+    if name.casefold() in claimed:
+        name = f"{name}_{index:05d}"
+    claimed.add(name.casefold())
+    return name
+
+
+def resize_one(
+    source: ResizeSource,
+    options: ResizeOptions,
+    *,
+    index: int = 0,
+    output_name: Optional[str] = None,
+) -> ResizeResult:
+    """1件を読み込み・リサイズ・エンコードする。
+
+    `output_name` を指定すると、入力名の代わりにその名前（拡張子なし）で `output_dir` に書き出す。
+    例外は送出せず、失敗時は `success=False` と `error` を持つ結果を返す。
+    """
+    started = time.perf_counter()
+    label = _describe_source(source, index)
+
+    def _failure(message: str, **extra) -> ResizeResult:
+        return ResizeResult(
+            index=index,
+            source=label,
+            success=False,
+            error=message,
+            elapsed_seconds=time.perf_counter() - started,
+            **extra,
+        )
+
+    source_path: Optional[Path] = None
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            bytes_in = len(source)
+            opened = Image.open(io.BytesIO(source))
+        else:
+            path = Path(os.fspath(source))
+            source_path = path
+            bytes_in = path.stat().st_size
+            opened = Image.open(path)
+        with opened:
+            opened.load()
+            image = opened
+    except Exception as e:
+        return _failure(f"読み込みに失敗しました: {e}")
+
+    # Orientation は縮小後の画像にだけ適用する（目標サイズは回転後の座標系で求める）
+    orientation = read_orientation(image)
+    source_size = oriented_size(image.size, orientation)
+    try:
+        target_size = compute_target_size(
+            source_size,
+            options.resize_mode,
+            options.resize_value,
+            allow_upscale=options.allow_upscale,
+        )
+    except ValueError as e:
+        return _failure(str(e), bytes_in=bytes_in, source_size=source_size)
+
+    kept_original_size = target_size == source_size
+    if kept_original_size:
+        resized = apply_orientation(image, orientation)
+    else:
+        resized = resize_oriented(image, target_size, orientation, Image.Resampling.LANCZOS)
+    output_format = resolve_output_format(options.output_format, image)
+    save_options = options.to_save_options(output_format)
+    if options.latency_budget_seconds is not None:
+        remaining = options.latency_budget_seconds - (time.perf_counter() - started)
+        save_options = replace(save_options, latency_budget_seconds=max(0.0, remaining))
+
+    common = dict(
+        index=index,
+        source=label,
+        output_format=output_format,
+        source_size=source_size,
+        output_size=resized.size,
+        bytes_in=bytes_in,
+        kept_original_size=kept_original_size,
+    )
+
+    if options.output_dir is None:
+        try:
+            encoded = encode_image(image, resized, save_options)
+        except Exception as e:
+            return _failure(f"エンコードに失敗しました: {e}", bytes_in=bytes_in, source_size=source_size)
+        return ResizeResult(
+            success=True,
+            data=encoded.data,
+            bytes_out=len(encoded.data),
+            exif_attached=encoded.exif_attached,
+            elapsed_seconds=time.perf_counter() - started,
+            encode_choice=encoded.encode_choice,
+            **common,
+        )
+
+    output_dir = Path(options.output_dir)
+    base_path = output_dir / output_name if output_name else _output_base_path(source, index, output_dir)
+    output_path = destination_with_extension(base_path, output_format)
+    save_result = save_image(
+        source_image=image,
+        resized_image=resized,
+        output_path=output_path,
+        options=save_options,
+        source_path=source_path,
+    )
+    bytes_out = 0
+    if save_result.success and not save_result.dry_run:
+        try:
+            bytes_out = output_path.stat().st_size
+        except OSError:
+            bytes_out = 0
+    return ResizeResult(
+        success=save_result.success,
+        output_path=save_result.output_path,
+        bytes_out=bytes_out,
+        exif_attached=save_result.exif_attached,
+        elapsed_seconds=time.perf_counter() - started,
+        error=save_result.error,
+        save_result=save_result,
+        encode_choice=save_result.encode_choice,
+        **common,
+    )
+
+
+def iter_resize(
+    sources: Iterable[ResizeSource],
+    options: Optional[ResizeOptions] = None,
+    *,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[ResizeResult]:
+    """入力を並列に処理し、完了した順に結果を yield する。
+
+    Args:
+        sources: ファイルパスまたは画像バイト列の iterable（遅延評価される）
+        options: 処理条件。省略時は `ResizeOptions()`
+        max_workers: ワーカースレッド数
+        max_in_flight: 同時に保持する未完了ジョブ数の上限。
+            入力はこの件数ぶんだけ先読みされるため、デコード済み画像の
+            メモリ使用量もこの件数で頭打ちになる。既定は `max_workers * 2`。
+
+    ジェネレータを途中で閉じた場合、未着手のジョブは取り消される。
+    `output_dir` へ書き出す場合、別フォルダにある同名の入力は2件目以降の出力名に
+    `_<入力番号>` を付けて区別する。
+    実行中は `cpu_budget.DEFAULT_CPU_BUDGET` に並列数を宣言し、AVIF のエンコーダスレッドを
+    コア数 / ワーカー数 に抑える。
+    """
+    resolved_options = options or ResizeOptions()
+    workers = max(1, max_workers or DEFAULT_MAX_WORKERS)
+    in_flight_limit = max(1, max_in_flight or workers * 2)
+
+    source_iter = enumerate(sources)
+    pending: Set[Future[ResizeResult]] = set()
+    claimed_names: Set[str] = set()
+    executor = ThreadPoolExecutor(max_workers=min(workers, in_flight_limit), thread_name_prefix="karuku-batch")
+
+    def _fill() -> None:
+        while len(pending) < in_flight_limit:
+            try:
+                index, source = next(source_iter)
+            except StopIteration:
+                return
+            output_name = None
+            if resolved_options.output_dir is not None:
+                output_name = claim_output_name(source, index, claimed_names)
+            pending.add(
+                executor.submit(resize_one, source, resolved_options, index=index, output_name=output_name)
+            )
+
+    try:
+        with DEFAULT_CPU_BUDGET.batch(min(workers, in_flight_limit)):
+            _fill()
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending.clear()
+                pending.update(not_done)
+                for future in done:
+                    yield future.result()
+                _fill()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,110 @@
+"""エンコーダのスレッド数を同時実行ジョブ数に応じて配分する。
+
+AVIF（libavif）は1枚のエンコードを複数スレッドで処理でき、Pillow は既定で全コア分の
+スレッドを使う。GUI の単発保存ではそれが望ましいが、バッチAPIや HTTP サービスのように
+複数の画像を並列に保存すると「ワーカー数 x コア数」のスレッドが立ち、コアの取り合いになる。
+
+`CpuBudget` は実行中のエンコード数（と、バッチが宣言した並列数）でコア数を割り、
+各エンコードに渡すスレッド数を決める。
+
+- 単発保存: 同時実行1件 → 全コア
+- 4並列のバッチ（8コア）: `batch(4)` を宣言 → 各エンコード2スレッド
+
+WebP は Pillow がスレッド数の指定を公開していないため、1スレッドのジョブとして数えるだけになる。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+
+def available_cpu_count() -> int:
+    """このプロセスが使えるCPU数（アフィニティ・コンテナの制限を反映）。"""
+    process_cpu_count = getattr(os, "process_cpu_count", None)
+    if process_cpu_count is not None:
+        count = process_cpu_count()
+    elif hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count()
+    return max(1, count or 1)
+
+
+@dataclass
+class CpuBudgetStats:
+    """スレッド配分の統計。"""
+
+    leases: int = 0
+    peak_jobs: int = 0
+    threads_granted: Dict[int, int] = field(default_factory=dict)
+
+    def record_lease(self, jobs: int, threads: int) -> None:
+        self.leases += 1
+        self.peak_jobs = max(self.peak_jobs, jobs)
+        self.threads_granted[threads] = self.threads_granted.get(threads, 0) + 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "leases": self.leases,
+            "peak_jobs": self.peak_jobs,
+            "threads_granted": dict(sorted(self.threads_granted.items())),
+        }
+
+
+class CpuBudget:
+    """実行中のエンコード数でコアを分け合う。"""
+
+    def __init__(self, cpu_count: Optional[int] = None) -> None:
+        self._cpu_count = max(1, int(cpu_count or available_cpu_count()))
+        self._lock = threading.Lock()
+        self._active = 0
+        self._declared = 0
+        self.stats = CpuBudgetStats()
+
+    @property
+    def cpu_count(self) -> int:
+        return self._cpu_count
+
+    def threads_for(self, jobs: int) -> int:
+        return max(1, self._cpu_count // max(1, jobs))
+
+    def expected_threads(self) -> int:
+        """今エンコードを始めた場合に `lease()` が返すスレッド数（枠は確保しない）。"""
+        with self._lock:
+            return self.threads_for(max(self._active + 1, self._declared))
+
+    @contextmanager
+    def batch(self, concurrency: int) -> Iterator[None]:
+        """並列数 `concurrency` のバッチ実行中であることを宣言する。
+
+        ワーカーがまだ揃っていない立ち上がり時にも、先頭のジョブが全コアを取らないようにする。
+        """
+        concurrency = max(0, int(concurrency))
+        with self._lock:
+            self._declared += concurrency
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._declared -= concurrency
+
+    @contextmanager
+    def lease(self) -> Iterator[int]:
+        """エンコード1回分の枠を確保し、使ってよいスレッド数を返す。"""
+        with self._lock:
+            self._active += 1
+            jobs = max(self._active, self._declared)
+            threads = self.threads_for(jobs)
+            self.stats.record_lease(jobs, threads)
+        try:
+            yield threads
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+DEFAULT_CPU_BUDGET = CpuBudget()
@@ -0,0 +1,169 @@
+"""バッチ内の同一内容ファイルの重複排除。
+
+同じファイルが複数フォルダへコピーされている場合、内容ハッシュと処理設定が
+一致する2件目以降はデコード・再エンコードを行わず、最初の出力を
+ハードリンク → reflink → コピー の順で出力先へ実体化する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from karuku_resizer.durability import (
+    DEFAULT_DURABILITY,
+    DurabilityMode,
+    default_directory_syncer,
+    fsync_file,
+    normalize_durability,
+)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+MATERIALIZE_METHODS: Tuple[str, ...] = ("hardlink", "reflink", "copy")
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def hash_file(path: Path, *, chunk_size: int = HASH_CHUNK_BYTES) -> str:
+    """ファイル内容を読み込みながら BLAKE2b ダイジェストを計算する。"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_and_hash_file(path: Path) -> Tuple[bytes, str]:
+    """ファイルを1回だけ読み込み、(内容, BLAKE2b ダイジェスト) を返す。
+
+    重複でない場合は返したバイト列からそのままデコードし、同じファイルを2回読まないようにする。
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    return data, hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+@dataclass
+class DedupStats:
+    unique_count: int = 0
+    encodes_avoided: int = 0
+    method_counts: Dict[str, int] = field(default_factory=dict)
+
+    def record_unique(self) -> None:
+        self.unique_count += 1
+
+    def record_duplicate(self, method: str) -> None:
+        self.encodes_avoided += 1
+        self.method_counts[method] = self.method_counts.get(method, 0) + 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "unique_count": self.unique_count,
+            "encodes_avoided": self.encodes_avoided,
+            "hardlinks": self.method_counts.get("hardlink", 0),
+            "reflinks": self.method_counts.get("reflink", 0),
+            "copies": self.method_counts.get("copy", 0),
+        }
+
+
+class DedupIndex:
+    """(内容ハッシュ, 処理設定) → 最初の出力パス の対応をスレッドセーフに保持する。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Hashable], Path] = {}
+
+    def lookup(self, digest: str, settings_key: Hashable) -> Optional[Path]:
+        with self._lock:
+            return self._entries.get((digest, settings_key))
+
+    def register(self, digest: str, settings_key: Hashable, output_path: Path) -> None:
+        with self._lock:
+            self._entries.setdefault((digest, settings_key), output_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _try_reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+
+
+def materialize_duplicate(
+    existing: Path,
+    target: Path,
+    *,
+    methods: Sequence[str] = MATERIALIZE_METHODS,
+    durability: DurabilityMode | str = DEFAULT_DURABILITY,
+) -> str:
+    """既存の出力を `target` に実体化し、使用した方式を返す。
+
+    一時名で作成してから置き換えるため、`target` が既に存在しても
+    中途半端な状態は残らない。`durability="durable"` の場合は置き換え前に fsync し、
+    親ディレクトリの fsync を `DirectorySyncBatcher` に登録する（通常の保存と同じ扱い）。
+
+    Returns:
+        "hardlink" / "reflink" / "copy" / "same"（同一パスの場合）
+
+    Raises:
+        OSError: いずれの方式でも作成できなかった場合
+    """
+    existing = Path(existing)
+    target = Path(target)
+    if existing.resolve() == target.resolve():
+        return "same"
+
+    durable = normalize_durability(durability) == "durable"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    last_error: Optional[OSError] = None
+    try:
+        for method in methods:
+            try:
+                if method == "hardlink":
+                    os.link(existing, tmp_path)
+                elif method == "reflink":
+                    if not _try_reflink(existing, tmp_path):
+                        continue
+                elif method == "copy":
+                    shutil.copyfile(existing, tmp_path)
+                else:
+                    raise ValueError(f"未対応の実体化方式: {method}")
+            except OSError as e:
+                last_error = e
+                continue
+            if durable:
+                fsync_file(tmp_path)
+            os.replace(tmp_path, target)
+            if durable:
+                default_directory_syncer().mark(target.parent)
+            return method
+    finally:
+        if tmp_path.exists():
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    raise last_error or OSError(f"重複ファイルを作成できませんでした: {target}")
@@ -0,0 +1,180 @@
+"""出力ファイルの書き込み耐久性ポリシー。
+
+- ``fast``: 最終パスへ直接書き込む。一時ファイルの作成・リネームを行わないため
+  メタデータ操作が最少（ネットワークFS向け）。書き込み途中のクラッシュでは壊れたファイルが残り得る。
+- ``atomic``: 同一ディレクトリの一時ファイルへ書き込み、``os.replace`` で置き換える（従来の挙動）。
+- ``durable``: ``atomic`` に加えてファイルを fsync し、親ディレクトリの fsync を
+  `DirectorySyncBatcher` でまとめて行う。ディレクトリ fsync はバッチ窓ごと
+  （またはバッチ終了時の `flush_pending_directory_syncs`）に1回だけ実行される。
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Literal, Optional, Set
+
+DurabilityMode = Literal["fast", "atomic", "durable"]
+DURABILITY_MODES: tuple[DurabilityMode, ...] = ("fast", "atomic", "durable")
+DEFAULT_DURABILITY: DurabilityMode = "atomic"
+
+DEFAULT_DIR_SYNC_WINDOW_SECONDS = 1.0
+DEFAULT_DIR_SYNC_MAX_PENDING = 256
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_durability(value: object) -> DurabilityMode:
+    """不明な値は既定値（atomic）に丸める。"""
+    text = str(value or "").strip().lower()
+    if text in DURABILITY_MODES:
+        return text  # type: ignore[return-value]
+    return DEFAULT_DURABILITY
+
+
+def build_temp_path(target_path: Path) -> Path:
+    """同一ディレクトリ内の一時保存パスを作る。"""
+    base_name = target_path.name or "karuku_output"
+    token = f"{os.getpid()}_{time.time_ns()}_{uuid.uuid4().hex[:10]}"
+    return target_path.with_name(f".{base_name}.{token}.tmp")
+
+
+def fsync_file(path: Path) -> None:
+    # Windows では書き込みハンドルでないと FlushFileBuffers が失敗するため r+b で開く
+    with open(path, "rb+") as fh:
+        os.fsync(fh.fileno())
+
+
+def fsync_directory(path: Path) -> None:
+    """ディレクトリエントリ（リネーム結果）を永続化する。Windowsでは何もしない。"""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class DirectorySyncBatcher:
+    """ディレクトリ fsync を時間窓・件数でまとめて実行する。"""
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_DIR_SYNC_WINDOW_SECONDS,
+        max_pending: int = DEFAULT_DIR_SYNC_MAX_PENDING,
+        sync_func: Callable[[Path], None] = fsync_directory,
+    ) -> None:
+        self.window_seconds = max(0.0, float(window_seconds))
+        self.max_pending = max(1, int(max_pending))
+        self._sync_func = sync_func
+        self._lock = threading.Lock()
+        self._pending: Set[Path] = set()
+        self._window_started: Optional[float] = None
+        self.sync_count = 0
+
+    def mark(self, directory: Path) -> None:
+        """同期が必要なディレクトリを登録し、窓を超えていればまとめて同期する。"""
+        with self._lock:
+            self._pending.add(Path(directory))
+            now = time.monotonic()
+            if self._window_started is None:
+                self._window_started = now
+            due = (
+                len(self._pending) >= self.max_pending
+                or now - self._window_started >= self.window_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """保留中のディレクトリをすべて同期し、同期した件数を返す。"""
+        with self._lock:
+            pending = sorted(self._pending)
+            self._pending.clear()
+            self._window_started = None
+        for directory in pending:
+            try:
+                self._sync_func(directory)
+            except OSError as e:
+                logger.warning("ディレクトリの同期に失敗: %s (%s)", directory, e)
+        with self._lock:
+            self.sync_count += len(pending)
+        return len(pending)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_default_syncer = DirectorySyncBatcher()
+atexit.register(_default_syncer.flush)
+
+
+def default_directory_syncer() -> DirectorySyncBatcher:
+    return _default_syncer
+
+
+def flush_pending_directory_syncs() -> int:
+    """バッチ終了時に呼び出し、保留中のディレクトリ fsync を確定させる。"""
+    return _default_syncer.flush()
+
+
+def _stat_signature(path: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def write_with_durability(
+    final_path: Path,
+    write: Callable[[Path], None],
+    mode: DurabilityMode | str = DEFAULT_DURABILITY,
+    *,
+    syncer: Optional[DirectorySyncBatcher] = None,
+) -> None:
+    """`write(path)` でファイルを書き出し、ポリシーに従って確定させる。
+
+    Raises:
+        `write` や置換で発生した例外をそのまま送出する（一時ファイルは削除済み）
+    """
+    resolved = normalize_durability(mode)
+    final_path = Path(final_path)
+
+    if resolved == "fast":
+        before = _stat_signature(final_path)
+        try:
+            write(final_path)
+        except BaseException:
+            # 書き込みが開く前に失敗した場合、既存ファイルはそのまま残す
+            # （作成・切り詰めで中身が変わったときだけ壊れたファイルとして削除する）
+            if _stat_signature(final_path) not in (None, before):
+                try:
+                    final_path.unlink()
+                except OSError:
+                    pass
+            raise
+        return
+
+    tmp_path = build_temp_path(final_path)
+    try:
+        write(tmp_path)
+        if resolved == "durable":
+            fsync_file(tmp_path)
+        os.replace(tmp_path, final_path)
+    finally:
+        if tmp_path.exists():
+            try:
+                tmp_path.unlink()
+            except OSError:
+                logger.warning("一時保存ファイルの削除に失敗: %s", tmp_path)
+    if resolved == "durable":
+        (syncer or _default_syncer).mark(final_path.parent)
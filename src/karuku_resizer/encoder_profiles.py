@@ -0,0 +1,86 @@
+"""最終保存時のエンコーダ速度プロファイル。
+
+- ``fastest``: エントロピー最適化・プログレッシブ・PNG の最適化を行わず、WebP/AVIF も最速設定で書く。
+- ``balanced``: JPEG はハフマン最適化のみ（プログレッシブなし）、PNG は zlib 既定レベル、
+  WebP は libwebp 既定の method 4、AVIF は speed 8。
+- ``smallest``: 従来の挙動（JPEG 最適化+プログレッシブ、PNG optimize、WebP/AVIF は個別指定のまま）。
+
+WebP の method と AVIF の speed は個別設定も持つため、プロファイルは「これより遅くしない」
+上限として働く（個別設定の方が速ければそちらを使う）。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Literal, Optional
+
+EncoderProfile = Literal["fastest", "balanced", "smallest"]
+ENCODER_PROFILES: tuple[EncoderProfile, ...] = ("fastest", "balanced", "smallest")
+DEFAULT_ENCODER_PROFILE: EncoderProfile = "smallest"
+
+
+@dataclass(frozen=True)
+class EncoderSettings:
+    """プロファイルごとのコーデック設定。
+
+    Attributes:
+        jpeg_optimize: JPEG のハフマンテーブル最適化
+        jpeg_progressive: プログレッシブ JPEG
+        png_optimize: PNG の optimize（zlib レベル 9 + 追加の探索）
+        png_compress_level: PNG の zlib レベル。None は呼び出し側の既定値を使う
+        webp_method_max: WebP の method の上限（0=最速〜6=最小）
+        avif_speed_min: AVIF の speed の下限（0=最小〜10=最速）
+    """
+
+    jpeg_optimize: bool
+    jpeg_progressive: bool
+    png_optimize: bool
+    png_compress_level: Optional[int]
+    webp_method_max: int
+    avif_speed_min: int
+
+    def webp_method(self, requested: int) -> int:
+        return min(requested, self.webp_method_max)
+
+    def avif_speed(self, requested: int) -> int:
+        return max(requested, self.avif_speed_min)
+
+
+_SETTINGS: Dict[EncoderProfile, EncoderSettings] = {
+    "fastest": EncoderSettings(
+        jpeg_optimize=False,
+        jpeg_progressive=False,
+        png_optimize=False,
+        png_compress_level=1,
+        webp_method_max=0,
+        avif_speed_min=10,
+    ),
+    "balanced": EncoderSettings(
+        jpeg_optimize=True,
+        jpeg_progressive=False,
+        png_optimize=False,
+        png_compress_level=6,
+        webp_method_max=4,
+        avif_speed_min=8,
+    ),
+    "smallest": EncoderSettings(
+        jpeg_optimize=True,
+        jpeg_progressive=True,
+        png_optimize=True,
+        png_compress_level=None,
+        webp_method_max=6,
+        avif_speed_min=0,
+    ),
+}
+
+
+def normalize_encoder_profile(value: object) -> EncoderProfile:
+    """不明な値は既定値（smallest）に丸める。"""
+    text = str(value or "").strip().lower()
+    if text in ENCODER_PROFILES:
+        return text  # type: ignore[return-value]
+    return DEFAULT_ENCODER_PROFILE
+
+
+def encoder_settings(profile: object) -> EncoderSettings:
+    return _SETTINGS[normalize_encoder_profile(profile)]
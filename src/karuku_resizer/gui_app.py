@@ -11,6 +11,7 @@ A convenience CLI entry point `karuku-resizer` is also provided if installed as
 """
 from __future__ import annotations
 
+import bisect
 import io
 import json
 import logging
@@ -26,11 +27,11 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union, cast
 from tkinter import filedialog, messagebox, simpledialog
 
 import customtkinter
-from PIL import Image, ImageOps, ImageTk
+from PIL import Image, ImageTk
 try:
     from tkinterdnd2 import COPY, DND_FILES, TkinterDnD
     TKDND_AVAILABLE = True
@@ -44,6 +45,8 @@ except Exception:
 from karuku_resizer.help_content import HELP_CONTENT, STEP_DESCRIPTIONS
 from karuku_resizer.help_dialog import HelpDialog
 from karuku_resizer.operation_flow import OperationScope, OperationScopeHooks
+from karuku_resizer.orientation import oriented_size, resize_oriented
+from karuku_resizer.encoder_profiles import normalize_encoder_profile
 from karuku_resizer.gui_settings_store import GuiSettingsStore, default_gui_settings
 from karuku_resizer.processing_preset_store import (
     ProcessingPreset,
@@ -67,6 +70,18 @@ from karuku_resizer.image_save_pipeline import (
     save_image,
     supported_output_formats,
 )
+from karuku_resizer.preview_service import (
+    DEFAULT_PREVIEW_WORKERS,
+    PRIORITY_BACKGROUND,
+    PRIORITY_CURRENT,
+    PreviewService,
+    PreviewTicket,
+    ResizedPreviewCache,
+    image_nbytes,
+    precompute_order,
+    preview_cache_key,
+)
+from karuku_resizer.retry_policy import RetryPolicy, active_retry_run, is_retryable_save_result
 from karuku_resizer.runtime_logging import (
     DEFAULT_MAX_FILES,
     DEFAULT_RETENTION_DAYS,
@@ -143,9 +158,13 @@ from karuku_resizer.ui_file_list_panel import (
     FileListRefs,
 )
 from karuku_resizer.ui_file_load_helpers import (
+    DecodedImageStore,
+    EncodedSource,
+    decode_image_file,
     dedupe_paths,
     is_selectable_input_file,
     normalize_dropped_path_text,
+    source_orientation,
 )
 from karuku_resizer.ui_metadata_panel import (
     apply_metadata_preview,
@@ -257,6 +276,9 @@ PREVIEW_ESTIMATION_FAST_QUALITY = 75
 PREVIEW_ESTIMATION_TIMEOUT_MS = 2200
 PREVIEW_ESTIMATION_RETRY_DELAY_MS = 180
 PREVIEW_HIGH_PRECISION_DELAY_MS = 320
+PREVIEW_IDLE_DELAY_MS = 600
+PREVIEW_PRECOMPUTE_MEMORY_BUDGET_MB = 256
+PREVIEW_CACHE_MEMORY_BUDGET_MB = 384
 QUALITY_VALUES = [str(v) for v in range(5, 101, 5)]
 WEBP_METHOD_VALUES = [str(v) for v in range(0, 7)]
 AVIF_SPEED_VALUES = [str(v) for v in range(0, 11)]
@@ -412,7 +434,8 @@ LOG_APP_NAME = "KarukuResize"
 @dataclass
 class ImageJob:
     path: Path
-    image: Image.Image
+    # 展開済み画像、または圧縮常駐モードでは元ファイルのバイト列（`image` で必要時に展開）
+    source: Union[Image.Image, EncodedSource]
     resized: Optional[Image.Image] = None  # cache of last processed result
     preview_target_size: Optional[Tuple[int, int]] = None  # size used for resized cache
     preview_size_cache: Dict[Tuple[Any, ...], Tuple[float, bool]] = field(
@@ -424,6 +447,44 @@ class ImageJob:
     metadata_error: Optional[str] = None
     last_process_state: str = "unprocessed"  # unprocessed / success / failed
     last_error_detail: Optional[str] = None
+    decode_cache: Optional[ResizedPreviewCache] = field(default=None, repr=False, compare=False)
+    # EXIF Orientation。画素は保存時の向きのまま保持し、リサイズ後に適用する
+    orientation: int = 1
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Orientation 適用後（表示上）のサイズ。目標サイズはこの座標系で計算する"""
+        return oriented_size(self.source.size, self.orientation)
+
+    @property
+    def image(self) -> Image.Image:
+        return self.load_image()
+
+    def load_image(self, *, cache: bool = True) -> Image.Image:
+        """展開済み画像（未回転）を返す。圧縮常駐の場合は共有LRUを経由して展開する"""
+        source = self.source
+        if isinstance(source, Image.Image):
+            return source
+        key = preview_cache_key(source.size, resample="source")
+        if self.decode_cache is not None:
+            cached = self.decode_cache.get(id(self), key)
+            if cached is not None:
+                return cached
+        image = source.decode()
+        if cache and self.decode_cache is not None:
+            self.decode_cache.put(id(self), key, image)
+        return image
+
+    @property
+    def resident_bytes(self) -> int:
+        """元画像として常駐しているバイト数（圧縮常駐ならファイルサイズ、それ以外は画素バッファ）"""
+        if isinstance(self.source, EncodedSource):
+            return len(self.source.data)
+        return image_nbytes(self.source)
+
+
+def _job_sort_key(job: ImageJob) -> str:
+    return str(job.path).lower()
 
 
 @dataclass
@@ -434,8 +495,13 @@ class BatchSaveStats:
     exif_applied_count: int = 0
     exif_fallback_count: int = 0
     gps_removed_count: int = 0
+    passthrough_count: int = 0
     failed_details: List[str] = field(default_factory=list)
     failed_paths: List[Path] = field(default_factory=list)
+    retry_count: int = 0
+
+    def record_retries(self, count: int) -> None:
+        self.retry_count += max(0, count)
 
     def record_success(self, result: SaveResult) -> None:
         self.processed_count += 1
@@ -447,6 +513,8 @@ class BatchSaveStats:
             self.exif_fallback_count += 1
         if result.gps_removed:
             self.gps_removed_count += 1
+        if result.passthrough:
+            self.passthrough_count += 1
 
     def record_failure(self, file_name: str, detail: str, file_path: Optional[Path] = None) -> None:
         self.failed_count += 1
@@ -463,8 +531,69 @@ class ResizePlan:
     height: Optional[int] = None
 
 
+@dataclass(frozen=True)
+class PreviewEstimationRequest:
+    """サイズ推定に使う設定スナップショットとキャッシュキー（Tkスレッドで作成する）"""
+
+    quality_for_preview: int
+    webp_method: int
+    avif_speed: int
+    webp_lossless: bool
+    precise_options: Optional[SaveOptions]
+    fast_cache_key: Tuple[Any, ...]
+    precise_cache_key: Optional[Tuple[Any, ...]]
+
+    def cached_kb(self, job: ImageJob) -> Optional[float]:
+        """表示に十分なキャッシュ（高精度、無効時は高速推定）があればそのKBを返す"""
+        key = self.precise_cache_key if self.precise_cache_key is not None else self.fast_cache_key
+        entry = job.preview_size_cache.get(key)
+        if entry is None or entry[0] <= 0:
+            return None
+        return entry[0]
+
+
+def _encode_fast_preview_kb(
+    source: Image.Image,
+    *,
+    output_format: SaveFormat,
+    request: PreviewEstimationRequest,
+) -> Tuple[float, bool]:
+    """低品質設定で一度エンコードして出力サイズ(KB)を推定する。大きい画像は縮小サンプルから外挿する"""
+    save_img = source
+    sample_scale = 1.0
+    estimated = False
+    source_pixels = source.width * source.height
+    if source_pixels > PREVIEW_ESTIMATION_SAMPLE_MAX_PIXELS:
+        estimated = True
+        sample_scale = math.sqrt(PREVIEW_ESTIMATION_SAMPLE_MAX_PIXELS / source_pixels)
+        sample_size = (
+            max(1, int(source.width * sample_scale)),
+            max(1, int(source.height * sample_scale)),
+        )
+        save_img = source.resize(sample_size, Image.Resampling.LANCZOS)
+    if output_format in {"jpeg", "avif"} and save_img.mode in {"RGBA", "LA", "P"}:
+        save_img = save_img.convert("RGB")
+    preview_kwargs = build_encoder_save_kwargs(
+        output_format=output_format,
+        quality=request.quality_for_preview,
+        webp_method=request.webp_method,
+        webp_lossless=request.webp_lossless,
+        avif_speed=request.avif_speed,
+        for_preview=True,
+    )
+    with io.BytesIO() as bio:
+        save_img.save(bio, **cast(Dict[str, Any], preview_kwargs))
+        kb = len(bio.getvalue()) / 1024
+    if estimated and sample_scale > 0:
+        kb = kb / (sample_scale * sample_scale)
+    return kb, estimated
+
+
 DEBUG = False
 
+# 保存の再試行（Proモードのみ）。一時的なロックの解除待ちを想定した短い指数バックオフ
+GUI_SAVE_RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=0.35, max_delay=1.5)
+
 logger = logging.getLogger(__name__)
 
 
@@ -702,7 +831,8 @@ class ResizeApp(customtkinter.CTk):
         self._cancel_batch = False
         self._is_loading_files = False
         self._file_load_cancel_event = threading.Event()
-        self._file_load_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=8)
+        self._file_load_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._file_load_image_store = DecodedImageStore()
         self._file_load_after_id: Optional[str] = None
         self._file_load_total_candidates = 0
         self._file_load_loaded_count = 0
@@ -743,7 +873,17 @@ class ResizeApp(customtkinter.CTk):
         self._single_save_cancel_event = threading.Event()
         self._single_save_version = 0
         self._preview_draw_after_id: Optional[str] = None
-        self._preview_thread: Optional[threading.Thread] = None
+        # プレビュー生成・サイズ推定は常駐スレッドで処理し、古い要求は開始前に破棄する
+        self._preview_service = PreviewService(max_workers=DEFAULT_PREVIEW_WORKERS)
+        # 設定を切り替えて戻したときに再リサイズしないよう、ジョブごとに複数サイズを保持する
+        self._preview_cache = ResizedPreviewCache(
+            max_bytes=PREVIEW_CACHE_MEMORY_BUDGET_MB * 1024 * 1024,
+            on_evict=self._on_preview_cache_evict,
+        )
+        self._last_user_input_at = time.monotonic()
+        self._idle_precompute_after_id: Optional[str] = None
+        self._idle_precompute_generation = 0
+        self._idle_precompute_completed: set[int] = set()
         self._preview_version = 0
         self._size_estimation_version = 0
         self._size_estimation_inflight_key: Optional[Tuple[Any, ...]] = None
@@ -765,6 +905,7 @@ class ResizeApp(customtkinter.CTk):
         self._setup_tooltips()
         self._setup_keyboard_shortcuts()
         self._setup_drag_and_drop()
+        self._setup_idle_precompute()
         self._refresh_preset_menu(selected_preset_id=self.settings.get("default_preset_id", ""))
         self._restore_settings()
         self._apply_default_preset_if_configured()
@@ -960,6 +1101,7 @@ class ResizeApp(customtkinter.CTk):
                 "webp_method": str(self._current_webp_method()),
                 "webp_lossless": self.webp_lossless_var.get(),
                 "avif_speed": str(self._current_avif_speed()),
+                "encoder_profile": normalize_encoder_profile(self.settings.get("encoder_profile")),
                 "dry_run": self.dry_run_var.get(),
                 "exif_mode": EXIF_LABEL_TO_ID.get(self.exif_mode_var.get(), "keep"),
                 "remove_gps": self.remove_gps_var.get(),
@@ -1007,6 +1149,7 @@ class ResizeApp(customtkinter.CTk):
         except (TypeError, ValueError):
             avif_speed = 6
         self.avif_speed_var.set(str(avif_speed))
+        self.settings["encoder_profile"] = normalize_encoder_profile(merged.get("encoder_profile"))
 
         self.dry_run_var.set(self._to_bool(merged.get("dry_run", False)))
 
@@ -1263,30 +1406,7 @@ class ResizeApp(customtkinter.CTk):
 
     @staticmethod
     def _is_retryable_save_error(result: SaveResult) -> bool:
-        if result.retryable:
-            return True
-        if result.error_category in {"sharing_violation"}:
-            return True
-
-        error_text = result.error or ""
-        if not error_text:
-            return False
-        text = error_text.lower()
-        if (result.error_code is not None) and result.error_code in {32, 33}:
-            return True
-        return any(
-            token in text
-            for token in (
-                "resource temporarily unavailable",
-                "temporarily unavailable",
-                "used by another process",
-                "used by another",
-                "in use",
-                "timed out",
-                "timeout",
-                "アクセスが拒否",
-            )
-        )
+        return is_retryable_save_result(result)
 
     def _save_with_retry(
         self,
@@ -1297,8 +1417,11 @@ class ResizeApp(customtkinter.CTk):
         options: SaveOptions,
         allow_retry: bool,
         cancel_event: Optional[threading.Event] = None,
+        source_path: Optional[Path] = None,
     ) -> Tuple[SaveResult, int]:
-        max_attempts = 2 if allow_retry else 1
+        policy = GUI_SAVE_RETRY_POLICY
+        max_attempts = policy.max_attempts if allow_retry else 1
+        run = active_retry_run()
         result: SaveResult = SaveResult(
             success=False,
             output_path=output_path,
@@ -1306,47 +1429,51 @@ class ResizeApp(customtkinter.CTk):
             error="未実行",
         )
 
+        def cancelled_result() -> SaveResult:
+            return SaveResult(
+                success=False,
+                output_path=output_path,
+                exif_mode=options.exif_mode,
+                error="保存をキャンセルしました",
+            )
+
         for attempt in range(1, max_attempts + 1):
             if cancel_event is not None and cancel_event.is_set():
-                return SaveResult(
-                    success=False,
-                    output_path=output_path,
-                    exif_mode=options.exif_mode,
-                    error="保存をキャンセルしました",
-                ), attempt
+                return cancelled_result(), attempt
             result = save_image(
                 source_image=source_image,
                 resized_image=resized_image,
                 output_path=output_path,
                 options=options,
+                source_path=source_path,
             )
             if result.success:
+                if attempt > 1:
+                    run.stats.record_recovered()
                 return result, attempt
-            if not allow_retry or attempt >= max_attempts:
+            if not allow_retry:
                 return result, attempt
             if not self._is_retryable_save_error(result):
+                run.stats.record_fatal()
                 return result, attempt
-            if cancel_event is not None and cancel_event.is_set():
-                return SaveResult(
-                    success=False,
-                    output_path=output_path,
-                    exif_mode=options.exif_mode,
-                    error="保存をキャンセルしました",
-                ), attempt
-            retry_delay = 0.35 * attempt
+            if attempt >= max_attempts:
+                run.stats.record_exhausted()
+                return result, attempt
+            retry_delay = policy.delay_for(attempt)
+            if not run.budget.try_consume(retry_delay):
+                run.stats.record_budget_exhausted()
+                return result, attempt
+            run.stats.record_retry(retry_delay)
             logging.info(
                 "保存再試行: %s (%s)",
                 output_path,
                 result.error,
             )
-            if cancel_event is not None and cancel_event.is_set():
-                return SaveResult(
-                    success=False,
-                    output_path=output_path,
-                    exif_mode=options.exif_mode,
-                    error="保存をキャンセルしました",
-                ), attempt
-            time.sleep(min(1.5, retry_delay))
+            if cancel_event is not None:
+                if cancel_event.wait(retry_delay):
+                    return cancelled_result(), attempt
+            else:
+                time.sleep(retry_delay)
 
         return result, max_attempts
 
@@ -1826,6 +1953,21 @@ class ResizeApp(customtkinter.CTk):
             self._file_load_cancel_event.set()
         if self._single_save_thread is not None and self._single_save_thread.is_alive():
             self._single_save_cancel_event.set()
+        if self._idle_precompute_after_id is not None:
+            try:
+                self.after_cancel(self._idle_precompute_after_id)
+            except Exception:
+                pass
+            self._idle_precompute_after_id = None
+        self._preview_service.shutdown()
+        cache_stats = self._preview_cache.stats
+        logging.info(
+            "Preview cache: hits=%d misses=%d evictions=%d evicted=%.1fMB",
+            cache_stats.hits,
+            cache_stats.misses,
+            cache_stats.evictions,
+            cache_stats.evicted_bytes / (1024 * 1024),
+        )
         self._save_current_settings()
         self._finalize_run_summary()
         self.destroy()
@@ -1964,6 +2106,7 @@ class ResizeApp(customtkinter.CTk):
             webp_method=webp_method,
             webp_lossless=webp_lossless,
             avif_speed=avif_speed,
+            encoder_profile=normalize_encoder_profile(self.settings.get("encoder_profile")),
         )
 
     # ------------------------------------------------------------------
@@ -1993,13 +2136,13 @@ class ResizeApp(customtkinter.CTk):
         fmt = self.output_format_var.get()
         target = None
         if self.jobs:
-            first_img = self.jobs[0].image
+            first_img = self.jobs[0].source
             resolved_format = self._resolve_output_format_for_image(first_img)
             fmt = FORMAT_ID_TO_LABEL.get(resolved_format, "JPEG")
-            target = self._get_target(first_img.size)
+            target = self._get_target(self.jobs[0].size)
         return settings_text, fmt, target
 
-    def _resolve_output_format_for_image(self, source_image: Image.Image) -> SaveFormat:
+    def _resolve_output_format_for_image(self, source_image: Union[Image.Image, EncodedSource]) -> SaveFormat:
         selected_id = FORMAT_LABEL_TO_ID.get(self.output_format_var.get(), "auto")
         return resolve_output_format(
             selected=selected_id,
@@ -2367,6 +2510,7 @@ class ResizeApp(customtkinter.CTk):
     def _finish_recursive_load(self, canceled: bool) -> None:
         retry_paths = list(self._file_load_failed_paths)
         self._is_loading_files = False
+        self._file_load_image_store.clear()
         if self._file_load_after_id is not None:
             try:
                 self.after_cancel(self._file_load_after_id)
@@ -2378,6 +2522,7 @@ class ResizeApp(customtkinter.CTk):
 
         if self.jobs:
             self._populate_listbox()
+            self._schedule_idle_precompute(PREVIEW_IDLE_DELAY_MS)
         else:
             self._clear_preview_panels()
 
@@ -2458,6 +2603,8 @@ class ResizeApp(customtkinter.CTk):
     def _reset_loaded_jobs(self) -> None:
         self.jobs.clear()
         self.current_index = None
+        self._idle_precompute_completed.clear()
+        self._preview_cache.clear()
         self._visible_job_indices = []
         for button in self.file_buttons:
             button.destroy()
@@ -2465,24 +2612,41 @@ class ResizeApp(customtkinter.CTk):
         self._clear_preview_panels()
         self._update_empty_state_hint()
 
-    def _append_loaded_job(self, path: Path, image: Image.Image) -> None:
-        file_size = 0
-        try:
-            file_size = path.stat().st_size
-        except Exception:
-            file_size = 0
-        self.jobs.append(ImageJob(path, image, source_size_bytes=file_size))
+    def _append_loaded_job(
+        self,
+        path: Path,
+        image: Union[Image.Image, EncodedSource],
+        file_size: Optional[int] = None,
+        *,
+        sorted_insert: bool = False,
+    ) -> None:
+        # 読み込みワーカーが計測済みのサイズを渡す場合は Tk スレッドで stat しない
+        if file_size is None:
+            try:
+                file_size = path.stat().st_size
+            except Exception:
+                file_size = 0
+        job = ImageJob(path, image, source_size_bytes=file_size, orientation=source_orientation(image))
+        if isinstance(image, EncodedSource):
+            job.decode_cache = self._preview_cache
+        if not sorted_insert:
+            self.jobs.append(job)
+            return
+        # 探索と読込が並行する場合は到着順が揃わないため、パス順の位置へ挿入する
+        position = bisect.bisect_right(self.jobs, str(path).lower(), key=_job_sort_key)
+        self.jobs.insert(position, job)
+        if self.current_index is not None and position <= self.current_index:
+            self.current_index += 1
 
     def _load_selected_paths(self, paths: List[Path]) -> None:
         # 新規選択として状態を初期化する
         self.jobs.clear()
         self.current_index = None
+        self._preview_cache.clear()
         for path in paths:
             try:
-                with Image.open(path) as opened:
-                    opened.load()
-                    # EXIF Orientationを正規化して表示/処理を統一する。
-                    img = ImageOps.exif_transpose(opened)
+                # EXIF Orientation は ImageJob.orientation として保持し、リサイズ後に適用する
+                img = decode_image_file(path)
             except Exception as e:  # pragma: no cover
                 detail = build_load_error_detail(path=path, error=e)
                 messagebox.showerror("エラー", f"{path} の読み込みに失敗しました: {detail}")
@@ -2814,18 +2978,30 @@ class ResizeApp(customtkinter.CTk):
         return img.resize(target_size, Resampling.LANCZOS)
 
     @staticmethod
-    def _resize_image_to_target(img: Image.Image, target_size: Tuple[int, int]) -> Optional[Image.Image]:
-        """Resize image to the explicit target size used for batch-apply saves."""
+    def _resize_image_to_target(
+        img: Image.Image,
+        target_size: Tuple[int, int],
+        orientation: int = 1,
+    ) -> Optional[Image.Image]:
+        """Resize image to the explicit target size used for batch-apply saves.
+
+        ``target_size`` is in oriented coordinates; ``orientation`` is applied to the resized output.
+        """
         tw, th = target_size
         if tw <= 0 or th <= 0:
             return None
-        return img.resize((tw, th), Resampling.LANCZOS)
+        return resize_oriented(img, (tw, th), orientation, Resampling.LANCZOS)
 
-    def _resize_image_with_plan(self, img: Image.Image, resize_plan: ResizePlan) -> Optional[Image.Image]:
-        target_size = self._resolve_target_from_resize_plan(img.size, resize_plan)
+    def _resize_image_with_plan(
+        self,
+        img: Image.Image,
+        resize_plan: ResizePlan,
+        orientation: int = 1,
+    ) -> Optional[Image.Image]:
+        target_size = self._resolve_target_from_resize_plan(oriented_size(img.size, orientation), resize_plan)
         if not target_size:
             return None
-        return self._resize_image_to_target(img, target_size)
+        return self._resize_image_to_target(img, target_size, orientation)
 
     def _resolve_batch_reference(self) -> Optional[Tuple[ImageJob, Tuple[int, int], ResizePlan, str, SaveFormat]]:
         """Resolve selected image as batch reference and freeze output params."""
@@ -2838,7 +3014,7 @@ class ResizeApp(customtkinter.CTk):
         reference_job = self.jobs[ref_index]
 
         resize_plan = self._snapshot_resize_plan()
-        target_size = self._resolve_target_from_resize_plan(reference_job.image.size, resize_plan)
+        target_size = self._resolve_target_from_resize_plan(reference_job.size, resize_plan)
         if not target_size:
             self.status_var.set("基準画像のリサイズ設定が無効です")
             return None
@@ -2867,8 +3043,7 @@ class ResizeApp(customtkinter.CTk):
             return
 
         job = self.jobs[job_index]
-        source = job.image
-        target_size = self._snapshot_resize_target(source.size)
+        target_size = self._snapshot_resize_target(job.size)
         self._preview_version += 1
         version = self._preview_version
 
@@ -2879,12 +3054,13 @@ class ResizeApp(customtkinter.CTk):
             )
             return
 
-        if job.resized is not None and job.preview_target_size == target_size:
+        cached = self._cached_resized_preview(job, target_size)
+        if cached is not None:
             self.after(
                 0,
                 lambda: self._apply_async_preview_result(
                     job_index,
-                    job.resized,
+                    cached,
                     version,
                     target_size=target_size,
                 ),
@@ -2900,13 +3076,15 @@ class ResizeApp(customtkinter.CTk):
         self.info_resized_var.set("計算中...")
         self.resized_title_label.configure(text="リサイズ後 (処理中)")
 
-        def worker() -> None:
+        def worker(ticket: PreviewTicket) -> None:
+            if ticket.cancelled or version != self._preview_version:
+                return
             resized: Optional[Image.Image] = None
             try:
-                resized = self._resize_image_to_target(source, target_size)
+                resized = self._resize_image_to_target(job.image, target_size, job.orientation)
             except Exception:
                 logging.exception("プレビュー生成に失敗")
-            if version != self._preview_version:
+            if ticket.cancelled or version != self._preview_version:
                 return
             if self.current_index is None:
                 return
@@ -2915,12 +3093,7 @@ class ResizeApp(customtkinter.CTk):
                 lambda: self._apply_async_preview_result(job_index, resized, version, target_size=target_size),
             )
 
-        self._preview_thread = threading.Thread(
-            target=worker,
-            daemon=True,
-            name=f"karuku-preview-{job_index}",
-        )
-        self._preview_thread.start()
+        self._preview_service.submit("render", worker, priority=PRIORITY_CURRENT)
 
     def _apply_async_preview_result(
         self,
@@ -2943,10 +3116,150 @@ class ResizeApp(customtkinter.CTk):
             self.jobs[job_index].preview_target_size = None
             self._draw_previews(self.jobs[job_index])
             return
-        self.jobs[job_index].resized = resized
-        self.jobs[job_index].preview_target_size = target_size
+        if target_size is not None:
+            self._remember_resized_preview(self.jobs[job_index], target_size, resized)
         self._draw_previews(self.jobs[job_index])
 
+    def _cached_resized_preview(self, job: ImageJob, target_size: Tuple[int, int]) -> Optional[Image.Image]:
+        key = preview_cache_key(target_size)
+        cached = self._preview_cache.get(id(job), key)
+        if cached is None and job.resized is not None and job.preview_target_size == target_size:
+            cached = job.resized
+        if cached is not None:
+            job.resized = cached
+            job.preview_target_size = target_size
+        return cached
+
+    def _remember_resized_preview(self, job: ImageJob, target_size: Tuple[int, int], resized: Image.Image) -> None:
+        job.resized = resized
+        job.preview_target_size = target_size
+        self._preview_cache.put(id(job), preview_cache_key(target_size), resized)
+
+    def _on_preview_cache_evict(self, owner: Any, key: Any, image: Image.Image) -> None:
+        # 表示中のジョブ以外は、追い出した画像への参照も外してメモリ上限を守る
+        for index, job in enumerate(self.jobs):
+            if id(job) != owner:
+                continue
+            if job.resized is image and index != self.current_index:
+                job.resized = None
+                job.preview_target_size = None
+            return
+
+    # -------------------- idle precompute ---------------------------
+    def _setup_idle_precompute(self) -> None:
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<MouseWheel>"):
+            self.bind_all(sequence, self._note_user_activity, add="+")
+
+    def _note_user_activity(self, _event: Any = None) -> None:
+        # 入力があれば先読みを即座に止め、再び無操作になってから設定を取り直して再開する
+        self._last_user_input_at = time.monotonic()
+        self._idle_precompute_generation += 1
+        self._idle_precompute_completed.clear()
+        self._preview_service.cancel_background()
+        self._schedule_idle_precompute(PREVIEW_IDLE_DELAY_MS)
+
+    def _schedule_idle_precompute(self, delay_ms: int) -> None:
+        if self._idle_precompute_after_id is not None:
+            try:
+                self.after_cancel(self._idle_precompute_after_id)
+            except Exception:
+                pass
+        self._idle_precompute_after_id = self.after(delay_ms, self._run_idle_precompute_step)
+
+    def _preview_cache_bytes(self) -> int:
+        return self._preview_cache.total_bytes
+
+    def _run_idle_precompute_step(self) -> None:
+        """無操作中に、選択中の前後から順に1件ずつプレビューとサイズ推定を先に計算する"""
+        self._idle_precompute_after_id = None
+        if not self.jobs or self._is_loading_files:
+            return
+        if self._operation_scope is not None and self._operation_scope.active:
+            return
+        idle_ms = (time.monotonic() - self._last_user_input_at) * 1000
+        if idle_ms < PREVIEW_IDLE_DELAY_MS:
+            self._schedule_idle_precompute(int(PREVIEW_IDLE_DELAY_MS - idle_ms) + 1)
+            return
+
+        resize_plan = self._snapshot_resize_plan()
+        budget_bytes = PREVIEW_PRECOMPUTE_MEMORY_BUDGET_MB * 1024 * 1024
+        used_bytes = self._preview_cache_bytes()
+        for index in precompute_order(self.current_index, len(self.jobs)):
+            job = self.jobs[index]
+            if id(job) in self._idle_precompute_completed:
+                continue
+            target_size = self._resolve_target_from_resize_plan(job.size, resize_plan)
+            if not target_size:
+                continue
+            existing = self._preview_cache.peek(id(job), preview_cache_key(target_size))
+            if existing is None and job.resized is not None and job.preview_target_size == target_size:
+                existing = job.resized
+            has_resized = existing is not None
+            output_format = self._resolve_output_format_for_image(job.source)
+            request = self._snapshot_preview_estimation_request(target_size, job.source.mode, output_format)
+            if has_resized and request.cached_kb(job) is not None:
+                self._idle_precompute_completed.add(id(job))
+                continue
+            if not has_resized:
+                needed_bytes = target_size[0] * target_size[1] * len(job.source.getbands())
+                if used_bytes + needed_bytes > budget_bytes:
+                    logging.debug("Idle precompute stopped: preview memory budget reached")
+                    return
+            self._submit_idle_precompute(job, target_size, output_format, request, existing=existing)
+            return
+
+    def _submit_idle_precompute(
+        self,
+        job: ImageJob,
+        target_size: Tuple[int, int],
+        output_format: SaveFormat,
+        request: PreviewEstimationRequest,
+        *,
+        existing: Optional[Image.Image],
+    ) -> None:
+        generation = self._idle_precompute_generation
+
+        def worker(ticket: PreviewTicket) -> None:
+            if ticket.cancelled:
+                return
+            # 先読みで展開した元画像はLRUに入れず、表示中の画像を追い出さない
+            source = job.load_image(cache=False)
+            resized = (
+                existing
+                if existing is not None
+                else self._resize_image_to_target(source, target_size, job.orientation)
+            )
+            if resized is None or ticket.cancelled:
+                return
+            size_kb = 0.0
+            estimated = False
+            try:
+                if request.precise_options is not None:
+                    size_kb = estimate_output_size_kb(
+                        source_image=source,
+                        resized_image=resized,
+                        options=request.precise_options,
+                    ) or 0.0
+                else:
+                    size_kb, estimated = _encode_fast_preview_kb(resized, output_format=output_format, request=request)
+            except Exception:
+                logging.debug("Idle size estimation failed: %s", job.path, exc_info=True)
+            if ticket.cancelled:
+                return
+            self.after(0, lambda: apply(resized, size_kb, estimated))
+
+        def apply(resized: Image.Image, size_kb: float, estimated: bool) -> None:
+            if resized is not existing:
+                self._remember_resized_preview(job, target_size, resized)
+            if size_kb > 0:
+                cache_key = request.precise_cache_key or request.fast_cache_key
+                job.preview_size_cache[cache_key] = (size_kb, estimated)
+            self._idle_precompute_completed.add(id(job))
+            if generation == self._idle_precompute_generation:
+                self._schedule_idle_precompute(0)
+
+        self._preview_service.submit(("precompute", id(job)), worker, priority=PRIORITY_BACKGROUND)
+
     def _save_current(self):
         ui_bootstrap.bootstrap_save_current(self)
 
@@ -3062,8 +3375,13 @@ class ResizeApp(customtkinter.CTk):
     def _draw_previews(self, job: ImageJob):
         """Draw original and resized previews on canvases."""
         # Original
-        self._imgtk_org = self._draw_image_on_canvas(self.canvas_org, job.image, is_resized=False)
-        size = job.image.size
+        self._imgtk_org = self._draw_image_on_canvas(
+            self.canvas_org,
+            job.image,
+            is_resized=False,
+            orientation=job.orientation,
+        )
+        size = job.size
         source_size_kb = (job.source_size_bytes / 1024) if job.source_size_bytes > 0 else 0.0
         self.info_orig_var.set(
             build_original_preview_info_text(
@@ -3079,7 +3397,7 @@ class ResizeApp(customtkinter.CTk):
             size = job.resized.size
             output_format = self._resolve_output_format_for_image(job.image)
 
-            orig_w, orig_h = job.image.size
+            orig_w, orig_h = job.size
             pct = (size[0] * size[1]) / (orig_w * orig_h) * 100
             fmt_label = FORMAT_ID_TO_LABEL.get(output_format, "JPEG")
             self.info_resized_var.set(
@@ -3113,23 +3431,21 @@ class ResizeApp(customtkinter.CTk):
         ratio_int = int(round(ratio))
         return f"原寸比 {ratio_int}%"
 
-    def _start_preview_size_estimation(
+    def _snapshot_preview_estimation_request(
         self,
-        *,
-        job: ImageJob,
-        source: Image.Image,
+        size: Tuple[int, int],
+        mode: str,
         output_format: SaveFormat,
-        pct: float,
-        fmt_label: str,
-    ) -> None:
+    ) -> PreviewEstimationRequest:
         quality, webp_method, avif_speed, webp_lossless = self._snapshot_encoder_settings()
         precise_options = self._snapshot_preview_save_options(output_format)
         quality_for_preview = min(quality, PREVIEW_ESTIMATION_FAST_QUALITY)
+        width, height = size
         fast_cache_key = (
             "fast",
-            source.width,
-            source.height,
-            source.mode,
+            width,
+            height,
+            mode,
             output_format,
             quality_for_preview,
             webp_method,
@@ -3140,9 +3456,9 @@ class ResizeApp(customtkinter.CTk):
         if precise_options is not None:
             precise_cache_key = (
                 "precise",
-                source.width,
-                source.height,
-                source.mode,
+                width,
+                height,
+                mode,
                 output_format,
                 precise_options.quality,
                 precise_options.webp_method,
@@ -3155,6 +3471,29 @@ class ResizeApp(customtkinter.CTk):
                 precise_options.exif_edit.user_comment if precise_options.exif_edit else "",
                 precise_options.exif_edit.datetime_original if precise_options.exif_edit else "",
             )
+        return PreviewEstimationRequest(
+            quality_for_preview=quality_for_preview,
+            webp_method=webp_method,
+            avif_speed=avif_speed,
+            webp_lossless=bool(webp_lossless),
+            precise_options=precise_options,
+            fast_cache_key=fast_cache_key,
+            precise_cache_key=precise_cache_key,
+        )
+
+    def _start_preview_size_estimation(
+        self,
+        *,
+        job: ImageJob,
+        source: Image.Image,
+        output_format: SaveFormat,
+        pct: float,
+        fmt_label: str,
+    ) -> None:
+        request = self._snapshot_preview_estimation_request(source.size, source.mode, output_format)
+        precise_options = request.precise_options
+        fast_cache_key = request.fast_cache_key
+        precise_cache_key = request.precise_cache_key
 
         precise_cached_entry = (
             job.preview_size_cache.get(precise_cache_key)
@@ -3258,53 +3597,34 @@ class ResizeApp(customtkinter.CTk):
                 mark_timeout,
             )
 
-        def worker() -> None:
+        def worker(ticket: PreviewTicket) -> None:
             def is_stale() -> bool:
-                return version != self._size_estimation_version
+                return ticket.cancelled or version != self._size_estimation_version
 
             def clear_request_tracking() -> None:
                 if self._size_estimation_inflight_key == request_key:
                     self._size_estimation_inflight_key = None
 
+            if is_stale():
+                clear_request_tracking()
+                return
+
             fast_kb = fast_cached_kb or 0.0
             fast_estimated = False
 
             if fast_cached_kb is None:
-                save_img = source
-                sample_scale = 1.0
-                source_pixels = source.width * source.height
-                if source_pixels > PREVIEW_ESTIMATION_SAMPLE_MAX_PIXELS:
-                    fast_estimated = True
-                    sample_scale = math.sqrt(PREVIEW_ESTIMATION_SAMPLE_MAX_PIXELS / source_pixels)
-                    sample_size = (
-                        max(1, int(source.width * sample_scale)),
-                        max(1, int(source.height * sample_scale)),
-                    )
-                    save_img = source.resize(sample_size, Image.Resampling.LANCZOS)
-                if output_format in {"jpeg", "avif"} and save_img.mode in {"RGBA", "LA", "P"}:
-                    save_img = save_img.convert("RGB")
-                preview_kwargs = build_encoder_save_kwargs(
-                    output_format=output_format,
-                    quality=quality_for_preview,
-                    webp_method=webp_method,
-                    webp_lossless=webp_lossless,
-                    avif_speed=avif_speed,
-                    for_preview=True,
-                )
                 for attempt in range(2):
                     try:
-                        with io.BytesIO() as bio:
-                            save_img.save(bio, **cast(Dict[str, Any], preview_kwargs))
-                            fast_kb = len(bio.getvalue()) / 1024
-                        if fast_estimated and sample_scale > 0:
-                            sample_area = sample_scale * sample_scale
-                            if sample_area > 0:
-                                fast_kb = fast_kb / sample_area
+                        fast_kb, fast_estimated = _encode_fast_preview_kb(
+                            source,
+                            output_format=output_format,
+                            request=request,
+                        )
                         break
                     except Exception:
                         fast_kb = 0.0
-                        if attempt == 0:
-                            time.sleep(PREVIEW_ESTIMATION_RETRY_DELAY_MS / 1000)
+                        if attempt == 0 and ticket.wait(PREVIEW_ESTIMATION_RETRY_DELAY_MS / 1000):
+                            break
 
             if is_stale():
                 clear_request_tracking()
@@ -3350,7 +3670,7 @@ class ResizeApp(customtkinter.CTk):
             assert precise_cache_key is not None
             precise_cache_key_value = precise_cache_key
 
-            time.sleep(PREVIEW_HIGH_PRECISION_DELAY_MS / 1000)
+            ticket.wait(PREVIEW_HIGH_PRECISION_DELAY_MS / 1000)
             if is_stale():
                 clear_request_tracking()
                 return
@@ -3403,14 +3723,15 @@ class ResizeApp(customtkinter.CTk):
 
             self.after(0, apply_precise)
 
-        thread = threading.Thread(
-            target=worker,
-            daemon=True,
-            name="karuku-preview-size-estimation",
-        )
-        thread.start()
+        self._preview_service.submit("estimate", worker, priority=PRIORITY_CURRENT)
 
-    def _draw_image_on_canvas(self, canvas: customtkinter.CTkCanvas, img: Image.Image, is_resized: bool) -> Optional[ImageTk.PhotoImage]:
+    def _draw_image_on_canvas(
+        self,
+        canvas: customtkinter.CTkCanvas,
+        img: Image.Image,
+        is_resized: bool,
+        orientation: int = 1,
+    ) -> Optional[ImageTk.PhotoImage]:
         canvas.delete("all")
         canvas_w, canvas_h = canvas.winfo_width(), canvas.winfo_height()
         if canvas_w <= 1 or canvas_h <= 1:  # Canvas not ready
@@ -3420,18 +3741,19 @@ class ResizeApp(customtkinter.CTk):
         zoom = getattr(self, zoom_attr)
         label = f"{int(zoom*100)}%" if zoom is not None else "画面に合わせる"
 
+        img_w, img_h = oriented_size(img.size, orientation)
         if zoom is None:  # Fit to screen
-            if img.width > 0 and img.height > 0:
-                zoom = min(canvas_w / img.width, canvas_h / img.height)
+            if img_w > 0 and img_h > 0:
+                zoom = min(canvas_w / img_w, canvas_h / img_h)
             else:
                 zoom = 1.0  # Fallback for zero-sized images
             label = f"Fit ({int(zoom*100)}%)"
         
-        new_size = (int(img.width * zoom), int(img.height * zoom))
+        new_size = (int(img_w * zoom), int(img_h * zoom))
         if new_size[0] <= 0 or new_size[1] <= 0:
             return None # Avoids errors with tiny images
         
-        disp = img.resize(new_size, Resampling.LANCZOS)
+        disp = resize_oriented(img, new_size, orientation, Resampling.LANCZOS)
         imgtk = ImageTk.PhotoImage(disp)
 
         # Center the image on the canvas
@@ -3599,10 +3921,10 @@ class ResizeApp(customtkinter.CTk):
         if self.current_index is None or self.current_index >= len(self.jobs):
             return 1.0
         job = self.jobs[self.current_index]
-        img = job.resized if is_resized and job.resized else job.image
+        width, height = job.resized.size if is_resized and job.resized else job.size
         canvas_w, canvas_h = canvas.winfo_width(), canvas.winfo_height()
-        if img and img.width > 0 and img.height > 0:
-            return min(canvas_w / img.width, canvas_h / img.height)
+        if width > 0 and height > 0:
+            return min(canvas_w / width, canvas_h / height)
         return 1.0
 
     def _on_zoom(self, event, is_resized: bool):
@@ -50,6 +50,13 @@ def default_gui_settings() -> dict[str, Any]:
         "default_preset_id": "",
         "pro_input_mode": "recursive",
         "recent_processing_settings": [],
+        "rendition_widths": "",
+        "rendition_formats": "webp,jpeg",
+        "durability": "atomic",
+        "encoder_profile": "smallest",
+        "png_palette": "auto",
+        "png_dither": False,
+        "source_residency": "decoded",
     }
 
 
@@ -0,0 +1,399 @@
+"""画素をデコードせずにファイルヘッダーだけを読む高速プローブ。
+
+JPEG の SOFn / PNG の IHDR / WebP の VP8・VP8L・VP8X / AVIF の ispe ボックスを直接解析し、
+寸法・形式・EXIF Orientation・アルファの有無・アニメーションかどうかを返す。
+Pillow のプラグイン判定や EXIF 全体の解析を経由しないため、1ファイルあたり数十マイクロ秒で済み、
+CLI の探索段階で `--min-width` 等の絞り込みやパススルー判定に使える。
+上記以外の形式は Pillow の遅延オープン（ヘッダーのみ読み込み）にフォールバックする。
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from karuku_resizer.orientation import EXIF_ORIENTATION_TAG, oriented_size, read_orientation
+
+# EXIF/AVIF メタデータとして読み込む上限（これを超えるものは壊れているとみなす）
+MAX_METADATA_BYTES = 1024 * 1024
+
+_EXIF_HEADER = b"Exif\x00\x00"
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_STANDALONE = frozenset([0x01, *range(0xD0, 0xD8)])
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_AVIF_BRANDS = frozenset((b"avif", b"avis"))
+_AVIF_ALPHA_URNS = (b"urn:mpeg:mpegB:cicp:systems:auxiliary:alpha", b"urn:mpeg:hevc:2015:auxid:1")
+# HEIF の irot（反時計回り 90° 単位）→ EXIF Orientation
+_IROT_TO_ORIENTATION = {0: 1, 1: 8, 2: 3, 3: 6}
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """ヘッダーから読み取った画像情報。
+
+    Attributes:
+        format: Pillow と同じ形式名（"JPEG"/"MPO"/"PNG"/"WEBP"/"AVIF" 等）
+        width/height: 保存時の向きの寸法
+        orientation: EXIF Orientation（1-8）
+        has_alpha: アルファチャンネル（PNG の tRNS を含む）を持つか
+        animated: 複数フレームか
+    """
+
+    format: str
+    width: int
+    height: int
+    orientation: int = 1
+    has_alpha: bool = False
+    animated: bool = False
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def oriented_size(self) -> Tuple[int, int]:
+        """Orientation 適用後（表示上）の寸法。目標サイズの判定はこちらを使う"""
+        return oriented_size(self.size, self.orientation)
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+@dataclass
+class ProbeStats:
+    probed_count: int = 0
+    failed_count: int = 0
+    skipped_min_width: int = 0
+    skipped_not_larger: int = 0
+    elapsed_seconds: float = 0.0
+    format_counts: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, header: Optional[ImageHeader], elapsed: float) -> None:
+        self.elapsed_seconds += elapsed
+        if header is None:
+            self.failed_count += 1
+            return
+        self.probed_count += 1
+        self.format_counts[header.format] = self.format_counts.get(header.format, 0) + 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "probed_count": self.probed_count,
+            "failed_count": self.failed_count,
+            "skipped_min_width": self.skipped_min_width,
+            "skipped_not_larger": self.skipped_not_larger,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "formats": dict(sorted(self.format_counts.items())),
+        }
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise ValueError("ファイルが途中で終わっています")
+    return data
+
+
+def exif_orientation(tiff: bytes) -> int:
+    """TIFF 形式の EXIF（``Exif\\0\\0`` 付きでも可）の IFD0 から Orientation を読む。"""
+    if tiff.startswith(_EXIF_HEADER):
+        tiff = tiff[len(_EXIF_HEADER):]
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return 1
+    try:
+        (ifd_offset,) = struct.unpack_from(endian + "I", tiff, 4)
+        (count,) = struct.unpack_from(endian + "H", tiff, ifd_offset)
+        for index in range(count):
+            entry = ifd_offset + 2 + index * 12
+            tag, value_type = struct.unpack_from(endian + "HH", tiff, entry)
+            if tag != EXIF_ORIENTATION_TAG:
+                continue
+            if value_type != 3:  # SHORT
+                return 1
+            (value,) = struct.unpack_from(endian + "H", tiff, entry + 8)
+            return value if 1 <= value <= 8 else 1
+    except struct.error:
+        return 1
+    return 1
+
+
+def _probe_jpeg(fh: BinaryIO) -> ImageHeader:
+    fh.seek(2)
+    orientation = 1
+    image_format = "JPEG"
+    while True:
+        if _read_exact(fh, 1) != b"\xff":
+            raise ValueError("JPEG マーカーが不正です")
+        marker = _read_exact(fh, 1)[0]
+        while marker == 0xFF:
+            marker = _read_exact(fh, 1)[0]
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise ValueError("JPEG の SOF がありません")
+        (length,) = struct.unpack(">H", _read_exact(fh, 2))
+        if length < 2:
+            raise ValueError("JPEG セグメント長が不正です")
+        if marker in _JPEG_SOF_MARKERS:
+            _precision, height, width = struct.unpack(">BHH", _read_exact(fh, 5))
+            return ImageHeader(image_format, width, height, orientation, animated=image_format == "MPO")
+        payload_length = length - 2
+        if marker == 0xE1 and orientation == 1:
+            payload = _read_exact(fh, payload_length)
+            if payload.startswith(_EXIF_HEADER):
+                orientation = exif_orientation(payload)
+            continue
+        if marker == 0xE2:
+            payload = _read_exact(fh, payload_length)
+            # 複数画像（MPF）を持つ JPEG は Pillow では MPO として開かれる
+            if payload.startswith(b"MPF\x00"):
+                image_format = "MPO"
+            continue
+        fh.seek(payload_length, 1)
+
+
+def _probe_png(fh: BinaryIO) -> ImageHeader:
+    fh.seek(8)
+    length, chunk_type = struct.unpack(">I4s", _read_exact(fh, 8))
+    if chunk_type != b"IHDR" or length < 13:
+        raise ValueError("PNG の IHDR がありません")
+    width, height, _bit_depth, color_type = struct.unpack(">IIBB", _read_exact(fh, 10))
+    fh.seek(8 + 8 + length + 4)
+    has_alpha = color_type in (4, 6)
+    orientation = 1
+    animated = False
+    # IDAT より前の補助チャンクだけを見る
+    while True:
+        header = fh.read(8)
+        if len(header) != 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        if chunk_type == b"tRNS":
+            has_alpha = True
+        elif chunk_type == b"acTL" and length >= 4:
+            (num_frames,) = struct.unpack(">I", _read_exact(fh, 4))
+            animated = num_frames > 1
+            fh.seek(length, 1)  # 残りのデータ + CRC
+            continue
+        elif chunk_type == b"eXIf" and length <= MAX_METADATA_BYTES:
+            orientation = exif_orientation(_read_exact(fh, length))
+            fh.seek(4, 1)
+            continue
+        fh.seek(length + 4, 1)
+    return ImageHeader("PNG", width, height, orientation, has_alpha, animated)
+
+
+def _probe_webp(fh: BinaryIO) -> ImageHeader:
+    fh.seek(12)
+    width = height = 0
+    has_alpha = animated = False
+    orientation = 1
+    has_exif = False
+    while True:
+        header = fh.read(8)
+        if len(header) != 8:
+            break
+        chunk_type, length = struct.unpack("<4sI", header)
+        padded = length + (length & 1)
+        if chunk_type == b"VP8X":
+            data = _read_exact(fh, 10)
+            flags = data[0]
+            has_alpha = bool(flags & 0x10)
+            has_exif = bool(flags & 0x08)
+            animated = bool(flags & 0x02)
+            width = 1 + int.from_bytes(data[4:7], "little")
+            height = 1 + int.from_bytes(data[7:10], "little")
+            fh.seek(padded - 10, 1)
+            if not has_exif:
+                break
+            continue
+        if chunk_type == b"VP8 " and not width:
+            data = _read_exact(fh, 10)
+            if data[3:6] != b"\x9d\x01\x2a":
+                raise ValueError("VP8 のスタートコードがありません")
+            width, height = (value & 0x3FFF for value in struct.unpack("<HH", data[6:10]))
+            break
+        if chunk_type == b"VP8L" and not width:
+            data = _read_exact(fh, 5)
+            if data[0] != 0x2F:
+                raise ValueError("VP8L のシグネチャがありません")
+            bits = int.from_bytes(data[1:5], "little")
+            width = (bits & 0x3FFF) + 1
+            height = ((bits >> 14) & 0x3FFF) + 1
+            has_alpha = bool((bits >> 28) & 1)
+            break
+        if chunk_type == b"EXIF" and length <= MAX_METADATA_BYTES:
+            orientation = exif_orientation(_read_exact(fh, length))
+            break
+        fh.seek(padded, 1)
+    if not width:
+        raise ValueError("WebP の画像チャンクがありません")
+    return ImageHeader("WEBP", width, height, orientation, has_alpha, animated)
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise ValueError("ISOBMFF ボックス長が不正です")
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _probe_avif(fh: BinaryIO) -> ImageHeader:
+    fh.seek(0)
+    animated = False
+    meta: Optional[bytes] = None
+    while True:
+        header = fh.read(8)
+        if len(header) != 8:
+            break
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", _read_exact(fh, 8))
+            header_size = 16
+        if size == 0 or size < header_size:
+            break
+        if box_type == b"ftyp":
+            brands = _read_exact(fh, size - header_size)
+            animated = brands[:4] == b"avis"
+            continue
+        if box_type == b"meta":
+            if size > MAX_METADATA_BYTES:
+                raise ValueError("AVIF の meta ボックスが大きすぎます")
+            meta = _read_exact(fh, size - header_size)
+            break
+        fh.seek(size - header_size, 1)
+    if meta is None:
+        raise ValueError("AVIF の meta ボックスがありません")
+
+    primary_item: Optional[int] = None
+    properties: List[Tuple[bytes, int, int]] = []
+    associations: Dict[int, List[int]] = {}
+    # meta は FullBox（version/flags の4バイト）
+    for box_type, start, end in _iter_boxes(meta, 4):
+        if box_type == b"pitm":
+            version = meta[start]
+            fmt = ">H" if version == 0 else ">I"
+            (primary_item,) = struct.unpack_from(fmt, meta, start + 4)
+        elif box_type == b"iprp":
+            for child_type, child_start, child_end in _iter_boxes(meta, start, end):
+                if child_type == b"ipco":
+                    properties.extend(_iter_boxes(meta, child_start, child_end))
+                elif child_type == b"ipma":
+                    associations.update(_parse_ipma(meta, child_start))
+
+    width = height = 0
+    orientation = 1
+    has_alpha = False
+    primary_indexes = associations.get(primary_item, []) if primary_item is not None else []
+    for index, (box_type, start, _end) in enumerate(properties, start=1):
+        if box_type == b"auxC" and meta[start + 4 :].startswith(_AVIF_ALPHA_URNS):
+            has_alpha = True
+        if primary_indexes and index not in primary_indexes:
+            continue
+        if box_type == b"ispe" and not width:
+            width, height = struct.unpack_from(">II", meta, start + 4)
+        elif box_type == b"irot":
+            # 鏡像（imir）は考慮しない
+            orientation = _IROT_TO_ORIENTATION[meta[start] & 0x03]
+    if not width:
+        raise ValueError("AVIF の ispe がありません")
+    return ImageHeader("AVIF", width, height, orientation, has_alpha, animated)
+
+
+def _parse_ipma(data: bytes, start: int) -> Dict[int, List[int]]:
+    version = data[start]
+    flags = int.from_bytes(data[start + 1 : start + 4], "big")
+    pos = start + 4
+    (entry_count,) = struct.unpack_from(">I", data, pos)
+    pos += 4
+    result: Dict[int, List[int]] = {}
+    for _ in range(entry_count):
+        if version < 1:
+            (item_id,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+        else:
+            (item_id,) = struct.unpack_from(">I", data, pos)
+            pos += 4
+        count = data[pos]
+        pos += 1
+        indexes = []
+        for _ in range(count):
+            if flags & 1:
+                (value,) = struct.unpack_from(">H", data, pos)
+                pos += 2
+                indexes.append(value & 0x7FFF)
+            else:
+                indexes.append(data[pos] & 0x7F)
+                pos += 1
+        result[item_id] = indexes
+    return result
+
+
+def _probe_with_pillow(path: Union[str, Path]) -> ImageHeader:
+    # Image.open はヘッダーのみ読み、画素は load() するまで展開しない
+    with Image.open(path) as opened:
+        bands = opened.getbands()
+        return ImageHeader(
+            format=(opened.format or "").upper(),
+            width=opened.width,
+            height=opened.height,
+            orientation=read_orientation(opened),
+            has_alpha="A" in bands or "transparency" in opened.info,
+            animated=bool(getattr(opened, "is_animated", False)),
+        )
+
+
+def probe_header(path: Union[str, Path]) -> Optional[ImageHeader]:
+    """ヘッダーだけを読んで画像情報を返す。画像として解釈できない場合は None。"""
+    try:
+        with open(path, "rb") as fh:
+            signature = fh.read(16)
+            if signature.startswith(b"\xff\xd8"):
+                return _probe_jpeg(fh)
+            if signature.startswith(_PNG_SIGNATURE):
+                return _probe_png(fh)
+            if signature[:4] == b"RIFF" and signature[8:12] == b"WEBP":
+                return _probe_webp(fh)
+            if signature[4:8] == b"ftyp" and signature[8:12] in _AVIF_BRANDS:
+                return _probe_avif(fh)
+        return _probe_with_pillow(path)
+    except Exception:
+        return None
+
+
+def probe_headers(
+    paths: Iterable[Path],
+    stats: Optional[ProbeStats] = None,
+) -> List[Tuple[Path, Optional[ImageHeader]]]:
+    """各パスをプローブし、(パス, ヘッダー or None) を入力順に返す。"""
+    results = []
+    for path in paths:
+        started = time.perf_counter()
+        header = probe_header(path)
+        if stats is not None:
+            stats.record(header, time.perf_counter() - started)
+        results.append((path, header))
+    return results
@@ -5,17 +5,32 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import io
 import os
 import logging
 import time
 from pathlib import Path
-import uuid
 from typing import Any, Dict, Iterable, Literal, Optional, Tuple
 
 from PIL import ExifTags, Image, features
 
+from karuku_resizer.content_analysis import (
+    DEFAULT_PNG_PALETTE,
+    PngPaletteMode,
+    prefers_lossless,
+    quantize_for_png,
+    simplify_for_encode,
+)
+from karuku_resizer.cpu_budget import DEFAULT_CPU_BUDGET
+from karuku_resizer.durability import DEFAULT_DURABILITY, DurabilityMode, write_with_durability
+from karuku_resizer.encoder_profiles import DEFAULT_ENCODER_PROFILE, EncoderProfile, encoder_settings
+from karuku_resizer.latency_budget import DEFAULT_COST_MODEL, EncodeChoice, cost_model_format, encoder_parameter
+from karuku_resizer.metadata_rewrite import METADATA_REWRITE_FORMATS, MetadataEdit
+from karuku_resizer.orientation import EXIF_ORIENTATION_TAG
+from karuku_resizer.passthrough import passthrough_copy, probe_passthrough_format
+from karuku_resizer.retry_policy import TRANSIENT_ERRNOS
+
 try:
     import pillow_avif  # noqa: F401
 except ImportError:
@@ -39,6 +54,18 @@ class SaveOptions:
     webp_method: int = 6
     webp_lossless: bool = False
     avif_speed: int = 6
+    durability: DurabilityMode = DEFAULT_DURABILITY
+    # 最終保存のエンコード速度と出力サイズのトレードオフ（fastest / balanced / smallest）
+    encoder_profile: EncoderProfile = DEFAULT_ENCODER_PROFILE
+    # 1枚あたりのエンコード時間の予算（秒）。指定時は AVIF の speed / WebP の method を
+    # 予算内に収まると予測される最も遅い設定まで速める（None は無効）
+    latency_budget_seconds: Optional[float] = None
+    # 不透明なアルファ・グレースケールの RGB を検出し、少ないチャンネルでエンコードする
+    content_analysis: bool = True
+    # PNG8（パレット）出力: off / auto（色数が少なく無損失で収まる場合のみ）/ always（減色してでも）
+    png_palette: PngPaletteMode = DEFAULT_PNG_PALETTE
+    # 減色時の誤差拡散。ノイズで圧縮が効かなくなり、フルカラーより大きくなることがあるため既定は無効
+    png_dither: bool = False
 
 
 @dataclass(frozen=True)
@@ -68,6 +95,10 @@ class SaveResult:
     error_category: Optional[str] = None
     retryable: bool = False
     error_guidance: Optional[str] = None
+    passthrough: bool = False
+    passthrough_method: Optional[str] = None
+    content_conversion: Optional[str] = None
+    encode_choice: Optional[EncodeChoice] = None
 
 
 @dataclass(frozen=True)
@@ -123,13 +154,6 @@ def _normalize_windows_long_path(path: Path) -> Path:
     return Path("\\\\?\\" + path_str)
 
 
-def _build_temp_save_path(target_path: Path) -> Path:
-    """同一ディレクトリ内の一時保存パスを作る。"""
-    base_name = target_path.name or "karuku_output"
-    token = f"{os.getpid()}_{time.time_ns()}_{uuid.uuid4().hex[:10]}"
-    return target_path.with_name(f".{base_name}.{token}.tmp")
-
-
 def _analyze_file_error(error: BaseException) -> Tuple[Optional[int], str, bool, str]:
     """ファイル保存に使えるエラー分類を返す。
 
@@ -211,26 +235,84 @@ def _analyze_file_error(error: BaseException) -> Tuple[Optional[int], str, bool,
     if code in {13, 5, 30}:
         return code, "permission_denied", False, "権限設定をご確認ください。"
 
+    if code in TRANSIENT_ERRNOS:
+        return code, "transient", True, "一時的なI/Oエラーです。数秒後に再試行してください。"
+
     return code, "unknown", False, "再試行しても解決しない場合は保存先を変更してください。"
 
 
+def _encode(save_img: Image.Image, target: Any, save_kwargs: Dict[str, Any]) -> float:
+    """CPU予算の枠内でエンコードし、かかった秒数を返す。
+
+    AVIF には同時実行数に応じたスレッド数を渡す。AVIF/WebP の所要時間は、そのスレッド数とともに
+    コストモデルに記録する。
+    """
+    with DEFAULT_CPU_BUDGET.lease() as threads:
+        if save_kwargs.get("format") == "AVIF":
+            save_kwargs = {**save_kwargs, "max_threads": threads}
+        started = time.perf_counter()
+        save_img.save(target, **save_kwargs)
+        elapsed = time.perf_counter() - started
+    model_format = cost_model_format(save_kwargs)
+    if model_format is not None:
+        setting = int(save_kwargs.get(encoder_parameter(model_format), 0))
+        DEFAULT_COST_MODEL.observe(model_format, setting, save_img.width * save_img.height, elapsed, threads)
+    return elapsed
+
+
+def _apply_latency_budget(
+    save_img: Image.Image,
+    save_kwargs: Dict[str, Any],
+    options: SaveOptions,
+) -> Optional[EncodeChoice]:
+    """時間予算が指定されていれば AVIF の speed / WebP の method を選び直す（`save_kwargs` を更新）。"""
+    if options.latency_budget_seconds is None:
+        return None
+    model_format = cost_model_format(save_kwargs)
+    if model_format is None:
+        return None
+    choice = DEFAULT_COST_MODEL.choose(
+        model_format,
+        int(save_kwargs[encoder_parameter(model_format)]),
+        save_img.width * save_img.height,
+        max(0.0, float(options.latency_budget_seconds)),
+        threads=DEFAULT_CPU_BUDGET.expected_threads(),
+    )
+    save_kwargs[choice.parameter] = choice.chosen
+    if choice.downgraded:
+        logger.debug(
+            "Latency budget %.2fs: %s %s %s -> %s (predicted %.2fs)",
+            choice.budget_seconds,
+            choice.format,
+            choice.parameter,
+            choice.requested,
+            choice.chosen,
+            choice.predicted_seconds,
+        )
+    return choice
+
+
+def _with_actual_seconds(choice: Optional[EncodeChoice], seconds: float) -> Optional[EncodeChoice]:
+    if choice is None:
+        return None
+    return replace(choice, actual_seconds=round(seconds, 4))
+
+
 def _save_with_atomic_replace(
     save_img: Image.Image,
     final_path: Path,
     save_kwargs: Dict[str, Any],
-) -> None:
-    """保存を一時ファイル→置換で実行し、壊れた最終ファイルを防ぐ。"""
-    tmp_path = _build_temp_save_path(final_path)
-    try:
-        # 拡張子に依存した場合を避けるため format を明示しておく
-        save_img.save(tmp_path, **save_kwargs)
-        os.replace(str(tmp_path), str(final_path))
-    finally:
-        if tmp_path.exists():
-            try:
-                tmp_path.unlink()
-            except Exception:
-                logger.warning("一時保存ファイルの削除に失敗: %s", tmp_path)
+    durability: str = DEFAULT_DURABILITY,
+) -> float:
+    """耐久性ポリシーに従って保存し、エンコードにかかった秒数を返す（既定は一時ファイル→置換）。"""
+    elapsed = [0.0]
+
+    def _write(path: Path) -> None:
+        elapsed[0] = _encode(save_img, path, save_kwargs)
+
+    # 拡張子に依存した場合を避けるため format は save_kwargs で明示しておく
+    write_with_durability(final_path, _write, durability)
+    return elapsed[0]
 
 
 def supported_output_formats() -> list[SaveFormat]:
@@ -265,11 +347,17 @@ def resolve_output_format(
     source_image: Image.Image,
     available_formats: Optional[Iterable[SaveFormat]] = None,
 ) -> SaveFormat:
-    """ユーザー選択と入力画像から最終出力形式を決定する。"""
+    """ユーザー選択と入力画像から最終出力形式を決定する。
+
+    "auto" は実際に透過画素がある、または色数が少ない画像を PNG、それ以外を JPEG にする。
+    画素を持たない入力（`EncodedSource` 等）はモードだけで判定する。
+    """
     available = set(available_formats or supported_output_formats())
     selected_lc = selected.lower()
 
     if selected_lc == "auto":
+        if isinstance(source_image, Image.Image):
+            return "png" if prefers_lossless(source_image) else "jpeg"
         if "A" in source_image.getbands() or source_image.mode in ("P", "1"):
             return "png"
         return "jpeg"
@@ -305,7 +393,7 @@ def preview_exif_plan(
 
     try:
         source_exif = source_image.getexif()
-        source_tag_count = len(source_exif)
+        source_tag_count = len([tag for tag in source_exif if tag != EXIF_ORIENTATION_TAG])
         source_has_gps = _EXIF_TAG_GPS_INFO in source_exif
         had_source_exif = bool(source_exif)
     except Exception:
@@ -332,20 +420,59 @@ def preview_exif_plan(
     )
 
 
+def can_passthrough(
+    source_path: Optional[Path],
+    source_image: Image.Image,
+    resized_image: Image.Image,
+    options: SaveOptions,
+) -> bool:
+    """再エンコードせず元ファイルをそのままコピーできるかを判定する。
+
+    リサイズなしで元ファイルの形式が出力形式と一致する場合に True。
+    EXIFの削除・GPS削除・編集が必要な場合はメタデータを直接書き換えられる JPEG/PNG に限る。
+    """
+    if source_path is None:
+        return False
+    if resized_image.size != source_image.size:
+        return False
+    source_format = probe_passthrough_format(source_path)
+    if source_format != options.output_format.upper():
+        return False
+    if options.exif_mode == "keep" and not options.remove_gps:
+        return True
+    return source_format in METADATA_REWRITE_FORMATS
+
+
+def _passthrough_metadata_edit(options: SaveOptions, exif_bytes: Optional[bytes]) -> Optional[MetadataEdit]:
+    """パススルー時のメタデータ書き換え内容（元のまま維持なら None）。"""
+    if options.exif_mode == "keep" and not options.remove_gps:
+        return None
+    # XMP にも位置情報が入り得るため、EXIF削除・GPS削除時は XMP も落とす
+    return MetadataEdit(exif=exif_bytes, keep_xmp=options.exif_mode == "edit" and not options.remove_gps)
+
+
 def save_image(
     source_image: Image.Image,
     resized_image: Image.Image,
     output_path: Path,
     options: SaveOptions,
+    *,
+    source_path: Optional[Path] = None,
 ) -> SaveResult:
-    """画像を保存する（必要ならEXIFを付与）。"""
+    """画像を保存する（必要ならEXIFを付与）。
+
+    `source_path` を渡し `can_passthrough` を満たす場合は、再エンコードせず元ファイルをコピーする。
+    """
     final_path = destination_with_extension(output_path, options.output_format)
+    passthrough = can_passthrough(source_path, source_image, resized_image, options)
 
-    save_img, save_kwargs, exif_meta, exif_requested = _prepare_save_payload(
+    save_img, save_kwargs, exif_meta, exif_requested, conversion = _prepare_save_payload(
         source_image=source_image,
         resized_image=resized_image,
         options=options,
+        simplify=not passthrough,
     )
+    encode_choice = None if passthrough else _apply_latency_budget(save_img, save_kwargs, options)
     if options.verbose:
         logger.debug(
             "save_image: format=%s quality=%s dry_run=%s exif_mode=%s has_exif=%s gps_removed=%s edits=%s",
@@ -371,15 +498,61 @@ def save_image(
             gps_removed=exif_meta.gps_removed,
             edited_fields=exif_meta.edited_fields,
             skipped_reason="dry-run",
+            passthrough=passthrough,
+            content_conversion=conversion,
+            encode_choice=encode_choice,
         )
     write_target = _normalize_windows_long_path(final_path)
 
+    if passthrough and source_path is not None:
+        try:
+            method = passthrough_copy(
+                source_path,
+                write_target,
+                options.durability,
+                metadata=_passthrough_metadata_edit(options, save_kwargs.get("exif")),
+                image_format=options.output_format,
+            )
+        except ValueError as e:
+            # 構造を解析できない場合は通常の再エンコードへ切り替える
+            logger.warning("Metadata rewrite failed, re-encoding %s: %s", source_path, e)
+            encode_choice = _apply_latency_budget(save_img, save_kwargs, options)
+        except Exception as e:  # pragma: no cover - GUI経由で表示
+            error_code, error_category, retryable, _retry_guidance = _analyze_file_error(e)
+            return SaveResult(
+                success=False,
+                output_path=final_path,
+                exif_mode=options.exif_mode,
+                error=str(e),
+                error_code=error_code,
+                error_category=error_category,
+                retryable=retryable,
+                error_guidance=_retry_guidance,
+                had_source_exif=exif_meta.had_source_exif,
+                exif_requested=exif_requested,
+            )
+        else:
+            return SaveResult(
+                success=True,
+                output_path=final_path,
+                exif_mode=options.exif_mode,
+                dry_run=False,
+                had_source_exif=exif_meta.had_source_exif,
+                exif_requested=exif_requested,
+                exif_attached="exif" in save_kwargs,
+                gps_removed=exif_meta.gps_removed,
+                edited_fields=exif_meta.edited_fields,
+                passthrough=True,
+                passthrough_method=method,
+            )
+
     # EXIF付与に失敗した場合は、メタデータなし保存へフォールバックする。
     try:
-        _save_with_atomic_replace(
+        encode_seconds = _save_with_atomic_replace(
             save_img=save_img,
             final_path=write_target,
             save_kwargs=save_kwargs,
+            durability=options.durability,
         )
         exif_attached = "exif" in save_kwargs
         return SaveResult(
@@ -393,6 +566,8 @@ def save_image(
             exif_skipped_reason=exif_meta.exif_skipped_reason,
             gps_removed=exif_meta.gps_removed,
             edited_fields=exif_meta.edited_fields,
+            content_conversion=conversion,
+            encode_choice=_with_actual_seconds(encode_choice, encode_seconds),
         )
     except Exception as e:  # pragma: no cover - GUI経由で表示
         exif_error = str(e)
@@ -400,10 +575,11 @@ def save_image(
             save_kwargs_without_exif = dict(save_kwargs)
             save_kwargs_without_exif.pop("exif", None)
             try:
-                _save_with_atomic_replace(
+                encode_seconds = _save_with_atomic_replace(
                     save_img=save_img,
                     final_path=write_target,
                     save_kwargs=save_kwargs_without_exif,
+                    durability=options.durability,
                 )
                 return SaveResult(
                     success=True,
@@ -417,6 +593,8 @@ def save_image(
                     exif_skipped_reason=f"exif-write-failed: {exif_error}",
                     gps_removed=exif_meta.gps_removed,
                     edited_fields=exif_meta.edited_fields,
+                    content_conversion=conversion,
+                    encode_choice=_with_actual_seconds(encode_choice, encode_seconds),
                 )
             except Exception:
                 pass
@@ -446,15 +624,16 @@ def estimate_output_size_kb(
     options: SaveOptions,
 ) -> Optional[float]:
     """実保存条件に近い設定で、出力サイズをメモリ上で見積もる。"""
-    save_img, save_kwargs, _exif_meta, _exif_requested = _prepare_save_payload(
+    save_img, save_kwargs, _exif_meta, _exif_requested, _conversion = _prepare_save_payload(
         source_image=source_image,
         resized_image=resized_image,
         options=options,
     )
+    _apply_latency_budget(save_img, save_kwargs, options)
 
     try:
         with io.BytesIO() as bio:
-            save_img.save(bio, **save_kwargs)
+            _encode(save_img, bio, save_kwargs)
             return len(bio.getvalue()) / 1024
     except Exception:
         if "exif" not in save_kwargs:
@@ -464,12 +643,67 @@ def estimate_output_size_kb(
     save_kwargs_without_exif.pop("exif", None)
     try:
         with io.BytesIO() as bio:
-            save_img.save(bio, **save_kwargs_without_exif)
+            _encode(save_img, bio, save_kwargs_without_exif)
             return len(bio.getvalue()) / 1024
     except Exception:
         return None
 
 
+@dataclass(frozen=True)
+class EncodedImage:
+    data: bytes
+    exif_attached: bool
+    encode_choice: Optional[EncodeChoice] = None
+
+
+def encode_image(
+    source_image: Image.Image,
+    resized_image: Image.Image,
+    options: SaveOptions,
+) -> EncodedImage:
+    """保存時と同じ条件でメモリ上にエンコードする。
+
+    Raises:
+        OSError/ValueError: EXIFなしでもエンコードできなかった場合
+    """
+    save_img, save_kwargs, _exif_meta, _exif_requested, _conversion = _prepare_save_payload(
+        source_image=source_image,
+        resized_image=resized_image,
+        options=options,
+    )
+    encode_choice = _apply_latency_budget(save_img, save_kwargs, options)
+    try:
+        with io.BytesIO() as bio:
+            seconds = _encode(save_img, bio, save_kwargs)
+            return EncodedImage(bio.getvalue(), "exif" in save_kwargs, _with_actual_seconds(encode_choice, seconds))
+    except Exception:
+        if "exif" not in save_kwargs:
+            raise
+
+    save_kwargs_without_exif = dict(save_kwargs)
+    save_kwargs_without_exif.pop("exif", None)
+    with io.BytesIO() as bio:
+        seconds = _encode(save_img, bio, save_kwargs_without_exif)
+        return EncodedImage(bio.getvalue(), False, _with_actual_seconds(encode_choice, seconds))
+
+
+def encode_image_bytes(
+    source_image: Image.Image,
+    resized_image: Image.Image,
+    options: SaveOptions,
+) -> Tuple[bytes, bool]:
+    """保存時と同じ条件でメモリ上にエンコードする。
+
+    Returns:
+        (エンコード済みバイト列, EXIFを付与できたか)
+
+    Raises:
+        OSError/ValueError: EXIFなしでもエンコードできなかった場合
+    """
+    encoded = encode_image(source_image, resized_image, options)
+    return encoded.data, encoded.exif_attached
+
+
 def build_encoder_save_kwargs(
     output_format: SaveFormat,
     quality: int,
@@ -478,8 +712,13 @@ def build_encoder_save_kwargs(
     avif_speed: int = 6,
     *,
     for_preview: bool = False,
+    profile: EncoderProfile = DEFAULT_ENCODER_PROFILE,
 ) -> Dict[str, Any]:
-    """出力形式に応じたエンコーダ設定を返す。"""
+    """出力形式に応じたエンコーダ設定を返す。
+
+    `profile` は最終保存（`for_preview=False`）の速度プロファイル。WebP の method と AVIF の speed は
+    プロファイルの上限/下限で丸める（`encoder_profiles` 参照）。
+    """
     normalized_quality = normalize_quality(quality)
     if for_preview:
         if output_format == "jpeg":
@@ -509,33 +748,36 @@ def build_encoder_save_kwargs(
             "speed": normalize_avif_speed(avif_speed),
         }
 
+    settings = encoder_settings(profile)
     if output_format == "jpeg":
         return {
             "format": "JPEG",
             "quality": min(normalized_quality, 95),
-            "optimize": True,
-            "progressive": True,
+            "optimize": settings.jpeg_optimize,
+            "progressive": settings.jpeg_progressive,
         }
     if output_format == "png":
         # PNGはロスレス。quality指定を圧縮レベルへ変換する。
-        compress_level = int(round((100 - normalized_quality) / 100 * 9))
+        compress_level = settings.png_compress_level
+        if compress_level is None:
+            compress_level = int(round((100 - normalized_quality) / 100 * 9))
         return {
             "format": "PNG",
-            "optimize": True,
+            "optimize": settings.png_optimize,
             "compress_level": max(0, min(9, compress_level)),
         }
     if output_format == "webp":
         return {
             "format": "WEBP",
             "quality": normalized_quality,
-            "method": normalize_webp_method(webp_method),
+            "method": settings.webp_method(normalize_webp_method(webp_method)),
             "lossless": bool(webp_lossless),
         }
     # avif
     return {
         "format": "AVIF",
         "quality": normalized_quality,
-        "speed": normalize_avif_speed(avif_speed),
+        "speed": settings.avif_speed(normalize_avif_speed(avif_speed)),
     }
 
 
@@ -543,7 +785,9 @@ def _prepare_save_payload(
     source_image: Image.Image,
     resized_image: Image.Image,
     options: SaveOptions,
-) -> tuple[Image.Image, Dict[str, Any], "ExifBuildMeta", bool]:
+    *,
+    simplify: bool = True,
+) -> tuple[Image.Image, Dict[str, Any], "ExifBuildMeta", bool, Optional[str]]:
     exif_bytes, exif_meta = _build_exif_bytes(
         source_image=source_image,
         exif_mode=options.exif_mode,
@@ -558,8 +802,19 @@ def _prepare_save_payload(
         webp_method=options.webp_method,
         webp_lossless=options.webp_lossless,
         avif_speed=options.avif_speed,
+        profile=options.encoder_profile,
     )
 
+    conversion: Optional[str] = None
+    if simplify and options.content_analysis:
+        save_img, conversion = simplify_for_encode(save_img, options.output_format)
+    if simplify and options.output_format == "png":
+        # auto は内容解析の結果（色数）に依存するため、解析を切った場合は行わない
+        palette_mode = options.png_palette if options.content_analysis or options.png_palette == "always" else "off"
+        save_img, palette = quantize_for_png(save_img, palette_mode, dither=options.png_dither)
+        if palette is not None:
+            conversion = palette if conversion is None else f"{conversion}+{palette}"
+
     if options.output_format in {"jpeg", "avif"} and save_img.mode in {"RGBA", "LA", "P"}:
         rgba = save_img.convert("RGBA")
         background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
@@ -572,7 +827,7 @@ def _prepare_save_payload(
     if exif_bytes is not None and options.output_format in {"jpeg", "png", "webp", "avif"}:
         save_kwargs["exif"] = exif_bytes
 
-    return save_img, save_kwargs, exif_meta, exif_requested
+    return save_img, save_kwargs, exif_meta, exif_requested, conversion
 
 
 @dataclass(frozen=True)
@@ -601,6 +856,11 @@ def _build_exif_bytes(
             exif_requested=False,
             exif_skipped_reason="getexif-failed",
         )
+    # 出力の画素は常に正立済み（Orientation はリサイズ後に適用）のため、向き指定は書き込まない
+    if EXIF_ORIENTATION_TAG in exif:
+        exif = Image.Exif()
+        exif.load(source_image.getexif().tobytes())
+        del exif[EXIF_ORIENTATION_TAG]
 
     had_source_exif = bool(exif)
     if not had_source_exif and exif_mode != "edit":
@@ -0,0 +1,182 @@
+"""遅いコーデック（AVIF・WebP）のための画像ごとの時間予算。
+
+AVIF の speed 0〜3 や WebP の method 6 は、大きな画像では1枚に数秒〜数十秒かかる。
+`EncodeCostModel` は設定ごとのエンコード速度（秒/メガピクセル）を持ち、画素数から所要時間を予測する。
+保存時は、予算内に収まると予測される設定のうち最も遅い（＝最も圧縮率の高い）ものを選び、
+実際にかかった時間で速度を更新する。
+
+- 初期値は `scripts/benchmark.py` の写真風合成画像（1スレッド）での実測値
+- 実測した設定はその速度を指数移動平均で更新する。未計測の設定は、計測済みの設定が初期値の
+  何倍だったか（マシンの速さ）を形式ごとに平均して初期値に掛ける
+- AVIF はエンコーダに渡したスレッド数（`cpu_budget` の配分）で速度が変わるため、実測値と
+  マシンの速さはスレッド数ごとに分けて持つ。そのスレッド数で未計測なら、より少ないスレッド数での
+  計測（なければ1スレッドの初期値）を使う（スレッドが多いほど遅くはならないため、予測は安全側になる）
+- WebP のロスレスは速度特性が大きく異なるため対象外
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+_EWMA_ALPHA = 0.3
+
+# 設定値ごとの秒/メガピクセル（AVIF は speed 0〜10、WebP は method 0〜6）
+_SEED_SECONDS_PER_MP: Dict[str, Tuple[float, ...]] = {
+    "avif": (65.6, 33.1, 28.4, 17.8, 4.7, 3.7, 0.57, 0.30, 0.12, 0.10, 0.10),
+    "webp": (0.03, 0.034, 0.048, 0.12, 0.12, 0.13, 0.19),
+}
+# 時間予算に合わせて調整する設定名
+_PARAMETERS: Dict[str, str] = {"avif": "speed", "webp": "method"}
+# エンコーダにスレッド数を渡す形式（WebP は Pillow がスレッド数の指定を公開していない）
+_THREADED_FORMATS = frozenset({"avif"})
+
+
+@dataclass(frozen=True)
+class EncodeChoice:
+    """時間予算から選んだエンコーダ設定。
+
+    Attributes:
+        format: "avif" / "webp"
+        parameter: 調整した設定名（"speed" / "method"）
+        requested: 予算適用前の設定値
+        chosen: 実際に使った設定値
+        predicted_seconds: 選んだ設定での予測エンコード時間
+        budget_seconds: エンコードに割り当てた時間
+        actual_seconds: 実際のエンコード時間（保存しなかった場合は None）
+        threads: 予測に使ったエンコーダのスレッド数
+    """
+
+    format: str
+    parameter: str
+    requested: int
+    chosen: int
+    predicted_seconds: float
+    budget_seconds: float
+    actual_seconds: Optional[float] = None
+    threads: int = 1
+
+    @property
+    def downgraded(self) -> bool:
+        return self.chosen != self.requested
+
+
+def cost_model_format(save_kwargs: Dict[str, object]) -> Optional[str]:
+    """保存引数からコストモデルの対象形式を返す（対象外は None）。"""
+    image_format = str(save_kwargs.get("format", "")).upper()
+    if image_format == "AVIF":
+        return "avif"
+    if image_format == "WEBP" and not save_kwargs.get("lossless"):
+        return "webp"
+    return None
+
+
+def encoder_parameter(image_format: str) -> str:
+    """コストモデルで調整する保存引数名（"speed" / "method"）。"""
+    return _PARAMETERS[image_format]
+
+
+def _thread_key(image_format: str, threads: int) -> int:
+    return max(1, int(threads)) if image_format in _THREADED_FORMATS else 1
+
+
+def _label(image_format: str, threads: int) -> str:
+    return image_format if threads == 1 else f"{image_format}@{threads}"
+
+
+class EncodeCostModel:
+    """設定（とスレッド数）ごとのエンコード速度を保持し、時間予算に収まる設定を選ぶ。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._observed: Dict[Tuple[str, int, int], float] = {}
+        self._scale: Dict[Tuple[str, int], float] = {}
+        self._samples = 0
+
+    def _machine_scale(self, image_format: str, threads: int) -> float:
+        """`threads` 以下で最も多いスレッド数で計測したマシンの速さ（未計測なら 1.0）。"""
+        known = [count for fmt, count in self._scale if fmt == image_format and count <= threads]
+        if not known:
+            return 1.0
+        return self._scale[(image_format, max(known))]
+
+    def predict(self, image_format: str, value: int, pixels: int, threads: int = 1) -> float:
+        seeds = _SEED_SECONDS_PER_MP[image_format]
+        value = max(0, min(len(seeds) - 1, int(value)))
+        threads = _thread_key(image_format, threads)
+        with self._lock:
+            rate = self._observed.get((image_format, value, threads))
+            if rate is None:
+                rate = seeds[value] * self._machine_scale(image_format, threads)
+        return rate * max(0, pixels) / 1_000_000
+
+    def observe(self, image_format: str, value: int, pixels: int, seconds: float, threads: int = 1) -> None:
+        seeds = _SEED_SECONDS_PER_MP.get(image_format)
+        if seeds is None or pixels <= 0 or seconds <= 0:
+            return
+        value = max(0, min(len(seeds) - 1, int(value)))
+        threads = _thread_key(image_format, threads)
+        rate = seconds / (pixels / 1_000_000)
+        with self._lock:
+            key = (image_format, value, threads)
+            previous = self._observed.get(key)
+            self._observed[key] = rate if previous is None else previous + _EWMA_ALPHA * (rate - previous)
+            ratio = rate / seeds[value]
+            scale = self._scale.get((image_format, threads))
+            self._scale[(image_format, threads)] = ratio if scale is None else scale + _EWMA_ALPHA * (ratio - scale)
+            self._samples += 1
+
+    def choose(
+        self,
+        image_format: str,
+        requested: int,
+        pixels: int,
+        budget_seconds: float,
+        threads: int = 1,
+    ) -> EncodeChoice:
+        """`requested` 以下の遅さで、予算内に収まると予測される最も遅い設定を選ぶ。
+
+        `threads` はエンコーダに渡す予定のスレッド数（AVIF のみ予測に影響する）。
+        どの設定も収まらない場合は最速の設定を使う。
+        """
+        seeds = _SEED_SECONDS_PER_MP[image_format]
+        requested = max(0, min(len(seeds) - 1, int(requested)))
+        threads = _thread_key(image_format, threads)
+        if image_format == "avif":
+            candidates = range(requested, len(seeds))  # speed は大きいほど速い
+        else:
+            candidates = range(requested, -1, -1)  # method は小さいほど速い
+        chosen = requested
+        predicted = 0.0
+        for value in candidates:
+            chosen = value
+            predicted = self.predict(image_format, value, pixels, threads)
+            if predicted <= budget_seconds:
+                break
+        return EncodeChoice(
+            format=image_format,
+            parameter=_PARAMETERS[image_format],
+            requested=requested,
+            chosen=chosen,
+            predicted_seconds=round(predicted, 4),
+            budget_seconds=round(budget_seconds, 4),
+            threads=threads,
+        )
+
+    def as_dict(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "samples": self._samples,
+                "seconds_per_megapixel": {
+                    f"{_label(image_format, threads)}:{value}": round(rate, 4)
+                    for (image_format, value, threads), rate in sorted(self._observed.items())
+                },
+                "machine_scale": {
+                    _label(image_format, threads): round(scale, 3)
+                    for (image_format, threads), scale in sorted(self._scale.items())
+                },
+            }
+
+
+DEFAULT_COST_MODEL = EncodeCostModel()
@@ -0,0 +1,197 @@
+"""画素データを再エンコードせずに JPEG/PNG のメタデータだけを書き換える。
+
+JPEG は SOS までの APPn セグメント、PNG はチャンク列を直接解析し、
+EXIF（JPEG APP1 ``Exif`` / PNG ``eXIf``）の削除・置換と XMP の削除を行う。
+エントロピー符号化データ（SOS 以降）や IDAT はそのまま読み流すため、
+出力の画素データは入力とビット単位で一致する。ICC プロファイル等その他のセグメントは保持する。
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+METADATA_REWRITE_FORMATS: Tuple[str, ...] = ("JPEG", "PNG")
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_EXIF_HEADER = b"Exif\x00\x00"
+_JPEG_XMP_HEADERS = (b"http://ns.adobe.com/xap/1.0/\x00", b"http://ns.adobe.com/xmp/extension/\x00")
+_JPEG_MAX_SEGMENT_PAYLOAD = 0xFFFF - 2
+_JPEG_APP0 = 0xE0
+_JPEG_APP1 = 0xE1
+_JPEG_SOS = 0xDA
+_JPEG_EOI = 0xD9
+_JPEG_STANDALONE = frozenset([0x01, *range(0xD0, 0xD8)])
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_XMP_KEYWORD = b"XML:com.adobe.xmp"
+# ImageMagick 等が EXIF を16進テキストで埋め込む旧形式
+_PNG_RAW_EXIF_KEYWORDS = (b"Raw profile type exif", b"Raw profile type APP1")
+
+# 出力片: 新しく書くバイト列、または入力ファイルの (開始位置, 長さ)
+_Piece = Union[bytes, Tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class MetadataEdit:
+    """書き換え内容。
+
+    Attributes:
+        exif: 新しい EXIF（``Exif\\0\\0`` 付きでも可）。None なら EXIF を削除する
+        keep_xmp: False なら XMP を削除する（XMP にも位置情報が入り得るため GPS 削除時は False）
+    """
+
+    exif: Optional[bytes]
+    keep_xmp: bool = True
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise ValueError("ファイルが途中で終わっています")
+    return data
+
+
+def _strip_exif_header(exif: bytes) -> bytes:
+    return exif[len(_JPEG_EXIF_HEADER):] if exif.startswith(_JPEG_EXIF_HEADER) else exif
+
+
+def _plan_jpeg(fh: BinaryIO, size: int, edit: MetadataEdit) -> List[_Piece]:
+    if fh.read(2) != _JPEG_SOI:
+        raise ValueError("JPEG の SOI がありません")
+    new_exif: Optional[bytes] = None
+    if edit.exif is not None:
+        new_exif = _JPEG_EXIF_HEADER + _strip_exif_header(edit.exif)
+        if len(new_exif) > _JPEG_MAX_SEGMENT_PAYLOAD:
+            raise ValueError("EXIF が JPEG の APP1 セグメントに収まりません")
+    exif_segment = b"" if new_exif is None else struct.pack(">BBH", 0xFF, _JPEG_APP1, len(new_exif) + 2) + new_exif
+
+    pieces: List[_Piece] = [_JPEG_SOI]
+    exif_written = new_exif is None
+    leading_app0 = True
+    while True:
+        marker_start = fh.tell()
+        if fh.read(1) != b"\xff":
+            raise ValueError(f"JPEG マーカーが不正です (offset={marker_start})")
+        marker = _read_exact(fh, 1)[0]
+        while marker == 0xFF:  # フィルバイト
+            marker = _read_exact(fh, 1)[0]
+        if marker in _JPEG_STANDALONE:
+            pieces.append(bytes((0xFF, marker)))
+            continue
+        if marker in (_JPEG_SOS, _JPEG_EOI):
+            if not exif_written:
+                pieces.append(exif_segment)
+            # SOS 以降（エントロピー符号化データ）は読み流す
+            pieces.append((marker_start, size - marker_start))
+            return pieces
+        length = struct.unpack(">H", _read_exact(fh, 2))[0]
+        if length < 2:
+            raise ValueError(f"JPEG セグメント長が不正です (offset={marker_start})")
+        payload = _read_exact(fh, length - 2)
+
+        if leading_app0 and marker != _JPEG_APP0:
+            leading_app0 = False
+            # EXIF は SOI（と JFIF の APP0）の直後に置く
+            if not exif_written:
+                pieces.append(exif_segment)
+                exif_written = True
+        if marker == _JPEG_APP1 and payload.startswith(_JPEG_EXIF_HEADER):
+            continue
+        if marker == _JPEG_APP1 and not edit.keep_xmp and payload.startswith(_JPEG_XMP_HEADERS):
+            continue
+        pieces.append(struct.pack(">BBH", 0xFF, marker, length) + payload)
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+
+
+def _plan_png(fh: BinaryIO, size: int, edit: MetadataEdit) -> List[_Piece]:
+    if fh.read(8) != _PNG_SIGNATURE:
+        raise ValueError("PNG シグネチャがありません")
+    exif_chunk = b"" if edit.exif is None else _png_chunk(b"eXIf", _strip_exif_header(edit.exif))
+    pieces: List[_Piece] = [_PNG_SIGNATURE]
+    exif_written = edit.exif is None
+    while True:
+        chunk_start = fh.tell()
+        header = fh.read(8)
+        if not header:
+            raise ValueError("PNG の IEND がありません")
+        if len(header) != 8:
+            raise ValueError("ファイルが途中で終わっています")
+        length, chunk_type = struct.unpack(">I4s", header)
+        total = 12 + length
+        if chunk_start + total > size:
+            raise ValueError(f"PNG チャンク長が不正です ({chunk_type!r})")
+
+        if chunk_type in (b"IDAT", b"IEND"):
+            if not exif_written:
+                pieces.append(exif_chunk)
+                exif_written = True
+            pieces.append((chunk_start, total))
+            fh.seek(chunk_start + total)
+            if chunk_type == b"IEND":
+                return pieces
+            continue
+        if chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+            data = _read_exact(fh, length)
+            fh.seek(4, 1)
+            keyword = data.split(b"\x00", 1)[0]
+            if keyword in _PNG_RAW_EXIF_KEYWORDS:
+                continue
+            if keyword == _PNG_XMP_KEYWORD and not edit.keep_xmp:
+                continue
+            pieces.append((chunk_start, total))
+            continue
+        fh.seek(chunk_start + total)
+        if chunk_type == b"eXIf":
+            if not exif_written:
+                pieces.append(exif_chunk)
+                exif_written = True
+            continue
+        pieces.append((chunk_start, total))
+
+
+def _write_pieces(src: BinaryIO, dst: BinaryIO, pieces: List[_Piece]) -> None:
+    for piece in pieces:
+        if isinstance(piece, bytes):
+            dst.write(piece)
+            continue
+        offset, remaining = piece
+        src.seek(offset)
+        while remaining > 0:
+            chunk = src.read(min(STREAM_CHUNK_BYTES, remaining))
+            if not chunk:
+                raise ValueError("ファイルが途中で終わっています")
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+
+def rewrite_metadata_file(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    image_format: str,
+    edit: MetadataEdit,
+) -> None:
+    """`source`（JPEG/PNG）のメタデータを `edit` に従って書き換え `target` に書き出す。
+
+    Raises:
+        ValueError: 未対応形式、または構造を解析できない場合（呼び出し側は再エンコードへ切り替える）
+        OSError: 読み書きに失敗した場合
+    """
+    fmt = image_format.upper()
+    if fmt not in METADATA_REWRITE_FORMATS:
+        raise ValueError(f"メタデータの直接書き換えに未対応の形式です: {image_format}")
+    planner = _plan_jpeg if fmt == "JPEG" else _plan_png
+    with open(source, "rb") as src:
+        size = src.seek(0, 2)
+        src.seek(0)
+        # 解析を終えてから出力を開くため、解析失敗時に出力ファイルは作られない
+        pieces = planner(src, size, edit)
+        with open(target, "wb") as dst:
+            _write_pieces(src, dst, pieces)
@@ -0,0 +1,82 @@
+"""EXIF Orientation をリサイズ後に適用するためのヘルパー。
+
+読込直後に `ImageOps.exif_transpose` でフル解像度の回転コピーを作る代わりに、
+Orientation を値として保持し、目標サイズは回転後の座標系で計算する。
+縮小は元の向きのまま（縦横を入れ替えたサイズへ）行い、小さくなった出力にだけ回転を適用する。
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from PIL import Image
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# ImageOps.exif_transpose と同じ対応
+_TRANSPOSE_METHODS = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+_AXIS_SWAPPING = frozenset((5, 6, 7, 8))
+
+
+def read_orientation(image: Image.Image) -> int:
+    """EXIF Orientation（1-8）を返す。未指定・不正値・読み取り失敗は 1。"""
+    try:
+        value = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+    except Exception:
+        return 1
+    try:
+        orientation = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return orientation if orientation in _TRANSPOSE_METHODS else 1
+
+
+def swaps_axes(orientation: int) -> bool:
+    return orientation in _AXIS_SWAPPING
+
+
+def oriented_size(size: Tuple[int, int], orientation: int) -> Tuple[int, int]:
+    """元の向きのサイズを、Orientation 適用後（表示上）のサイズに変換する。"""
+    width, height = size
+    return (height, width) if swaps_axes(orientation) else (width, height)
+
+
+def apply_orientation(image: Image.Image, orientation: int) -> Image.Image:
+    """画素に Orientation を適用した画像を返す（1 の場合は `image` をそのまま返す）。"""
+    method = _TRANSPOSE_METHODS.get(orientation)
+    if method is None:
+        return image
+    return image.transpose(method)
+
+
+def resize_oriented(
+    image: Image.Image,
+    target_size: Tuple[int, int],
+    orientation: int,
+    resample: Image.Resampling = Image.Resampling.LANCZOS,
+) -> Image.Image:
+    """回転後の座標系の `target_size` へ縮小し、縮小後の画像に Orientation を適用する。
+
+    `image` は元の向き（未回転）の画素。戻り値は常に新しい画像。
+    Pillow の縮小は横→縦の2パスで中間結果を丸めるため、縦横が入れ替わる向きでは
+    縦→横の順に1軸ずつ縮小し、回転してから縮小した場合とビット単位で一致させる。
+    """
+    raw_target = oriented_size(target_size, orientation)
+    if swaps_axes(orientation) and image.height != raw_target[1]:
+        vertical = image.resize((image.width, raw_target[1]), resample)
+        resized = vertical.resize(raw_target, resample)
+        vertical.close()
+    else:
+        resized = image.resize(raw_target, resample)
+    oriented = apply_orientation(resized, orientation)
+    if oriented is not resized:
+        resized.close()
+    return oriented
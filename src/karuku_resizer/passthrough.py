@@ -0,0 +1,196 @@
+"""再エンコード不要な入力のバイト単位コピー（パススルー）。
+
+元画像が目標サイズに収まり、出力形式とEXIFポリシーも入力と一致する場合は
+デコード・再エンコードを行わず、元ファイルのバイト列をそのまま出力する。
+画質劣化（世代劣化）がなく、`optimize`/`progressive` による再圧縮時間もかからない。
+EXIF の削除・GPS 削除・編集だけが必要な JPEG/PNG は `metadata_rewrite` で
+メタデータ部分のみを書き換える。
+
+コピーはカーネル内コピー（``copy_file_range`` → ``sendfile``）を優先し、
+利用できない環境では通常の読み書きにフォールバックする。
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+from karuku_resizer.durability import DEFAULT_DURABILITY, normalize_durability, write_with_durability
+from karuku_resizer.header_probe import probe_header
+from karuku_resizer.metadata_rewrite import MetadataEdit, rewrite_metadata_file
+from karuku_resizer.orientation import read_orientation
+
+PASSTHROUGH_FORMATS: Tuple[str, ...] = ("JPEG", "PNG", "WEBP")
+COPY_METHODS: Tuple[str, ...] = ("copy_file_range", "sendfile", "copy")
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
+# カーネル内コピーが使えないことを示すエラー（1バイトも書かれていなければ次の方式へ）
+_FALLBACK_ERRNOS = frozenset(
+    code
+    for code in (
+        getattr(errno, "EXDEV", None),
+        getattr(errno, "ENOSYS", None),
+        getattr(errno, "EINVAL", None),
+        getattr(errno, "EOPNOTSUPP", None),
+        getattr(errno, "ENOTSUP", None),
+        getattr(errno, "EBADF", None),
+        getattr(errno, "EPERM", None),
+        getattr(errno, "ETXTBSY", None),
+    )
+    if code is not None
+)
+
+
+@dataclass
+class PassthroughStats:
+    encoded_count: int = 0
+    passthrough_count: int = 0
+    method_counts: Dict[str, int] = field(default_factory=dict)
+
+    def record_encoded(self) -> None:
+        self.encoded_count += 1
+
+    def record_passthrough(self, method: str) -> None:
+        self.passthrough_count += 1
+        self.method_counts[method] = self.method_counts.get(method, 0) + 1
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "passthrough_count": self.passthrough_count,
+            "encoded_count": self.encoded_count,
+            "copy_file_range": self.method_counts.get("copy_file_range", 0),
+            "sendfile": self.method_counts.get("sendfile", 0),
+            "copies": self.method_counts.get("copy", 0),
+            "metadata_rewrites": self.method_counts.get("metadata_rewrite", 0),
+        }
+
+
+def passthrough_source_format(image: Image.Image) -> Optional[str]:
+    """開いた直後（未変換）の画像がパススルー可能なら形式名を返す。
+
+    単一フレームの JPEG/PNG/WEBP で、EXIF の Orientation が未指定または 1 のものに限る。
+    MPO やアニメーションはコピーすると出力内容が変わるため対象外。
+    """
+    image_format = (image.format or "").upper()
+    if image_format not in PASSTHROUGH_FORMATS:
+        return None
+    if getattr(image, "is_animated", False) or getattr(image, "n_frames", 1) > 1:
+        return None
+    if read_orientation(image) != 1:
+        return None
+    return image_format
+
+
+def probe_passthrough_format(path: Union[str, Path]) -> Optional[str]:
+    """ファイルのヘッダーだけを読み、パススルー可能な形式名を返す（不可なら None）。"""
+    header = probe_header(path)
+    if header is None or header.format not in PASSTHROUGH_FORMATS:
+        return None
+    if header.animated or header.orientation != 1:
+        return None
+    return header.format
+
+
+def _copy_with_copy_file_range(src_fd: int, dst_fd: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(src_fd, dst_fd, size - copied, copied, copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _copy_with_sendfile(src_fd: int, dst_fd: int, size: int) -> int:
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(dst_fd, src_fd, copied, min(COPY_CHUNK_BYTES, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def copy_file_bytes(source: Union[str, Path], target: Union[str, Path]) -> str:
+    """`source` の内容を `target` へコピーし、使用した方式を返す。
+
+    Returns:
+        "copy_file_range" / "sendfile" / "copy"
+
+    Raises:
+        OSError: 読み書きに失敗した場合（途中まで書き込んだ後の失敗はフォールバックしない）
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        size = os.fstat(src_fd).st_size
+        kernel_copies = []
+        if hasattr(os, "copy_file_range"):
+            kernel_copies.append(("copy_file_range", _copy_with_copy_file_range))
+        # 通常ファイルへの sendfile は Linux のみ対応
+        if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+            kernel_copies.append(("sendfile", _copy_with_sendfile))
+        for method, copy_func in kernel_copies:
+            try:
+                copied = copy_func(src_fd, dst_fd, size)
+            except OSError as e:
+                if e.errno not in _FALLBACK_ERRNOS or os.fstat(dst_fd).st_size:
+                    raise
+                continue
+            if copied >= size:
+                return method
+            # 途中で読み取れなくなった（コピー中に縮んだ等）場合は読み書きでやり直す
+            dst.truncate(0)
+            break
+        src.seek(0)
+        dst.seek(0)
+        shutil.copyfileobj(src, dst, COPY_CHUNK_BYTES)
+        return "copy"
+
+
+def passthrough_copy(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    durability: str = DEFAULT_DURABILITY,
+    *,
+    metadata: Optional[MetadataEdit] = None,
+    image_format: str = "",
+) -> str:
+    """耐久性ポリシーに従って元ファイルを出力先へコピーし、使用した方式を返す。
+
+    `metadata` を指定した場合は `image_format`（JPEG/PNG）のメタデータだけを書き換えて
+    "metadata_rewrite" を返す。入力と出力が同一パスの単純コピーは何もせず "same" を返す。
+
+    Raises:
+        ValueError: メタデータを直接書き換えられない場合（出力は作られない）
+    """
+    source = Path(source)
+    target = Path(target)
+    try:
+        same_path = source.resolve() == target.resolve()
+    except OSError:
+        same_path = False
+    if same_path:
+        if metadata is None:
+            return "same"
+        # fast は出力先を直接開くため、入力を読み終える前に切り詰めてしまう
+        if normalize_durability(durability) == "fast":
+            durability = DEFAULT_DURABILITY
+
+    methods = []
+
+    def write(path: Path) -> None:
+        if metadata is None:
+            methods.append(copy_file_bytes(source, path))
+            return
+        rewrite_metadata_file(source, path, image_format, metadata)
+        methods.append("metadata_rewrite")
+
+    write_with_durability(target, write, durability)
+    return methods[-1]
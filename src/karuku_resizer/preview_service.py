@@ -0,0 +1,328 @@
+"""Long-lived preview render / size-estimation service for the GUI.
+
+Requests are keyed by slot (e.g. ``"render"``). A new request for a slot replaces
+the queued one before it starts and asks the running one to stop at its next
+stage boundary, so rapid slider or selection changes do not pile up work.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+PRIORITY_CURRENT = 0
+PRIORITY_BACKGROUND = 10
+DEFAULT_PREVIEW_WORKERS = 2
+DEFAULT_PREVIEW_CACHE_ENTRIES_PER_JOB = 4
+
+PreviewCacheKey = Tuple[Tuple[int, int], str, int]
+
+
+def precompute_order(current: Optional[int], count: int) -> Iterator[int]:
+    """Yield job indices nearest to ``current`` first (next, previous, next+1, ...), excluding it."""
+    if count <= 0:
+        return
+    if current is None or not 0 <= current < count:
+        yield from range(count)
+        return
+    for distance in range(1, count):
+        after = current + distance
+        before = current - distance
+        if after >= count and before < 0:
+            return
+        if after < count:
+            yield after
+        if before >= 0:
+            yield before
+
+
+class PreviewTicket:
+    """Handle passed to a request's callable; poll it between stages."""
+
+    def __init__(self, key: Hashable, priority: int, seq: int) -> None:
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``; return True when the request was cancelled meanwhile."""
+        return self._cancel_event.wait(max(0.0, seconds))
+
+
+@dataclass
+class PreviewServiceStats:
+    submitted: int = 0
+    coalesced: int = 0
+    started: int = 0
+    completed: int = 0
+    interrupted: int = 0
+
+
+class PreviewService:
+    """Priority queue served by a fixed number of daemon threads.
+
+    Lower ``priority`` runs first; ties run in submission order. Threads are started
+    on the first submit and live until `shutdown`.
+    """
+
+    def __init__(self, *, max_workers: int = DEFAULT_PREVIEW_WORKERS, name: str = "karuku-preview") -> None:
+        self._max_workers = max(1, int(max_workers))
+        self._name = name
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, PreviewTicket, Callable[[PreviewTicket], None]]] = []
+        self._pending: Dict[Hashable, PreviewTicket] = {}
+        self._running: Dict[Hashable, PreviewTicket] = {}
+        self._threads: List[threading.Thread] = []
+        self._busy = 0
+        self._seq = 0
+        self._closed = False
+        self.stats = PreviewServiceStats()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def submit(
+        self,
+        key: Hashable,
+        func: Callable[[PreviewTicket], None],
+        *,
+        priority: int = PRIORITY_CURRENT,
+    ) -> PreviewTicket:
+        """Queue ``func(ticket)`` for ``key``, superseding earlier requests for the same key."""
+        with self._cond:
+            self._seq += 1
+            ticket = PreviewTicket(key, priority, self._seq)
+            self.stats.submitted += 1
+            if self._closed:
+                ticket.cancel()
+                return ticket
+            self._supersede_locked(key)
+            self._pending[key] = ticket
+            heapq.heappush(self._heap, (priority, ticket.seq, ticket, func))
+            self._ensure_threads_locked()
+            self._cond.notify()
+        return ticket
+
+    def cancel(self, key: Hashable) -> None:
+        """Drop the queued request for ``key`` and interrupt the running one."""
+        with self._cond:
+            self._supersede_locked(key)
+
+    def cancel_background(self) -> int:
+        """Drop and interrupt every request below current priority; return how many were hit."""
+        hit = 0
+        with self._cond:
+            for key, ticket in list(self._pending.items()):
+                if ticket.priority >= PRIORITY_BACKGROUND:
+                    del self._pending[key]
+                    ticket.cancel()
+                    hit += 1
+            for ticket in self._running.values():
+                if ticket.priority >= PRIORITY_BACKGROUND and not ticket.cancelled:
+                    ticket.cancel()
+                    self.stats.interrupted += 1
+                    hit += 1
+        return hit
+
+    def shutdown(self) -> None:
+        """Cancel everything and let the worker threads exit."""
+        with self._cond:
+            self._closed = True
+            for ticket in list(self._pending.values()) + list(self._running.values()):
+                ticket.cancel()
+            self._pending.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+
+    def _supersede_locked(self, key: Hashable) -> None:
+        queued = self._pending.pop(key, None)
+        if queued is not None:
+            queued.cancel()
+            self.stats.coalesced += 1
+        running = self._running.get(key)
+        if running is not None and not running.cancelled:
+            running.cancel()
+            self.stats.interrupted += 1
+
+    def _ensure_threads_locked(self) -> None:
+        # Threads are persistent, so this only starts the missing ones.
+        idle = len(self._threads) - self._busy
+        if idle > len(self._pending) - 1 or len(self._threads) >= self._max_workers:
+            return
+        thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name=f"{self._name}-{len(self._threads)}",
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _next_locked(self) -> Optional[Tuple[PreviewTicket, Callable[[PreviewTicket], None]]]:
+        while self._heap:
+            _priority, _seq, ticket, func = heapq.heappop(self._heap)
+            if ticket.cancelled:
+                continue
+            if self._pending.get(ticket.key) is ticket:
+                del self._pending[ticket.key]
+            return ticket, func
+        return None
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next_locked()
+                while item is None and not self._closed:
+                    self._cond.wait()
+                    item = self._next_locked()
+                if item is None:
+                    return
+                ticket, func = item
+                self._running[ticket.key] = ticket
+                self._busy += 1
+                self.stats.started += 1
+            try:
+                func(ticket)
+            except Exception:
+                logging.exception("Preview request failed: %s", ticket.key)
+            finally:
+                with self._cond:
+                    if self._running.get(ticket.key) is ticket:
+                        del self._running[ticket.key]
+                    self._busy -= 1
+                    self.stats.completed += 1
+
+
+def preview_cache_key(
+    target_size: Tuple[int, int],
+    *,
+    resample: str = "lanczos",
+    orientation: int = 1,
+) -> PreviewCacheKey:
+    """Key a resized preview by output size, resample tier and EXIF orientation."""
+    return ((int(target_size[0]), int(target_size[1])), resample, int(orientation))
+
+
+def image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+@dataclass
+class PreviewCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+
+
+class ResizedPreviewCache:
+    """Per-job LRU of resized previews under one memory cap shared by all jobs.
+
+    Each owner (a job) keeps at most ``max_entries_per_owner`` results; when the total
+    exceeds ``max_bytes`` the least recently used entry of any owner is evicted.
+    ``on_evict(owner, key, image)`` is called for every eviction.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        max_entries_per_owner: int = DEFAULT_PREVIEW_CACHE_ENTRIES_PER_JOB,
+        on_evict: Optional[Callable[[Hashable, PreviewCacheKey, Image.Image], None]] = None,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entries_per_owner = max(1, int(max_entries_per_owner))
+        self._on_evict = on_evict
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Hashable, PreviewCacheKey], Image.Image]" = OrderedDict()
+        self._owner_counts: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self.stats = PreviewCacheStats()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, owner: Hashable, key: PreviewCacheKey) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get((owner, key))
+            if image is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end((owner, key))
+            self.stats.hits += 1
+            return image
+
+    def peek(self, owner: Hashable, key: PreviewCacheKey) -> Optional[Image.Image]:
+        """Look up without touching LRU order or hit statistics (for background scans)."""
+        with self._lock:
+            return self._entries.get((owner, key))
+
+    def put(self, owner: Hashable, key: PreviewCacheKey, image: Image.Image) -> None:
+        evicted: List[Tuple[Hashable, PreviewCacheKey, Image.Image]] = []
+        with self._lock:
+            entry_key = (owner, key)
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self._total_bytes -= image_nbytes(previous)
+                self._owner_counts[owner] -= 1
+            self._entries[entry_key] = image
+            self._total_bytes += image_nbytes(image)
+            self._owner_counts[owner] = self._owner_counts.get(owner, 0) + 1
+            if self._owner_counts[owner] > self.max_entries_per_owner:
+                oldest = next(k for k in self._entries if k[0] == owner)
+                evicted.append(self._evict_locked(oldest))
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == entry_key:
+                    break
+                evicted.append(self._evict_locked(oldest))
+        if self._on_evict is not None:
+            for evicted_owner, evicted_key, evicted_image in evicted:
+                self._on_evict(evicted_owner, evicted_key, evicted_image)
+
+    def discard_owner(self, owner: Hashable) -> None:
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == owner]:
+                image = self._entries.pop(entry_key)
+                self._total_bytes -= image_nbytes(image)
+            self._owner_counts.pop(owner, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._owner_counts.clear()
+            self._total_bytes = 0
+
+    def _evict_locked(self, entry_key: Tuple[Hashable, PreviewCacheKey]) -> Tuple[Hashable, PreviewCacheKey, Image.Image]:
+        image = self._entries.pop(entry_key)
+        nbytes = image_nbytes(image)
+        owner, key = entry_key
+        self._total_bytes -= nbytes
+        self._owner_counts[owner] -= 1
+        if self._owner_counts[owner] <= 0:
+            del self._owner_counts[owner]
+        self.stats.evictions += 1
+        self.stats.evicted_bytes += nbytes
+        return owner, key, image
@@ -28,6 +28,7 @@ def default_processing_values() -> dict[str, Any]:
         "webp_method": "6",
         "webp_lossless": False,
         "avif_speed": "6",
+        "encoder_profile": "smallest",
         "dry_run": False,
         "exif_mode": "keep",
         "remove_gps": False,
@@ -0,0 +1,285 @@
+"""1回のデコードから複数サイズ・複数形式の派生画像を書き出す。
+
+レスポンシブ画像用に 2560/1280/640/320px のような幅違いを作る場合、
+大きい幅から順に直前の中間画像を縮小していく（カスケード）。
+各サイズは指定された全形式でエンコードされ、画像ごとに
+`<stem>.renditions.json` マニフェストへ出力一覧を記録する。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from karuku_resizer.image_save_pipeline import (
+    SaveFormat,
+    SaveOptions,
+    SaveResult,
+    destination_with_extension,
+    save_image,
+    supported_output_formats,
+)
+from karuku_resizer.orientation import apply_orientation, oriented_size
+
+DEFAULT_RENDITION_WIDTHS: Tuple[int, ...] = (2560, 1280, 640, 320)
+DEFAULT_RENDITION_FORMATS: Tuple[SaveFormat, ...] = ("webp", "jpeg")
+MANIFEST_SUFFIX = ".renditions.json"
+MANIFEST_VERSION = 1
+
+_FORMAT_ALIASES = {"jpg": "jpeg"}
+
+
+@dataclass(frozen=True)
+class RenditionOutput:
+    width: int
+    height: int
+    output_format: SaveFormat
+    path: Path
+    success: bool
+    bytes_out: int = 0
+    error: Optional[str] = None
+    save_result: Optional[SaveResult] = None
+
+
+@dataclass(frozen=True)
+class RenditionSetResult:
+    source_name: str
+    source_size: Tuple[int, int]
+    outputs: Tuple[RenditionOutput, ...]
+    skipped_widths: Tuple[int, ...] = ()
+    manifest_path: Optional[Path] = None
+
+    @property
+    def success(self) -> bool:
+        return bool(self.outputs) and all(output.success for output in self.outputs)
+
+    @property
+    def failed_outputs(self) -> Tuple[RenditionOutput, ...]:
+        return tuple(output for output in self.outputs if not output.success)
+
+    @property
+    def first_error(self) -> str:
+        for output in self.outputs:
+            if not output.success:
+                return output.error or "保存処理で不明なエラー"
+        return ""
+
+
+def parse_rendition_widths(value: str | Iterable[int]) -> Tuple[int, ...]:
+    """幅指定（例: ``"320,640,1280"``）を降順・重複なしのタプルにする。
+
+    Raises:
+        ValueError: 数値でない値や0以下の値を含む場合
+    """
+    if isinstance(value, str):
+        tokens = [token.strip() for token in value.split(",") if token.strip()]
+    else:
+        tokens = [str(token) for token in value]
+    widths = set()
+    for token in tokens:
+        try:
+            width = int(token)
+        except ValueError:
+            raise ValueError(f"幅は整数で指定してください: {token}") from None
+        if width <= 0:
+            raise ValueError(f"幅は1以上で指定してください: {token}")
+        widths.add(width)
+    return tuple(sorted(widths, reverse=True))
+
+
+def parse_rendition_formats(
+    value: str | Iterable[str],
+    available_formats: Optional[Iterable[SaveFormat]] = None,
+) -> Tuple[SaveFormat, ...]:
+    """形式指定（例: ``"webp,jpeg"``）を検証し、指定順を保ったタプルにする。
+
+    Raises:
+        ValueError: 未対応の形式を含む場合、または空の場合
+    """
+    available = set(available_formats or supported_output_formats())
+    raw_tokens = value.split(",") if isinstance(value, str) else list(value)
+    formats: list[SaveFormat] = []
+    for raw in raw_tokens:
+        token = str(raw).strip().lower()
+        if not token:
+            continue
+        token = _FORMAT_ALIASES.get(token, token)
+        if token not in available:
+            raise ValueError(f"未対応の出力形式です: {raw}")
+        if token not in formats:
+            formats.append(token)  # type: ignore[arg-type]
+    if not formats:
+        raise ValueError("出力形式が指定されていません")
+    return tuple(formats)
+
+
+def rendition_path(base_path: Path, width: int, output_format: SaveFormat) -> Path:
+    """`photo` → `photo-640w.webp` のような出力パスを返す。"""
+    return destination_with_extension(base_path.with_name(f"{base_path.stem}-{width}w"), output_format)
+
+
+def manifest_path_for(base_path: Path) -> Path:
+    return base_path.with_name(f"{base_path.stem}{MANIFEST_SUFFIX}")
+
+
+def plan_rendition_widths(source_width: int, widths: Sequence[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """拡大にならない幅だけを残す。
+
+    Returns:
+        (出力する幅（降順）, 元画像より大きいため省略した幅)
+
+    すべて省略される場合は元画像の幅で1サイズだけ出力する。
+    """
+    ordered = sorted(set(widths), reverse=True)
+    usable = tuple(w for w in ordered if w <= source_width)
+    skipped = tuple(w for w in ordered if w > source_width)
+    if not usable:
+        usable = (source_width,)
+    return usable, skipped
+
+
+def iter_cascade(
+    image: Image.Image,
+    widths: Sequence[int],
+    orientation: int = 1,
+) -> Iterator[Tuple[int, Image.Image]]:
+    """降順の幅ごとに、直前の中間画像から縮小した画像を返す。
+
+    高さは元画像の縦横比から求めるため、段数を重ねても丸め誤差は蓄積しない。
+    `image` は未回転の画素で、幅は Orientation 適用後の座標系で指定する。
+    カスケードは元の向きのまま行い、yield する画像にだけ Orientation を適用する。
+    yield された画像は次の段の生成後に閉じられるため、呼び出し側で保持しないこと。
+    """
+    source_width, source_height = oriented_size(image.size, orientation)
+    current = image
+    for width in widths:
+        height = max(1, round(source_height * width / source_width))
+        raw_size = oriented_size((width, height), orientation)
+        if raw_size != current.size:
+            derived = current.resize(raw_size, Image.Resampling.LANCZOS)
+            if current is not image:
+                current.close()
+            current = derived
+        oriented = apply_orientation(current, orientation)
+        yield width, oriented
+        if oriented is not current:
+            oriented.close()
+    if current is not image:
+        current.close()
+
+
+def _prepare_cascade_source(image: Image.Image) -> Image.Image:
+    # パレット画像等をそのまま縮小すると最近傍補間になるため、先に展開する。
+    if image.mode in ("RGB", "RGBA", "L", "LA"):
+        return image
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def render_renditions(
+    source_image: Image.Image,
+    base_path: Path,
+    *,
+    widths: Sequence[int] = DEFAULT_RENDITION_WIDTHS,
+    formats: Sequence[SaveFormat] = DEFAULT_RENDITION_FORMATS,
+    save_options: Optional[SaveOptions] = None,
+    source_name: Optional[str] = None,
+    write_manifest: bool = True,
+    orientation: int = 1,
+) -> RenditionSetResult:
+    """デコード済み画像から全サイズ・全形式を出力する。
+
+    Args:
+        source_image: デコード済みの元画像（EXIF取得にも使う）。画素は未回転のまま渡す
+        base_path: 出力のベースパス。拡張子は無視され ``<stem>-<幅>w.<ext>`` になる
+        widths: 出力幅。元画像より大きい幅は省略される
+        formats: 各サイズで出力する形式
+        save_options: 品質・EXIF等の保存条件。`output_format` は形式ごとに上書きされる
+        source_name: マニフェストに記録する元ファイル名
+        write_manifest: マニフェストJSONを書き出すか（dry_run時は書き出さない）
+        orientation: `source_image` の EXIF Orientation。縮小後の各出力に適用する
+    """
+    base_options = save_options or SaveOptions(output_format=formats[0] if formats else "jpeg")
+    source_size = oriented_size(source_image.size, orientation)
+    usable_widths, skipped_widths = plan_rendition_widths(source_size[0], widths)
+    cascade_source = _prepare_cascade_source(source_image)
+
+    outputs: list[RenditionOutput] = []
+    try:
+        for width, resized in iter_cascade(cascade_source, usable_widths, orientation):
+            for output_format in formats:
+                path = rendition_path(base_path, width, output_format)
+                result = save_image(
+                    source_image=source_image,
+                    resized_image=resized,
+                    output_path=path,
+                    options=replace(base_options, output_format=output_format),
+                )
+                bytes_out = 0
+                if result.success and not result.dry_run:
+                    try:
+                        bytes_out = path.stat().st_size
+                    except OSError:
+                        bytes_out = 0
+                outputs.append(
+                    RenditionOutput(
+                        width=resized.width,
+                        height=resized.height,
+                        output_format=output_format,
+                        path=result.output_path,
+                        success=result.success,
+                        bytes_out=bytes_out,
+                        error=result.error,
+                        save_result=result,
+                    )
+                )
+    finally:
+        if cascade_source is not source_image:
+            cascade_source.close()
+
+    result_set = RenditionSetResult(
+        source_name=source_name or base_path.name,
+        source_size=source_size,
+        outputs=tuple(outputs),
+        skipped_widths=skipped_widths,
+    )
+    if write_manifest and not base_options.dry_run:
+        manifest_path = manifest_path_for(base_path)
+        write_rendition_manifest(manifest_path, result_set)
+        result_set = replace(result_set, manifest_path=manifest_path)
+    return result_set
+
+
+def build_rendition_manifest(result: RenditionSetResult) -> Dict[str, Any]:
+    return {
+        "version": MANIFEST_VERSION,
+        "source": result.source_name,
+        "source_width": result.source_size[0],
+        "source_height": result.source_size[1],
+        "skipped_widths": list(result.skipped_widths),
+        "renditions": [
+            {
+                "width": output.width,
+                "height": output.height,
+                "format": output.output_format,
+                "file": output.path.name,
+                "bytes": output.bytes_out,
+                "success": output.success,
+                **({"error": output.error} if output.error else {}),
+            }
+            for output in result.outputs
+        ],
+    }
+
+
+def write_rendition_manifest(path: Path, result: RenditionSetResult) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        json.dump(build_rendition_manifest(result), fh, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -8,17 +8,47 @@
 両方から利用可能な共通機能を提供します。
 """
 
+import io
+import mmap
 import os
 import sys
 import json
 import shutil
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional, Union, Tuple
 from PIL import Image, UnidentifiedImageError
 from loguru import logger
+from karuku_resizer.content_analysis import (
+    DEFAULT_PNG_PALETTE,
+    PNG_PALETTE_MODES,
+    quantize_for_png,
+    simplify_for_encode,
+)
+from karuku_resizer.dedup import DedupIndex, DedupStats, materialize_duplicate, read_and_hash_file
+from karuku_resizer.durability import (
+    DEFAULT_DURABILITY,
+    DURABILITY_MODES,
+    flush_pending_directory_syncs,
+    normalize_durability,
+    write_with_durability,
+)
+from karuku_resizer.header_probe import ProbeStats, probe_headers
+from karuku_resizer.image_save_pipeline import SaveOptions
+from karuku_resizer.metadata_rewrite import METADATA_REWRITE_FORMATS, MetadataEdit
+from karuku_resizer.orientation import read_orientation
+from karuku_resizer.encoder_profiles import (
+    DEFAULT_ENCODER_PROFILE,
+    ENCODER_PROFILES,
+    encoder_settings,
+)
+from karuku_resizer.passthrough import PassthroughStats, passthrough_copy, passthrough_source_format
+from karuku_resizer.renditions import parse_rendition_formats, parse_rendition_widths, render_renditions
+from karuku_resizer.retry_policy import DEFAULT_RETRY_BUDGET, RetryBudget, RetryPolicy, call_with_retry, retry_run
 from karuku_resizer.runtime_logging import get_default_log_dir
 
 # Windows固有のエラーコードと対応する日本語メッセージ
@@ -186,40 +216,31 @@ def get_windows_error_message(error_code):
 
 def retry_on_file_error(func, *args, max_retries=3, retry_delay=0.5, **kwargs):
     """
-    ファイル操作に関連する関数を実行し、エラー時にリトライするラッパー関数
+    ファイル操作に関連する関数を実行し、一時的なエラー時のみリトライするラッパー関数
+
+    共有違反・EAGAIN などの一時的なエラーだけを指数バックオフ＋ジッタで再試行し、
+    FileNotFoundError やパス長超過などは即座に再送出する。
+    再試行回数は実行中の `retry_policy.retry_run` の予算・集計に計上される。
 
     Args:
         func: 実行する関数
         *args: 関数の引数
-        max_retries: 最大リトライ回数
-        retry_delay: リトライ間の待機時間（秒）
+        max_retries: 最大試行回数（初回を含む）
+        retry_delay: 初回リトライ前の基準待機時間（秒）。以降は倍々に増える
         **kwargs: 関数のキーワード引数
 
     Returns:
         関数の結果
 
     Raises:
-        最大リトライ回数後も失敗した場合は最後の例外を再送出
+        再試行対象外のエラー、または最大試行回数・予算到達後の最後の例外
     """
-    retries = 0
-    last_exception = None
-
-    while retries < max_retries:
-        try:
-            return func(*args, **kwargs)
-        except (PermissionError, OSError) as e:
-            last_exception = e
-            retries += 1
-            logger.debug(f"ファイル操作エラー: {e} - リトライ {retries}/{max_retries}")
-
-            # Windows環境ではファイルロックが一時的な場合があるため、待機して再試行
-            time.sleep(retry_delay)
-
-    # 最大リトライ回数到達後も失敗した場合
-    if last_exception:
-        logger.error(f"最大リトライ回数到達: {last_exception}")
-        raise last_exception
-    return None
+    policy = RetryPolicy(
+        max_attempts=max(1, int(max_retries)),
+        base_delay=retry_delay,
+        max_delay=max(retry_delay, retry_delay * 4),
+    )
+    return call_with_retry(func, *args, policy=policy, **kwargs)
 
 
 def is_long_path_enabled():
@@ -769,6 +790,127 @@ def get_destination_path(source_path, source_dir, dest_dir):
     return result_path
 
 
+DEFAULT_MKDIR_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class PlannedPath:
+    """バッチ内の1ファイル分の入力→出力パス"""
+
+    source: Path
+    dest: Path
+
+
+@dataclass
+class PathPlan:
+    """
+    バッチ全体の入力→出力パスの対応表
+
+    出力ディレクトリは `directories` に1回ずつだけ現れ、`create_directories` で
+    処理開始前にまとめて作成する。作成に失敗したディレクトリは `failed_directories` に残る。
+    """
+
+    entries: list[PlannedPath]
+    directories: list[Path]
+    failed_directories: dict[Path, str] = field(default_factory=dict)
+    created_count: int = 0
+
+    def directory_error(self, dest_path: Path) -> Optional[str]:
+        """出力先の親ディレクトリが作成できなかった場合、そのエラーを返す"""
+        return self.failed_directories.get(Path(dest_path).parent)
+
+    def leaf_directories(self) -> list[Path]:
+        """
+        他のディレクトリの祖先にならないディレクトリのみを返す
+        （makedirs が祖先も作るため、祖先への mkdir は不要）
+        """
+        ancestors: set[Path] = set()
+        for directory in self.directories:
+            ancestors.update(directory.parents)
+        return [d for d in self.directories if d not in ancestors]
+
+    def create_directories(self, max_workers: int = DEFAULT_MKDIR_WORKERS) -> int:
+        """
+        出力ディレクトリを並列にまとめて作成する
+
+        Returns:
+            int: mkdir を発行したディレクトリ数
+        """
+        leaves = self.leaf_directories()
+
+        def _make(directory: Path) -> Optional[str]:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                return None
+            except OSError as e:
+                return analyze_os_error(e)
+
+        if len(leaves) <= 1 or max_workers <= 1:
+            errors = [_make(directory) for directory in leaves]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(leaves)), thread_name_prefix="karuku-mkdir"
+            ) as executor:
+                errors = list(executor.map(_make, leaves))
+
+        for directory, error in zip(leaves, errors):
+            if error is not None:
+                logger.error(f"出力先ディレクトリを作成できませんでした: {directory}: {error}")
+                self.failed_directories[directory] = error
+        self.created_count = len(leaves)
+        return self.created_count
+
+
+def _relative_directory_parts(parent_str: str, source_dir_str: str) -> list[str]:
+    """入力ディレクトリからの相対ディレクトリ要素を返す（範囲外なら空）"""
+    if parent_str == source_dir_str:
+        return []
+    prefix = source_dir_str.rstrip(os.sep) + os.sep
+    if not parent_str.startswith(prefix):
+        abs_parent = os.path.abspath(parent_str)
+        abs_source = os.path.abspath(source_dir_str)
+        if abs_parent == abs_source:
+            return []
+        prefix = abs_source.rstrip(os.sep) + os.sep
+        if not abs_parent.startswith(prefix):
+            return []
+        parent_str = abs_parent
+    return [part for part in parent_str[len(prefix):].split(os.sep) if part]
+
+
+def plan_destination_paths(source_paths, source_dir, dest_dir) -> PathPlan:
+    """
+    バッチ全体の出力先パスを一括で計算します（ディレクトリは作成しない）
+
+    `get_destination_path` と同じ規則（相対ディレクトリをミラーし、各要素を
+    `sanitize_filename` で変換）で対応付けるが、ディレクトリ部分の変換は
+    入力ディレクトリごとに1回だけ行う。
+
+    Args:
+        source_paths: 入力ファイルパスの反復可能オブジェクト
+        source_dir: 入力ディレクトリ
+        dest_dir: 出力ディレクトリ
+
+    Returns:
+        PathPlan: パスの対応表と、作成が必要な出力ディレクトリ一覧
+    """
+    source_dir_str = str(source_dir)
+    dest_root = Path(dest_dir)
+    dir_cache: dict[str, Path] = {}
+    entries: list[PlannedPath] = []
+
+    for source in source_paths:
+        parent_str, name = os.path.split(str(source))
+        dest_parent = dir_cache.get(parent_str)
+        if dest_parent is None:
+            parts = _relative_directory_parts(parent_str, source_dir_str)
+            dest_parent = dest_root.joinpath(*(sanitize_filename(part) for part in parts))
+            dir_cache[parent_str] = dest_parent
+        entries.append(PlannedPath(Path(source), dest_parent / sanitize_filename(name)))
+
+    return PathPlan(entries=entries, directories=sorted(set(dir_cache.values())))
+
+
 def find_image_files(source_dir) -> list[Path]:
     """
     指定されたディレクトリから全ての.jpgと.pngファイルを検索します
@@ -911,6 +1053,14 @@ def resize_and_compress_image(
     progressive: bool = False,
     optimize: bool = False,
     output_format: Optional[str] = None,
+    durability: str = DEFAULT_DURABILITY,
+    prepared_paths: bool = False,
+    passthrough: bool = False,
+    passthrough_stats: Optional[PassthroughStats] = None,
+    png_palette: str = DEFAULT_PNG_PALETTE,
+    png_dither: bool = False,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+    source_bytes: Optional[bytes] = None,
 ) -> Union[Tuple[bool, bool, Optional[int]], Tuple[bool, Optional[str]]]:
     """
     画像をリサイズして圧縮します（ファイルベースとメモリベースの両方をサポート）
@@ -935,6 +1085,17 @@ def resize_and_compress_image(
         progressive: プログレッシブJPEGを使用するか
         optimize: PNG/JPEG最適化を使用するか
         output_format: 出力フォーマット（formatパラメータより優先）
+        durability: 書き込み耐久性 ('fast', 'atomic', 'durable')。ファイルベース処理のみ有効
+        prepared_paths: パスが `plan_destination_paths` で計画済み（出力先ディレクトリ作成済み）の場合 True。
+            ファイルごとのパス正規化・存在確認・ディレクトリ作成を省略する
+        passthrough: True の場合、リサイズ不要で出力形式が入力と一致すれば再エンコードせず
+            元ファイルのバイト列をそのままコピーする（EXIF削除時は JPEG/PNG のみメタデータを直接書き換え。
+            ファイルベース処理のみ）。`quality` は適用されないため既定は False
+        passthrough_stats: 指定時はパススルー/再エンコードの件数を記録する
+        png_palette: PNG出力時のパレット化 ('off', 'auto': 無損失で256色以下に収まる場合のみ, 'always': 減色も行う)
+        png_dither: png_palette='always' で減色する際に誤差拡散ディザを使うか
+        encoder_profile: エンコード速度プロファイル ('fastest', 'balanced', 'smallest')。ファイルベース処理のみ
+        source_bytes: 読み込み済みの `source_path` の内容。指定時はファイルを再度読まずにこのバイト列からデコードする
 
     Returns:
         tuple[bool, bool, int | None]: (成功したか, 元のサイズを維持したか, 見積もりサイズ)
@@ -1036,49 +1197,54 @@ def resize_and_compress_image(
             logger.error(error_msg)
             raise ValueError(error_msg) from e
 
-        # パスの正規化にリトライ機構を使用
-        def normalize_path_with_retry(path):
-            return normalize_long_path(path, remove_prefix=True)
+        if prepared_paths:
+            # plan_destination_paths で計画済み・出力先ディレクトリ作成済み。
+            # 存在しない入力は画像を開く時点でエラーになる
+            source_path_str = str(source_path)
+        else:
+            # パスの正規化にリトライ機構を使用
+            def normalize_path_with_retry(path):
+                return normalize_long_path(path, remove_prefix=True)
 
-        source_path_str = retry_on_file_error(
-            normalize_path_with_retry, source_path, max_retries=3, retry_delay=0.2
-        )
-        source_path = Path(source_path_str)
+            source_path_str = retry_on_file_error(
+                normalize_path_with_retry, source_path, max_retries=3, retry_delay=0.2
+            )
+            source_path = Path(source_path_str)
 
-        # 実際に存在するか確認し、存在しない場合は再試行
-        def check_file_exists(path):
-            if not Path(path).exists():
-                raise FileNotFoundError(f"ファイルが存在しません: {path}")
-            return True
+            # 実際に存在するか確認（存在しない場合は再試行せず即失敗）
+            def check_file_exists(path):
+                if not Path(path).exists():
+                    raise FileNotFoundError(f"ファイルが存在しません: {path}")
+                return True
 
-        retry_on_file_error(
-            check_file_exists, source_path_str, max_retries=3, retry_delay=0.3
-        )
+            retry_on_file_error(
+                check_file_exists, source_path_str, max_retries=3, retry_delay=0.3
+            )
 
-        # 出力先ディレクトリの安全な取得 (dest_path引数を使用)
-        dest_dir = Path(dest_path).parent
-        success, created_dir = create_directory_with_permissions(dest_dir)
-        if not success:
-            error_msg = f"出力先ディレクトリを作成できませんでした: {dest_dir}"
-            logger.error(error_msg)
-            raise PermissionError(error_msg)
+            # 出力先ディレクトリの安全な取得 (dest_path引数を使用)
+            dest_dir = Path(dest_path).parent
+            success, created_dir = create_directory_with_permissions(dest_dir)
+            if not success:
+                error_msg = f"出力先ディレクトリを作成できませんでした: {dest_dir}"
+                logger.error(error_msg)
+                raise PermissionError(error_msg)
 
         # 出力先パスを文字列に変換
         dest_path_str = str(dest_path)
 
         # 画像ファイルの有効性を確認
         try:
-            # ファイルの存在とアクセス権限を確認
-            if not os.path.isfile(source_path_str):
+            # ファイルの存在とアクセス権限を確認（計画済みパスでは open 時のエラーに任せる）
+            if not prepared_paths and not os.path.isfile(source_path_str):
                 logger.error(f"ファイルが存在しません: {source_path_str}")
                 return False, False, None
 
-            if not os.access(source_path_str, os.R_OK):
+            if not prepared_paths and not os.access(source_path_str, os.R_OK):
                 logger.error(f"ファイルに読み取り権限がありません: {source_path_str}")
                 return False, False, None
 
             # 画像ファイルを開いてフォーマットを確認
-            with Image.open(source_path_str) as img:
+            with Image.open(io.BytesIO(source_bytes) if source_bytes is not None else source_path_str) as img:
                 # 画像フォーマットの確認
                 img_format = img.format
                 SUPPORTED_FORMATS = {"JPEG", "PNG", "WEBP"}
@@ -1148,6 +1314,47 @@ def resize_and_compress_image(
                     else:
                         resized_img = img
 
+                # リサイズ不要・同一形式ならバイト列をそのままコピーする
+                # （EXIF削除のみ必要な JPEG/PNG はメタデータ部分だけを書き換える）
+                passthrough_format = passthrough_source_format(img) if passthrough and keep_original_size else None
+                metadata_edit = None if exif_handling == "keep" else MetadataEdit(exif=None, keep_xmp=False)
+                use_passthrough = passthrough_format == actual_output_format and (
+                    metadata_edit is None or passthrough_format in METADATA_REWRITE_FORMATS
+                )
+                if use_passthrough:
+                    output_ext = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}[actual_output_format]
+                    passthrough_dest = update_extension(dest_path_str, output_ext)
+                    if dry_run:
+                        if passthrough_stats is not None:
+                            passthrough_stats.record_passthrough("dry_run")
+                        return True, keep_original_size, os.path.getsize(source_path_str)
+                    if not prepared_paths and not os.path.exists(os.path.dirname(dest_path_str)):
+                        os.makedirs(os.path.dirname(dest_path_str), exist_ok=True)
+                    method = None
+                    try:
+                        method = retry_on_file_error(
+                            lambda: passthrough_copy(
+                                source_path_str,
+                                passthrough_dest,
+                                durability,
+                                metadata=metadata_edit,
+                                image_format=actual_output_format,
+                            ),
+                            max_retries=3,
+                            retry_delay=0.5,
+                        )
+                    except ValueError as e:
+                        # 構造を解析できない場合は通常の再エンコードへ切り替える
+                        logger.warning(f"メタデータを直接書き換えられないため再エンコードします: {e}")
+                    except Exception as e:
+                        logger.error(f"パススルーコピーエラー ({passthrough_dest}): {e}")
+                        return False, False, None
+                    if method is not None:
+                        if passthrough_stats is not None:
+                            passthrough_stats.record_passthrough(method)
+                        logger.info(f"再エンコードせずコピー（{method}）: {passthrough_dest}")
+                        return True, keep_original_size, None
+
                 # 見積もりサイズ計算（テンポラリファイルに保存して測定）
                 estimated_size = None
 
@@ -1197,8 +1404,8 @@ def resize_and_compress_image(
                     return True, keep_original_size, estimated_size
 
                 # 以下は実際の保存処理
-                # ディレクトリが存在するか確認
-                if not os.path.exists(os.path.dirname(dest_path_str)):
+                # ディレクトリが存在するか確認（計画済みパスでは作成済み）
+                if not prepared_paths and not os.path.exists(os.path.dirname(dest_path_str)):
                     os.makedirs(os.path.dirname(dest_path_str), exist_ok=True)
 
                 # バランス値に基づいて最適化パラメータを調整 (JPEG/WebPの品質に使用)
@@ -1206,7 +1413,13 @@ def resize_and_compress_image(
                     quality, balance, actual_output_format.lower()
                 )
 
+                # 全画素不透明のアルファ・グレースケールの RGB は少ないチャンネルでエンコードする
+                save_img, conversion = simplify_for_encode(save_img, actual_output_format.lower())
+                if conversion:
+                    logger.debug(f"内容解析により {conversion} 変換を適用: {save_img.mode}")
+
                 # 出力形式に応じた保存処理
+                codec = encoder_settings(encoder_profile)
                 save_options = {}
                 output_ext = ""
                 final_dest_path_str = str(dest_path)  # 元のdest_pathをベースにする
@@ -1220,8 +1433,8 @@ def resize_and_compress_image(
                     save_options = {
                         "format": "JPEG",
                         "quality": optimized_quality,
-                        "optimize": True,
-                        "progressive": True,
+                        "optimize": codec.jpeg_optimize,
+                        "progressive": codec.jpeg_progressive,
                     }
                     # EXIF情報を保持する場合
                     if (
@@ -1231,8 +1444,8 @@ def resize_and_compress_image(
                     ):
                         save_options["exif"] = img.info["exif"]
 
-                    # JPEGはRGBモードである必要がある
-                    if save_img.mode != "RGB":
+                    # JPEGはRGB（またはグレースケール）モードである必要がある
+                    if save_img.mode not in ("RGB", "L"):
                         logger.debug(f"画像をRGBモードに変換中 (元: {save_img.mode})")
                         save_img = save_img.convert("RGB")
 
@@ -1243,10 +1456,13 @@ def resize_and_compress_image(
                     )
                     # PNGの圧縮レベル (0-9, 9が最高圧縮)。品質とは直接関係ない。
                     # 一旦固定値 (6) を使うか、バランスから簡易的に計算？ -> 固定値6 (Pillowのデフォルトより少し高め) にする
-                    compress_level = 6
+                    compress_level = codec.png_compress_level if codec.png_compress_level is not None else 6
+                    save_img, palette = quantize_for_png(save_img, png_palette, dither=png_dither)
+                    if palette:
+                        logger.debug(f"PNG8 ({palette}) で保存: {len(save_img.getpalette() or []) // 3} 色")
                     save_options = {
                         "format": "PNG",
-                        "optimize": True,
+                        "optimize": codec.png_optimize,
                         "compress_level": compress_level,
                     }
                     # EXIFはPNG標準では保存されないことが多いが、念のため試みる (Pillow次第)
@@ -1267,7 +1483,7 @@ def resize_and_compress_image(
                         "format": "WEBP",
                         "quality": optimized_quality,
                         "lossless": webp_lossless,
-                        "method": 6,  # 高品質な圧縮方法
+                        "method": codec.webp_method(6),  # smallest では高品質な圧縮方法
                     }
                     # EXIF情報を保持する場合
                     if (
@@ -1296,65 +1512,24 @@ def resize_and_compress_image(
                     logger.error(f"未対応の出力形式です: {actual_output_format}")
                     return False, False, estimated_size  # エラーとして返す
 
-                # アトミック書き込みの実装（一時ファイル → リネーム）
-                import tempfile
-                import uuid
-                import shutil
-
-                # 一時ファイルパスを生成（出力先と同一ボリューム上に作成）
-                temp_dir = dest_dir if dest_dir.exists() else tempfile.gettempdir()
-                temp_filename = f"resize_temp_{uuid.uuid4().hex}{output_ext}"
-                temp_path = temp_dir / temp_filename
-                temp_path_str = str(temp_path)
+                # 耐久性ポリシーに従って書き込む（fast: 直接 / atomic: 一時ファイル→置換 / durable: +fsync）
+                def write_output(path):
+                    logger.debug(f"画像を書き込み: {path}, オプション: {save_options}")
+                    save_img.save(str(path), **save_options)
 
-                # 画像を一時ファイルに保存
-                def save_image_to_temp():
-                    logger.debug(
-                        f"一時ファイルに保存: {temp_path_str}, オプション: {save_options}"
-                    )
-                    save_img.save(temp_path_str, **save_options)
-                    return True
-
-                # 一時ファイルを最終出力先にリネーム
-                def rename_to_final():
-                    logger.debug(
-                        f"一時ファイルを最終出力先に移動: {temp_path_str} → {final_dest_path_str}"
-                    )
-                    shutil.move(temp_path_str, final_dest_path_str)
+                def save_with_policy():
+                    write_with_durability(Path(final_dest_path_str), write_output, durability)
                     return True
 
                 try:
-                    # 一時ファイルに保存
                     logger.info(f"画像を保存中: フォーマット={actual_output_format}, パス={final_dest_path_str}")
-                    success = retry_on_file_error(
-                        save_image_to_temp, max_retries=3, retry_delay=0.5
-                    )
-                    if not success:
-                        raise OSError(
-                            f"一時ファイルへの保存に失敗しました: {temp_path_str}"
-                        )
-
-                    # 最終出力先にリネーム
-                    success = retry_on_file_error(
-                        rename_to_final, max_retries=3, retry_delay=0.5
-                    )
-                    if not success:
-                        raise OSError(
-                            f"最終出力先へのリネームに失敗しました: {final_dest_path_str}"
-                        )
-
-                    logger.info(f"保存完了（アトミック操作）: {final_dest_path_str}")
+                    retry_on_file_error(save_with_policy, max_retries=3, retry_delay=0.5)
+                    logger.info(f"保存完了（{normalize_durability(durability)}）: {final_dest_path_str}")
                 except Exception as e:
                     logger.error(f"画像保存エラー ({final_dest_path_str}): {e}")
-                    # 一時ファイルの削除を試みる
-                    try:
-                        if temp_path.exists():
-                            temp_path.unlink()
-                    except Exception as cleanup_error:
-                        logger.debug(
-                            f"一時ファイルのクリーンアップに失敗: {cleanup_error}"
-                        )
                     return False, False, estimated_size
+                if passthrough_stats is not None:
+                    passthrough_stats.record_encoded()
 
                 if is_mpo_input:
                     logger.info(
@@ -1469,6 +1644,116 @@ def format_file_size(size_in_bytes):
     return f"{size_in_bytes:.1f} {unit}"
 
 
+def _resize_for_memory(source_image, resize_mode, resize_value, lanczos_filter=True):
+    """メモリ処理用のリサイズ。リサイズ不要なら元画像をそのまま返す。"""
+    img = source_image
+    original_width, original_height = source_image.size
+
+    # リサイズ処理
+    if resize_mode != "none":
+        new_size = None
+
+        if resize_mode == "width":
+            ratio = original_height / original_width
+            new_height = int(resize_value * ratio)
+            new_size = (resize_value, new_height)
+        elif resize_mode == "height":
+            ratio = original_width / original_height
+            new_width = int(resize_value * ratio)
+            new_size = (new_width, resize_value)
+        elif resize_mode == "longest_side":
+            if original_width > original_height:
+                ratio = original_height / original_width
+                new_size = (resize_value, int(resize_value * ratio))
+            else:
+                ratio = original_width / original_height
+                new_size = (int(resize_value * ratio), resize_value)
+        elif resize_mode == "percentage":
+            scale = resize_value / 100.0
+            new_size = (int(original_width * scale), int(original_height * scale))
+
+        if new_size:
+            filter_type = Image.LANCZOS if lanczos_filter else Image.BICUBIC
+            img = img.resize(new_size, filter_type)
+
+    return img
+
+
+def _prepare_memory_save(
+    img,
+    source_image,
+    *,
+    output_format: str,
+    quality: int,
+    exif_handling: str,
+    progressive: bool,
+    optimize: bool,
+    webp_lossless: bool,
+) -> tuple[Any, dict[str, Any]]:
+    """出力形式に合わせて保存用画像と保存オプションを作る。
+
+    Raises:
+        ValueError: 未対応の出力形式の場合
+    """
+    # 出力フォーマットの正規化
+    output_format = output_format.lower()
+    if output_format == "jpg":
+        output_format = "jpeg"
+
+    # 保存オプションの設定
+    save_options = {}
+
+    if output_format == "jpeg":
+        save_options["format"] = "JPEG"
+        save_options["quality"] = quality
+        save_options["optimize"] = optimize
+        save_options["progressive"] = progressive
+
+        # EXIF処理
+        if exif_handling == "keep" and hasattr(source_image, "info") and "exif" in source_image.info:
+            save_options["exif"] = source_image.info["exif"]
+
+        # JPEGはRGBモードが必要
+        if img.mode not in ("RGB", "L"):
+            if img.mode == "RGBA":
+                # 透明度がある場合は白背景で合成
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[3])
+                img = background
+            else:
+                img = img.convert("RGB")
+
+    elif output_format == "png":
+        save_options["format"] = "PNG"
+        save_options["optimize"] = optimize
+        save_options["compress_level"] = 6
+
+        # PNGはEXIFをサポートしない場合が多い
+        if exif_handling == "keep" and hasattr(source_image, "info"):
+            # PNGメタデータとして保存を試みる
+            for key in ["exif", "dpi", "icc_profile"]:
+                if key in source_image.info:
+                    save_options[key] = source_image.info[key]
+
+    elif output_format == "webp":
+        save_options["format"] = "WEBP"
+        save_options["quality"] = quality
+        save_options["lossless"] = webp_lossless
+        save_options["method"] = 6
+
+        # EXIF処理
+        if exif_handling == "keep" and hasattr(source_image, "info") and "exif" in source_image.info:
+            save_options["exif"] = source_image.info["exif"]
+
+        # WebPはRGBAをサポート
+        if not webp_lossless and img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGB")
+    else:
+        raise ValueError(f"サポートされていない出力フォーマット: {output_format}")
+
+    return img, save_options
+
+
 def resize_and_compress_image_memory(
     source_image=None,
     output_buffer=None,
@@ -1517,92 +1802,21 @@ def resize_and_compress_image_memory(
             if resize_value is None or resize_value <= 0:
                 return False, f"無効なリサイズ値: {resize_value} (resize_mode={resize_mode})"
 
-        # 画像のコピーを作成（元の画像を変更しないため）
-        img = source_image.copy()
-        original_width, original_height = img.size
-
-        # リサイズ処理
-        if resize_mode != "none":
-            new_size = None
-
-            if resize_mode == "width":
-                ratio = original_height / original_width
-                new_height = int(resize_value * ratio)
-                new_size = (resize_value, new_height)
-            elif resize_mode == "height":
-                ratio = original_width / original_height
-                new_width = int(resize_value * ratio)
-                new_size = (new_width, resize_value)
-            elif resize_mode == "longest_side":
-                if original_width > original_height:
-                    ratio = original_height / original_width
-                    new_size = (resize_value, int(resize_value * ratio))
-                else:
-                    ratio = original_width / original_height
-                    new_size = (int(resize_value * ratio), resize_value)
-            elif resize_mode == "percentage":
-                scale = resize_value / 100.0
-                new_size = (int(original_width * scale), int(original_height * scale))
-
-            if new_size:
-                filter_type = Image.LANCZOS if lanczos_filter else Image.BICUBIC
-                img = img.resize(new_size, filter_type)
-
-        # 出力フォーマットの正規化
-        output_format = output_format.lower()
-        if output_format == "jpg":
-            output_format = "jpeg"
-
-        # 保存オプションの設定
-        save_options = {}
-
-        if output_format == "jpeg":
-            save_options["format"] = "JPEG"
-            save_options["quality"] = quality
-            save_options["optimize"] = optimize
-            save_options["progressive"] = progressive
-
-            # EXIF処理
-            if exif_handling == "keep" and hasattr(source_image, "info") and "exif" in source_image.info:
-                save_options["exif"] = source_image.info["exif"]
-
-            # JPEGはRGBモードが必要
-            if img.mode not in ("RGB", "L"):
-                if img.mode == "RGBA":
-                    # 透明度がある場合は白背景で合成
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                else:
-                    img = img.convert("RGB")
-
-        elif output_format == "png":
-            save_options["format"] = "PNG"
-            save_options["optimize"] = optimize
-            save_options["compress_level"] = 6
-
-            # PNGはEXIFをサポートしない場合が多い
-            if exif_handling == "keep" and hasattr(source_image, "info"):
-                # PNGメタデータとして保存を試みる
-                for key in ["exif", "dpi", "icc_profile"]:
-                    if key in source_image.info:
-                        save_options[key] = source_image.info[key]
-
-        elif output_format == "webp":
-            save_options["format"] = "WEBP"
-            save_options["quality"] = quality
-            save_options["lossless"] = webp_lossless
-            save_options["method"] = 6
-
-            # EXIF処理
-            if exif_handling == "keep" and hasattr(source_image, "info") and "exif" in source_image.info:
-                save_options["exif"] = source_image.info["exif"]
-
-            # WebPはRGBAをサポート
-            if not webp_lossless and img.mode not in ("RGB", "RGBA", "L"):
-                img = img.convert("RGB")
-        else:
-            return False, f"サポートされていない出力フォーマット: {output_format}"
+        # 元画像は変更しないため防御的コピーは不要（リサイズ・変換は新しい画像を返す）
+        img = _resize_for_memory(source_image, resize_mode, resize_value, lanczos_filter)
+        try:
+            img, save_options = _prepare_memory_save(
+                img,
+                source_image,
+                output_format=output_format,
+                quality=quality,
+                exif_handling=exif_handling,
+                progressive=progressive,
+                optimize=optimize,
+                webp_lossless=webp_lossless,
+            )
+        except ValueError as e:
+            return False, str(e)
 
         # バッファに保存
         output_buffer.seek(0)
@@ -1617,6 +1831,179 @@ def resize_and_compress_image_memory(
         return False, error_msg
 
 
+class _BufferReader(io.RawIOBase):
+    """bytes/memoryview/mmap を複製せずに読み出すファイル風オブジェクト。"""
+
+    def __init__(self, data) -> None:
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = len(self._view) - self._pos
+        size = min(len(buffer), max(0, remaining))
+        buffer[:size] = self._view[self._pos : self._pos + size]
+        self._pos += size
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        # RawIOBase.read は要求サイズ分のバッファを先に確保するため、残量分だけ切り出す
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        chunk = bytes(self._view[self._pos : end])
+        self._pos = max(self._pos, end)
+        return chunk
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if self._pos < 0:
+            self._pos = 0
+            raise ValueError("negative seek position")
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+class _BufferWriter(io.RawIOBase):
+    """呼び出し側が用意した書き込み可能バッファへ直接エンコード結果を書き込む。"""
+
+    def __init__(self, target) -> None:
+        super().__init__()
+        self._view = memoryview(target).cast("B")
+        if self._view.readonly:
+            raise ValueError("出力バッファが読み取り専用です")
+        self._pos = 0
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = memoryview(data).cast("B")
+        end = self._pos + len(chunk)
+        if end > len(self._view):
+            raise ValueError(f"出力バッファが不足しています（必要: {end} バイト以上, 確保: {len(self._view)} バイト）")
+        self._view[self._pos : end] = chunk
+        self._pos = end
+        self.size = max(self.size, end)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def result_view(self) -> memoryview:
+        return self._view[: self.size]
+
+
+def resize_and_compress_bytes(
+    data,
+    *,
+    output=None,
+    resize_mode: str = "width",
+    resize_value: Optional[int] = None,
+    quality: int = 85,
+    output_format: str = "jpeg",
+    exif_handling: str = "keep",
+    lanczos_filter: bool = True,
+    progressive: bool = False,
+    optimize: bool = False,
+    webp_lossless: bool = False,
+) -> memoryview:
+    """バイト列を受け取り、エンコード済みデータの memoryview を返す。
+
+    `resize_and_compress_image_memory` と同じ処理を、入出力の複製なしで行う。
+
+    Args:
+        data: 入力画像。bytes / bytearray / memoryview / mmap、またはファイルパス
+            （パスの場合は mmap で読み込む）
+        output: 書き込み先の書き込み可能バッファ（bytearray / mmap など）。
+            None の場合は内部の BytesIO に書き込み、`getbuffer()` のビューを返す。
+        その他: `resize_and_compress_image_memory` と同じ
+
+    Returns:
+        memoryview: エンコード結果（`output` 指定時はその先頭部分のビュー）
+
+    Raises:
+        ValueError: 引数が不正、出力バッファ不足、または未対応形式の場合
+        OSError: 入力を画像として読み込めない場合
+    """
+    if resize_mode != "none" and (resize_value is None or resize_value <= 0):
+        raise ValueError(f"無効なリサイズ値: {resize_value} (resize_mode={resize_mode})")
+
+    if isinstance(data, (str, os.PathLike)):
+        with open(data, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return resize_and_compress_bytes(
+                    mapped,
+                    output=output,
+                    resize_mode=resize_mode,
+                    resize_value=resize_value,
+                    quality=quality,
+                    output_format=output_format,
+                    exif_handling=exif_handling,
+                    lanczos_filter=lanczos_filter,
+                    progressive=progressive,
+                    optimize=optimize,
+                    webp_lossless=webp_lossless,
+                )
+
+    with _BufferReader(data) as reader, Image.open(reader) as source_image:
+        source_image.load()
+        img = _resize_for_memory(source_image, resize_mode, resize_value, lanczos_filter)
+        img, save_options = _prepare_memory_save(
+            img,
+            source_image,
+            output_format=output_format,
+            quality=quality,
+            exif_handling=exif_handling,
+            progressive=progressive,
+            optimize=optimize,
+            webp_lossless=webp_lossless,
+        )
+        if output is None:
+            buffer = io.BytesIO()
+            img.save(buffer, **save_options)
+            return buffer.getbuffer()
+
+        writer = _BufferWriter(output)
+        img.save(writer, **save_options)
+        return writer.result_view()
+
+
 def save_progress(processed_files, remaining_files, output_file="progress.json"):
     """
     処理の進捗状況を保存します
@@ -1692,6 +2079,36 @@ def _discover_cli_image_paths(
     return sorted(found, key=lambda p: str(p).lower())
 
 
+def _prefilter_cli_image_paths(
+    image_paths: list[Path],
+    *,
+    min_width: int,
+    larger_than: Optional[int],
+    stats: ProbeStats,
+) -> list[Path]:
+    """ヘッダーだけを読み、幅の条件に合わない画像をデコード前に除外する。
+
+    幅は CLI のリサイズ判定と同じく EXIF Orientation 適用前の画素幅で判定する。
+    ヘッダーを読めないファイルは除外せず、通常処理でエラーとして報告させる。
+    """
+    kept = []
+    for path, header in probe_headers(image_paths, stats):
+        if header is None:
+            kept.append(path)
+            continue
+        width = header.size[0]
+        if width < min_width:
+            stats.skipped_min_width += 1
+            logger.debug(f"--min-width 未満のため除外: {path.name} ({width}px)")
+            continue
+        if larger_than is not None and width <= larger_than:
+            stats.skipped_not_larger += 1
+            logger.debug(f"縮小不要のため除外: {path.name} ({width}px)")
+            continue
+        kept.append(path)
+    return kept
+
+
 def _write_failures_file(
     output_path: Path,
     *,
@@ -1739,6 +2156,67 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         default="",
         help="失敗一覧をJSON保存するパス（未指定時は保存しない）",
     )
+    p.add_argument(
+        "--renditions",
+        default="",
+        help="複数幅を1回のデコードで出力する（例: 320,640,1280,2560。指定時は --width を無視）",
+    )
+    p.add_argument(
+        "--rendition-formats",
+        default="webp,jpeg",
+        help="--renditions 指定時の出力形式のカンマ区切り指定",
+    )
+    p.add_argument(
+        "--dedup",
+        action="store_true",
+        help="内容が同一の入力は1回だけ変換し、残りはハードリンク/reflink/コピーで出力する",
+    )
+    p.add_argument(
+        "--durability",
+        choices=list(DURABILITY_MODES),
+        default=DEFAULT_DURABILITY,
+        help="書き込み方式（fast: 直接書き込み / atomic: 一時ファイル→置換 / durable: fsync付き）",
+    )
+    p.add_argument(
+        "--passthrough",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="リサイズ不要で形式が同じ入力は再エンコードせずコピーする（-q の画質は適用されない。既定は常に再エンコード）",
+    )
+    p.add_argument(
+        "--encoder-profile",
+        choices=list(ENCODER_PROFILES),
+        default=DEFAULT_ENCODER_PROFILE,
+        help="エンコード速度プロファイル（fastest: 最速 / balanced: 速度とサイズの両立 / smallest: 最小サイズ）",
+    )
+    p.add_argument(
+        "--png-palette",
+        choices=list(PNG_PALETTE_MODES),
+        default=DEFAULT_PNG_PALETTE,
+        help="PNG8（256色パレット）で保存するか（auto: 画質を変えずに収まる場合のみ / always: 減色してでも / off）",
+    )
+    p.add_argument(
+        "--png-dither",
+        action="store_true",
+        help="--png-palette always で減色する際に誤差拡散ディザを使う（階調の再現は良くなるが、ファイルは大きくなりやすい）",
+    )
+    p.add_argument(
+        "--min-width",
+        type=int,
+        default=0,
+        help="幅がこの値未満の画像を処理しない（ヘッダーのみ読んで判定、0で無効）",
+    )
+    p.add_argument(
+        "--only-larger-than",
+        action="store_true",
+        help="幅が --width（--renditions 指定時は最大幅）より大きい画像だけを処理する",
+    )
+    p.add_argument(
+        "--retry-budget",
+        type=int,
+        default=DEFAULT_RETRY_BUDGET,
+        help="実行全体で許可する一時エラーの再試行回数の上限（負の値で無制限）",
+    )
     p.add_argument("--dry-run", action="store_true", help="ファイルを出力せずに処理をシミュレート")
     p.add_argument("--json", action="store_true", help="実行結果サマリをJSONで標準出力に出力")
     p.add_argument("--verbose", "-v", action="count", default=0, help="詳細ログを増やす (重ね掛け可)")
@@ -1763,6 +2241,18 @@ def _build_cli_summary(
     failed_files: Optional[list[dict[str, str]]] = None,
     failures_file: str = "",
     message: str = "",
+    renditions: Optional[list[int]] = None,
+    rendition_formats: Optional[list[str]] = None,
+    dedup: Optional[dict[str, Any]] = None,
+    durability: str = DEFAULT_DURABILITY,
+    retries: Optional[dict[str, Any]] = None,
+    passthrough: Optional[dict[str, Any]] = None,
+    min_width: int = 0,
+    only_larger_than: bool = False,
+    probe: Optional[dict[str, Any]] = None,
+    png_palette: str = DEFAULT_PNG_PALETTE,
+    png_dither: bool = False,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
 ) -> dict[str, Any]:
     return {
         "status": status,
@@ -1779,10 +2269,22 @@ def _build_cli_summary(
             "quality": quality,
             "recursive": recursive,
             "extensions": list(extensions),
+            "renditions": list(renditions or []),
+            "rendition_formats": list(rendition_formats or []) if renditions else [],
+            "durability": durability,
+            "min_width": min_width,
+            "only_larger_than": only_larger_than,
+            "png_palette": png_palette,
+            "png_dither": png_dither,
+            "encoder_profile": encoder_profile,
         },
         "elapsed_seconds": round(max(0.0, elapsed_seconds), 3),
         "failed_files": failed_files or [],
         "failures_file": failures_file,
+        "dedup": dict(dedup or {}),
+        "retries": dict(retries or {}),
+        "passthrough": dict(passthrough or {}),
+        "probe": dict(probe or {}),
     }
 
 
@@ -1803,6 +2305,44 @@ def _interpret_resize_result(result: Any) -> tuple[bool, str]:
     return False, "不正な処理結果が返されました"
 
 
+def _run_cli_renditions(
+    img_path: Path,
+    dst_path: Path,
+    *,
+    widths: tuple[int, ...],
+    formats: tuple[str, ...],
+    quality: int,
+    dry_run: bool,
+    durability: str = DEFAULT_DURABILITY,
+    png_palette: str = DEFAULT_PNG_PALETTE,
+    png_dither: bool = False,
+    encoder_profile: str = DEFAULT_ENCODER_PROFILE,
+) -> tuple[bool, str]:
+    """1回のデコードで複数サイズ・複数形式を出力する（--renditions）。"""
+    with Image.open(img_path) as image:
+        image.load()
+        result = render_renditions(
+            image,
+            dst_path,
+            widths=widths,
+            formats=formats,  # type: ignore[arg-type]
+            save_options=SaveOptions(
+                output_format=formats[0],  # type: ignore[arg-type]
+                quality=quality,
+                dry_run=dry_run,
+                durability=normalize_durability(durability),
+                png_palette=png_palette,  # type: ignore[arg-type]
+                png_dither=png_dither,
+                encoder_profile=encoder_profile,  # type: ignore[arg-type]
+            ),
+            source_name=img_path.name,
+            orientation=read_orientation(image),
+        )
+    if result.success:
+        return True, ""
+    return False, result.first_error
+
+
 def main() -> None:  # noqa: D401
     """CLI を実行列に登録されています"""
 
@@ -1850,6 +2390,38 @@ def main() -> None:  # noqa: D401
             )
         sys.exit(1)
 
+    rendition_widths: tuple[int, ...] = ()
+    rendition_formats: tuple[str, ...] = ()
+    try:
+        if str(args.renditions).strip():
+            rendition_widths = parse_rendition_widths(args.renditions)
+            rendition_formats = parse_rendition_formats(args.rendition_formats)
+    except ValueError as e:
+        message = f"renditions 指定が無効です: {e}"
+        logger.error(message)
+        if args.json:
+            _emit_cli_summary_json(
+                _build_cli_summary(
+                    status="error",
+                    source=src_dir,
+                    dest=dst_dir,
+                    total_files=0,
+                    processed_count=0,
+                    failed_count=0,
+                    dry_run=bool(args.dry_run),
+                    output_format=str(args.format),
+                    width=int(args.width),
+                    quality=int(args.quality),
+                    recursive=bool(args.recursive),
+                    extensions=extensions,
+                    elapsed_seconds=time.perf_counter() - start_time,
+                    failed_files=[],
+                    failures_file=str(failures_file_path) if failures_file_path else "",
+                    message=message,
+                )
+            )
+        sys.exit(1)
+
     if not src_dir.exists() or not src_dir.is_dir():
         message = f"入力ディレクトリが存在しません: {src_dir}"
         logger.error(message)
@@ -1882,8 +2454,27 @@ def main() -> None:  # noqa: D401
         recursive=bool(args.recursive),
         extensions=extensions,
     )
+    probe_stats: Optional[ProbeStats] = None
+    discovered_count = len(image_paths)
+    if image_paths and (args.min_width > 0 or args.only_larger_than):
+        probe_stats = ProbeStats()
+        larger_than: Optional[int] = None
+        if args.only_larger_than:
+            larger_than = max(rendition_widths) if rendition_widths else args.width
+        image_paths = _prefilter_cli_image_paths(
+            image_paths,
+            min_width=args.min_width,
+            larger_than=larger_than,
+            stats=probe_stats,
+        )
+        skipped = discovered_count - len(image_paths)
+        if skipped:
+            logger.info(
+                f"ヘッダー判定で {skipped} 件を除外しました"
+                f"（{probe_stats.probed_count + probe_stats.failed_count} 件を {probe_stats.elapsed_seconds:.3f} 秒で判定）"
+            )
     if not image_paths:
-        message = "画像が見つかりませんでした"
+        message = "条件に一致する画像がありません" if discovered_count else "画像が見つかりませんでした"
         logger.warning(message)
         if args.json:
             _emit_cli_summary_json(
@@ -1904,46 +2495,127 @@ def main() -> None:  # noqa: D401
                     failed_files=[],
                     failures_file=str(failures_file_path) if failures_file_path else "",
                     message=message,
+                    min_width=int(args.min_width),
+                    only_larger_than=bool(args.only_larger_than),
+                    probe=probe_stats.as_dict() if probe_stats is not None else None,
                 )
             )
         sys.exit(0)
 
+    dedup_index: Optional[DedupIndex] = None
+    dedup_stats: Optional[DedupStats] = None
+    if args.dedup:
+        if rendition_widths:
+            logger.warning("--dedup は --renditions と併用できないため無効にします")
+        else:
+            dedup_index = DedupIndex()
+            dedup_stats = DedupStats()
+    passthrough_stats = PassthroughStats()
+    dedup_settings_key = (args.width, args.quality, args.format, args.png_palette, args.png_dither, args.encoder_profile)
+    output_ext = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}[args.format]
+
+    # 出力先パスを一括で計画し、出力ディレクトリは処理開始前に1回ずつ作成する
+    path_plan = plan_destination_paths(image_paths, src_dir, dst_dir)
+    path_plan.create_directories()
+
     processed, remaining = [], []
     failed_files: list[dict[str, str]] = []
-    for img_path in image_paths:
-        dst_path = get_destination_path(img_path, src_dir, dst_dir)
-        try:
-            result = resize_and_compress_image(
-                source_path=img_path,
-                dest_path=dst_path,
-                target_width=args.width,
-                quality=args.quality,
-                format=args.format,
-                dry_run=args.dry_run,
-            )
-            success, error_detail = _interpret_resize_result(result)
-            if success:
-                processed.append(img_path)
-                logger.info(f"成功: {img_path.name} → {dst_path.name}")
+    retry_budget = RetryBudget(max_retries=args.retry_budget if args.retry_budget >= 0 else None)
+    with retry_run(retry_budget) as retry:
+        for planned in path_plan.entries:
+            img_path, dst_path = planned.source, planned.dest
+            directory_error = path_plan.directory_error(dst_path)
+            if directory_error is not None:
+                error_detail = f"出力先ディレクトリを作成できませんでした: {dst_path.parent} ({directory_error})"
+                logger.error(f"失敗: {img_path.name}: {error_detail}")
+                remaining.append(img_path)
+                failed_files.append({"file": str(img_path), "error": error_detail})
                 continue
-            logger.error(f"失敗: {img_path.name}: {error_detail}")
-            remaining.append(img_path)
-            failed_files.append(
-                {
-                    "file": str(img_path),
-                    "error": error_detail,
-                }
-            )
-        except Exception as e:
-            error_detail = get_japanese_error_message(e)
-            logger.error(f"失敗: {img_path.name}: {error_detail}")
-            remaining.append(img_path)
-            failed_files.append(
-                {
-                    "file": str(img_path),
-                    "error": error_detail,
-                }
-            )
+            try:
+                digest: Optional[str] = None
+                source_bytes: Optional[bytes] = None
+                if dedup_index is not None and dedup_stats is not None:
+                    # ハッシュ計算で読んだバイト列をそのままデコードに使い、入力の読み込みを1回にする
+                    source_bytes, digest = read_and_hash_file(img_path)
+                    first_output = dedup_index.lookup(digest, dedup_settings_key)
+                    if first_output is not None:
+                        final_path = Path(update_extension(dst_path, output_ext))
+                        method = (
+                            "dry_run"
+                            if args.dry_run
+                            else materialize_duplicate(first_output, final_path, durability=args.durability)
+                        )
+                        dedup_stats.record_duplicate(method)
+                        processed.append(img_path)
+                        logger.info(f"重複のため再変換を省略: {img_path.name} → {final_path.name} ({method})")
+                        continue
+
+                if rendition_widths:
+                    success, error_detail = _run_cli_renditions(
+                        img_path,
+                        dst_path,
+                        widths=rendition_widths,
+                        formats=rendition_formats,
+                        quality=args.quality,
+                        dry_run=args.dry_run,
+                        durability=args.durability,
+                        png_palette=args.png_palette,
+                        png_dither=args.png_dither,
+                        encoder_profile=args.encoder_profile,
+                    )
+                    if success:
+                        processed.append(img_path)
+                        logger.info(f"成功: {img_path.name} → {len(rendition_widths)}サイズ x {len(rendition_formats)}形式")
+                        continue
+                    logger.error(f"失敗: {img_path.name}: {error_detail}")
+                    remaining.append(img_path)
+                    failed_files.append({"file": str(img_path), "error": error_detail})
+                    continue
+
+                result = resize_and_compress_image(
+                    source_path=img_path,
+                    dest_path=dst_path,
+                    target_width=args.width,
+                    quality=args.quality,
+                    format=args.format,
+                    dry_run=args.dry_run,
+                    durability=args.durability,
+                    prepared_paths=True,
+                    passthrough=args.passthrough,
+                    passthrough_stats=passthrough_stats,
+                    png_palette=args.png_palette,
+                    png_dither=args.png_dither,
+                    encoder_profile=args.encoder_profile,
+                    source_bytes=source_bytes,
+                )
+                success, error_detail = _interpret_resize_result(result)
+                if success:
+                    if digest is not None and dedup_index is not None and dedup_stats is not None:
+                        dedup_index.register(digest, dedup_settings_key, Path(update_extension(dst_path, output_ext)))
+                        dedup_stats.record_unique()
+                    processed.append(img_path)
+                    logger.info(f"成功: {img_path.name} → {dst_path.name}")
+                    continue
+                logger.error(f"失敗: {img_path.name}: {error_detail}")
+                remaining.append(img_path)
+                failed_files.append(
+                    {
+                        "file": str(img_path),
+                        "error": error_detail,
+                    }
+                )
+            except Exception as e:
+                error_detail = get_japanese_error_message(e)
+                logger.error(f"失敗: {img_path.name}: {error_detail}")
+                remaining.append(img_path)
+                failed_files.append(
+                    {
+                        "file": str(img_path),
+                        "error": error_detail,
+                    }
+                )
+
+    flush_pending_directory_syncs()
 
     message = ""
     if remaining:
@@ -1952,6 +2624,16 @@ def main() -> None:  # noqa: D401
     else:
         message = "すべての画像を処理しました！"
         logger.success(message)
+    if dedup_stats is not None and dedup_stats.encodes_avoided:
+        logger.info(f"重複排除により {dedup_stats.encodes_avoided} 件の変換を省略しました")
+    if passthrough_stats.passthrough_count:
+        logger.info(f"リサイズ不要のため {passthrough_stats.passthrough_count} 件を再エンコードせずコピーしました")
+    retry_summary = retry.stats.as_dict()
+    if retry_summary["retries"]:
+        logger.info(
+            f"一時的なエラーで {retry_summary['retries']} 回再試行しました"
+            f"（回復 {retry_summary['recovered']} 件）"
+        )
 
     if failures_file_path is not None and failed_files:
         try:
@@ -1985,6 +2667,18 @@ def main() -> None:  # noqa: D401
                 failed_files=failed_files,
                 failures_file=str(failures_file_path) if failures_file_path else "",
                 message=message,
+                renditions=list(rendition_widths),
+                rendition_formats=list(rendition_formats),
+                dedup=dedup_stats.as_dict() if dedup_stats is not None else None,
+                durability=args.durability,
+                retries=retry_summary,
+                passthrough=passthrough_stats.as_dict(),
+                min_width=int(args.min_width),
+                only_larger_than=bool(args.only_larger_than),
+                probe=probe_stats.as_dict() if probe_stats is not None else None,
+                png_palette=str(args.png_palette),
+                png_dither=bool(args.png_dither),
+                encoder_profile=str(args.encoder_profile),
             )
         )
 
@@ -0,0 +1,527 @@
+"""ローカルHTTPリサイズサービス。
+
+デコード・リサイズした画像を `image_save_pipeline.encode_image` でエンコードして返す
+（GUI/CLI/バッチAPIと同じエンコーダ設定・時間予算・CPU配分を使う）。
+標準ライブラリの `http.server` のみで構成し、localhost上で完結してテストできる。
+
+エンドポイント:
+    POST /resize   画像バイト列を受け取り、エンコード済みバイト列を返す
+    GET  /metrics  処理件数・拒否件数・処理時間などをJSONで返す
+    GET  /healthz  死活確認
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, replace
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from loguru import logger
+from PIL import Image
+
+from karuku_resizer.batch_api import compute_target_size
+from karuku_resizer.encoder_profiles import DEFAULT_ENCODER_PROFILE, EncoderProfile, normalize_encoder_profile
+from karuku_resizer.image_save_pipeline import (
+    ExifMode,
+    SaveFormat,
+    SaveOptions,
+    encode_image,
+    supported_output_formats,
+)
+from karuku_resizer.latency_budget import EncodeChoice
+from karuku_resizer.orientation import apply_orientation, oriented_size, read_orientation, resize_oriented
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BODY_BYTES = 64 * 1024 * 1024
+DEFAULT_REQUEST_TIMEOUT = 30.0
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_RESIZE_MODES = {"width", "height", "longest_side", "percentage", "none"}
+_OUTPUT_FORMATS = {"jpeg", "jpg", "png", "webp", "avif"}
+_CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+@dataclass(frozen=True)
+class ServeConfig:
+    host: str = DEFAULT_HOST
+    port: int = DEFAULT_PORT
+    max_workers: int = max(1, (os.cpu_count() or 2) - 1)
+    max_pending: int = 8
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT
+    max_body_bytes: int = DEFAULT_MAX_BODY_BYTES
+    # 1リクエストの処理時間の予算（秒）。クエリ `budget` が無いリクエストに適用する（None は無効）
+    latency_budget_seconds: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ResizeParams:
+    resize_mode: str = "width"
+    resize_value: Optional[int] = 1280
+    quality: int = 85
+    output_format: SaveFormat = "jpeg"
+    exif_handling: ExifMode = "keep"
+    webp_lossless: bool = False
+    encoder_profile: EncoderProfile = DEFAULT_ENCODER_PROFILE
+    lanczos_filter: bool = True
+    # デコード・リサイズ後の残り時間を AVIF/WebP のエンコードに割り当てる
+    latency_budget_seconds: Optional[float] = None
+
+
+class ServerMetrics:
+    """リクエスト単位の集計値をスレッドセーフに保持する。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self.requests_total = 0
+        self.requests_ok = 0
+        self.requests_failed = 0
+        self.requests_rejected = 0
+        self.requests_timed_out = 0
+        self.encodes_downgraded = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.inflight = 0
+        self.processing_seconds_total = 0.0
+        self.queue_seconds_total = 0.0
+
+    def begin(self, bytes_in: int) -> None:
+        with self._lock:
+            self.requests_total += 1
+            self.inflight += 1
+            self.bytes_in += bytes_in
+
+    def finish(
+        self,
+        *,
+        ok: bool,
+        bytes_out: int = 0,
+        queue_s: float = 0.0,
+        process_s: float = 0.0,
+        downgraded: bool = False,
+    ) -> None:
+        with self._lock:
+            self.inflight = max(0, self.inflight - 1)
+            if ok:
+                self.requests_ok += 1
+            else:
+                self.requests_failed += 1
+            if downgraded:
+                self.encodes_downgraded += 1
+            self.bytes_out += bytes_out
+            self.queue_seconds_total += queue_s
+            self.processing_seconds_total += process_s
+
+    def reject(self) -> None:
+        with self._lock:
+            self.requests_total += 1
+            self.requests_rejected += 1
+
+    def timeout(self) -> None:
+        with self._lock:
+            self.requests_timed_out += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.requests_ok + self.requests_failed
+            return {
+                "uptime_seconds": round(time.time() - self._started_at, 3),
+                "requests_total": self.requests_total,
+                "requests_ok": self.requests_ok,
+                "requests_failed": self.requests_failed,
+                "requests_rejected": self.requests_rejected,
+                "requests_timed_out": self.requests_timed_out,
+                "encodes_downgraded": self.encodes_downgraded,
+                "inflight": self.inflight,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "processing_seconds_total": round(self.processing_seconds_total, 6),
+                "queue_seconds_total": round(self.queue_seconds_total, 6),
+                "processing_ms_avg": (
+                    round(self.processing_seconds_total / completed * 1000, 3) if completed else 0.0
+                ),
+            }
+
+
+def parse_resize_params(query: Mapping[str, list[str]]) -> ResizeParams:
+    """クエリ文字列からリサイズ/エンコード条件を組み立てる。
+
+    Raises:
+        ValueError: 値が不正な場合
+    """
+
+    def first(name: str, default: str = "") -> str:
+        values = query.get(name)
+        if not values:
+            return default
+        return str(values[0]).strip()
+
+    def as_bool(name: str) -> bool:
+        return first(name, "0").lower() in {"1", "true", "yes", "on"}
+
+    resize_mode = first("mode", "width").lower()
+    if resize_mode not in _RESIZE_MODES:
+        raise ValueError(f"mode が不正です: {resize_mode}")
+
+    resize_value: Optional[int] = None
+    if resize_mode != "none":
+        raw_value = first("value", "1280")
+        try:
+            resize_value = int(raw_value)
+        except ValueError as e:
+            raise ValueError(f"value は整数で指定してください: {raw_value}") from e
+        if resize_value <= 0:
+            raise ValueError(f"value は1以上で指定してください: {resize_value}")
+
+    raw_quality = first("quality", "85")
+    try:
+        quality = int(raw_quality)
+    except ValueError as e:
+        raise ValueError(f"quality は整数で指定してください: {raw_quality}") from e
+    if not 1 <= quality <= 100:
+        raise ValueError(f"quality は1-100で指定してください: {quality}")
+
+    output_format = first("format", "jpeg").lower()
+    if output_format not in _OUTPUT_FORMATS:
+        raise ValueError(f"format が不正です: {output_format}")
+    if output_format == "jpg":
+        output_format = "jpeg"
+    if output_format not in supported_output_formats():
+        raise ValueError(f"この環境では {output_format} を出力できません")
+
+    exif_handling = first("exif", "keep").lower()
+    if exif_handling not in {"keep", "remove"}:
+        raise ValueError(f"exif は keep/remove で指定してください: {exif_handling}")
+
+    raw_profile = first("profile", DEFAULT_ENCODER_PROFILE).lower()
+    encoder_profile = normalize_encoder_profile(raw_profile)
+    if encoder_profile != raw_profile:
+        raise ValueError(f"profile は fastest/balanced/smallest で指定してください: {raw_profile}")
+
+    latency_budget_seconds: Optional[float] = None
+    raw_budget = first("budget")
+    if raw_budget:
+        try:
+            latency_budget_seconds = float(raw_budget)
+        except ValueError as e:
+            raise ValueError(f"budget は秒数で指定してください: {raw_budget}") from e
+        if not latency_budget_seconds > 0:
+            raise ValueError(f"budget は0より大きい秒数で指定してください: {raw_budget}")
+
+    return ResizeParams(
+        resize_mode=resize_mode,
+        resize_value=resize_value,
+        quality=quality,
+        output_format=output_format,  # type: ignore[arg-type]
+        exif_handling=exif_handling,  # type: ignore[arg-type]
+        webp_lossless=as_bool("lossless"),
+        encoder_profile=encoder_profile,
+        lanczos_filter=first("filter", "lanczos").lower() != "bicubic",
+        latency_budget_seconds=latency_budget_seconds,
+    )
+
+
+def process_resize_request(
+    body: bytes, params: ResizeParams
+) -> Tuple[memoryview, Dict[str, float], Optional[EncodeChoice]]:
+    """1リクエスト分のデコード→リサイズ→エンコードを実行する。
+
+    Returns:
+        (エンコード済みデータのビュー, 段階ごとの処理時間[秒], 時間予算で選んだエンコーダ設定 or None)
+
+    Raises:
+        ValueError: 画像として解釈できない、またはエンコードに失敗した場合
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        source_image = Image.open(io.BytesIO(body))
+        source_image.load()
+    except Exception as e:
+        raise ValueError(f"画像を読み込めません: {e}") from e
+    timings["decode"] = time.perf_counter() - started
+
+    encode_started = time.perf_counter()
+    try:
+        # Orientation は縮小後の画像にだけ適用する（目標サイズは回転後の座標系で求める。batch_api と同じ）
+        orientation = read_orientation(source_image)
+        source_size = oriented_size(source_image.size, orientation)
+        target_size = compute_target_size(
+            source_size, params.resize_mode, params.resize_value, allow_upscale=True
+        )
+        if target_size == source_size:
+            resized = apply_orientation(source_image, orientation)
+        else:
+            resample = Image.Resampling.LANCZOS if params.lanczos_filter else Image.Resampling.BICUBIC
+            resized = resize_oriented(source_image, target_size, orientation, resample)
+        latency_budget_seconds = params.latency_budget_seconds
+        if latency_budget_seconds is not None:
+            latency_budget_seconds = max(0.0, latency_budget_seconds - (time.perf_counter() - started))
+        options = SaveOptions(
+            output_format=params.output_format,
+            quality=params.quality,
+            exif_mode=params.exif_handling,
+            webp_lossless=params.webp_lossless,
+            encoder_profile=params.encoder_profile,
+            latency_budget_seconds=latency_budget_seconds,
+        )
+        encoded = encode_image(source_image, resized, options)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"画像処理エラー: {e}") from e
+    finally:
+        source_image.close()
+    timings["encode"] = time.perf_counter() - encode_started
+    return memoryview(encoded.data), timings, encoded.encode_choice
+
+
+class ResizeHTTPServer(ThreadingHTTPServer):
+    """同時実行数を制限したリサイズ用HTTPサーバー。
+
+    受付枠 (`max_workers + max_pending`) を超えたリクエストは、処理キューに積まずに
+    即座に 503 を返してクライアント側へ背圧をかける。
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, config: ServeConfig) -> None:
+        self.config = config
+        self.metrics = ServerMetrics()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, config.max_workers),
+            thread_name_prefix="karuku-serve-worker",
+        )
+        self.admission = threading.BoundedSemaphore(max(1, config.max_workers) + max(0, config.max_pending))
+        super().__init__((config.host, config.port), ResizeRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResizeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "KarukuResize"
+    server: ResizeHTTPServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug("serve: {} - {}", self.address_string(), format % args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.metrics.snapshot())
+            return
+        if path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+            return
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"not found: {path}"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        request_started = time.perf_counter()
+        parts = urlsplit(self.path)
+        if parts.path != "/resize":
+            self._discard_body()
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"not found: {parts.path}"})
+            return
+
+        try:
+            params = parse_resize_params(parse_qs(parts.query))
+        except ValueError as e:
+            self._discard_body()
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        if params.latency_budget_seconds is None and self.server.config.latency_budget_seconds is not None:
+            params = replace(params, latency_budget_seconds=self.server.config.latency_budget_seconds)
+
+        content_length = self._content_length()
+        if content_length is None or content_length <= 0:
+            self._send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length が必要です"}, close=True)
+            return
+        if content_length > self.server.config.max_body_bytes:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "リクエストが大きすぎます"}, close=True)
+            return
+
+        body = self.rfile.read(content_length)
+
+        if not self.server.admission.acquire(blocking=False):
+            self.server.metrics.reject()
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "処理上限に達しています。時間をおいて再試行してください"},
+                extra_headers={"Retry-After": "1"},
+            )
+            return
+
+        self.server.metrics.begin(len(body))
+        submitted_at = time.perf_counter()
+        started_box: Dict[str, float] = {}
+
+        def run() -> Tuple[memoryview, Dict[str, float], Optional[EncodeChoice]]:
+            started_box["started"] = time.perf_counter()
+            return process_resize_request(body, params)
+
+        future: Future[Tuple[memoryview, Dict[str, float], Optional[EncodeChoice]]] = self.server.executor.submit(run)
+        future.add_done_callback(lambda _f: self.server.admission.release())
+        try:
+            payload, timings, encode_choice = future.result(timeout=self.server.config.request_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.server.metrics.timeout()
+            self.server.metrics.finish(ok=False)
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": "処理がタイムアウトしました"})
+            return
+        except ValueError as e:
+            self.server.metrics.finish(ok=False)
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception("serve: 予期せぬエラー")
+            self.server.metrics.finish(ok=False)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+
+        queue_s = started_box.get("started", submitted_at) - submitted_at
+        process_s = timings.get("decode", 0.0) + timings.get("encode", 0.0)
+        total_s = time.perf_counter() - request_started
+        self.server.metrics.finish(
+            ok=True,
+            bytes_out=len(payload),
+            queue_s=queue_s,
+            process_s=process_s,
+            downgraded=encode_choice is not None and encode_choice.downgraded,
+        )
+
+        server_timing = ", ".join(
+            [
+                f"queue;dur={queue_s * 1000:.3f}",
+                f"decode;dur={timings.get('decode', 0.0) * 1000:.3f}",
+                f"encode;dur={timings.get('encode', 0.0) * 1000:.3f}",
+                f"total;dur={total_s * 1000:.3f}",
+            ]
+        )
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", _CONTENT_TYPES.get(params.output_format, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Server-Timing", server_timing)
+        self.send_header("X-Karuku-Elapsed-Ms", f"{total_s * 1000:.3f}")
+        if encode_choice is not None:
+            self.send_header(
+                "X-Karuku-Encoder",
+                f"{encode_choice.parameter}={encode_choice.chosen}; requested={encode_choice.requested}",
+            )
+        self.end_headers()
+        view = memoryview(payload)
+        for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+            self.wfile.write(view[offset : offset + STREAM_CHUNK_BYTES])
+
+    def _content_length(self) -> Optional[int]:
+        raw = self.headers.get("Content-Length")
+        if raw is None:
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            return None
+
+    def _discard_body(self) -> None:
+        length = self._content_length()
+        if length and 0 < length <= self.server.config.max_body_bytes:
+            self.rfile.read(length)
+        elif length:
+            self.close_connection = True
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: Mapping[str, Any],
+        *,
+        extra_headers: Optional[Mapping[str, str]] = None,
+        close: bool = False,
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(config: Optional[ServeConfig] = None) -> ResizeHTTPServer:
+    """設定に従ってサーバーを生成する（まだ待ち受けは開始しない）。"""
+    return ResizeHTTPServer(config or ServeConfig())
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="karukuresize-serve",
+        description="画像リサイズをHTTPで提供するローカルサーバー",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    defaults = ServeConfig()
+    p.add_argument("--host", default=defaults.host, help="待ち受けアドレス")
+    p.add_argument("--port", type=int, default=defaults.port, help="待ち受けポート")
+    p.add_argument("--workers", type=int, default=defaults.max_workers, help="同時処理数")
+    p.add_argument("--max-pending", type=int, default=defaults.max_pending, help="処理待ちの上限（超過時は503）")
+    p.add_argument("--timeout", type=float, default=defaults.request_timeout, help="1リクエストの処理上限(秒)")
+    p.add_argument(
+        "--latency-budget",
+        type=float,
+        default=defaults.latency_budget_seconds,
+        help="1リクエストの処理時間の予算(秒)。AVIF/WebP はこの時間に収まる設定まで速める",
+    )
+    p.add_argument(
+        "--max-body-mb",
+        type=int,
+        default=defaults.max_body_bytes // (1024 * 1024),
+        help="受け付ける画像サイズ上限(MB)",
+    )
+    return p
+
+
+def main() -> None:
+    """`karukuresize-serve` エントリポイント。"""
+    args = _build_arg_parser().parse_args()
+    config = ServeConfig(
+        host=args.host,
+        port=args.port,
+        max_workers=max(1, args.workers),
+        max_pending=max(0, args.max_pending),
+        request_timeout=max(0.1, args.timeout),
+        latency_budget_seconds=args.latency_budget if args.latency_budget and args.latency_budget > 0 else None,
+        max_body_bytes=max(1, args.max_body_mb) * 1024 * 1024,
+    )
+    server = create_server(config)
+    host, port = server.server_address[:2]
+    logger.info("karukuresize-serve: http://{}:{}/ で待ち受けます", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("karukuresize-serve: 停止します")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
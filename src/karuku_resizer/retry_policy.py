@@ -0,0 +1,270 @@
+"""ファイル操作の再試行ポリシー。
+
+一時的なエラー（共有違反・EAGAIN・EBUSY など）のみを再試行し、
+存在しないファイルやパス長超過などは即座に失敗させる。
+待機時間は指数バックオフ＋ジッタで、実行単位の再試行予算（`RetryBudget`）を
+使い切った後は再試行しない。再試行回数は `RetryStats` に集計され、CLI/GUIの
+実行サマリに出力される。
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+# 一時的とみなす errno（ロック・割り込み・タイムアウト）
+TRANSIENT_ERRNOS = frozenset(
+    code
+    for code in (
+        getattr(errno, "EAGAIN", None),
+        getattr(errno, "EWOULDBLOCK", None),
+        getattr(errno, "EBUSY", None),
+        getattr(errno, "EINTR", None),
+        getattr(errno, "ETIMEDOUT", None),
+        getattr(errno, "ETXTBSY", None),
+        getattr(errno, "EDEADLK", None),
+    )
+    if code is not None
+)
+# Windows: 共有違反(32)・ロック違反(33)・ユーザーマップ済みセクション(1224)
+TRANSIENT_WINERRORS = frozenset({32, 33, 1224})
+
+# 再試行しても解決しない例外
+FATAL_EXCEPTIONS = (FileNotFoundError, IsADirectoryError, NotADirectoryError, FileExistsError)
+FATAL_ERRNOS = frozenset(
+    code
+    for code in (
+        getattr(errno, "ENOENT", None),
+        getattr(errno, "ENAMETOOLONG", None),
+        getattr(errno, "EINVAL", None),
+        getattr(errno, "ENOSPC", None),
+        getattr(errno, "EROFS", None),
+        getattr(errno, "EDQUOT", None),
+        getattr(errno, "ELOOP", None),
+    )
+    if code is not None
+)
+
+_TRANSIENT_MESSAGE_TOKENS = (
+    "resource temporarily unavailable",
+    "temporarily unavailable",
+    "used by another process",
+    "used by another",
+    "timed out",
+    "timeout",
+)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """例外が一時的で再試行に値するかを判定する。"""
+    if not isinstance(error, OSError):
+        return False
+    win_error = getattr(error, "winerror", None)
+    if os.name == "nt" and win_error:
+        return int(win_error) in TRANSIENT_WINERRORS
+    if isinstance(error, FATAL_EXCEPTIONS):
+        return False
+    if isinstance(error, (BlockingIOError, InterruptedError, TimeoutError)):
+        return True
+    code = getattr(error, "errno", None)
+    if isinstance(code, int):
+        if code in FATAL_ERRNOS:
+            return False
+        return code in TRANSIENT_ERRNOS
+    return False
+
+
+def is_retryable_save_result(result: Any) -> bool:
+    """`SaveResult` が一時的な失敗かを判定する（例外が残っていない場合の判定用）。"""
+    if getattr(result, "retryable", False):
+        return True
+    if getattr(result, "error_category", None) in {"sharing_violation", "transient"}:
+        return True
+    error_code = getattr(result, "error_code", None)
+    if error_code is not None:
+        transient_codes = TRANSIENT_WINERRORS if os.name == "nt" else TRANSIENT_ERRNOS
+        if error_code in transient_codes:
+            return True
+    text = (getattr(result, "error", None) or "").lower()
+    if not text:
+        return False
+    return any(token in text for token in _TRANSIENT_MESSAGE_TOKENS)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """指数バックオフ＋ジッタの再試行ポリシー。
+
+    `max_attempts` は初回を含む試行回数。待機時間は
+    ``min(max_delay, base_delay * multiplier ** (retry - 1))`` に
+    ``[1 - jitter, 1]`` の乱数係数を掛けたもの。
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.05
+    multiplier: float = 2.0
+    max_delay: float = 1.0
+    jitter: float = 0.5
+
+    def delay_for(self, retry_number: int, rng: Callable[[], float] = random.random) -> float:
+        raw = self.base_delay * (self.multiplier ** max(0, retry_number - 1))
+        capped = min(self.max_delay, max(0.0, raw))
+        jitter = min(1.0, max(0.0, self.jitter))
+        return capped * (1.0 - jitter * rng())
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+# CLI/GUIのバッチ1回あたりの再試行回数の上限
+DEFAULT_RETRY_BUDGET = 100
+
+
+class RetryBudget:
+    """実行単位で共有する再試行予算（回数・累積待機秒数）。None は無制限。"""
+
+    def __init__(self, max_retries: Optional[int] = None, max_sleep_seconds: Optional[float] = None) -> None:
+        self.max_retries = max_retries
+        self.max_sleep_seconds = max_sleep_seconds
+        self._lock = threading.Lock()
+        self.used_retries = 0
+        self.used_sleep_seconds = 0.0
+
+    def try_consume(self, delay: float) -> bool:
+        with self._lock:
+            if self.max_retries is not None and self.used_retries >= self.max_retries:
+                return False
+            if self.max_sleep_seconds is not None and self.used_sleep_seconds + delay > self.max_sleep_seconds:
+                return False
+            self.used_retries += 1
+            self.used_sleep_seconds += delay
+            return True
+
+
+class RetryStats:
+    """再試行の集計（スレッドセーフ）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.recovered = 0
+        self.failed_fatal = 0
+        self.failed_exhausted = 0
+        self.budget_exhausted = 0
+        self.slept_seconds = 0.0
+
+    def _add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.slept_seconds += delay
+
+    def record_recovered(self) -> None:
+        self._add("recovered")
+
+    def record_fatal(self) -> None:
+        self._add("failed_fatal")
+
+    def record_exhausted(self) -> None:
+        self._add("failed_exhausted")
+
+    def record_budget_exhausted(self) -> None:
+        self._add("budget_exhausted")
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "recovered": self.recovered,
+                "failed_fatal": self.failed_fatal,
+                "failed_exhausted": self.failed_exhausted,
+                "budget_exhausted": self.budget_exhausted,
+                "slept_seconds": round(self.slept_seconds, 3),
+            }
+
+
+@dataclass
+class RetryRun:
+    budget: RetryBudget
+    stats: RetryStats
+
+
+_run_lock = threading.Lock()
+_active_run = RetryRun(budget=RetryBudget(), stats=RetryStats())
+
+
+def active_retry_run() -> RetryRun:
+    with _run_lock:
+        return _active_run
+
+
+@contextmanager
+def retry_run(budget: Optional[RetryBudget] = None) -> Iterator[RetryRun]:
+    """CLI/GUIのバッチ1回分の予算と集計を有効にする。
+
+    ワーカースレッドからも参照できるよう、スレッドローカルではなくプロセス全体で切り替える。
+    """
+    global _active_run
+    run = RetryRun(budget=budget or RetryBudget(), stats=RetryStats())
+    with _run_lock:
+        previous = _active_run
+        _active_run = run
+    try:
+        yield run
+    finally:
+        with _run_lock:
+            _active_run = previous
+
+
+def call_with_retry(
+    func: Callable[..., T],
+    *args: Any,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    run: Optional[RetryRun] = None,
+    classify: Callable[[BaseException], bool] = is_retryable_error,
+    sleep: Callable[[float], None] = time.sleep,
+    **kwargs: Any,
+) -> T:
+    """`func` を実行し、一時的なエラーのみポリシーに従って再試行する。
+
+    Raises:
+        再試行対象外のエラー、試行回数超過、予算超過時は最後の例外を再送出
+    """
+    current = run or active_retry_run()
+    attempt = 1
+    while True:
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            if not classify(e):
+                if isinstance(e, OSError):
+                    current.stats.record_fatal()
+                raise
+            if attempt >= policy.max_attempts:
+                current.stats.record_exhausted()
+                logger.error(f"最大リトライ回数到達: {e}")
+                raise
+            delay = policy.delay_for(attempt)
+            if not current.budget.try_consume(delay):
+                current.stats.record_budget_exhausted()
+                logger.warning(f"リトライ予算を使い切ったため再試行しません: {e}")
+                raise
+            current.stats.record_retry(delay)
+            logger.debug(f"一時的なファイル操作エラー: {e} - リトライ {attempt}/{policy.max_attempts - 1}")
+            sleep(delay)
+            attempt += 1
+            continue
+        if attempt > 1:
+            current.stats.record_recovered()
+        return result
@@ -13,7 +13,11 @@ from PIL import Image
 from tkinter import messagebox
 
 from karuku_resizer.ui_file_load_helpers import (
+    DEFAULT_BATCH_MAX_ITEMS,
+    DecodedImageStore,
+    EncodedSource,
     load_paths_worker,
+    resolve_source_decoder,
     scan_and_load_drop_items_worker,
     scan_and_load_images_worker,
 )
@@ -24,6 +28,13 @@ from karuku_resizer.ui_text_presenter import (
     build_format_duration,
 )
 
+# Poll interval adapts to backlog: fast while results are waiting, backing off when idle.
+FILE_LOAD_POLL_BUSY_MS = 4
+FILE_LOAD_POLL_FRAME_MS = 16
+FILE_LOAD_POLL_IDLE_MAX_MS = 100
+# Time budget for handling queue messages per poll, leaving the rest of the frame to Tk.
+FILE_LOAD_POLL_BUDGET_SECONDS = 0.008
+
 
 def begin_file_load_session(
     app: Any,
@@ -41,9 +52,17 @@ def begin_file_load_session(
 
     app._is_loading_files = True
     app._file_load_cancel_event = threading.Event()
-    app._file_load_queue = queue.Queue(maxsize=8)
+    # Messages are small (handles + metadata); decoded images are bounded by the store.
+    app._file_load_queue = queue.Queue()
+    app._file_load_image_store = DecodedImageStore()
     app._file_load_after_id = None
+    app._file_load_poll_ms = FILE_LOAD_POLL_FRAME_MS
+    app._file_load_progress_dirty = False
+    app._file_load_last_path_text = ""
+    app._file_load_last_failed = False
     app._file_load_total_candidates = 0
+    app._file_load_detected_count = 0
+    app._file_load_sorted_insert = False
     app._file_load_loaded_count = 0
     app._file_load_failed_details = []
     app._file_load_failed_paths = []
@@ -64,6 +83,15 @@ def begin_file_load_session(
     app._refresh_status_indicators()
 
 
+def _worker_delivery_kwargs(app: Any) -> Dict[str, Any]:
+    residency = str(getattr(app, "settings", {}).get("source_residency", "decoded"))
+    return {
+        "image_store": app._file_load_image_store,
+        "batch_size": DEFAULT_BATCH_MAX_ITEMS,
+        "decode": resolve_source_decoder(residency),
+    }
+
+
 def start_drop_load_async(
     app: Any,
     files: List[Path],
@@ -104,6 +132,8 @@ def start_drop_load_async(
     app._file_load_started_at = time.monotonic()
 
     if dirs:
+        # Discovery and decode overlap, so jobs are inserted in path order as they arrive.
+        app._file_load_sorted_insert = True
         worker = threading.Thread(
             target=scan_and_load_drop_items_worker,
             args=(
@@ -111,12 +141,13 @@ def start_drop_load_async(
                 dirs,
                 app._file_load_cancel_event,
                 app._file_load_queue,
-                max_files,
             ),
             kwargs={
+                "max_files": max_files,
                 "selectable_exts": selectable_input_extensions,
                 "recursive_exts": recursive_extensions,
                 "build_file_load_error_payload": build_file_load_error_payload,
+                **_worker_delivery_kwargs(app),
             },
             daemon=True,
             name="karuku-dnd-loader",
@@ -127,12 +158,13 @@ def start_drop_load_async(
             args=(files, app._file_load_cancel_event, app._file_load_queue),
             kwargs={
                 "build_file_load_error_payload": build_file_load_error_payload,
+                **_worker_delivery_kwargs(app),
             },
             daemon=True,
             name="karuku-dnd-file-loader",
         )
     worker.start()
-    app._file_load_after_id = app.after(40, app._poll_file_load_queue)
+    app._file_load_after_id = app.after(FILE_LOAD_POLL_FRAME_MS, app._poll_file_load_queue)
 
 
 def start_recursive_load_async(
@@ -153,6 +185,7 @@ def start_recursive_load_async(
         f"再帰探索開始: {root_dir} / 上限 {str(max_files) if max_files > 0 else '無制限'}枚 / 読み込み中は他操作を無効化（中止可）"
     )
     app._file_load_started_at = time.monotonic()
+    app._file_load_sorted_insert = True
 
     worker = threading.Thread(
         target=scan_and_load_images_worker,
@@ -165,12 +198,13 @@ def start_recursive_load_async(
         kwargs={
             "recursive_exts": recursive_extensions,
             "build_file_load_error_payload": build_file_load_error_payload,
+            **_worker_delivery_kwargs(app),
         },
         daemon=True,
         name="karuku-recursive-loader",
     )
     worker.start()
-    app._file_load_after_id = app.after(40, app._poll_file_load_queue)
+    app._file_load_after_id = app.after(FILE_LOAD_POLL_FRAME_MS, app._poll_file_load_queue)
 
 
 def start_retry_failed_load_async(
@@ -197,12 +231,22 @@ def start_retry_failed_load_async(
         args=(unique_paths, app._file_load_cancel_event, app._file_load_queue),
         kwargs={
             "build_file_load_error_payload": build_file_load_error_payload,
+            **_worker_delivery_kwargs(app),
         },
         daemon=True,
         name="karuku-retry-loader",
     )
     worker.start()
-    app._file_load_after_id = app.after(40, app._poll_file_load_queue)
+    app._file_load_after_id = app.after(FILE_LOAD_POLL_FRAME_MS, app._poll_file_load_queue)
+
+
+def next_file_load_poll_interval(previous_ms: int, *, handled: int, backlog: bool) -> int:
+    """Return the next poll delay: short while backlogged, one frame while active, backing off when idle."""
+    if backlog:
+        return FILE_LOAD_POLL_BUSY_MS
+    if handled:
+        return FILE_LOAD_POLL_FRAME_MS
+    return min(FILE_LOAD_POLL_IDLE_MAX_MS, max(FILE_LOAD_POLL_FRAME_MS, previous_ms * 2))
 
 
 def poll_file_load_queue(app: Any) -> None:
@@ -210,8 +254,13 @@ def poll_file_load_queue(app: Any) -> None:
         app._file_load_after_id = None
         return
 
+    deadline = time.perf_counter() + FILE_LOAD_POLL_BUDGET_SECONDS
     handled = 0
-    while handled < 30:
+    backlog = False
+    while True:
+        if handled and time.perf_counter() >= deadline:
+            backlog = not app._file_load_queue.empty()
+            break
         try:
             message = app._file_load_queue.get_nowait()
         except queue.Empty:
@@ -222,7 +271,13 @@ def poll_file_load_queue(app: Any) -> None:
             break
 
     if app._is_loading_files:
-        app._file_load_after_id = app.after(40, app._poll_file_load_queue)
+        flush_file_load_progress(app)
+        app._file_load_poll_ms = next_file_load_poll_interval(
+            getattr(app, "_file_load_poll_ms", FILE_LOAD_POLL_FRAME_MS),
+            handled=handled,
+            backlog=backlog,
+        )
+        app._file_load_after_id = app.after(app._file_load_poll_ms, app._poll_file_load_queue)
     else:
         app._file_load_after_id = None
 
@@ -236,10 +291,63 @@ def _format_path_for_display(app: Any, path: Path) -> str:
     return str(path)
 
 
+def _mark_file_load_progress(app: Any, path: Path, *, failed: bool) -> None:
+    app._file_load_last_path_text = _format_path_for_display(app, path)
+    app._file_load_last_failed = failed
+    app._file_load_progress_dirty = True
+
+
+def flush_file_load_progress(app: Any) -> None:
+    """Apply accumulated loaded/failed progress to the widgets (at most once per poll)."""
+    if not getattr(app, "_file_load_progress_dirty", False):
+        return
+    app._file_load_progress_dirty = False
+    display_path = app._file_load_last_path_text
+    failed = bool(app._file_load_last_failed)
+    total = app._file_load_total_candidates
+    failed_count = len(app._file_load_failed_details)
+    done_count = app._file_load_loaded_count + failed_count
+    if total <= 0 and done_count > 0:
+        # Streaming load: the walk is still running, so the total is provisional.
+        detected = max(int(getattr(app, "_file_load_detected_count", 0)), done_count)
+        app.progress_bar.set(min(0.95, done_count / detected))
+        app.operation_stage_var.set(f"探索中: {detected}件検出 / {'失敗' if failed else '読込'}: {display_path}")
+        app.status_var.set(
+            f"{app._file_load_mode_label}: 探索中 {detected}件検出 / 読込 {app._file_load_loaded_count}件"
+            f"{f' / 失敗 {failed_count}件' if failed_count else ''} / 処理: {display_path} / "
+            f"{build_loading_hint_text(cancel_hint='中止のみ可能')}"
+        )
+    elif total > 0:
+        app.progress_bar.set(min(1.0, done_count / total))
+        app.operation_stage_var.set(f"{'失敗' if failed else '読込'}: {display_path}")
+        app.status_var.set(
+            build_loading_progress_status_text(
+                total=total,
+                loaded=app._file_load_loaded_count,
+                failed_count=failed_count,
+                done_count=done_count,
+                elapsed_seconds=time.monotonic() - app._file_load_started_at,
+                path_text=display_path,
+                failed=failed,
+                loading_hint=build_loading_hint_text(cancel_hint="中止のみ可能"),
+            )
+        )
+    elif not failed:
+        app.status_var.set(
+            f"{app._file_load_mode_label}: 読込中 / 処理: {display_path} / "
+            f"{build_loading_hint_text(cancel_hint='中止のみ可能')}"
+        )
+
+
 def handle_file_load_message(app: Any, message: Dict[str, Any]) -> None:
     msg_type = str(message.get("type", ""))
     if msg_type == "scan_progress":
         detected = int(message.get("count", 0))
+        app._file_load_detected_count = max(int(getattr(app, "_file_load_detected_count", 0)), detected)
+        if app._file_load_loaded_count or app._file_load_failed_details:
+            # Loading has already started; the next flush shows the provisional total.
+            app._file_load_progress_dirty = True
+            return
         app._file_scan_pulse = (app._file_scan_pulse + 0.08) % 1.0
         scan_elapsed = time.monotonic() - app._file_load_started_at
         app.progress_bar.set(max(0.05, app._file_scan_pulse))
@@ -256,6 +364,11 @@ def handle_file_load_message(app: Any, message: Dict[str, Any]) -> None:
         app._file_load_limited = bool(message.get("reached_limit", False))
         if app._file_load_limit <= 0:
             app._file_load_limit = app._file_load_total_candidates
+        app._file_load_detected_count = app._file_load_total_candidates
+        if message.get("streaming") and (app._file_load_loaded_count or app._file_load_failed_details):
+            # Loading overlapped discovery: keep the elapsed clock and let the flush show done/total.
+            app._file_load_progress_dirty = True
+            return
         app._file_load_started_at = time.monotonic()
         app._set_operation_stage("読込中")
         if app._file_load_total_candidates == 0:
@@ -275,38 +388,29 @@ def handle_file_load_message(app: Any, message: Dict[str, Any]) -> None:
             )
         return
 
+    if msg_type == "batch":
+        for item in message.get("messages", ()):
+            handle_file_load_message(app, item)
+            if not app._is_loading_files:
+                break
+        return
+
     if msg_type == "loaded":
         path = Path(str(message.get("path", "")))
         image = message.get("image")
-        if isinstance(image, Image.Image):
+        handle = message.get("handle")
+        store = getattr(app, "_file_load_image_store", None)
+        if image is None and handle is not None and store is not None:
+            image = store.take(handle)
+        if isinstance(image, (Image.Image, EncodedSource)):
             append_job = getattr(app, "_append_loaded_job", None)
             if callable(append_job):
-                append_job(path, image)
+                if getattr(app, "_file_load_sorted_insert", False):
+                    append_job(path, image, file_size=message.get("file_size"), sorted_insert=True)
+                else:
+                    append_job(path, image, file_size=message.get("file_size"))
         app._file_load_loaded_count += 1
-        total = app._file_load_total_candidates
-        failed_count = len(app._file_load_failed_details)
-        done_count = app._file_load_loaded_count + failed_count
-        display_path = _format_path_for_display(app, path)
-        if total > 0:
-            app.progress_bar.set(min(1.0, done_count / total))
-            app.operation_stage_var.set(f"読込: {display_path}")
-            app.status_var.set(
-                build_loading_progress_status_text(
-                    total=total,
-                    loaded=app._file_load_loaded_count,
-                    failed_count=failed_count,
-                    done_count=done_count,
-                    elapsed_seconds=time.monotonic() - app._file_load_started_at,
-                    path_text=display_path,
-                    failed=False,
-                    loading_hint=build_loading_hint_text(cancel_hint="中止のみ可能"),
-                )
-            )
-        else:
-            app.status_var.set(
-                f"{app._file_load_mode_label}: 読込中 / 処理: {display_path} / "
-                f"{build_loading_hint_text(cancel_hint='中止のみ可能')}"
-            )
+        _mark_file_load_progress(app, path, failed=False)
         return
 
     if msg_type == "load_error":
@@ -321,24 +425,7 @@ def handle_file_load_message(app: Any, message: Dict[str, Any]) -> None:
         display_path = _format_path_for_display(app, path)
         app._file_load_failed_details.append(f"{display_path}: {error_text}")
         app._file_load_failed_paths.append(path)
-        total = app._file_load_total_candidates
-        failed_count = len(app._file_load_failed_details)
-        done_count = app._file_load_loaded_count + failed_count
-        if total > 0:
-            app.progress_bar.set(min(1.0, done_count / total))
-            app.operation_stage_var.set(f"失敗: {display_path}")
-            app.status_var.set(
-                build_loading_progress_status_text(
-                    total=total,
-                    loaded=app._file_load_loaded_count,
-                    failed_count=failed_count,
-                    done_count=done_count,
-                    elapsed_seconds=time.monotonic() - app._file_load_started_at,
-                    path_text=display_path,
-                    failed=True,
-                    loading_hint=build_loading_hint_text(cancel_hint="中止のみ可能"),
-                )
-            )
+        _mark_file_load_progress(app, path, failed=True)
         return
 
     if msg_type == "fatal":
@@ -11,7 +11,7 @@ from tkinter import filedialog, messagebox
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import unquote, urlparse
 
-from PIL import Image, ImageOps
+from karuku_resizer.ui_file_load_helpers import load_candidates_in_order
 
 
 def setup_drag_and_drop(
@@ -305,17 +305,18 @@ def scan_and_load_drop_items_worker(
         candidates.sort(key=lambda p: str(p).lower())
         out_queue.put({"type": "scan_done", "total": len(candidates)})
 
-        for index, path in enumerate(candidates, start=1):
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            try:
-                with Image.open(path) as opened:
-                    opened.load()
-                    img = ImageOps.exif_transpose(opened)
-                out_queue.put({"type": "loaded", "path": path, "image": img, "index": index})
-            except Exception as exc:
-                out_queue.put({"type": "load_error", "path": path, "error": str(exc), "index": index})
+        if not load_candidates_in_order(
+            candidates,
+            cancel_event,
+            out_queue,
+            build_file_load_error_payload=lambda path, exc, index: {
+                "type": "load_error",
+                "path": path,
+                "error": str(exc),
+                "index": index,
+            },
+        ):
+            return
 
         out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
     except Exception as exc:
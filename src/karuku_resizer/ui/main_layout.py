@@ -9,6 +9,7 @@ from PIL import Image
 from PIL.ExifTags import GPSTAGS
 from karuku_resizer.ui_text_presenter import (
     build_action_hint_text,
+    build_memory_usage_text,
     build_status_counts_text,
 )
 
@@ -151,12 +152,21 @@ def session_status_text(
     success = sum(1 for job in app.jobs if job.last_process_state == "success")
     failed = sum(1 for job in app.jobs if job.last_process_state == "failed")
     unprocessed = sum(1 for job in app.jobs if job.last_process_state == "unprocessed")
-    return build_status_counts_text(
+    counts_text = build_status_counts_text(
         total_jobs=total,
         success_jobs=success,
         failed_jobs=failed,
         unprocessed_jobs=unprocessed,
     )
+    if total <= 0:
+        return counts_text
+    preview_cache = getattr(app, "_preview_cache", None)
+    memory_text = build_memory_usage_text(
+        resident_bytes=sum(job.resident_bytes for job in app.jobs),
+        decoded_bytes=sum(job.source.width * job.source.height * len(job.source.getbands()) for job in app.jobs),
+        cache_bytes=preview_cache.total_bytes if preview_cache is not None else 0,
+    )
+    return f"{counts_text} | {memory_text}"
 
 
 def update_session_summary(
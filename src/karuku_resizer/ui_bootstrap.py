@@ -18,12 +18,20 @@ import time
 import tkinter.font as tkfont
 from tkinter import filedialog, messagebox
 
+from karuku_resizer.durability import flush_pending_directory_syncs
+from karuku_resizer.retry_policy import DEFAULT_RETRY_BUDGET, RetryBudget, retry_run
 from karuku_resizer.runtime_logging import write_run_summary
 from karuku_resizer.image_save_pipeline import (
     SaveFormat,
     SaveResult,
     destination_with_extension,
 )
+from karuku_resizer.renditions import (
+    manifest_path_for,
+    parse_rendition_formats,
+    parse_rendition_widths,
+    render_renditions,
+)
 from karuku_resizer.ui_text_presenter import (
     build_batch_completion_message,
     build_batch_progress_status_text,
@@ -296,6 +304,8 @@ def bootstrap_create_initial_run_summary(app: Any, *, log_app_name: str) -> Dict
             "failed_count": 0,
             "dry_run_count": 0,
             "cancelled_count": 0,
+            "retry_count": 0,
+            "passthrough_count": 0,
         },
     }
 
@@ -1144,7 +1154,7 @@ def bootstrap_save_current(app: Any) -> None:
         return
 
     source_image = job.image
-    target_size = app._snapshot_resize_target(source_image.size)
+    target_size = app._snapshot_resize_target(job.size)
     if not target_size:
         messagebox.showwarning("保存エラー", "リサイズ設定が無効です")
         return
@@ -1168,18 +1178,20 @@ def bootstrap_save_current(app: Any) -> None:
     def worker() -> None:
         resized_for_save: Optional[Image.Image] = None
         try:
-            resized_for_save = app._resize_image_to_target(source_image, target_size)
+            resized_for_save = app._resize_image_to_target(source_image, target_size, job.orientation)
             if resized_for_save is None:
                 raise RuntimeError("リサイズ設定が無効です")
 
-            result, attempts = app._save_with_retry(
-                source_image=source_image,
-                resized_image=resized_for_save,
-                output_path=save_path,
-                options=options,
-                allow_retry=app._is_pro_mode(),
-                cancel_event=app._single_save_cancel_event,
-            )
+            with retry_run(RetryBudget(max_retries=DEFAULT_RETRY_BUDGET)):
+                result, attempts = app._save_with_retry(
+                    source_image=source_image,
+                    resized_image=resized_for_save,
+                    output_path=save_path,
+                    options=options,
+                    allow_retry=app._is_pro_mode(),
+                    cancel_event=app._single_save_cancel_event,
+                    source_path=job.path,
+                )
         except Exception as exc:  # pragma: no cover
             logging.exception("Unexpected error during single save")
             error = SaveResult(
@@ -1317,6 +1329,67 @@ def bootstrap_prepare_batch_ui(app: Any) -> None:
     app._refresh_status_indicators()
 
 
+def bootstrap_resolve_rendition_plan(app: Any) -> Optional[Tuple[Tuple[int, ...], Tuple[SaveFormat, ...]]]:
+    """Return (widths, formats) when multi-rendition output is configured in settings."""
+    settings = getattr(app, "settings", None) or {}
+    raw_widths = str(settings.get("rendition_widths", "")).strip()
+    if not raw_widths:
+        return None
+    try:
+        widths = parse_rendition_widths(raw_widths)
+        formats = parse_rendition_formats(str(settings.get("rendition_formats", "webp,jpeg")))
+    except ValueError as e:
+        logging.warning("Ignoring invalid rendition settings: %s", e)
+        return None
+    return widths, formats
+
+
+def bootstrap_process_rendition_batch_job(
+    app: Any,
+    *,
+    job: Any,
+    output_dir: Path,
+    widths: Tuple[int, ...],
+    formats: Tuple[SaveFormat, ...],
+    batch_options: Any,
+    stats: Any,
+) -> None:
+    out_base = build_unique_batch_base_path(
+        output_dir=output_dir,
+        stem=job.path.stem,
+        output_format=formats[0],
+        destination_with_extension_func=lambda base, _fmt: manifest_path_for(base),
+        dry_run=batch_options.dry_run,
+    )
+    result = render_renditions(
+        job.image,
+        out_base,
+        widths=widths,
+        formats=formats,
+        save_options=batch_options,
+        source_name=job.path.name,
+        orientation=job.orientation,
+    )
+    if result.success:
+        job.last_process_state = "success"
+        job.last_error_detail = None
+        first_save_result = result.outputs[0].save_result
+        if first_save_result is not None:
+            stats.record_success(first_save_result)
+        return
+
+    error_detail = result.first_error
+    job.last_process_state = "failed"
+    job.last_error_detail = error_detail
+    stats.record_failure(job.path.name, error_detail, file_path=job.path)
+    logging.error(
+        "Failed to write %d of %d renditions for %s",
+        len(result.failed_outputs),
+        len(result.outputs),
+        job.path,
+    )
+
+
 def bootstrap_process_single_batch_job(
     app: Any,
     *,
@@ -1329,9 +1402,23 @@ def bootstrap_process_single_batch_job(
     batch_options: Any,
     stats: Any,
 ) -> None:
+    rendition_plan = bootstrap_resolve_rendition_plan(app)
+    if rendition_plan is not None:
+        widths, formats = rendition_plan
+        bootstrap_process_rendition_batch_job(
+            app,
+            job=job,
+            output_dir=output_dir,
+            widths=widths,
+            formats=formats,
+            batch_options=batch_options,
+            stats=stats,
+        )
+        return
+
     resized_img: Optional[Any] = None
     try:
-        resized_img = app._resize_image_with_plan(job.image, resize_plan)
+        resized_img = app._resize_image_with_plan(job.image, resize_plan, job.orientation)
         if not resized_img:
             job.last_process_state = "failed"
             job.last_error_detail = "リサイズ失敗"
@@ -1357,7 +1444,10 @@ def bootstrap_process_single_batch_job(
             output_path=out_base,
             options=effective_options,
             allow_retry=app._is_pro_mode(),
+            source_path=job.path,
         )
+        if attempts > 1 and hasattr(stats, "record_retries"):
+            stats.record_retries(attempts - 1)
         if result.success:
             job.last_process_state = "success"
             job.last_error_detail = None
@@ -1504,31 +1594,37 @@ def bootstrap_run_batch_save_async(
 
     def worker() -> None:
         try:
-            for i, job in enumerate(jobs_to_process):
-                if app._cancel_batch:
-                    break
-                emit_processing(job.path.name, i + 1)
-                try:
-                    bootstrap_process_single_batch_job(
-                        app,
-                        job=job,
-                        output_dir=output_dir,
-                        reference_target=reference_target,
-                        resize_plan=resize_plan,
-                        output_format_id=output_format_id,
-                        reference_output_format=reference_output_format,
-                        batch_options=batch_options,
-                        stats=stats,
-                    )
-                except Exception as e:
-                    job.last_process_state = "failed"
-                    job.last_error_detail = f"例外 {e}"
-                    stats.record_failure(job.path.name, f"例外 {e}", file_path=job.path)
-                    logging.exception("Unexpected error during batch save: %s", job.path)
-                finally:
-                    done = i + 1
-                    emit_progress(done, job.path.name)
+            # GUIのバッチ1回分の再試行予算（CLI の --retry-budget 既定値と同じ）
+            with retry_run(RetryBudget(max_retries=DEFAULT_RETRY_BUDGET)):
+                for i, job in enumerate(jobs_to_process):
+                    if app._cancel_batch:
+                        break
+                    emit_processing(job.path.name, i + 1)
+                    try:
+                        bootstrap_process_single_batch_job(
+                            app,
+                            job=job,
+                            output_dir=output_dir,
+                            reference_target=reference_target,
+                            resize_plan=resize_plan,
+                            output_format_id=output_format_id,
+                            reference_output_format=reference_output_format,
+                            batch_options=batch_options,
+                            stats=stats,
+                        )
+                    except Exception as e:
+                        job.last_process_state = "failed"
+                        job.last_error_detail = f"例外 {e}"
+                        stats.record_failure(job.path.name, f"例外 {e}", file_path=job.path)
+                        logging.exception("Unexpected error during batch save: %s", job.path)
+                    finally:
+                        done = i + 1
+                        emit_progress(done, job.path.name)
         finally:
+            try:
+                flush_pending_directory_syncs()
+            except Exception:
+                logging.exception("Failed to flush pending directory syncs")
             progress_queue.put(("done",))
 
     app._batch_save_thread = threading.Thread(
@@ -1651,6 +1747,8 @@ def bootstrap_record_batch_run_summary(
             "exif_applied_count": stats.exif_applied_count,
             "exif_fallback_count": stats.exif_fallback_count,
             "gps_removed_count": stats.gps_removed_count,
+            "retry_count": getattr(stats, "retry_count", 0),
+            "passthrough_count": getattr(stats, "passthrough_count", 0),
         },
         "failed_files": list(stats.failed_details),
     }
@@ -1660,6 +1758,8 @@ def bootstrap_record_batch_run_summary(
     totals["processed_count"] += stats.processed_count
     totals["failed_count"] += stats.failed_count
     totals["dry_run_count"] += stats.dry_run_count
+    totals["retry_count"] = totals.get("retry_count", 0) + getattr(stats, "retry_count", 0)
+    totals["passthrough_count"] = totals.get("passthrough_count", 0) + getattr(stats, "passthrough_count", 0)
     if app._cancel_batch:
         totals["cancelled_count"] += 1
     app._write_run_summary_safe()
@@ -1748,6 +1848,7 @@ def bootstrap_batch_save(app: Any) -> None:
             dry_run=batch_options.dry_run,
             batch_cancelled=app._cancel_batch,
             dry_run_count=stats.dry_run_count,
+            passthrough_count=getattr(stats, "passthrough_count", 0),
         )
         if stats.processed_count > 0:
             app._register_recent_setting_from_current()
@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
+import io
 import queue
 import os
 import logging
 import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Sequence
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from PIL import Image, ImageOps
+from PIL import Image
+
+from karuku_resizer.orientation import read_orientation
+
+# Pillow releases the GIL while decoding, so a few threads scale with cores.
+DEFAULT_DECODE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+_CANCEL_POLL_SECONDS = 0.05
+# Decoded images allowed to wait for the Tk thread before workers block.
+DEFAULT_IMAGE_STORE_CAPACITY = 32
+# Coalesce per-file results into one queue message per UI frame.
+DEFAULT_BATCH_MAX_ITEMS = 32
+DEFAULT_BATCH_MAX_DELAY = 1 / 60
+# "decoded" keeps pixels per job; "compressed" keeps the original file bytes and decodes on demand.
+SOURCE_RESIDENCY_MODES = ("decoded", "compressed")
 
 
 def dedupe_paths(paths: List[Path]) -> List[Path]:
@@ -87,6 +105,366 @@ def parse_drop_paths(split_texts: Callable[[str], Sequence[str]], raw_data: Any)
     return dedupe_paths(paths)
 
 
+def decode_image_file(path: Path) -> Image.Image:
+    """Open and fully decode one image file.
+
+    Pixels stay in stored orientation; callers read it with `source_orientation` and
+    apply it after resizing, so no full-resolution rotated copy is made.
+    """
+    with Image.open(path) as opened:
+        opened.load()
+    return opened
+
+
+@dataclass(frozen=True)
+class EncodedSource:
+    """Original file bytes plus the decoded geometry, kept instead of pixels.
+
+    ``size``/``mode``/``getbands()`` describe the decoded pixels in stored orientation,
+    and ``orientation`` is the EXIF value to apply after resizing, so callers can plan
+    resizes and pick output formats without decoding.
+    """
+
+    data: bytes
+    size: Tuple[int, int]
+    mode: str
+    bands: Tuple[str, ...]
+    orientation: int = 1
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def getbands(self) -> Tuple[str, ...]:
+        return self.bands
+
+    @property
+    def decoded_nbytes(self) -> int:
+        return self.size[0] * self.size[1] * len(self.bands)
+
+    def decode(self) -> Image.Image:
+        with Image.open(io.BytesIO(self.data)) as opened:
+            opened.load()
+        return opened
+
+
+def source_orientation(source: Any) -> int:
+    """EXIF orientation of a decoded image or an `EncodedSource`."""
+    if isinstance(source, EncodedSource):
+        return source.orientation
+    return read_orientation(source)
+
+
+def read_encoded_source(path: Path) -> EncodedSource:
+    """Read a file's bytes, decoding once so broken files fail at load time as before."""
+    data = path.read_bytes()
+    with Image.open(io.BytesIO(data)) as opened:
+        opened.load()
+    return EncodedSource(
+        data=data,
+        size=opened.size,
+        mode=opened.mode,
+        bands=tuple(opened.getbands()),
+        orientation=read_orientation(opened),
+    )
+
+
+def resolve_source_decoder(residency: str) -> Callable[[Path], Any]:
+    """Return the per-file load function for a residency mode (unknown values mean decoded)."""
+    if residency == "compressed":
+        return read_encoded_source
+    return decode_image_file
+
+
+class DecodedImageStore:
+    """Hands decoded images to the Tk thread by integer handle.
+
+    Queue messages carry only the handle, and ``capacity`` bounds how many decoded
+    images may wait for the UI: producers block (cancel-aware) while the store is full.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_IMAGE_STORE_CAPACITY) -> None:
+        self.capacity = max(1, int(capacity))
+        self._cond = threading.Condition()
+        self._images: Dict[int, Image.Image] = {}
+        self._next_handle = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._images)
+
+    def is_full(self) -> bool:
+        with self._cond:
+            return len(self._images) >= self.capacity
+
+    def put(self, image: Image.Image, cancel_event: threading.Event) -> Optional[int]:
+        """Store ``image`` and return its handle, or None when canceled while waiting."""
+        with self._cond:
+            while len(self._images) >= self.capacity:
+                if cancel_event.is_set():
+                    return None
+                self._cond.wait(_CANCEL_POLL_SECONDS)
+            self._next_handle += 1
+            self._images[self._next_handle] = image
+            return self._next_handle
+
+    def take(self, handle: int) -> Optional[Image.Image]:
+        with self._cond:
+            image = self._images.pop(handle, None)
+            self._cond.notify_all()
+        return image
+
+    def clear(self) -> None:
+        with self._cond:
+            self._images.clear()
+            self._cond.notify_all()
+
+
+class LoadMessageBatcher:
+    """Coalesces per-file results into ``{"type": "batch", "messages": [...]}``.
+
+    A batch is sent when it reaches ``max_items``, when its oldest entry is older
+    than ``max_delay`` or when ``flush`` is called. ``max_items=1`` sends every
+    message as-is.
+    """
+
+    def __init__(
+        self,
+        out_queue: "queue.Queue[Dict[str, Any]]",
+        *,
+        max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+        max_delay: float = DEFAULT_BATCH_MAX_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._out_queue = out_queue
+        self.max_items = max(1, int(max_items))
+        self.max_delay = max(0.0, float(max_delay))
+        self._clock = clock
+        self._items: List[Dict[str, Any]] = []
+        self._first_at = 0.0
+
+    def add(self, message: Dict[str, Any]) -> None:
+        if self.max_items == 1:
+            self._out_queue.put(message)
+            return
+        if not self._items:
+            self._first_at = self._clock()
+        self._items.append(message)
+        if len(self._items) >= self.max_items or self._clock() - self._first_at >= self.max_delay:
+            self.flush()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._items)
+
+    def flush(self) -> None:
+        if not self._items:
+            return
+        items, self._items = self._items, []
+        self._out_queue.put({"type": "batch", "messages": items})
+
+
+def _decode_with_size(decode: Callable[[Path], Any], path: Path) -> Tuple[Any, int]:
+    image = decode(path)
+    if isinstance(image, EncodedSource):
+        return image, len(image.data)
+    try:
+        file_size = os.stat(path).st_size
+    except OSError:
+        file_size = 0
+    return image, file_size
+
+
+_STREAM_END = object()
+_STREAM_PENDING = object()
+
+
+class CandidateStream:
+    """Runs discovery on a helper thread so loading can start with the first match.
+
+    ``discover(emit)`` calls ``emit(path)`` for every candidate; the loader pulls
+    whatever has been found so far without waiting for the walk to finish.
+    An exception raised by ``discover`` is kept in ``error``; the loader re-raises it
+    after delivering everything found before the failure.
+    """
+
+    def __init__(self, discover: Callable[[Callable[[Path], None]], None], *, name: str = "karuku-discovery") -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(discover,), daemon=True, name=name)
+        self._thread.start()
+
+    def _run(self, discover: Callable[[Callable[[Path], None]], None]) -> None:
+        try:
+            discover(self._queue.put)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self._queue.put(_STREAM_END)
+
+    def take(self, timeout: Optional[float]) -> Any:
+        """Return the next path, ``_STREAM_PENDING`` when none is ready yet, or ``_STREAM_END``."""
+        try:
+            if timeout is None or timeout <= 0:
+                item = self._queue.get_nowait()
+            else:
+                item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return _STREAM_PENDING
+        return item
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+
+def load_candidates_in_order(
+    candidates: Iterable[Path] | CandidateStream,
+    cancel_event: threading.Event,
+    out_queue: "queue.Queue[Dict[str, Any]]",
+    *,
+    build_file_load_error_payload: Callable[[Path, BaseException, int], Dict[str, Any]],
+    max_workers: int = DEFAULT_DECODE_WORKERS,
+    decode: Callable[[Path], Any] = decode_image_file,
+    image_store: Optional[DecodedImageStore] = None,
+    batch_size: int = 1,
+) -> bool:
+    """Decode candidates on a small pool and emit ``loaded`` messages in index order.
+
+    At most ``max_workers * 2`` decodes are in flight so memory stays bounded while the
+    UI consumes results. ``loaded`` messages include the precomputed ``file_size``;
+    with ``image_store`` they carry a ``handle`` instead of the image itself, and with
+    ``batch_size > 1`` they are coalesced by `LoadMessageBatcher`. ``candidates`` may be
+    a `CandidateStream`, in which case decoding starts while discovery continues.
+    Returns False (after emitting ``done``/canceled) when ``cancel_event`` is set;
+    pending decodes are dropped.
+    """
+    workers = max(1, int(max_workers))
+    window = workers * 2
+    batcher = LoadMessageBatcher(out_queue, max_items=batch_size)
+    pending: Deque[Tuple[int, Path, "Future[Tuple[Image.Image, int]]"]] = deque()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="karuku-decode")
+    if isinstance(candidates, CandidateStream):
+        take = candidates.take
+    else:
+        iterator = iter(candidates)
+
+        def take(_timeout: Optional[float]) -> Any:
+            return next(iterator, _STREAM_END)
+
+    next_index = 0
+    exhausted = False
+    canceled = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window and not cancel_event.is_set():
+                # Block briefly on discovery only when there is nothing to deliver.
+                path = take(None if pending or batcher.pending_count else _CANCEL_POLL_SECONDS)
+                if path is _STREAM_END:
+                    exhausted = True
+                    break
+                if path is _STREAM_PENDING:
+                    break
+                next_index += 1
+                pending.append((next_index, path, executor.submit(_decode_with_size, decode, path)))
+            if cancel_event.is_set():
+                canceled = True
+                break
+            if not pending:
+                batcher.flush()
+                if exhausted:
+                    break
+                continue
+
+            index, path, future = pending[0]
+            try:
+                img, file_size = future.result(timeout=0 if batcher.pending_count else _CANCEL_POLL_SECONDS)
+            except FutureTimeoutError:
+                # Nothing ready: deliver what we have before waiting.
+                batcher.flush()
+                continue
+            except Exception as exc:
+                pending.popleft()
+                batcher.add(build_file_load_error_payload(path, exc, index))
+                continue
+            pending.popleft()
+            message: Dict[str, Any] = {"type": "loaded", "path": path, "index": index, "file_size": file_size}
+            if image_store is None:
+                message["image"] = img
+            else:
+                if image_store.is_full():
+                    batcher.flush()
+                handle = image_store.put(img, cancel_event)
+                if handle is None:
+                    canceled = True
+                    break
+                message["handle"] = handle
+            batcher.add(message)
+    finally:
+        for _index, _path, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    batcher.flush()
+    if canceled:
+        out_queue.put({"type": "done", "canceled": True})
+        return False
+    if isinstance(candidates, CandidateStream) and candidates.error is not None:
+        raise candidates.error
+    return True
+
+
+def _stream_and_load(
+    discover: Callable[[Callable[[Path], None]], bool],
+    cancel_event: threading.Event,
+    out_queue: "queue.Queue[Dict[str, Any]]",
+    *,
+    build_file_load_error_payload: Callable[[Path, BaseException, int], Dict[str, Any]],
+    image_store: Optional[DecodedImageStore],
+    batch_size: int,
+    decode: Callable[[Path], Any],
+) -> None:
+    """Decode candidates while ``discover`` is still walking.
+
+    ``discover(emit)`` returns whether the ``max_files`` limit was reached. ``scan_done``
+    (with ``streaming: True``) is sent once the walk ends, usually after the first
+    ``loaded`` messages; the UI keeps sort order by inserting each job in place.
+    """
+    found: List[int] = [0]
+
+    def _discover(emit: Callable[[Path], None]) -> None:
+        def _emit(path: Path) -> None:
+            found[0] += 1
+            emit(path)
+
+        reached_limit = discover(_emit)
+        if not cancel_event.is_set():
+            out_queue.put(
+                {
+                    "type": "scan_done",
+                    "total": found[0],
+                    "reached_limit": reached_limit,
+                    "streaming": True,
+                }
+            )
+
+    stream = CandidateStream(_discover)
+    if not load_candidates_in_order(
+        stream,
+        cancel_event,
+        out_queue,
+        build_file_load_error_payload=build_file_load_error_payload,
+        decode=decode,
+        image_store=image_store,
+        batch_size=batch_size,
+    ):
+        return
+    out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
+
+
 def scan_and_load_drop_items_worker(
     dropped_files: List[Path],
     dropped_dirs: List[Path],
@@ -97,96 +475,73 @@ def scan_and_load_drop_items_worker(
     selectable_exts: Sequence[str],
     recursive_exts: Sequence[str],
     build_file_load_error_payload: Callable[[Path, BaseException, int], Dict[str, Any]],
+    image_store: Optional[DecodedImageStore] = None,
+    batch_size: int = 1,
+    decode: Callable[[Path], Any] = decode_image_file,
 ) -> None:
-    """Background worker: load dropped file candidates and recursive folders."""
-    try:
-        candidates: List[Path] = []
+    """Background worker: load dropped file candidates and recursive folders while scanning."""
+
+    def _discover(emit: Callable[[Path], None]) -> bool:
         seen: set[str] = set()
-        reached_limit = False
         scan_errors: List[str] = []
+        detected = 0
+        recursive_set = set(recursive_exts)
 
-        def _add_candidate(path: Path) -> None:
+        def _add_candidate(path: Path) -> bool:
+            """Emit path once; return True when the limit is reached."""
+            nonlocal detected
             marker = str(path).lower()
             if marker in seen:
-                return
+                return False
             seen.add(marker)
-            candidates.append(path)
-
-        detected = 0
-        for path in dropped_files:
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            if path.exists() and path.is_file() and is_selectable_input_file(path, selectable_exts=selectable_exts):
-                _add_candidate(path)
-                detected += 1
-                if detected % 40 == 0:
-                    out_queue.put({"type": "scan_progress", "count": detected})
-                if max_files > 0 and detected >= max_files:
-                    reached_limit = True
-                    break
-
-            if reached_limit:
-                break
+            emit(path)
+            detected += 1
+            if detected % 40 == 0:
+                out_queue.put({"type": "scan_progress", "count": detected})
+            return max_files > 0 and detected >= max_files
+
+        try:
+            for path in dropped_files:
+                if cancel_event.is_set():
+                    return False
+                if path.exists() and path.is_file() and is_selectable_input_file(path, selectable_exts=selectable_exts):
+                    if _add_candidate(path):
+                        return True
 
-        for root_dir in dropped_dirs:
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            if reached_limit:
-                break
+            for root_dir in dropped_dirs:
+                if cancel_event.is_set():
+                    return False
 
-            def _onerror(exc: OSError) -> None:
-                source = str(getattr(exc, "filename", str(root_dir)))
-                message = f"{Path(source)}: {exc}"
-                scan_errors.append(message)
+                def _onerror(exc: OSError) -> None:
+                    source = str(getattr(exc, "filename", str(root_dir)))
+                    message = f"{Path(source)}: {exc}"
+                    scan_errors.append(message)
 
-            for dirpath, _dirnames, filenames in os.walk(root_dir, topdown=True, onerror=_onerror):
-                if cancel_event.is_set():
-                    out_queue.put({"type": "done", "canceled": True})
-                    return
-                base_dir = Path(dirpath)
-                for name in filenames:
+                for dirpath, _dirnames, filenames in os.walk(root_dir, topdown=True, onerror=_onerror):
                     if cancel_event.is_set():
-                        out_queue.put({"type": "done", "canceled": True})
-                        return
-                    if Path(name).suffix.lower() in set(recursive_exts):
-                        _add_candidate(base_dir / name)
-                        detected += 1
-                        if detected % 40 == 0:
-                            out_queue.put({"type": "scan_progress", "count": detected})
-                        if max_files > 0 and detected >= max_files:
-                            reached_limit = True
-                            break
-                if reached_limit:
-                    break
-
-        if scan_errors:
+                        return False
+                    base_dir = Path(dirpath)
+                    for name in sorted(filenames, key=str.lower):
+                        if cancel_event.is_set():
+                            return False
+                        if Path(name).suffix.lower() in recursive_set:
+                            if _add_candidate(base_dir / name):
+                                return True
+            return False
+        finally:
             for message in scan_errors[:10]:
                 logging.warning("Recursive scan (drag&drop) warning: %s", message)
 
-        candidates.sort(key=lambda p: str(p).lower())
-        out_queue.put(
-            {
-                "type": "scan_done",
-                "total": len(candidates),
-                "reached_limit": reached_limit,
-            }
+    try:
+        _stream_and_load(
+            _discover,
+            cancel_event,
+            out_queue,
+            build_file_load_error_payload=build_file_load_error_payload,
+            image_store=image_store,
+            batch_size=batch_size,
+            decode=decode,
         )
-
-        for index, path in enumerate(candidates, start=1):
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            try:
-                with Image.open(path) as opened:
-                    opened.load()
-                    img = ImageOps.exif_transpose(opened)
-                out_queue.put({"type": "loaded", "path": path, "image": img, "index": index})
-            except Exception as exc:
-                out_queue.put(build_file_load_error_payload(path, exc, index))
-
-        out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
     except Exception as exc:
         out_queue.put({"type": "fatal", "error": str(exc)})
         out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
@@ -200,66 +555,52 @@ def scan_and_load_images_worker(
     *,
     recursive_exts: Sequence[str],
     build_file_load_error_payload: Callable[[Path, BaseException, int], Dict[str, Any]],
+    image_store: Optional[DecodedImageStore] = None,
+    batch_size: int = 1,
+    decode: Callable[[Path], Any] = decode_image_file,
 ) -> None:
-    """Background worker: scan directory recursively and load supported images."""
-    try:
-        candidates: List[Path] = []
+    """Background worker: scan directory recursively and load supported images while scanning."""
+
+    def _discover(emit: Callable[[Path], None]) -> bool:
         detected = 0
-        reached_limit = False
         scan_errors: List[str] = []
+        recursive_set = set(recursive_exts)
 
         def _onerror(exc: OSError) -> None:
             source = str(getattr(exc, "filename", str(root_dir)))
             message = f"{Path(source)}: {exc}"
             scan_errors.append(message)
 
-        for dirpath, _dirnames, filenames in os.walk(root_dir, topdown=True, onerror=_onerror):
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            base_dir = Path(dirpath)
-            for name in filenames:
+        try:
+            for dirpath, _dirnames, filenames in os.walk(root_dir, topdown=True, onerror=_onerror):
                 if cancel_event.is_set():
-                    out_queue.put({"type": "done", "canceled": True})
-                    return
-                suffix = Path(name).suffix.lower()
-                if suffix in set(recursive_exts):
-                    candidates.append(base_dir / name)
-                    detected += 1
-                    if detected % 40 == 0:
-                        out_queue.put({"type": "scan_progress", "count": detected})
-                    if max_files > 0 and detected >= max_files:
-                        reached_limit = True
-                        break
-            if reached_limit:
-                break
-
-        if scan_errors:
+                    return False
+                base_dir = Path(dirpath)
+                for name in sorted(filenames, key=str.lower):
+                    if cancel_event.is_set():
+                        return False
+                    if Path(name).suffix.lower() in recursive_set:
+                        emit(base_dir / name)
+                        detected += 1
+                        if detected % 40 == 0:
+                            out_queue.put({"type": "scan_progress", "count": detected})
+                        if max_files > 0 and detected >= max_files:
+                            return True
+            return False
+        finally:
             for message in scan_errors[:10]:
                 logging.warning("Recursive scan warning: %s", message)
 
-        candidates.sort(key=lambda p: str(p).lower())
-        out_queue.put(
-            {
-                "type": "scan_done",
-                "total": len(candidates),
-                "reached_limit": reached_limit,
-            }
+    try:
+        _stream_and_load(
+            _discover,
+            cancel_event,
+            out_queue,
+            build_file_load_error_payload=build_file_load_error_payload,
+            image_store=image_store,
+            batch_size=batch_size,
+            decode=decode,
         )
-
-        for index, path in enumerate(candidates, start=1):
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            try:
-                with Image.open(path) as opened:
-                    opened.load()
-                    img = ImageOps.exif_transpose(opened)
-                out_queue.put({"type": "loaded", "path": path, "image": img, "index": index})
-            except Exception as exc:
-                out_queue.put(build_file_load_error_payload(path, exc, index))
-
-        out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
     except Exception as exc:
         out_queue.put({"type": "fatal", "error": str(exc)})
         out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
@@ -271,21 +612,23 @@ def load_paths_worker(
     out_queue: "queue.Queue[Dict[str, Any]]",
     *,
     build_file_load_error_payload: Callable[[Path, BaseException, int], Dict[str, Any]],
+    image_store: Optional[DecodedImageStore] = None,
+    batch_size: int = 1,
+    decode: Callable[[Path], Any] = decode_image_file,
 ) -> None:
     """Background worker: load explicit image paths."""
     try:
         out_queue.put({"type": "scan_done", "total": len(paths)})
-        for index, path in enumerate(paths, start=1):
-            if cancel_event.is_set():
-                out_queue.put({"type": "done", "canceled": True})
-                return
-            try:
-                with Image.open(path) as opened:
-                    opened.load()
-                    img = ImageOps.exif_transpose(opened)
-                out_queue.put({"type": "loaded", "path": path, "image": img, "index": index})
-            except Exception as exc:
-                out_queue.put(build_file_load_error_payload(path, exc, index))
+        if not load_candidates_in_order(
+            paths,
+            cancel_event,
+            out_queue,
+            build_file_load_error_payload=build_file_load_error_payload,
+            decode=decode,
+            image_store=image_store,
+            batch_size=batch_size,
+        ):
+            return
 
         out_queue.put({"type": "done", "canceled": cancel_event.is_set()})
     except Exception as exc:
@@ -9,6 +9,9 @@ import tempfile
 from pathlib import Path
 from typing import Any, Callable, Iterable, Optional, Sequence
 
+from karuku_resizer.content_analysis import normalize_png_palette_mode
+from karuku_resizer.durability import normalize_durability
+from karuku_resizer.encoder_profiles import normalize_encoder_profile
 from karuku_resizer.image_save_pipeline import ExifEditValues, SaveOptions, SaveFormat
 
 
@@ -25,6 +28,7 @@ def build_save_options(
         edit_values = app._current_exif_edit_values(show_warning=True, strict=True)
         if edit_values is None:
             return None
+    settings = getattr(app, "settings", None) or {}
     return SaveOptions(
         output_format=output_format,
         quality=app._current_quality(),
@@ -36,6 +40,10 @@ def build_save_options(
         webp_method=app._current_webp_method() if pro_mode else 6,
         webp_lossless=app.webp_lossless_var.get() if pro_mode else False,
         avif_speed=app._current_avif_speed() if pro_mode else 6,
+        durability=normalize_durability(settings.get("durability")),
+        encoder_profile=normalize_encoder_profile(settings.get("encoder_profile")),
+        png_palette=normalize_png_palette_mode(settings.get("png_palette")),
+        png_dither=bool(settings.get("png_dither", False)),
     )
 
 
@@ -73,6 +73,15 @@ def build_status_counts_text(
     return f"成功 {success_jobs} | 失敗 {failed_jobs} | 未処理 {unprocessed_jobs}"
 
 
+def build_memory_usage_text(*, resident_bytes: int, decoded_bytes: int, cache_bytes: int) -> str:
+    """Image memory line for the session summary; shows the decoded equivalent when sources stay compressed."""
+    mib = 1024 * 1024
+    text = f"画像メモリ {(resident_bytes + cache_bytes) / mib:.1f}MB"
+    if decoded_bytes > resident_bytes:
+        text += f"（展開時 {decoded_bytes / mib:.1f}MB）"
+    return text
+
+
 def build_session_status_text(
     *,
     is_pro_mode: bool,
@@ -354,6 +363,7 @@ def build_batch_completion_message(
     dry_run: bool,
     batch_cancelled: bool,
     dry_run_count: int,
+    passthrough_count: int = 0,
 ) -> str:
     if batch_cancelled:
         return (
@@ -365,6 +375,8 @@ def build_batch_completion_message(
         f"一括処理完了。{processed_count}/{total_files}件を{mode_text}しました。"
         f"\n失敗: {failed_count}件 / EXIF付与: {exif_applied_count}件 / EXIFフォールバック: {exif_fallback_count}件 / GPS削除: {gps_removed_count}件"
     )
+    if passthrough_count:
+        msg += f"\n再エンコードなしでコピー: {passthrough_count}件"
     msg += (
         f"\n基準画像プレビュー: {reference_job_name} / "
         f"{reference_target[0]}x{reference_target[1]} / {reference_format_label}"
@@ -6,6 +6,7 @@ pytest設定ファイル
 共通のフィクスチャやテスト設定を定義
 """
 
+import io
 import pytest
 import tempfile
 import shutil
@@ -21,6 +22,19 @@ def temp_dir():
     shutil.rmtree(temp_dir)
 
 
+@pytest.fixture
+def jpeg_bytes():
+    """単色のJPEG画像をバイト列で作るファクトリを返すフィクスチャ"""
+
+    def _make(size=(400, 200), color=(40, 120, 200), exif=None):
+        buffer = io.BytesIO()
+        params = {"exif": exif} if exif is not None else {}
+        Image.new("RGB", size, color).save(buffer, format="JPEG", quality=90, **params)
+        return buffer.getvalue()
+
+    return _make
+
+
 @pytest.fixture
 def sample_images(temp_dir):
     """様々なフォーマットのサンプル画像を作成するフィクスチャ"""
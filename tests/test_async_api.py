@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import time
+
+from PIL import Image
+
+from karuku_resizer import batch_api
+from karuku_resizer.async_api import aiter_resize, resize_async
+from karuku_resizer.batch_api import ResizeOptions, ResizeResult
+
+
+def _png_bytes(size: tuple[int, int] = (64, 32)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (10, 200, 90)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_resize_async_returns_same_result_as_sync_path() -> None:
+    options = ResizeOptions(resize_value=32, output_format="png")
+    data = _png_bytes()
+
+    async_result = asyncio.run(resize_async(data, options))
+    sync_result = batch_api.resize_one(data, options)
+
+    assert isinstance(async_result, ResizeResult)
+    assert async_result.success is True
+    assert async_result.output_size == sync_result.output_size == (32, 16)
+    assert async_result.data == sync_result.data
+
+
+def test_aiter_resize_accepts_async_sources_and_bounds_concurrency(monkeypatch) -> None:
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def _fake_resize_one(source, options, *, index=0, output_name=None):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.005)
+        with lock:
+            state["active"] -= 1
+        return ResizeResult(index=index, source=str(source), success=True)
+
+    monkeypatch.setattr("karuku_resizer.async_api.resize_one", _fake_resize_one)
+
+    async def _sources():
+        for i in range(12):
+            yield f"item-{i}"
+
+    async def _collect() -> list[ResizeResult]:
+        return [result async for result in aiter_resize(_sources(), max_concurrency=3)]
+
+    results = asyncio.run(_collect())
+
+    assert sorted(r.index for r in results) == list(range(12))
+    assert state["peak"] <= 3
+
+
+def test_aiter_resize_cancellation_stops_pending_work(monkeypatch) -> None:
+    started: list[int] = []
+    release = threading.Event()
+
+    def _blocking_resize_one(source, options, *, index=0, output_name=None):
+        started.append(index)
+        release.wait(timeout=5)
+        return ResizeResult(index=index, source=str(source), success=True)
+
+    monkeypatch.setattr("karuku_resizer.async_api.resize_one", _blocking_resize_one)
+
+    async def _consume() -> None:
+        async for _ in aiter_resize([f"item-{i}" for i in range(50)], max_concurrency=2):
+            pass
+
+    async def _main() -> None:
+        task = asyncio.create_task(_consume())
+        while len(started) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        release.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_main())
+
+    assert len(started) <= 3
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import batch_api
+from karuku_resizer.batch_api import ResizeOptions, ResizeResult, compute_target_size, iter_resize
+
+
+def test_compute_target_size_modes() -> None:
+    assert compute_target_size((400, 200), "width", 100) == (100, 50)
+    assert compute_target_size((400, 200), "height", 100) == (200, 100)
+    assert compute_target_size((200, 400), "longest_side", 100) == (50, 100)
+    assert compute_target_size((400, 200), "percentage", 50) == (200, 100)
+    assert compute_target_size((400, 200), "width", 800) == (400, 200)
+    assert compute_target_size((400, 200), "width", 800, allow_upscale=True) == (800, 400)
+    with pytest.raises(ValueError):
+        compute_target_size((400, 200), "diagonal", 100)
+
+
+def test_iter_resize_writes_files_and_reports_typed_results(tmp_path: Path, jpeg_bytes) -> None:
+    src_dir = tmp_path / "src"
+    out_dir = tmp_path / "out"
+    src_dir.mkdir()
+    out_dir.mkdir()
+    paths = []
+    for i in range(5):
+        path = src_dir / f"photo_{i}.jpg"
+        path.write_bytes(jpeg_bytes())
+        paths.append(path)
+    broken = src_dir / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    paths.append(broken)
+
+    results = list(
+        iter_resize(paths, ResizeOptions(resize_value=100, output_format="png", output_dir=out_dir), max_workers=3)
+    )
+
+    assert sorted(r.index for r in results) == list(range(6))
+    by_index = {r.index: r for r in results}
+    assert by_index[5].success is False
+    assert by_index[5].error
+    for i in range(5):
+        result = by_index[i]
+        assert isinstance(result, ResizeResult)
+        assert result.success is True
+        assert result.output_path == out_dir / f"photo_{i}.png"
+        assert result.output_size == (100, 50)
+        assert result.bytes_out == result.output_path.stat().st_size
+
+
+def test_iter_resize_keeps_same_named_inputs_apart(tmp_path: Path, jpeg_bytes) -> None:
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    paths = []
+    for folder, size in (("a", (400, 200)), ("b", (200, 400))):
+        (tmp_path / folder).mkdir()
+        path = tmp_path / folder / "x.jpg"
+        path.write_bytes(jpeg_bytes(size))
+        paths.append(path)
+
+    results = sorted(
+        iter_resize(paths, ResizeOptions(resize_value=100, output_format="jpeg", output_dir=out_dir)),
+        key=lambda r: r.index,
+    )
+
+    assert [r.output_path for r in results] == [out_dir / "x.jpg", out_dir / "x_00001.jpg"]
+    with Image.open(results[0].output_path) as first, Image.open(results[1].output_path) as second:
+        assert (first.size, second.size) == ((100, 50), (100, 200))
+
+
+def test_iter_resize_accepts_bytes_and_returns_encoded_data(jpeg_bytes) -> None:
+    results = list(iter_resize([jpeg_bytes(), jpeg_bytes((50, 50))], ResizeOptions(resize_value=100)))
+
+    by_index = {r.index: r for r in results}
+    assert by_index[0].output_format == "jpeg"
+    with Image.open(io.BytesIO(by_index[0].data)) as decoded:
+        assert decoded.size == (100, 50)
+    assert by_index[1].kept_original_size is True
+    assert by_index[1].source == "<bytes #1>"
+
+
+def test_iter_resize_bounds_in_flight_jobs(monkeypatch) -> None:
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    pulled: list[int] = []
+
+    def _fake_resize_one(source, options, *, index=0, output_name=None):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+        return ResizeResult(index=index, source=str(source), success=True)
+
+    def _sources():
+        for i in range(20):
+            pulled.append(i)
+            yield f"item-{i}"
+
+    monkeypatch.setattr(batch_api, "resize_one", _fake_resize_one)
+    iterator = iter_resize(_sources(), max_workers=2, max_in_flight=3)
+    first = next(iterator)
+    assert first.success is True
+    assert len(pulled) <= 4
+    iterator.close()
+
+    assert state["peak"] <= 2
+    assert len(pulled) < 20
+
+
+def test_import_does_not_load_tk() -> None:
+    src_root = Path(batch_api.__file__).resolve().parents[1]
+    code = "import sys, karuku_resizer.batch_api; print('tkinter' in sys.modules)"
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": str(src_root)},
+    )
+    assert completed.stdout.strip() == "False"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer.content_analysis import (
+    alpha_is_opaque,
+    analyze_content,
+    count_colors,
+    is_grayscale,
+    simplify_for_encode,
+)
+from karuku_resizer.image_save_pipeline import SaveOptions, resolve_output_format, save_image
+from karuku_resizer.ui_file_load_helpers import EncodedSource
+
+_FORMATS = {"jpeg", "png", "webp"}
+
+
+def _photo(mode: str = "RGB", size: tuple = (64, 48)) -> Image.Image:
+    noise = Image.effect_noise(size, 60)
+    image = Image.merge("RGB", (noise, noise.rotate(90), noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    return image.convert(mode)
+
+
+def _gray_rgb(size: tuple = (64, 48)) -> Image.Image:
+    return Image.linear_gradient("L").resize(size).convert("RGB")
+
+
+def test_profile_of_opaque_rgba_photo() -> None:
+    profile = analyze_content(_photo("RGBA"))
+
+    assert profile.has_alpha and profile.alpha_opaque and not profile.needs_alpha
+    assert not profile.grayscale
+    assert profile.color_count is None and not profile.low_color
+
+
+def test_detects_transparency_grayscale_and_low_color() -> None:
+    translucent = _photo("RGBA")
+    translucent.putpixel((0, 0), (1, 2, 3, 0))
+    palette = Image.new("P", (8, 8), 1)
+    palette.info["transparency"] = 1
+
+    assert not alpha_is_opaque(translucent)
+    assert not alpha_is_opaque(palette)
+    assert is_grayscale(_gray_rgb()) and not is_grayscale(_photo())
+    assert count_colors(Image.new("RGB", (20, 20), (10, 20, 30))) == 1
+    assert count_colors(_photo()) is None
+
+
+def test_auto_format_uses_content_instead_of_mode() -> None:
+    flat_rgba = Image.new("RGBA", (32, 32), (255, 0, 0, 255))
+    translucent = Image.new("RGBA", (32, 32), (255, 0, 0, 128))
+
+    assert resolve_output_format("auto", _photo("RGBA"), _FORMATS) == "jpeg"
+    assert resolve_output_format("auto", translucent, _FORMATS) == "png"
+    assert resolve_output_format("auto", flat_rgba, _FORMATS) == "png"
+    assert resolve_output_format("auto", _photo("P"), _FORMATS) == "png"
+    assert resolve_output_format("auto", _photo(), _FORMATS) == "jpeg"
+
+
+def test_auto_format_without_pixels_falls_back_to_mode() -> None:
+    source = EncodedSource(data=b"", size=(10, 10), mode="RGBA", bands=("R", "G", "B", "A"))
+
+    assert resolve_output_format("auto", source, _FORMATS) == "png"
+
+
+@pytest.mark.parametrize(
+    ("image", "output_format", "mode", "conversion"),
+    [
+        (_photo("RGBA"), "png", "RGB", "opaque-alpha"),
+        (_photo("RGBA"), "jpeg", "RGB", "opaque-alpha"),
+        (_gray_rgb(), "jpeg", "L", "grayscale"),
+        (_gray_rgb().convert("RGBA"), "png", "L", "opaque-alpha+grayscale"),
+        (_gray_rgb(), "webp", "RGB", None),
+        (_photo(), "jpeg", "RGB", None),
+    ],
+)
+def test_simplify_for_encode(image: Image.Image, output_format: str, mode: str, conversion: str) -> None:
+    simplified, applied = simplify_for_encode(image, output_format)
+
+    assert simplified.mode == mode
+    assert applied == conversion
+    if applied is None:
+        assert simplified is image
+    else:
+        assert simplified.convert("RGB").tobytes() == image.convert("RGB").tobytes()
+
+
+def test_translucent_grayscale_png_keeps_alpha() -> None:
+    image = _gray_rgb().convert("RGBA")
+    image.putalpha(Image.linear_gradient("L").resize(image.size))
+
+    simplified, applied = simplify_for_encode(image, "png")
+
+    assert (simplified.mode, applied) == ("LA", "grayscale")
+    assert simplified.convert("RGBA").tobytes() == image.tobytes()
+
+
+def test_save_image_reports_conversion(tmp_path: Path) -> None:
+    image = _gray_rgb().convert("RGBA")
+
+    converted = save_image(image, image, tmp_path / "gray", SaveOptions(output_format="png"))
+    kept = save_image(image, image, tmp_path / "kept", SaveOptions(output_format="png", content_analysis=False))
+
+    assert converted.success and converted.content_conversion == "opaque-alpha+grayscale"
+    assert kept.success and kept.content_conversion is None
+    with Image.open(tmp_path / "gray.png") as out:
+        assert out.mode == "L"
+    assert (tmp_path / "gray.png").stat().st_size < (tmp_path / "kept.png").stat().st_size
+
+
+def test_icc_tagged_gray_rgb_stays_rgb(tmp_path: Path) -> None:
+    from PIL import ImageCms
+
+    srgb = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    image = _gray_rgb()
+    image.info["icc_profile"] = srgb
+
+    simplified, applied = simplify_for_encode(image, "png")
+    options = SaveOptions(output_format="png", exif_mode="keep", png_palette="off")
+    result = save_image(image, image, tmp_path / "tagged", options)
+
+    assert (simplified is image, applied) == (True, None)
+    assert result.success and result.content_conversion is None
+    with Image.open(tmp_path / "tagged.png") as out:
+        assert out.mode == "RGB"
+        assert out.info.get("icc_profile") == srgb
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import async_api, batch_api, image_save_pipeline, resize_server
+from karuku_resizer.cpu_budget import CpuBudget, available_cpu_count
+from karuku_resizer.image_save_pipeline import SaveOptions, save_image
+
+
+def test_single_lease_gets_all_cores() -> None:
+    budget = CpuBudget(cpu_count=8)
+
+    with budget.lease() as threads:
+        assert threads == 8
+
+    assert budget.stats.as_dict() == {"leases": 1, "peak_jobs": 1, "threads_granted": {8: 1}}
+
+
+def test_concurrent_leases_split_cores() -> None:
+    budget = CpuBudget(cpu_count=8)
+
+    with budget.lease() as first, budget.lease() as second, budget.lease() as third:
+        assert (first, second, third) == (8, 4, 2)
+    with budget.lease() as again:
+        assert again == 8
+
+
+def test_declared_batch_limits_first_job() -> None:
+    budget = CpuBudget(cpu_count=8)
+
+    with budget.batch(4):
+        with budget.lease() as threads:
+            assert threads == 2
+    with budget.batch(16), budget.lease() as threads:
+        assert threads == 1
+    with budget.lease() as threads:
+        assert threads == 8
+
+
+def test_expected_threads_does_not_take_a_lease() -> None:
+    budget = CpuBudget(cpu_count=8)
+
+    assert budget.expected_threads() == 8
+    with budget.batch(4):
+        assert budget.expected_threads() == 2
+    with budget.lease():
+        assert budget.expected_threads() == 4
+    assert budget.stats.leases == 1
+
+
+def test_leases_from_threads_never_exceed_cores() -> None:
+    budget = CpuBudget(cpu_count=4)
+    barrier = threading.Barrier(4)
+    granted: List[int] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        barrier.wait()
+        with budget.lease() as threads:
+            with lock:
+                granted.append(threads)
+            barrier.wait()
+
+    workers = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert budget.stats.peak_jobs == 4
+    assert sorted(granted) == [1, 1, 2, 4]
+    assert available_cpu_count() >= 1
+
+
+@pytest.fixture
+def recorded_saves(monkeypatch: pytest.MonkeyPatch) -> List[Dict[str, Any]]:
+    budget = CpuBudget(cpu_count=8)
+    monkeypatch.setattr(image_save_pipeline, "DEFAULT_CPU_BUDGET", budget)
+    monkeypatch.setattr(batch_api, "DEFAULT_CPU_BUDGET", budget)
+    monkeypatch.setattr(async_api, "DEFAULT_CPU_BUDGET", budget)
+    calls: List[Dict[str, Any]] = []
+    original = Image.Image.save
+
+    def _recording(self: Image.Image, fp: Any, format: Any = None, **params: Any) -> None:
+        calls.append(dict(params, format=format))
+        original(self, fp, format, **params)
+
+    monkeypatch.setattr(Image.Image, "save", _recording)
+    return calls
+
+
+@pytest.mark.skipif("avif" not in image_save_pipeline.supported_output_formats(), reason="AVIF unavailable")
+def test_avif_save_uses_budgeted_threads(tmp_path: Path, recorded_saves: List[Dict[str, Any]]) -> None:
+    image = Image.new("RGB", (32, 24), (10, 120, 200))
+
+    single = save_image(image, image, tmp_path / "single", SaveOptions(output_format="avif"))
+    with image_save_pipeline.DEFAULT_CPU_BUDGET.batch(4):
+        batched = save_image(image, image, tmp_path / "batched", SaveOptions(output_format="avif"))
+
+    assert single.success and batched.success
+    assert [call["max_threads"] for call in recorded_saves] == [8, 2]
+
+
+def test_non_avif_saves_do_not_get_thread_option(tmp_path: Path, recorded_saves: List[Dict[str, Any]]) -> None:
+    image = Image.new("RGB", (32, 24), (10, 120, 200))
+
+    assert save_image(image, image, tmp_path / "photo", SaveOptions(output_format="webp")).success
+    assert "max_threads" not in recorded_saves[0]
+
+
+def test_iter_resize_declares_worker_count(recorded_saves: List[Dict[str, Any]], jpeg_bytes) -> None:
+    budget = image_save_pipeline.DEFAULT_CPU_BUDGET
+    sources = [jpeg_bytes((40, 30), (shade, shade, shade)) for shade in range(4)]
+
+    results = list(
+        batch_api.iter_resize(sources, batch_api.ResizeOptions(resize_value=20, output_format="jpeg"), max_workers=2)
+    )
+
+    assert all(result.success for result in results)
+    assert budget.stats.leases == 4
+    assert set(budget.stats.threads_granted) == {4}
+    with budget.lease() as threads:
+        assert threads == 8
+
+
+def test_aiter_resize_declares_concurrency(recorded_saves: List[Dict[str, Any]], jpeg_bytes) -> None:
+    budget = image_save_pipeline.DEFAULT_CPU_BUDGET
+    sources = [jpeg_bytes((40, 30), (shade, shade, shade)) for shade in range(4)]
+
+    async def _collect() -> List[batch_api.ResizeResult]:
+        options = batch_api.ResizeOptions(resize_value=20, output_format="jpeg")
+        return [result async for result in async_api.aiter_resize(sources, options, max_concurrency=2)]
+
+    results = asyncio.run(_collect())
+
+    assert all(result.success for result in results)
+    assert budget.stats.leases == 4
+    assert budget.stats.peak_jobs == 2
+    assert budget.stats.threads_granted == {4: 4}
+    with budget.lease() as threads:
+        assert threads == 8
+
+
+def test_http_service_encodes_inside_the_budget(recorded_saves: List[Dict[str, Any]], jpeg_bytes) -> None:
+    budget = image_save_pipeline.DEFAULT_CPU_BUDGET
+
+    payload, _timings, _choice = resize_server.process_resize_request(
+        jpeg_bytes((40, 30), (200, 200, 200)), resize_server.parse_resize_params({"value": ["20"]})
+    )
+
+    assert len(payload) > 0
+    assert budget.stats.leases == 1
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from karuku_resizer import dedup, resize_core
+from karuku_resizer.dedup import DedupIndex, hash_file, materialize_duplicate, read_and_hash_file
+from karuku_resizer.durability import DirectorySyncBatcher
+
+
+def test_hash_file_matches_identical_content(tmp_path: Path) -> None:
+    a = tmp_path / "a.bin"
+    b = tmp_path / "b.bin"
+    c = tmp_path / "c.bin"
+    a.write_bytes(b"x" * 3000)
+    b.write_bytes(b"x" * 3000)
+    c.write_bytes(b"x" * 2999 + b"y")
+
+    assert hash_file(a, chunk_size=1024) == hash_file(b)
+    assert hash_file(a) != hash_file(c)
+    assert read_and_hash_file(a) == (b"x" * 3000, hash_file(a))
+
+
+def test_dedup_index_is_keyed_by_settings(tmp_path: Path) -> None:
+    index = DedupIndex()
+    index.register("abc", (1280, 85, "jpeg"), tmp_path / "first.jpg")
+
+    assert index.lookup("abc", (1280, 85, "jpeg")) == tmp_path / "first.jpg"
+    assert index.lookup("abc", (640, 85, "jpeg")) is None
+
+
+def test_materialize_duplicate_prefers_hardlink_and_falls_back_to_copy(tmp_path: Path) -> None:
+    existing = tmp_path / "first.jpg"
+    existing.write_bytes(b"encoded")
+    linked = tmp_path / "sub" / "second.jpg"
+    copied = tmp_path / "third.jpg"
+    copied.write_bytes(b"stale")
+
+    assert materialize_duplicate(existing, linked) == "hardlink"
+    assert linked.stat().st_ino == existing.stat().st_ino
+
+    assert materialize_duplicate(existing, copied, methods=("copy",)) == "copy"
+    assert copied.read_bytes() == b"encoded"
+    assert copied.stat().st_ino != existing.stat().st_ino
+    assert materialize_duplicate(existing, existing) == "same"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_materialize_duplicate_honours_durable_mode(tmp_path: Path, monkeypatch) -> None:
+    existing = tmp_path / "first.jpg"
+    existing.write_bytes(b"encoded")
+    synced_files: list[Path] = []
+    synced_dirs: list[Path] = []
+    syncer = DirectorySyncBatcher(window_seconds=60, sync_func=synced_dirs.append)
+    monkeypatch.setattr(dedup, "fsync_file", synced_files.append)
+    monkeypatch.setattr(dedup, "default_directory_syncer", lambda: syncer)
+
+    materialize_duplicate(existing, tmp_path / "atomic.jpg", methods=("copy",))
+    materialize_duplicate(existing, tmp_path / "sub" / "durable.jpg", methods=("copy",), durability="durable")
+    syncer.flush()
+
+    assert len(synced_files) == 1 and synced_files[0].name.startswith(".durable.jpg.")
+    assert synced_dirs == [tmp_path / "sub"]
+
+
+def test_cli_dedup_skips_repeated_encodes(tmp_path: Path, monkeypatch, capsys) -> None:
+    src = tmp_path / "in"
+    dst = tmp_path / "out"
+    for folder in ("team_a", "team_b", "team_c"):
+        (src / folder).mkdir(parents=True)
+    Image.new("RGB", (300, 200), (10, 20, 30)).save(src / "team_a" / "photo.jpg", quality=90)
+    for folder in ("team_b", "team_c"):
+        (src / folder / "photo.jpg").write_bytes((src / "team_a" / "photo.jpg").read_bytes())
+    Image.new("RGB", (300, 200), (90, 20, 30)).save(src / "team_c" / "other.jpg", quality=90)
+
+    calls: list[Path] = []
+    original = resize_core.resize_and_compress_image
+
+    def _counting(**kwargs):
+        calls.append(Path(kwargs["source_path"]))
+        assert kwargs["source_bytes"] == Path(kwargs["source_path"]).read_bytes()
+        return original(**kwargs)
+
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(resize_core, "resize_and_compress_image", _counting)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["karukuresize-cli", "-s", str(src), "-d", str(dst), "-w", "100", "--dedup", "--json"],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert len(calls) == 2
+    assert summary["processed_count"] == 4
+    assert summary["dedup"]["encodes_avoided"] == 2
+    outputs = sorted(p.relative_to(dst).as_posix() for p in dst.rglob("*.jpg"))
+    assert outputs == ["team_a/photo.jpg", "team_b/photo.jpg", "team_c/other.jpg", "team_c/photo.jpg"]
+    assert (dst / "team_b" / "photo.jpg").read_bytes() == (dst / "team_a" / "photo.jpg").read_bytes()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import durability
+from karuku_resizer.durability import DirectorySyncBatcher, normalize_durability, write_with_durability
+from karuku_resizer.image_save_pipeline import SaveOptions, save_image
+from karuku_resizer.resize_core import resize_and_compress_image
+
+
+def _write_bytes(payload: bytes):
+    def _write(path: Path) -> None:
+        path.write_bytes(payload)
+
+    return _write
+
+
+def test_normalize_durability_falls_back_to_atomic() -> None:
+    assert normalize_durability("DURABLE") == "durable"
+    assert normalize_durability("fast") == "fast"
+    assert normalize_durability("unknown") == "atomic"
+    assert normalize_durability(None) == "atomic"
+
+
+def test_fast_mode_writes_directly_without_rename(tmp_path: Path, monkeypatch) -> None:
+    written: list[Path] = []
+    monkeypatch.setattr(os, "replace", lambda *_args: pytest.fail("fast mode must not rename"))
+
+    def _write(path: Path) -> None:
+        written.append(path)
+        path.write_bytes(b"data")
+
+    write_with_durability(tmp_path / "out.jpg", _write, "fast")
+
+    assert written == [tmp_path / "out.jpg"]
+    assert (tmp_path / "out.jpg").read_bytes() == b"data"
+
+
+def test_fast_mode_removes_partial_file_on_failure(tmp_path: Path) -> None:
+    def _broken(path: Path) -> None:
+        path.write_bytes(b"partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_with_durability(tmp_path / "out.jpg", _broken, "fast")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fast_mode_keeps_existing_file_when_writer_fails_before_opening(tmp_path: Path) -> None:
+    target = tmp_path / "out.jpg"
+    target.write_bytes(b"precious")
+
+    def _denied(_path: Path) -> None:
+        raise PermissionError("denied")
+
+    with pytest.raises(PermissionError):
+        write_with_durability(target, _denied, "fast")
+
+    assert target.read_bytes() == b"precious"
+
+
+def test_atomic_mode_leaves_no_temp_files(tmp_path: Path) -> None:
+    target = tmp_path / "out.jpg"
+    target.write_bytes(b"old")
+
+    write_with_durability(target, _write_bytes(b"new"), "atomic")
+
+    assert target.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.jpg"]
+
+
+def test_durable_mode_fsyncs_file_and_batches_directory_syncs(tmp_path: Path, monkeypatch) -> None:
+    fsynced: list[Path] = []
+    synced_dirs: list[Path] = []
+    monkeypatch.setattr(durability, "fsync_file", lambda path: fsynced.append(Path(path)))
+    syncer = DirectorySyncBatcher(window_seconds=3600, sync_func=synced_dirs.append)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+
+    for i in range(5):
+        write_with_durability(tmp_path / "a" / f"{i}.jpg", _write_bytes(b"x"), "durable", syncer=syncer)
+        write_with_durability(tmp_path / "b" / f"{i}.jpg", _write_bytes(b"x"), "durable", syncer=syncer)
+
+    assert len(fsynced) == 10
+    assert all(p.name.endswith(".tmp") for p in fsynced)
+    assert synced_dirs == []
+    assert syncer.pending_count == 2
+
+    assert syncer.flush() == 2
+    assert sorted(synced_dirs) == [tmp_path / "a", tmp_path / "b"]
+
+
+def test_directory_sync_batcher_flushes_when_pending_limit_reached(tmp_path: Path) -> None:
+    synced: list[Path] = []
+    syncer = DirectorySyncBatcher(window_seconds=3600, max_pending=2, sync_func=synced.append)
+
+    syncer.mark(tmp_path / "a")
+    assert synced == []
+    syncer.mark(tmp_path / "b")
+    assert len(synced) == 2
+    assert syncer.pending_count == 0
+
+
+@pytest.mark.parametrize("mode", ["fast", "atomic", "durable"])
+def test_save_paths_honor_durability(tmp_path: Path, mode: str) -> None:
+    image = Image.new("RGB", (120, 80), (20, 40, 60))
+    result = save_image(
+        source_image=image,
+        resized_image=image,
+        output_path=tmp_path / "pipeline",
+        options=SaveOptions(output_format="png", durability=mode),  # type: ignore[arg-type]
+    )
+    assert result.success
+    assert (tmp_path / "pipeline.png").exists()
+
+    source = tmp_path / "src.jpg"
+    image.save(source)
+    ok, _keep, _size = resize_and_compress_image(
+        source_path=source,
+        dest_path=tmp_path / "out" / "core.jpg",
+        target_width=60,
+        quality=80,
+        format="jpeg",
+        durability=mode,
+    )
+    assert ok
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["core.jpg"]
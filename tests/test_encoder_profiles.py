@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import resize_core
+from karuku_resizer.encoder_profiles import encoder_settings, normalize_encoder_profile
+from karuku_resizer.image_save_pipeline import SaveOptions, build_encoder_save_kwargs, save_image
+from karuku_resizer.processing_preset_store import builtin_processing_presets, default_processing_values
+
+
+def _photo(size: tuple = (120, 90)) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (gradient, gradient.rotate(90), Image.effect_noise(size, 30)))
+
+
+def test_smallest_profile_keeps_previous_kwargs() -> None:
+    assert build_encoder_save_kwargs("jpeg", 85) == build_encoder_save_kwargs("jpeg", 85, profile="smallest")
+    jpeg = build_encoder_save_kwargs("jpeg", 85, profile="smallest")
+    png = build_encoder_save_kwargs("png", 85, profile="smallest")
+
+    assert jpeg["optimize"] is True and jpeg["progressive"] is True
+    assert png["optimize"] is True and png["compress_level"] == 1
+    assert build_encoder_save_kwargs("webp", 85, webp_method=6)["method"] == 6
+
+
+@pytest.mark.parametrize(
+    ("profile", "jpeg_flags", "png_level", "webp_method", "avif_speed"),
+    [
+        ("fastest", (False, False), 1, 0, 10),
+        ("balanced", (True, False), 6, 4, 8),
+    ],
+)
+def test_faster_profiles_map_to_codec_parameters(
+    profile: str,
+    jpeg_flags: tuple,
+    png_level: int,
+    webp_method: int,
+    avif_speed: int,
+) -> None:
+    jpeg = build_encoder_save_kwargs("jpeg", 85, profile=profile)  # type: ignore[arg-type]
+    png = build_encoder_save_kwargs("png", 85, profile=profile)  # type: ignore[arg-type]
+
+    assert (jpeg["optimize"], jpeg["progressive"]) == jpeg_flags
+    assert png["optimize"] is False and png["compress_level"] == png_level
+    assert build_encoder_save_kwargs("webp", 85, webp_method=6, profile=profile)["method"] == webp_method  # type: ignore[arg-type]
+    assert build_encoder_save_kwargs("avif", 85, avif_speed=2, profile=profile)["speed"] == avif_speed  # type: ignore[arg-type]
+
+
+def test_explicit_faster_settings_win_over_profile_limits() -> None:
+    settings = encoder_settings("balanced")
+
+    assert settings.webp_method(2) == 2
+    assert settings.avif_speed(10) == 10
+    assert normalize_encoder_profile(" Fastest ") == "fastest"
+    assert normalize_encoder_profile("turbo") == "smallest"
+
+
+def test_save_image_uses_profile(tmp_path: Path) -> None:
+    image = _photo()
+
+    fastest = save_image(image, image, tmp_path / "fast", SaveOptions(output_format="jpeg", encoder_profile="fastest"))
+    smallest = save_image(image, image, tmp_path / "small", SaveOptions(output_format="jpeg"))
+
+    assert fastest.success and smallest.success
+    with Image.open(tmp_path / "fast.jpg") as fast, Image.open(tmp_path / "small.jpg") as small:
+        assert not fast.info.get("progressive")
+        assert small.info.get("progressive")
+
+
+def test_presets_carry_encoder_profile() -> None:
+    assert default_processing_values()["encoder_profile"] == "smallest"
+    assert all("encoder_profile" in preset.values for preset in builtin_processing_presets())
+
+
+def test_cli_encoder_profile(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    src = tmp_path / "in"
+    src.mkdir()
+    _photo((200, 150)).save(src / "photo.jpg", quality=95)
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "karukuresize-cli", "-s", str(src), "-d", str(tmp_path / "out"),
+            "-w", "100", "--encoder-profile", "fastest", "--json",
+        ],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["processed_count"] == 1
+    assert summary["options"]["encoder_profile"] == "fastest"
+    with Image.open(tmp_path / "out" / "photo.jpg") as out:
+        assert not out.info.get("progressive")
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from PIL import Image
+
+from karuku_resizer.ui_file_load_helpers import load_candidates_in_order, load_paths_worker
+from karuku_resizer.ui_text_presenter import build_file_load_error_payload
+
+
+def _drain(out_queue: "queue.Queue[Dict[str, Any]]") -> List[Dict[str, Any]]:
+    messages = []
+    while not out_queue.empty():
+        messages.append(out_queue.get_nowait())
+    return messages
+
+
+def test_results_are_delivered_in_index_order_despite_uneven_decode_times() -> None:
+    paths = [Path(f"img_{i}.jpg") for i in range(12)]
+
+    def _decode(path: Path) -> Image.Image:
+        index = int(path.stem.split("_")[1])
+        time.sleep(0.02 if index % 3 == 0 else 0.001)
+        if index == 5:
+            raise OSError("broken")
+        return Image.new("RGB", (index + 1, 1))
+
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    completed = load_candidates_in_order(
+        paths,
+        threading.Event(),
+        out_queue,
+        build_file_load_error_payload=build_file_load_error_payload,
+        max_workers=4,
+        decode=_decode,
+    )
+
+    messages = _drain(out_queue)
+    assert completed is True
+    assert [m["index"] for m in messages] == list(range(1, 13))
+    assert [m["type"] for m in messages].count("load_error") == 1
+    assert messages[5]["type"] == "load_error"
+    assert messages[0]["image"].size == (1, 1)
+
+
+def test_cancel_stops_promptly_and_reports_done() -> None:
+    cancel_event = threading.Event()
+    started = threading.Event()
+
+    def _slow_decode(path: Path) -> Image.Image:
+        started.set()
+        time.sleep(0.2)
+        return Image.new("RGB", (1, 1))
+
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    paths = [Path(f"{i}.jpg") for i in range(100)]
+    threading.Timer(0.05, cancel_event.set).start()
+
+    begin = time.perf_counter()
+    completed = load_candidates_in_order(
+        paths,
+        cancel_event,
+        out_queue,
+        build_file_load_error_payload=build_file_load_error_payload,
+        max_workers=2,
+        decode=_slow_decode,
+    )
+    elapsed = time.perf_counter() - begin
+
+    assert started.is_set()
+    assert completed is False
+    assert elapsed < 1.0
+    assert _drain(out_queue)[-1] == {"type": "done", "canceled": True}
+
+
+def test_load_paths_worker_keeps_message_protocol(tmp_path: Path) -> None:
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (10 + i, 10)).save(path)
+        paths.append(path)
+    paths.append(tmp_path / "missing.png")
+
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    load_paths_worker(paths, threading.Event(), out_queue, build_file_load_error_payload=build_file_load_error_payload)
+
+    messages = _drain(out_queue)
+    assert messages[0] == {"type": "scan_done", "total": 7}
+    loaded = [m for m in messages if m["type"] == "loaded"]
+    assert [m["path"] for m in loaded] == paths[:6]
+    assert [m["image"].size[0] for m in loaded] == [10, 11, 12, 13, 14, 15]
+    assert messages[-2]["type"] == "load_error"
+    assert messages[-1] == {"type": "done", "canceled": False}
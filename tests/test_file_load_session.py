@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import queue
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from PIL import Image
+
+from karuku_resizer.ui import file_load_session
+from karuku_resizer.ui.file_load_session import (
+    FILE_LOAD_POLL_BUSY_MS,
+    FILE_LOAD_POLL_FRAME_MS,
+    FILE_LOAD_POLL_IDLE_MAX_MS,
+    next_file_load_poll_interval,
+    poll_file_load_queue,
+)
+from karuku_resizer.ui_file_load_helpers import DecodedImageStore, LoadMessageBatcher, load_paths_worker
+from karuku_resizer.ui_text_presenter import build_file_load_error_payload
+
+
+class _Var:
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+
+    def set(self, value: Any) -> None:
+        self.values.append(value)
+
+
+def _dummy_app(out_queue: "queue.Queue[Dict[str, Any]]", store: DecodedImageStore) -> SimpleNamespace:
+    appended: List[tuple] = []
+    app = SimpleNamespace(
+        _is_loading_files=True,
+        _file_load_queue=out_queue,
+        _file_load_image_store=store,
+        _file_load_after_id=None,
+        _file_load_poll_ms=FILE_LOAD_POLL_FRAME_MS,
+        _file_load_progress_dirty=False,
+        _file_load_last_path_text="",
+        _file_load_last_failed=False,
+        _file_load_total_candidates=0,
+        _file_load_loaded_count=0,
+        _file_load_failed_details=[],
+        _file_load_failed_paths=[],
+        _file_load_limited=False,
+        _file_load_limit=0,
+        _file_load_started_at=0.0,
+        _file_load_mode_label="読込",
+        _file_load_root_dir=None,
+        progress_bar=_Var(),
+        operation_stage_var=_Var(),
+        status_var=_Var(),
+        appended=appended,
+        scheduled=[],
+    )
+    app._append_loaded_job = lambda path, image, file_size=None: appended.append((path, image.size, file_size))
+    app._set_operation_stage = lambda _text: None
+    app._handle_file_load_message = lambda message: file_load_session.handle_file_load_message(app, message)
+    app._poll_file_load_queue = lambda: None
+
+    def _after(ms: int, _callback: Any) -> str:
+        app.scheduled.append(ms)
+        return "after-id"
+
+    app.after = _after
+    return app
+
+
+def test_batcher_coalesces_until_size_or_flush() -> None:
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    batcher = LoadMessageBatcher(out_queue, max_items=3, max_delay=60)
+
+    for i in range(4):
+        batcher.add({"type": "loaded", "index": i})
+    assert out_queue.qsize() == 1
+    batcher.flush()
+
+    first, second = out_queue.get_nowait(), out_queue.get_nowait()
+    assert [m["index"] for m in first["messages"]] == [0, 1, 2]
+    assert [m["index"] for m in second["messages"]] == [3]
+
+
+def test_image_store_blocks_when_full_and_releases_on_cancel() -> None:
+    store = DecodedImageStore(capacity=1)
+    cancel_event = threading.Event()
+    assert store.put(Image.new("RGB", (1, 1)), cancel_event) == 1
+
+    threading.Timer(0.05, cancel_event.set).start()
+    assert store.put(Image.new("RGB", (1, 1)), cancel_event) is None
+    assert store.take(1) is not None
+    assert len(store) == 0
+
+
+def test_worker_sends_handles_and_file_sizes_in_batches(tmp_path: Path) -> None:
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (8 + i, 8)).save(path)
+        paths.append(path)
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    store = DecodedImageStore(capacity=2)
+    app = _dummy_app(out_queue, store)
+
+    worker = threading.Thread(
+        target=load_paths_worker,
+        args=(paths, threading.Event(), out_queue),
+        kwargs={"build_file_load_error_payload": build_file_load_error_payload, "image_store": store, "batch_size": 4},
+    )
+    worker.start()
+    # The store holds only 2 images, so the worker needs the UI side to drain it.
+    finished = []
+    app._finish_recursive_load = lambda canceled: finished.append(canceled)
+    while not finished:
+        message = out_queue.get(timeout=5)
+        if message["type"] == "batch":
+            assert all("image" not in item for item in message["messages"])
+        file_load_session.handle_file_load_message(app, message)
+    worker.join(timeout=5)
+
+    assert finished == [False]
+    assert [entry[0] for entry in app.appended] == paths
+    assert [entry[1][0] for entry in app.appended] == [8, 9, 10, 11, 12]
+    assert [entry[2] for entry in app.appended] == [p.stat().st_size for p in paths]
+    assert len(store) == 0
+
+
+def test_poll_updates_widgets_once_per_frame() -> None:
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    store = DecodedImageStore(capacity=64)
+    app = _dummy_app(out_queue, store)
+    app._file_load_total_candidates = 40
+    messages = []
+    for i in range(40):
+        handle = store.put(Image.new("RGB", (1, 1)), threading.Event())
+        messages.append({"type": "loaded", "path": Path(f"{i}.jpg"), "handle": handle, "index": i + 1, "file_size": 1})
+    out_queue.put({"type": "batch", "messages": messages})
+
+    poll_file_load_queue(app)
+
+    assert app._file_load_loaded_count == 40
+    assert len(app.appended) == 40
+    assert app.progress_bar.values == [1.0]
+    assert len(app.status_var.values) == 1
+    assert app.scheduled == [FILE_LOAD_POLL_FRAME_MS]
+
+
+def test_poll_interval_adapts_to_backlog() -> None:
+    assert next_file_load_poll_interval(16, handled=10, backlog=True) == FILE_LOAD_POLL_BUSY_MS
+    assert next_file_load_poll_interval(4, handled=3, backlog=False) == FILE_LOAD_POLL_FRAME_MS
+    assert next_file_load_poll_interval(16, handled=0, backlog=False) == 32
+    assert next_file_load_poll_interval(80, handled=0, backlog=False) == FILE_LOAD_POLL_IDLE_MAX_MS
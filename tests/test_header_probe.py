@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+from PIL import Image, features
+
+from karuku_resizer import resize_core
+from karuku_resizer.header_probe import ImageHeader, ProbeStats, probe_header, probe_headers
+from karuku_resizer.orientation import read_orientation
+
+_SIZE = (97, 41)
+
+
+def _exif(orientation: int) -> bytes:
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    return exif.tobytes()
+
+
+def _frames(mode: str = "RGB") -> Dict[str, object]:
+    return {"save_all": True, "append_images": [Image.new(mode, _SIZE, (9, 9, 9))]}
+
+
+_WRITERS: Dict[str, Callable[[Path], None]] = {
+    "rotated.jpg": lambda p: Image.new("RGB", _SIZE).save(p, exif=_exif(6)),
+    "gray.jpg": lambda p: Image.new("L", _SIZE).save(p),
+    "rgba.png": lambda p: Image.new("RGBA", _SIZE).save(p),
+    "trns.png": lambda p: Image.new("P", _SIZE).save(p, transparency=0),
+    "rotated.png": lambda p: Image.new("RGB", _SIZE).save(p, exif=_exif(8)),
+    "anim.png": lambda p: Image.new("RGB", _SIZE).save(p, **_frames()),
+    "lossy.webp": lambda p: Image.new("RGB", _SIZE).save(p),
+    "alpha.webp": lambda p: Image.new("RGBA", _SIZE, (1, 2, 3, 4)).save(p),
+    "lossless.webp": lambda p: Image.new("RGBA", _SIZE, (1, 2, 3, 4)).save(p, lossless=True),
+    "rotated.webp": lambda p: Image.new("RGB", _SIZE).save(p, exif=_exif(3)),
+    "anim.webp": lambda p: Image.new("RGB", _SIZE).save(p, **_frames()),
+    "still.gif": lambda p: Image.new("RGB", _SIZE).save(p),
+}
+if features.check("avif"):
+    _WRITERS["alpha.avif"] = lambda p: Image.new("RGBA", _SIZE, (1, 2, 3, 4)).save(p)
+
+
+@pytest.mark.parametrize("name", sorted(_WRITERS))
+def test_probe_matches_pillow(tmp_path: Path, name: str) -> None:
+    path = tmp_path / name
+    _WRITERS[name](path)
+
+    header = probe_header(path)
+
+    with Image.open(path) as opened:
+        expected = ImageHeader(
+            format=opened.format,
+            width=opened.width,
+            height=opened.height,
+            orientation=read_orientation(opened),
+            has_alpha="A" in opened.getbands() or "transparency" in opened.info,
+            animated=bool(getattr(opened, "is_animated", False)),
+        )
+    assert header == expected
+
+
+def test_probe_reports_oriented_size(tmp_path: Path) -> None:
+    _WRITERS["rotated.jpg"](tmp_path / "rotated.jpg")
+
+    header = probe_header(tmp_path / "rotated.jpg")
+
+    assert header is not None
+    assert header.oriented_size == (41, 97)
+    assert header.pixels == 97 * 41
+
+
+def test_truncated_or_unknown_files_return_none(tmp_path: Path) -> None:
+    _WRITERS["lossy.webp"](tmp_path / "full.webp")
+    (tmp_path / "cut.webp").write_bytes((tmp_path / "full.webp").read_bytes()[:20])
+    (tmp_path / "text.jpg").write_bytes(b"not an image")
+    stats = ProbeStats()
+
+    results = probe_headers([tmp_path / "cut.webp", tmp_path / "text.jpg", tmp_path / "full.webp"], stats)
+
+    assert [header is None for _path, header in results] == [True, True, False]
+    assert stats.as_dict()["failed_count"] == 2
+    assert stats.as_dict()["formats"] == {"WEBP": 1}
+
+
+def test_cli_filters_by_header_width(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    src = tmp_path / "in"
+    src.mkdir()
+    Image.new("RGB", (50, 40)).save(src / "tiny.jpg")
+    Image.new("RGB", (150, 40)).save(src / "small.jpg")
+    Image.new("RGB", (300, 40)).save(src / "portrait.jpg", exif=_exif(6))  # 表示上は 40x300 だが画素幅で判定
+    Image.new("RGB", (400, 300)).save(src / "large.jpg")
+    decoded: list[str] = []
+    original = resize_core.resize_and_compress_image
+
+    def _recording(**kwargs):
+        decoded.append(Path(kwargs["source_path"]).name)
+        return original(**kwargs)
+
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(resize_core, "resize_and_compress_image", _recording)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "karukuresize-cli", "-s", str(src), "-d", str(tmp_path / "out"),
+            "-w", "200", "--min-width", "100", "--only-larger-than", "--json",
+        ],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert sorted(decoded) == ["large.jpg", "portrait.jpg"]
+    assert summary["total_files"] == 2 and summary["processed_count"] == 2
+    assert summary["options"]["min_width"] == 100 and summary["options"]["only_larger_than"] is True
+    assert summary["probe"]["skipped_min_width"] == 1
+    assert summary["probe"]["skipped_not_larger"] == 1
+    assert summary["probe"]["formats"] == {"JPEG": 4}
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--only-larger-than"]])
+def test_cli_filter_uses_the_same_width_as_resize(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys, extra_args: list
+) -> None:
+    src = tmp_path / "in"
+    src.mkdir()
+    Image.new("RGB", (400, 300)).save(src / "rotated.jpg", exif=_exif(6))  # 表示上は 300x400
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["karukuresize-cli", "-s", str(src), "-d", str(tmp_path / "out"), "-w", "350", "--json", *extra_args],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["processed_count"] == 1
+    with Image.open(tmp_path / "out" / "rotated.jpg") as out:
+        assert out.size == (350, 262)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import gui_app
+from karuku_resizer.gui_app import ImageJob, PreviewEstimationRequest, ResizeApp, ResizePlan
+from karuku_resizer.preview_service import PreviewService, ResizedPreviewCache, precompute_order
+
+
+def _request(size: tuple, mode: str, output_format: str) -> PreviewEstimationRequest:
+    return PreviewEstimationRequest(
+        quality_for_preview=75,
+        webp_method=6,
+        avif_speed=6,
+        webp_lossless=False,
+        precise_options=None,
+        fast_cache_key=("fast", size[0], size[1], mode, output_format),
+        precise_cache_key=None,
+    )
+
+
+def _dummy_app(job_count: int, current_index: int) -> SimpleNamespace:
+    scheduled: List[Callable[[], None]] = []
+    app = SimpleNamespace(
+        jobs=[ImageJob(Path(f"{i}.png"), Image.new("RGB", (40 + i, 20))) for i in range(job_count)],
+        current_index=current_index,
+        _is_loading_files=False,
+        _operation_scope=None,
+        _last_user_input_at=0.0,
+        _idle_precompute_after_id=None,
+        _idle_precompute_generation=0,
+        _idle_precompute_completed=set(),
+        _preview_service=PreviewService(max_workers=1),
+        _preview_cache=ResizedPreviewCache(max_bytes=64 * 1024 * 1024),
+        _snapshot_resize_plan=lambda: ResizePlan(mode="ratio", ratio_percent=50),
+        _resolve_target_from_resize_plan=ResizeApp._resolve_target_from_resize_plan,
+        _resize_image_to_target=ResizeApp._resize_image_to_target,
+        _resolve_output_format_for_image=lambda _image: "png",
+        _snapshot_preview_estimation_request=_request,
+        scheduled=scheduled,
+        completed_order=[],
+    )
+    app.after = lambda _ms, callback: scheduled.append(callback) or f"after-{len(scheduled)}"
+    app.after_cancel = lambda _after_id: None
+    for name in (
+        "_run_idle_precompute_step",
+        "_submit_idle_precompute",
+        "_schedule_idle_precompute",
+        "_preview_cache_bytes",
+        "_note_user_activity",
+        "_remember_resized_preview",
+    ):
+        setattr(app, name, getattr(ResizeApp, name).__get__(app))
+    return app
+
+
+def _pump(app: SimpleNamespace, rounds: int = 50) -> None:
+    """Run queued Tk callbacks, waiting for the preview worker between rounds."""
+    for _ in range(rounds):
+        deadline = time.monotonic() + 5
+        service = app._preview_service
+        while service.pending_count() or service.stats.completed < service.stats.started:
+            assert time.monotonic() < deadline
+            time.sleep(0.002)
+        if not app.scheduled:
+            return
+        callbacks, app.scheduled[:] = list(app.scheduled), []
+        for callback in callbacks:
+            before = set(app._idle_precompute_completed)
+            callback()
+            app.completed_order.extend(
+                index for index, job in enumerate(app.jobs) if id(job) in app._idle_precompute_completed - before
+            )
+
+
+def test_precompute_order_visits_neighbours_first() -> None:
+    assert list(precompute_order(2, 6)) == [3, 1, 4, 0, 5]
+    assert list(precompute_order(0, 3)) == [1, 2]
+    assert list(precompute_order(None, 3)) == [0, 1, 2]
+    assert list(precompute_order(0, 0)) == []
+
+
+def test_idle_step_fills_neighbour_caches_in_order() -> None:
+    app = _dummy_app(4, current_index=1)
+
+    app._run_idle_precompute_step()
+    _pump(app)
+    app._preview_service.shutdown()
+
+    assert app.completed_order == [2, 0, 3]
+    assert app.jobs[1].resized is None
+    for index in (0, 2, 3):
+        job = app.jobs[index]
+        assert job.resized is not None and job.resized.size == job.preview_target_size
+        assert job.preview_target_size == ((40 + index) // 2, 10)
+        assert list(job.preview_size_cache.values())[0][0] > 0
+    assert len(app._preview_cache) == 3
+
+
+def test_idle_step_skips_jobs_without_target_size() -> None:
+    app = _dummy_app(4, current_index=1)
+    resolve = ResizeApp._resolve_target_from_resize_plan
+    # Only the first neighbour visited (index 2) has no resolvable target size.
+    app._resolve_target_from_resize_plan = lambda size, plan: None if size[0] == 42 else resolve(size, plan)
+
+    app._run_idle_precompute_step()
+    _pump(app)
+    app._preview_service.shutdown()
+
+    assert app.completed_order == [0, 3]
+    assert app.jobs[2].resized is None
+
+
+def test_idle_step_respects_memory_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(gui_app, "PREVIEW_PRECOMPUTE_MEMORY_BUDGET_MB", 0)
+    app = _dummy_app(3, current_index=0)
+
+    app._run_idle_precompute_step()
+    _pump(app)
+    app._preview_service.shutdown()
+
+    assert all(job.resized is None for job in app.jobs[1:])
+    assert app._preview_service.stats.submitted == 0
+
+
+def test_user_input_stops_precompute_and_postpones_it() -> None:
+    app = _dummy_app(3, current_index=0)
+    cancelled: List[Any] = []
+    app._preview_service.cancel_background = lambda: cancelled.append(True) or 0
+
+    app._note_user_activity()
+    app.scheduled[-1]()
+
+    assert cancelled == [True]
+    assert app._idle_precompute_generation == 1
+    # Still inside the idle delay: the step only re-arms itself.
+    assert app._preview_service.stats.submitted == 0
+    assert len(app.scheduled) == 2
+    app._preview_service.shutdown()
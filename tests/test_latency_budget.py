@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import image_save_pipeline
+from karuku_resizer.batch_api import ResizeOptions, resize_one
+from karuku_resizer.image_save_pipeline import SaveOptions, save_image
+from karuku_resizer.latency_budget import EncodeCostModel, cost_model_format
+
+_MP = 1_000_000
+
+
+@pytest.fixture
+def model(monkeypatch: pytest.MonkeyPatch) -> EncodeCostModel:
+    fresh = EncodeCostModel()
+    monkeypatch.setattr(image_save_pipeline, "DEFAULT_COST_MODEL", fresh)
+    return fresh
+
+
+def _photo(size: tuple = (64, 48)) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (gradient, gradient.rotate(90), Image.effect_noise(size, 20)))
+
+
+def test_requested_setting_kept_when_it_fits() -> None:
+    choice = EncodeCostModel().choose("webp", 6, 1 * _MP, 2.0)
+
+    assert (choice.parameter, choice.requested, choice.chosen) == ("method", 6, 6)
+    assert not choice.downgraded
+    assert choice.predicted_seconds <= choice.budget_seconds
+
+
+def test_slowest_setting_within_budget_is_chosen() -> None:
+    cost = EncodeCostModel()
+
+    avif = cost.choose("avif", 0, 4 * _MP, 2.0)
+    webp = cost.choose("webp", 6, 20 * _MP, 2.5)
+
+    assert (avif.parameter, avif.chosen) == ("speed", 7)
+    assert webp.chosen == 4 and webp.downgraded
+
+
+def test_fastest_setting_when_nothing_fits() -> None:
+    cost = EncodeCostModel()
+
+    assert cost.choose("avif", 2, 100 * _MP, 0.5).chosen == 10
+    assert cost.choose("webp", 6, 100 * _MP, 0.1).chosen == 0
+
+
+def test_observations_refine_predictions() -> None:
+    cost = EncodeCostModel()
+    seed_speed8 = cost.predict("avif", 8, _MP)
+
+    cost.observe("avif", 6, _MP, 0.57 * 2)
+
+    assert cost.predict("avif", 6, _MP) == pytest.approx(1.14)
+    assert cost.predict("avif", 8, _MP) == pytest.approx(seed_speed8 * 2)
+    cost.observe("avif", 6, _MP, 0.57)
+    assert cost.predict("avif", 6, _MP) == pytest.approx(1.14 + 0.3 * (0.57 - 1.14))
+    assert cost.as_dict()["samples"] == 2
+
+
+def test_avif_timings_are_kept_per_thread_count() -> None:
+    cost = EncodeCostModel()
+    seed_speed8 = cost.predict("avif", 8, _MP)
+
+    cost.observe("avif", 6, _MP, 0.57 / 4, threads=8)
+
+    assert cost.predict("avif", 6, _MP, threads=8) == pytest.approx(0.57 / 4)
+    assert cost.predict("avif", 8, _MP, threads=8) == pytest.approx(seed_speed8 / 4)
+    assert cost.predict("avif", 6, _MP) == pytest.approx(0.57)
+    # No measurement at 4 threads or fewer: fall back to the single-thread seed.
+    assert cost.predict("avif", 8, _MP, threads=4) == pytest.approx(seed_speed8)
+    assert cost.choose("avif", 0, 4 * _MP, 2.0, threads=8).threads == 8
+    assert cost.as_dict()["seconds_per_megapixel"] == {"avif@8:6": pytest.approx(0.1425)}
+
+
+def test_webp_ignores_thread_count() -> None:
+    cost = EncodeCostModel()
+
+    cost.observe("webp", 6, _MP, 0.38, threads=8)
+
+    assert cost.predict("webp", 6, _MP) == pytest.approx(0.38)
+    assert cost.choose("webp", 6, _MP, 1.0, threads=8).threads == 1
+
+
+def test_only_lossy_webp_and_avif_are_modelled() -> None:
+    assert cost_model_format({"format": "AVIF"}) == "avif"
+    assert cost_model_format({"format": "WEBP", "lossless": False}) == "webp"
+    assert cost_model_format({"format": "WEBP", "lossless": True}) is None
+    assert cost_model_format({"format": "JPEG"}) is None
+
+
+def test_save_image_reports_chosen_settings(tmp_path: Path, model: EncodeCostModel) -> None:
+    image = _photo()
+
+    result = save_image(image, image, tmp_path / "out", SaveOptions(output_format="webp", latency_budget_seconds=0.0))
+
+    assert result.success
+    choice = result.encode_choice
+    assert choice is not None
+    assert (choice.format, choice.parameter, choice.requested, choice.chosen) == ("webp", "method", 6, 0)
+    assert choice.actual_seconds is not None and choice.actual_seconds > 0
+    assert model.as_dict()["seconds_per_megapixel"].keys() == {"webp:0"}
+
+
+def test_without_budget_times_are_still_recorded(tmp_path: Path, model: EncodeCostModel) -> None:
+    image = _photo()
+
+    webp = save_image(image, image, tmp_path / "webp", SaveOptions(output_format="webp"))
+    jpeg = save_image(image, image, tmp_path / "jpeg", SaveOptions(output_format="jpeg", latency_budget_seconds=1.0))
+
+    assert webp.encode_choice is None and jpeg.encode_choice is None
+    assert model.as_dict()["samples"] == 1
+
+
+def test_batch_api_spends_remaining_budget(model: EncodeCostModel) -> None:
+    buffer = io.BytesIO()
+    _photo((128, 96)).save(buffer, format="PNG")
+
+    result = resize_one(
+        buffer.getvalue(),
+        ResizeOptions(resize_value=64, output_format="webp", latency_budget_seconds=5.0),
+    )
+
+    assert result.success and result.encode_choice is not None
+    assert result.encode_choice.chosen == 6
+    assert 0 < result.encode_choice.budget_seconds <= 5.0
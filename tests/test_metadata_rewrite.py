@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from PIL import Image, ImageChops, PngImagePlugin
+
+from karuku_resizer.image_save_pipeline import ExifEditValues, SaveOptions, save_image
+from karuku_resizer.metadata_rewrite import MetadataEdit, rewrite_metadata_file
+from karuku_resizer.passthrough import PassthroughStats
+from karuku_resizer.resize_core import resize_and_compress_image
+
+_GPS_IFD = 0x8825
+_ARTIST = 0x013B
+_XMP = b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><exif:GPSLatitude>35,0N</exif:GPSLatitude></x:xmpmeta>'
+_ICC = b"fake-icc-profile"
+
+
+def _exif_with_gps() -> Image.Exif:
+    exif = Image.Exif()
+    exif[_ARTIST] = "tester"
+    exif.get_ifd(_GPS_IFD)[2] = (35.0, 0.0, 0.0)
+    return exif
+
+
+def _pattern(size: Tuple[int, int] = (48, 32)) -> Image.Image:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    return image
+
+
+def _jpeg_segments(data: bytes) -> List[Tuple[int, bytes]]:
+    segments, pos = [], 2
+    while data[pos + 1] != 0xDA:
+        marker = data[pos + 1]
+        (length,) = struct.unpack(">H", data[pos + 2 : pos + 4])
+        segments.append((marker, data[pos + 4 : pos + 2 + length]))
+        pos += 2 + length
+    return segments
+
+
+def _entropy_data(data: bytes) -> bytes:
+    return data[data.index(b"\xff\xda") :]
+
+
+def _same_pixels(a: Path, b: Path) -> bool:
+    with Image.open(a) as left, Image.open(b) as right:
+        return ImageChops.difference(left.convert("RGB"), right.convert("RGB")).getbbox() is None
+
+
+def test_jpeg_remove_keeps_icc_and_entropy_data(tmp_path: Path) -> None:
+    source = tmp_path / "in.jpg"
+    _pattern().save(source, exif=_exif_with_gps(), xmp=_XMP, icc_profile=_ICC, quality=90)
+
+    rewrite_metadata_file(source, tmp_path / "out.jpg", "JPEG", MetadataEdit(exif=None, keep_xmp=False))
+
+    data = (tmp_path / "out.jpg").read_bytes()
+    payloads = [payload for _marker, payload in _jpeg_segments(data)]
+    assert not any(p.startswith(b"Exif\x00\x00") or p.startswith(b"http://ns.adobe.com/xap") for p in payloads)
+    assert any(p.startswith(b"ICC_PROFILE") for p in payloads)
+    assert _entropy_data(data) == _entropy_data(source.read_bytes())
+    assert _same_pixels(source, tmp_path / "out.jpg")
+
+
+def test_jpeg_exif_is_inserted_after_jfif(tmp_path: Path) -> None:
+    source = tmp_path / "in.jpg"
+    _pattern().save(source, quality=90)
+    exif = Image.Exif()
+    exif[_ARTIST] = "inserted"
+
+    rewrite_metadata_file(source, tmp_path / "out.jpg", "JPEG", MetadataEdit(exif=exif.tobytes()))
+
+    markers = [marker for marker, _payload in _jpeg_segments((tmp_path / "out.jpg").read_bytes())]
+    assert markers[:2] == [0xE0, 0xE1]
+    with Image.open(tmp_path / "out.jpg") as out:
+        assert out.getexif()[_ARTIST] == "inserted"
+
+
+def test_png_chunks_are_rewritten_and_idat_streamed(tmp_path: Path) -> None:
+    source = tmp_path / "in.png"
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Comment", "keep me")
+    info.add_itxt("XML:com.adobe.xmp", _XMP.decode())
+    _pattern().save(source, exif=_exif_with_gps(), pnginfo=info)
+
+    rewrite_metadata_file(source, tmp_path / "out.png", "PNG", MetadataEdit(exif=None, keep_xmp=False))
+
+    data = (tmp_path / "out.png").read_bytes()
+    assert b"eXIf" not in data and b"XML:com.adobe.xmp" not in data
+    idat = source.read_bytes()[source.read_bytes().index(b"IDAT") - 4 :]
+    assert data.endswith(idat)
+    with Image.open(tmp_path / "out.png") as out:
+        out.load()
+        assert out.text == {"Comment": "keep me"}
+    assert _same_pixels(source, tmp_path / "out.png")
+
+
+def test_malformed_input_raises_without_creating_output(tmp_path: Path) -> None:
+    source = tmp_path / "broken.jpg"
+    source.write_bytes(b"\xff\xd8\xff\xe1\x00")
+
+    with pytest.raises(ValueError):
+        rewrite_metadata_file(source, tmp_path / "out.jpg", "JPEG", MetadataEdit(exif=None))
+    assert not (tmp_path / "out.jpg").exists()
+
+
+def test_gui_gps_removal_rewrites_metadata_only(tmp_path: Path) -> None:
+    source = tmp_path / "photo.jpg"
+    _pattern().save(source, exif=_exif_with_gps(), xmp=_XMP, quality=90)
+    with Image.open(source) as opened:
+        image = opened.copy()
+    options = SaveOptions(
+        output_format="jpeg",
+        exif_mode="edit",
+        remove_gps=True,
+        exif_edit=ExifEditValues(copyright_text="(c) test"),
+    )
+
+    result = save_image(image, image, tmp_path / "out", options, source_path=source)
+
+    assert result.success and result.passthrough and result.passthrough_method == "metadata_rewrite"
+    assert result.gps_removed and result.edited_fields == ("Copyright",)
+    data = (tmp_path / "out.jpg").read_bytes()
+    assert _entropy_data(data) == _entropy_data(source.read_bytes())
+    assert _XMP not in data
+    with Image.open(tmp_path / "out.jpg") as out:
+        exif = out.getexif()
+        assert exif[_ARTIST] == "tester" and exif[0x8298] == "(c) test"
+        assert _GPS_IFD not in exif
+
+
+def test_core_exif_removal_skips_reencode(tmp_path: Path) -> None:
+    source = tmp_path / "small.jpg"
+    _pattern().save(source, exif=_exif_with_gps(), quality=95)
+    stats = PassthroughStats()
+
+    ok, _kept, _size = resize_and_compress_image(
+        source_path=source,
+        dest_path=tmp_path / "out" / "small.jpg",
+        target_width=200,
+        quality=70,
+        format="jpeg",
+        exif_handling="remove",
+        passthrough=True,
+        passthrough_stats=stats,
+    )
+
+    assert ok
+    assert stats.as_dict()["metadata_rewrites"] == 1 and stats.encoded_count == 0
+    output = (tmp_path / "out" / "small.jpg").read_bytes()
+    assert _entropy_data(output) == _entropy_data(source.read_bytes())
+    with Image.open(tmp_path / "out" / "small.jpg") as out:
+        assert not out.getexif()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageOps
+
+from karuku_resizer.batch_api import ResizeOptions, resize_one
+from karuku_resizer.orientation import (
+    EXIF_ORIENTATION_TAG,
+    apply_orientation,
+    oriented_size,
+    read_orientation,
+    resize_oriented,
+)
+from karuku_resizer.renditions import render_renditions
+from karuku_resizer.ui_file_load_helpers import decode_image_file
+
+_ARTIST = 0x013B
+
+
+def _pattern(size: tuple = (96, 40)) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient.rotate(90)))
+
+
+def _with_orientation(image: Image.Image, orientation: int) -> Image.Image:
+    copy = image.copy()
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = orientation
+    exif[_ARTIST] = "tester"
+    copy.info["exif"] = exif.tobytes()
+    return copy
+
+
+def _rotated_jpeg(path: Path, orientation: int = 6) -> Path:
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = orientation
+    exif[_ARTIST] = "tester"
+    _pattern().save(path, format="JPEG", quality=95, exif=exif.tobytes())
+    return path
+
+
+@pytest.mark.parametrize("orientation", range(1, 9))
+def test_resize_after_orientation_matches_transpose_first(orientation: int) -> None:
+    raw = _pattern()
+    target = oriented_size((48, 20), orientation)
+
+    expected = ImageOps.exif_transpose(_with_orientation(raw, orientation)).resize(target, Image.Resampling.LANCZOS)
+    actual = resize_oriented(raw, target, orientation)
+
+    assert actual.size == target
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_orientation_helpers() -> None:
+    image = _with_orientation(_pattern(), 8)
+
+    assert read_orientation(image) == 8
+    assert read_orientation(_pattern()) == 1
+    assert oriented_size((96, 40), 8) == (40, 96)
+    assert apply_orientation(image, 1) is image
+
+
+def test_decode_keeps_stored_pixels(tmp_path: Path) -> None:
+    path = _rotated_jpeg(tmp_path / "rotated.jpg")
+
+    image = decode_image_file(path)
+
+    assert image.size == (96, 40)
+    assert read_orientation(image) == 6
+
+
+def test_batch_api_targets_oriented_size_and_drops_orientation_tag(tmp_path: Path) -> None:
+    path = _rotated_jpeg(tmp_path / "rotated.jpg")
+
+    result = resize_one(path, ResizeOptions(resize_mode="width", resize_value=20, output_format="jpeg"))
+
+    assert result.success
+    assert result.source_size == (40, 96)
+    assert result.output_size == (20, 48)
+    with Image.open(io.BytesIO(result.data)) as out:
+        assert out.size == (20, 48)
+        exif = out.getexif()
+        assert EXIF_ORIENTATION_TAG not in exif
+        assert exif[_ARTIST] == "tester"
+
+
+def test_renditions_use_oriented_widths(tmp_path: Path) -> None:
+    path = _rotated_jpeg(tmp_path / "rotated.jpg")
+    (tmp_path / "out").mkdir()
+
+    with Image.open(path) as image:
+        image.load()
+        result = render_renditions(
+            image,
+            tmp_path / "out" / "rotated",
+            widths=(40, 20),
+            formats=("png",),
+            orientation=read_orientation(image),
+            write_manifest=False,
+        )
+
+    assert result.success
+    assert result.source_size == (40, 96)
+    assert [(o.width, o.height) for o in result.outputs] == [(40, 96), (20, 48)]
+    with Image.open(result.outputs[1].path) as out:
+        assert out.size == (20, 48)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import errno
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import passthrough, resize_core
+from karuku_resizer.image_save_pipeline import SaveOptions, save_image
+from karuku_resizer.passthrough import (
+    COPY_METHODS,
+    PassthroughStats,
+    copy_file_bytes,
+    passthrough_copy,
+    probe_passthrough_format,
+)
+from karuku_resizer.resize_core import resize_and_compress_image
+
+
+def _jpeg(path: Path, size: tuple = (64, 48), orientation: int = 1) -> Path:
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x013B] = "tester"
+    Image.new("RGB", size, (200, 30, 90)).save(path, format="JPEG", quality=95, exif=exif.tobytes())
+    return path
+
+
+def test_copy_file_bytes_is_exact(tmp_path: Path) -> None:
+    source = tmp_path / "src.bin"
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+
+    method = copy_file_bytes(source, tmp_path / "dst.bin")
+
+    assert method in COPY_METHODS
+    assert (tmp_path / "dst.bin").read_bytes() == source.read_bytes()
+
+
+def test_copy_falls_back_when_kernel_copy_is_unsupported(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def _unsupported(*_args: object) -> int:
+        raise OSError(errno.EXDEV, "cross-device")
+
+    monkeypatch.setattr(passthrough, "_copy_with_copy_file_range", _unsupported)
+    monkeypatch.setattr(passthrough, "_copy_with_sendfile", _unsupported)
+    source = tmp_path / "src.bin"
+    source.write_bytes(b"abc" * 1000)
+
+    assert copy_file_bytes(source, tmp_path / "dst.bin") == "copy"
+    assert (tmp_path / "dst.bin").read_bytes() == source.read_bytes()
+
+
+def test_passthrough_copy_to_same_path_is_a_no_op(tmp_path: Path) -> None:
+    source = _jpeg(tmp_path / "a.jpg")
+    before = source.read_bytes()
+
+    assert passthrough_copy(source, tmp_path / "a.jpg", "fast") == "same"
+    assert source.read_bytes() == before
+
+
+def test_rotated_or_unsupported_sources_are_not_passed_through(tmp_path: Path) -> None:
+    assert probe_passthrough_format(_jpeg(tmp_path / "upright.jpg")) == "JPEG"
+    assert probe_passthrough_format(_jpeg(tmp_path / "rotated.jpg", orientation=6)) is None
+    Image.new("RGB", (4, 4)).save(tmp_path / "a.bmp")
+    assert probe_passthrough_format(tmp_path / "a.bmp") is None
+
+
+def test_core_copies_when_no_resize_or_reencode_is_needed(tmp_path: Path) -> None:
+    source = _jpeg(tmp_path / "small.jpg")
+    stats = PassthroughStats()
+
+    ok, kept, _size = resize_and_compress_image(
+        source_path=source,
+        dest_path=tmp_path / "out" / "small.jpg",
+        target_width=200,
+        quality=70,
+        format="jpeg",
+        passthrough=True,
+        passthrough_stats=stats,
+    )
+
+    assert ok and kept
+    assert (tmp_path / "out" / "small.jpg").read_bytes() == source.read_bytes()
+    assert stats.passthrough_count == 1 and stats.encoded_count == 0
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"format": "png"},
+        {"target_width": 32},
+        {"passthrough": False},
+    ],
+)
+def test_core_reencodes_when_anything_changes(tmp_path: Path, overrides: dict) -> None:
+    source = _jpeg(tmp_path / "small.jpg")
+    stats = PassthroughStats()
+    kwargs = dict(
+        source_path=source,
+        dest_path=tmp_path / "out" / "small.jpg",
+        target_width=200,
+        quality=70,
+        format="jpeg",
+        passthrough_stats=stats,
+    )
+    kwargs.update(overrides)
+
+    ok, _kept, _size = resize_and_compress_image(**kwargs)
+
+    assert ok
+    assert stats.passthrough_count == 0 and stats.encoded_count == 1
+    (output,) = (tmp_path / "out").iterdir()
+    assert output.read_bytes() != source.read_bytes()
+
+
+def test_core_applies_requested_quality_unless_passthrough_is_opted_in(tmp_path: Path) -> None:
+    source = _jpeg(tmp_path / "in.jpg", size=(400, 300))
+    stats = PassthroughStats()
+
+    ok, kept, _size = resize_and_compress_image(
+        source_path=source,
+        dest_path=tmp_path / "out" / "in.jpg",
+        target_width=800,
+        quality=40,
+        format="jpeg",
+        passthrough_stats=stats,
+    )
+
+    assert ok and kept
+    assert stats.passthrough_count == 0 and stats.encoded_count == 1
+    assert (tmp_path / "out" / "in.jpg").read_bytes() != source.read_bytes()
+    assert resize_core._build_arg_parser().parse_args(["-s", "in", "-d", "out"]).passthrough is False
+
+
+def test_gui_save_copies_unchanged_source(tmp_path: Path) -> None:
+    source = _jpeg(tmp_path / "photo.jpg")
+    with Image.open(source) as opened:
+        image = opened.copy()
+    options = SaveOptions(output_format="jpeg", quality=70)
+    (tmp_path / "out").mkdir()
+
+    copied = save_image(image, image, tmp_path / "out" / "photo", options, source_path=source)
+    resized = image.resize((32, 24))
+    encoded = save_image(image, resized, tmp_path / "out" / "small", options, source_path=source)
+
+    assert copied.success and copied.passthrough and copied.exif_attached
+    assert copied.passthrough_method in COPY_METHODS
+    assert (tmp_path / "out" / "photo.jpg").read_bytes() == source.read_bytes()
+    assert encoded.success and not encoded.passthrough
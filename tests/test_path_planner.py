@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from karuku_resizer.resize_core import PathPlan, get_destination_path, plan_destination_paths
+
+
+def _touch_tree(root: Path, relative_paths: list[str]) -> list[Path]:
+    paths = []
+    for rel in relative_paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(path)
+    return paths
+
+
+def test_plan_matches_get_destination_path(tmp_path: Path) -> None:
+    src = tmp_path / "in"
+    sources = _touch_tree(src, ["top.jpg", "a/one.jpg", "a/b/two.png", "a/b/three.jpg", "c/four.jpg"])
+
+    plan = plan_destination_paths(sources, src, tmp_path / "out_plan")
+
+    expected = [get_destination_path(p, src, tmp_path / "out_plan") for p in sources]
+    assert [entry.dest for entry in plan.entries] == expected
+    assert [entry.source for entry in plan.entries] == sources
+
+
+def test_plan_does_not_touch_filesystem_and_lists_each_directory_once(tmp_path: Path) -> None:
+    src = tmp_path / "in"
+    sources = _touch_tree(src, ["a/1.jpg", "a/2.jpg", "a/b/3.jpg", "c/4.jpg"])
+    out = tmp_path / "out"
+
+    plan = plan_destination_paths(sources, src, out)
+
+    assert not out.exists()
+    assert plan.directories == sorted({out / "a", out / "a" / "b", out / "c"})
+    assert sorted(plan.leaf_directories()) == [out / "a" / "b", out / "c"]
+
+
+def test_create_directories_creates_all_mirrored_dirs(tmp_path: Path) -> None:
+    src = tmp_path / "in"
+    rels = [f"d{i}/sub{j}/img.jpg" for i in range(4) for j in range(3)]
+    sources = _touch_tree(src, rels)
+    out = tmp_path / "out"
+
+    plan = plan_destination_paths(sources, src, out)
+    created = plan.create_directories(max_workers=4)
+
+    assert created == 12
+    assert plan.failed_directories == {}
+    assert all(entry.dest.parent.is_dir() for entry in plan.entries)
+
+
+def test_create_directories_records_failures(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "blocked").write_bytes(b"not a directory")
+    plan = PathPlan(entries=[], directories=[out / "blocked" / "child", out / "ok"])
+
+    plan.create_directories()
+
+    assert (out / "ok").is_dir()
+    assert plan.directory_error(out / "blocked" / "child" / "x.jpg")
+    assert plan.directory_error(out / "ok" / "x.jpg") is None
+
+
+def test_sources_outside_source_dir_map_to_dest_root(tmp_path: Path) -> None:
+    other = _touch_tree(tmp_path / "elsewhere", ["x.jpg"])
+
+    plan = plan_destination_paths(other, tmp_path / "in", tmp_path / "out")
+
+    assert plan.entries[0].dest == tmp_path / "out" / "x.jpg"
+    assert os.fspath(plan.directories[0]) == os.fspath(tmp_path / "out")
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+from karuku_resizer import resize_core
+from karuku_resizer.content_analysis import normalize_png_palette_mode, quantize_for_png
+from karuku_resizer.image_save_pipeline import SaveOptions, save_image
+
+_UI_COLORS = [(245, 245, 245), (33, 150, 243), (66, 66, 66), (239, 83, 80)]
+
+
+def _screenshot(size: tuple = (160, 90)) -> Image.Image:
+    image = Image.new("RGB", size, _UI_COLORS[0])
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, size[0], 12), fill=_UI_COLORS[1])
+    for row in range(5):
+        draw.rectangle((10, 20 + row * 14, size[0] - 10, 30 + row * 14), outline=_UI_COLORS[2], fill=_UI_COLORS[3 - row % 2])
+    return image
+
+
+def _gradient(size: tuple = (96, 64)) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (gradient, gradient.rotate(90), gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def test_auto_palette_is_lossless_for_few_colors() -> None:
+    image = _screenshot()
+
+    converted, applied = quantize_for_png(image, "auto")
+
+    assert (converted.mode, applied) == ("P", "palette")
+    assert converted.convert("RGB").tobytes() == image.tobytes()
+
+
+def test_auto_palette_survives_many_close_colors() -> None:
+    # 256色ちょうど・隣り合う色が近い画像でも、元の画素を変えずにパレット化できる
+    image = Image.linear_gradient("L").resize((256, 4)).convert("RGB")
+    image.putpixel((0, 0), (1, 0, 0))
+
+    converted, applied = quantize_for_png(image, "auto")
+
+    assert applied == "palette"
+    assert converted.convert("RGB").tobytes() == image.tobytes()
+
+
+def test_auto_palette_skips_many_colors_and_other_modes() -> None:
+    gradient = _gradient()
+
+    assert quantize_for_png(gradient, "auto") == (gradient, None)
+    assert quantize_for_png(_screenshot(), "off")[1] is None
+    gray = _screenshot().convert("L")
+    assert quantize_for_png(gray, "always") == (gray, None)
+
+
+@pytest.mark.parametrize("dither", [False, True])
+def test_always_quantizes_to_adaptive_palette(dither: bool) -> None:
+    converted, applied = quantize_for_png(_gradient(), "always", dither=dither)
+
+    assert (converted.mode, applied) == ("P", "palette-quantized")
+    assert len(converted.getcolors(256) or []) <= 256
+
+
+def test_translucent_rgba_keeps_transparency() -> None:
+    image = Image.new("RGBA", (40, 40), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle((5, 5, 30, 30), fill=(200, 10, 10, 255))
+
+    converted, applied = quantize_for_png(image, "always")
+
+    assert applied in ("palette", "palette-quantized")
+    assert converted.convert("RGBA").getpixel((0, 0))[3] == 0
+    assert converted.convert("RGBA").getpixel((10, 10))[3] == 255
+
+
+def test_normalize_png_palette_mode() -> None:
+    assert normalize_png_palette_mode(" Always ") == "always"
+    assert normalize_png_palette_mode(None) == "auto"
+    assert normalize_png_palette_mode("bogus") == "auto"
+
+
+def test_save_image_writes_png8(tmp_path: Path) -> None:
+    image = _screenshot().convert("RGBA")
+
+    palette = save_image(image, image, tmp_path / "palette", SaveOptions(output_format="png"))
+    truecolor = save_image(image, image, tmp_path / "truecolor", SaveOptions(output_format="png", png_palette="off"))
+
+    assert palette.content_conversion == "opaque-alpha+palette"
+    assert truecolor.content_conversion == "opaque-alpha"
+    with Image.open(tmp_path / "palette.png") as out:
+        assert out.mode == "P"
+        assert out.convert("RGB").tobytes() == image.convert("RGB").tobytes()
+    assert (tmp_path / "palette.png").stat().st_size < (tmp_path / "truecolor.png").stat().st_size
+
+
+def test_content_analysis_off_disables_auto_only(tmp_path: Path) -> None:
+    image = _screenshot()
+
+    auto = save_image(image, image, tmp_path / "auto", SaveOptions(output_format="png", content_analysis=False))
+    always = save_image(
+        image,
+        image,
+        tmp_path / "always",
+        SaveOptions(output_format="png", content_analysis=False, png_palette="always"),
+    )
+
+    assert auto.content_conversion is None
+    assert always.content_conversion == "palette"
+
+
+def test_cli_png_palette(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    src = tmp_path / "in"
+    src.mkdir()
+    _screenshot().save(src / "shot.png")
+    _gradient().save(src / "photo.png")
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "karukuresize-cli", "-s", str(src), "-d", str(tmp_path / "out"),
+            "-w", "50", "-f", "png", "--extensions", "png", "--json",
+        ],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["processed_count"] == 2
+    assert summary["options"]["png_palette"] == "auto" and summary["options"]["png_dither"] is False
+    with Image.open(tmp_path / "out" / "photo.png") as photo:
+        assert photo.mode == "RGB"
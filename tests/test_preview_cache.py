@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, List
+
+from PIL import Image
+
+from karuku_resizer.gui_app import ImageJob, ResizeApp
+from karuku_resizer.preview_service import ResizedPreviewCache, image_nbytes, preview_cache_key
+
+
+def _img(width: int, height: int = 10) -> Image.Image:
+    return Image.new("RGB", (width, height))
+
+
+def test_flipping_back_to_a_previous_size_hits_the_cache() -> None:
+    cache = ResizedPreviewCache(max_bytes=10_000_000)
+    small, large = _img(10), _img(20)
+    cache.put("job", preview_cache_key((10, 10)), small)
+    cache.put("job", preview_cache_key((20, 10)), large)
+
+    assert cache.get("job", preview_cache_key((10, 10))) is small
+    assert cache.get("job", preview_cache_key((20, 10))) is large
+    assert cache.get("job", preview_cache_key((30, 10))) is None
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+    assert preview_cache_key((10, 10)) != preview_cache_key((10, 10), orientation=6)
+
+
+def test_per_owner_limit_evicts_that_owners_oldest_entry() -> None:
+    evicted: List[Any] = []
+    cache = ResizedPreviewCache(
+        max_bytes=10_000_000,
+        max_entries_per_owner=2,
+        on_evict=lambda owner, key, _image: evicted.append((owner, key[0])),
+    )
+    cache.put("a", preview_cache_key((1, 1)), _img(1))
+    cache.put("b", preview_cache_key((1, 1)), _img(1))
+    cache.put("a", preview_cache_key((2, 2)), _img(2))
+    cache.get("a", preview_cache_key((1, 1)))
+    cache.put("a", preview_cache_key((3, 3)), _img(3))
+
+    assert evicted == [("a", (2, 2))]
+    assert len(cache) == 3
+
+
+def test_global_memory_cap_is_shared_across_owners() -> None:
+    per_image = image_nbytes(_img(100))
+    cache = ResizedPreviewCache(max_bytes=per_image * 2)
+    cache.put("a", preview_cache_key((100, 10)), _img(100))
+    cache.put("b", preview_cache_key((100, 10)), _img(100))
+    cache.get("a", preview_cache_key((100, 10)))
+    cache.put("c", preview_cache_key((100, 10)), _img(100))
+
+    assert cache.peek("b", preview_cache_key((100, 10))) is None
+    assert cache.peek("a", preview_cache_key((100, 10))) is not None
+    assert cache.total_bytes == per_image * 2
+    assert (cache.stats.evictions, cache.stats.evicted_bytes) == (1, per_image)
+
+    cache.discard_owner("a")
+    assert cache.total_bytes == per_image
+
+
+def test_gui_reuses_cached_resize_and_drops_evicted_references() -> None:
+    jobs = [ImageJob(Path(f"{i}.png"), _img(100, 100)) for i in range(2)]
+    app = SimpleNamespace(jobs=jobs, current_index=1)
+    app._preview_cache = ResizedPreviewCache(
+        max_bytes=image_nbytes(_img(50, 50)) * 2,
+        on_evict=ResizeApp._on_preview_cache_evict.__get__(app),
+    )
+    remember = ResizeApp._remember_resized_preview.__get__(app)
+    lookup = ResizeApp._cached_resized_preview.__get__(app)
+
+    half = _img(50, 50)
+    remember(jobs[0], (50, 50), half)
+    remember(jobs[0], (40, 40), _img(40, 40))
+    assert lookup(jobs[0], (50, 50)) is half
+    assert jobs[0].resized is half and jobs[0].preview_target_size == (50, 50)
+
+    # Filling the cap from another job evicts job 0's least recent entry first...
+    remember(jobs[1], (50, 50), _img(50, 50))
+    assert jobs[0].resized is half
+    assert app._preview_cache.peek(id(jobs[0]), preview_cache_key((40, 40))) is None
+    # ...then the image job 0 still points at, which is released too.
+    remember(jobs[1], (30, 30), _img(30, 30))
+    assert jobs[0].resized is None and jobs[0].preview_target_size is None
+    assert jobs[1].resized is not None
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+from karuku_resizer.preview_service import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CURRENT,
+    PreviewService,
+    PreviewTicket,
+)
+
+
+def _blocker(service: PreviewService, key: str = "block") -> threading.Event:
+    """Occupy the single worker until the returned event is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def _run(_ticket: PreviewTicket) -> None:
+        started.set()
+        release.wait(5)
+
+    service.submit(key, _run)
+    assert started.wait(5)
+    return release
+
+
+def _wait_idle(service: PreviewService) -> None:
+    deadline = time.monotonic() + 5
+    while service.stats.completed < service.stats.started or service.pending_count():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_superseded_requests_are_dropped_before_they_start() -> None:
+    service = PreviewService(max_workers=1)
+    release = _blocker(service)
+    ran: List[int] = []
+
+    for value in range(5):
+        service.submit("render", lambda _ticket, value=value: ran.append(value))
+    release.set()
+    _wait_idle(service)
+    service.shutdown()
+
+    assert ran == [4]
+    assert service.stats.coalesced == 4
+
+
+def test_current_selection_runs_before_background_work() -> None:
+    service = PreviewService(max_workers=1)
+    release = _blocker(service)
+    order: List[str] = []
+
+    service.submit(("precompute", 1), lambda _t: order.append("bg1"), priority=PRIORITY_BACKGROUND)
+    service.submit(("precompute", 2), lambda _t: order.append("bg2"), priority=PRIORITY_BACKGROUND)
+    service.submit("render", lambda _t: order.append("current"), priority=PRIORITY_CURRENT)
+    release.set()
+    _wait_idle(service)
+    service.shutdown()
+
+    assert order == ["current", "bg1", "bg2"]
+
+
+def test_running_request_is_interrupted_between_stages() -> None:
+    service = PreviewService(max_workers=2)
+    in_stage = threading.Event()
+    outcome: List[str] = []
+
+    def _slow(ticket: PreviewTicket) -> None:
+        in_stage.set()
+        outcome.append("cancelled" if ticket.wait(5) else "finished")
+
+    begin = time.monotonic()
+    service.submit("estimate", _slow)
+    assert in_stage.wait(5)
+    service.submit("estimate", lambda _t: outcome.append("newer"))
+    _wait_idle(service)
+    service.shutdown()
+
+    assert sorted(outcome) == ["cancelled", "newer"]
+    assert time.monotonic() - begin < 2
+    assert service.stats.interrupted == 1
+
+
+def test_thread_count_is_bounded_and_failures_do_not_kill_workers() -> None:
+    service = PreviewService(max_workers=2, name="bounded-preview")
+    done: List[int] = []
+
+    def _fail(_ticket: PreviewTicket) -> None:
+        raise RuntimeError("boom")
+
+    service.submit("broken", _fail)
+    for i in range(50):
+        service.submit(("job", i), lambda _t, i=i: done.append(i))
+    _wait_idle(service)
+
+    threads = [t for t in threading.enumerate() if t.name.startswith("bounded-preview")]
+    assert 1 <= len(threads) <= 2
+    assert sorted(done) == list(range(50))
+
+    service.shutdown()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert not any(thread.is_alive() for thread in threads)
+    assert service.submit("late", lambda _t: done.append(-1)).cancelled
+
+
+def test_cancel_background_leaves_current_requests_alone() -> None:
+    service = PreviewService(max_workers=1)
+    release = _blocker(service)
+    ran: List[str] = []
+
+    service.submit(("precompute", 1), lambda _t: ran.append("bg"), priority=PRIORITY_BACKGROUND)
+    service.submit("render", lambda _t: ran.append("current"), priority=PRIORITY_CURRENT)
+    assert service.cancel_background() == 1
+    release.set()
+    _wait_idle(service)
+    service.shutdown()
+
+    assert ran == ["current"]
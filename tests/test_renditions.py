@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import resize_core, ui_bootstrap
+from karuku_resizer.image_save_pipeline import SaveOptions
+from karuku_resizer.renditions import (
+    iter_cascade,
+    parse_rendition_formats,
+    parse_rendition_widths,
+    render_renditions,
+)
+
+
+def test_parse_rendition_widths_and_formats() -> None:
+    assert parse_rendition_widths("320, 1280,640,320") == (1280, 640, 320)
+    assert parse_rendition_formats("webp,jpg", available_formats=["jpeg", "webp"]) == ("webp", "jpeg")
+    with pytest.raises(ValueError):
+        parse_rendition_widths("320,abc")
+    with pytest.raises(ValueError):
+        parse_rendition_formats("gif", available_formats=["jpeg"])
+
+
+def test_iter_cascade_derives_each_size_from_previous() -> None:
+    source = Image.new("RGB", (1000, 750))
+    sizes = [(width, image.size) for width, image in iter_cascade(source, (800, 400, 100))]
+
+    assert sizes == [(800, (800, 600)), (400, (400, 300)), (100, (100, 75))]
+
+
+def test_render_renditions_writes_outputs_and_manifest(tmp_path: Path) -> None:
+    source = Image.new("RGB", (800, 400), (120, 30, 30))
+
+    result = render_renditions(
+        source,
+        tmp_path / "photo",
+        widths=(1280, 640, 320),
+        formats=("webp", "jpeg"),
+        save_options=SaveOptions(output_format="jpeg", quality=80),
+        source_name="photo.jpg",
+    )
+
+    assert result.success
+    assert result.skipped_widths == (1280,)
+    assert sorted(p.name for p in tmp_path.glob("photo-*")) == [
+        "photo-320w.jpg",
+        "photo-320w.webp",
+        "photo-640w.jpg",
+        "photo-640w.webp",
+    ]
+    manifest = json.loads((tmp_path / "photo.renditions.json").read_text(encoding="utf-8"))
+    assert manifest["source"] == "photo.jpg"
+    assert [(r["width"], r["height"], r["format"]) for r in manifest["renditions"]] == [
+        (640, 320, "webp"),
+        (640, 320, "jpeg"),
+        (320, 160, "webp"),
+        (320, 160, "jpeg"),
+    ]
+    for entry in manifest["renditions"]:
+        assert entry["bytes"] == (tmp_path / entry["file"]).stat().st_size
+
+
+def test_cli_renditions_mode(tmp_path: Path, monkeypatch, capsys) -> None:
+    src = tmp_path / "in"
+    dst = tmp_path / "out"
+    src.mkdir()
+    Image.new("RGB", (900, 600), (0, 90, 200)).save(src / "a.jpg")
+
+    monkeypatch.setattr(resize_core, "setup_logging", lambda **_kwargs: None)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["karukuresize-cli", "-s", str(src), "-d", str(dst), "--renditions", "600,300", "--rendition-formats", "jpeg", "--json"],
+    )
+    resize_core.main()
+
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["processed_count"] == 1
+    assert summary["options"]["renditions"] == [600, 300]
+    assert (dst / "a-600w.jpg").exists()
+    assert (dst / "a-300w.jpg").exists()
+    assert (dst / "a.renditions.json").exists()
+
+
+def test_batch_job_uses_rendition_settings(tmp_path: Path) -> None:
+    recorded: list[object] = []
+    stats = SimpleNamespace(
+        record_success=recorded.append,
+        record_failure=lambda *args, **kwargs: pytest.fail(f"unexpected failure: {args}"),
+    )
+    app = SimpleNamespace(settings={"rendition_widths": "200,100", "rendition_formats": "png"})
+    job = SimpleNamespace(
+        path=Path("shot.jpg"),
+        image=Image.new("RGB", (400, 200)),
+        orientation=1,
+        last_process_state=None,
+    )
+
+    ui_bootstrap.bootstrap_process_single_batch_job(
+        app,
+        job=job,
+        output_dir=tmp_path,
+        reference_target=(0, 0),
+        resize_plan=None,
+        output_format_id="auto",
+        reference_output_format="png",
+        batch_options=SaveOptions(output_format="png"),
+        stats=stats,
+    )
+
+    assert job.last_process_state == "success"
+    assert len(recorded) == 1
+    assert (tmp_path / "shot_resized-200w.png").exists()
+    assert (tmp_path / "shot_resized-100w.png").exists()
+    assert (tmp_path / "shot_resized.renditions.json").exists()
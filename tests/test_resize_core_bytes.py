@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from karuku_resizer.resize_core import resize_and_compress_bytes, resize_and_compress_image_memory
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_resize_and_compress_bytes_accepts_buffers(wrap, jpeg_bytes) -> None:
+    view = resize_and_compress_bytes(wrap(jpeg_bytes()), resize_value=100, output_format="png")
+
+    assert isinstance(view, memoryview)
+    with Image.open(io.BytesIO(view)) as decoded:
+        assert decoded.format == "PNG"
+        assert decoded.size == (100, 50)
+
+
+def test_resize_and_compress_bytes_reads_file_via_mmap(tmp_path: Path, jpeg_bytes) -> None:
+    source = tmp_path / "src.jpg"
+    source.write_bytes(jpeg_bytes())
+
+    view = resize_and_compress_bytes(source, resize_mode="height", resize_value=50, output_format="webp")
+
+    with Image.open(io.BytesIO(view)) as decoded:
+        assert decoded.size == (100, 50)
+
+
+def test_resize_and_compress_bytes_writes_into_caller_buffer(jpeg_bytes) -> None:
+    target = bytearray(64 * 1024)
+
+    view = resize_and_compress_bytes(jpeg_bytes(), output=target, resize_value=80, output_format="jpeg")
+
+    assert bytes(view) == bytes(target[: len(view)])
+    assert bytes(target[:2]) == b"\xff\xd8"
+    with Image.open(io.BytesIO(view)) as decoded:
+        assert decoded.size == (80, 40)
+
+    with pytest.raises(ValueError):
+        resize_and_compress_bytes(jpeg_bytes(), output=bytearray(16), resize_value=80)
+    with pytest.raises(ValueError):
+        resize_and_compress_bytes(jpeg_bytes(), output=b"readonly" * 100, resize_value=80)
+
+
+def test_memory_api_leaves_source_image_untouched() -> None:
+    source = Image.new("RGBA", (200, 100), (255, 0, 0, 128))
+    before = source.tobytes()
+    output = io.BytesIO()
+
+    ok, error = resize_and_compress_image_memory(
+        source_image=source,
+        output_buffer=output,
+        resize_mode="none",
+        output_format="jpeg",
+    )
+
+    assert ok, error
+    assert source.mode == "RGBA"
+    assert source.tobytes() == before
+    with Image.open(output) as decoded:
+        assert decoded.size == (200, 100)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import threading
+from typing import Iterator
+
+import pytest
+from PIL import Image
+
+from karuku_resizer import resize_server
+from karuku_resizer.image_save_pipeline import supported_output_formats
+from karuku_resizer.resize_server import ServeConfig, create_server, parse_resize_params
+
+
+@pytest.fixture
+def running_server() -> Iterator[resize_server.ResizeHTTPServer]:
+    server = create_server(ServeConfig(host="127.0.0.1", port=0, max_workers=1, max_pending=0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def _connect(server: resize_server.ResizeHTTPServer) -> http.client.HTTPConnection:
+    host, port = server.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=10)
+
+
+def test_parse_resize_params_validates_values() -> None:
+    params = parse_resize_params({"mode": ["longest_side"], "value": ["320"], "format": ["jpg"]})
+    assert params.resize_mode == "longest_side"
+    assert params.resize_value == 320
+    assert params.output_format == "jpeg"
+
+    with pytest.raises(ValueError):
+        parse_resize_params({"mode": ["diagonal"]})
+    with pytest.raises(ValueError):
+        parse_resize_params({"quality": ["0"]})
+    with pytest.raises(ValueError):
+        parse_resize_params({"profile": ["turbo"]})
+    with pytest.raises(ValueError):
+        parse_resize_params({"budget": ["0"]})
+
+
+def test_parse_resize_params_reads_profile_and_budget() -> None:
+    params = parse_resize_params({"format": ["webp"], "profile": ["Balanced"], "budget": ["1.5"]})
+
+    assert params.encoder_profile == "balanced"
+    assert params.latency_budget_seconds == 1.5
+    assert parse_resize_params({}).latency_budget_seconds is None
+
+
+def test_resize_endpoint_returns_encoded_image_over_keep_alive(running_server, jpeg_bytes) -> None:
+    conn = _connect(running_server)
+    try:
+        for width in (100, 50):
+            conn.request("POST", f"/resize?mode=width&value={width}&format=png", body=jpeg_bytes())
+            response = conn.getresponse()
+            payload = response.read()
+
+            assert response.status == 200
+            assert response.getheader("Content-Type") == "image/png"
+            assert "decode;dur=" in (response.getheader("Server-Timing") or "")
+            with Image.open(io.BytesIO(payload)) as result:
+                assert result.format == "PNG"
+                assert result.size == (width, width // 2)
+    finally:
+        conn.close()
+
+    metrics = running_server.metrics.snapshot()
+    assert metrics["requests_ok"] == 2
+    assert metrics["inflight"] == 0
+
+
+def test_resize_endpoint_rejects_with_503_when_saturated(running_server, monkeypatch, jpeg_bytes) -> None:
+    release = threading.Event()
+    entered = threading.Event()
+    original = resize_server.process_resize_request
+
+    def _blocking(body, params):
+        entered.set()
+        release.wait(timeout=10)
+        return original(body, params)
+
+    monkeypatch.setattr(resize_server, "process_resize_request", _blocking)
+
+    results: dict[str, int] = {}
+
+    def _first_request() -> None:
+        conn = _connect(running_server)
+        conn.request("POST", "/resize?value=80", body=jpeg_bytes())
+        results["first"] = conn.getresponse().status
+        conn.close()
+
+    first = threading.Thread(target=_first_request)
+    first.start()
+    assert entered.wait(timeout=10)
+
+    conn = _connect(running_server)
+    conn.request("POST", "/resize?value=80", body=jpeg_bytes())
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    release.set()
+    first.join(timeout=10)
+
+    assert response.status == 503
+    assert response.getheader("Retry-After") == "1"
+    assert results["first"] == 200
+    assert running_server.metrics.snapshot()["requests_rejected"] == 1
+
+
+def test_metrics_and_bad_request(running_server) -> None:
+    conn = _connect(running_server)
+    try:
+        conn.request("POST", "/resize", body=b"not an image")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 422
+
+        conn.request("GET", "/metrics")
+        response = conn.getresponse()
+        metrics = json.loads(response.read())
+    finally:
+        conn.close()
+
+    assert response.status == 200
+    assert metrics["requests_failed"] == 1
+    assert metrics["bytes_in"] == len(b"not an image")
+
+
+@pytest.mark.skipif("webp" not in supported_output_formats(), reason="WebP unavailable")
+def test_server_latency_budget_downgrades_slow_encodes(jpeg_bytes) -> None:
+    server = create_server(ServeConfig(host="127.0.0.1", port=0, max_workers=1, latency_budget_seconds=1e-6))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    conn = _connect(server)
+    try:
+        conn.request("POST", "/resize?value=100&format=webp", body=jpeg_bytes())
+        response = conn.getresponse()
+        payload = response.read()
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    assert response.status == 200
+    assert response.getheader("Content-Type") == "image/webp"
+    assert response.getheader("X-Karuku-Encoder") == "method=0; requested=6"
+    with Image.open(io.BytesIO(payload)) as result:
+        assert result.size == (100, 50)
+    assert server.metrics.snapshot()["encodes_downgraded"] == 1
+
+
+def test_resize_endpoint_applies_exif_orientation(running_server, jpeg_bytes) -> None:
+    exif = Image.Exif()
+    exif[0x0112] = 6  # 90° 回転して表示する
+
+    conn = _connect(running_server)
+    try:
+        conn.request("POST", "/resize?mode=width&value=100&format=jpeg", body=jpeg_bytes(exif=exif.tobytes()))
+        response = conn.getresponse()
+        payload = response.read()
+    finally:
+        conn.close()
+
+    assert response.status == 200
+    with Image.open(io.BytesIO(payload)) as result:
+        assert result.size == (100, 200)
+        assert result.getexif().get(0x0112, 1) == 1
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import errno
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from karuku_resizer import resize_core, ui_bootstrap
+from karuku_resizer.retry_policy import (
+    DEFAULT_RETRY_BUDGET,
+    RetryBudget,
+    RetryPolicy,
+    RetryRun,
+    RetryStats,
+    active_retry_run,
+    call_with_retry,
+    is_retryable_error,
+    is_retryable_save_result,
+    retry_run,
+)
+
+
+def _flaky(failures: list[BaseException]):
+    calls: list[int] = []
+
+    def _func() -> str:
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    return _func, calls
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        FileNotFoundError(errno.ENOENT, "missing"),
+        IsADirectoryError(errno.EISDIR, "dir"),
+        OSError(errno.ENAMETOOLONG, "too long"),
+        PermissionError(errno.EACCES, "denied"),
+        ValueError("not an OSError"),
+    ],
+)
+def test_fatal_errors_are_not_retryable(error: BaseException) -> None:
+    assert is_retryable_error(error) is False
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        BlockingIOError(errno.EAGAIN, "again"),
+        OSError(errno.EBUSY, "busy"),
+        InterruptedError(errno.EINTR, "interrupted"),
+        TimeoutError(errno.ETIMEDOUT, "timeout"),
+    ],
+)
+def test_transient_errors_are_retryable(error: BaseException) -> None:
+    assert is_retryable_error(error) is True
+
+
+def test_save_result_classification() -> None:
+    assert is_retryable_save_result(SimpleNamespace(retryable=True))
+    assert is_retryable_save_result(SimpleNamespace(retryable=False, error_category="transient"))
+    assert is_retryable_save_result(SimpleNamespace(error="The file is used by another process"))
+    assert not is_retryable_save_result(SimpleNamespace(error_category="not_found", error="missing"))
+    assert not is_retryable_save_result(SimpleNamespace(error="保存に失敗しました。アクセスが拒否されました。"))
+    assert not is_retryable_save_result(SimpleNamespace(error="Address already in use"))
+
+
+def test_retry_on_file_error_fails_fast_without_sleeping(monkeypatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr("karuku_resizer.retry_policy.time.sleep", sleeps.append)
+    func, calls = _flaky([FileNotFoundError(errno.ENOENT, "missing")])
+
+    with retry_run() as run:
+        with pytest.raises(FileNotFoundError):
+            resize_core.retry_on_file_error(func, max_retries=3, retry_delay=0.5)
+
+    assert len(calls) == 1
+    assert sleeps == []
+    assert run.stats.as_dict()["failed_fatal"] == 1
+
+
+def test_missing_source_does_not_sleep(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "karuku_resizer.retry_policy.time.sleep",
+        lambda _delay: pytest.fail("missing files must not be retried"),
+    )
+
+    result = resize_core.resize_and_compress_image(
+        source_path=tmp_path / "gone.jpg",
+        dest_path=tmp_path / "out.jpg",
+        target_width=100,
+        quality=80,
+    )
+
+    assert result[0] is False
+
+
+def test_transient_error_is_retried_with_backoff() -> None:
+    sleeps: list[float] = []
+    run = RetryRun(budget=RetryBudget(), stats=RetryStats())
+    func, calls = _flaky([BlockingIOError(errno.EAGAIN, "a"), BlockingIOError(errno.EAGAIN, "b")])
+    policy = RetryPolicy(max_attempts=3, base_delay=0.1, multiplier=2, jitter=0)
+
+    assert call_with_retry(func, policy=policy, run=run, sleep=sleeps.append) == "ok"
+
+    assert len(calls) == 3
+    assert sleeps == pytest.approx([0.1, 0.2])
+    stats = run.stats.as_dict()
+    assert stats["retries"] == 2
+    assert stats["recovered"] == 1
+
+
+def test_delay_is_capped_and_jittered() -> None:
+    policy = RetryPolicy(base_delay=0.1, multiplier=10, max_delay=0.5, jitter=0.5)
+
+    assert policy.delay_for(1, rng=lambda: 0.0) == pytest.approx(0.1)
+    assert policy.delay_for(3, rng=lambda: 0.0) == pytest.approx(0.5)
+    assert policy.delay_for(3, rng=lambda: 1.0) == pytest.approx(0.25)
+
+
+def test_budget_limits_retries_across_calls() -> None:
+    run = RetryRun(budget=RetryBudget(max_retries=1), stats=RetryStats())
+    policy = RetryPolicy(max_attempts=5, base_delay=0, jitter=0)
+    first, _ = _flaky([OSError(errno.EBUSY, "busy")])
+    second, second_calls = _flaky([OSError(errno.EBUSY, "busy")])
+
+    assert call_with_retry(first, policy=policy, run=run, sleep=lambda _d: None) == "ok"
+    with pytest.raises(OSError):
+        call_with_retry(second, policy=policy, run=run, sleep=lambda _d: None)
+
+    assert len(second_calls) == 1
+    assert run.stats.as_dict()["budget_exhausted"] == 1
+
+
+def test_retry_run_restores_previous_run() -> None:
+    outer = active_retry_run()
+    with retry_run(RetryBudget(max_retries=0)) as run:
+        assert active_retry_run() is run
+    assert active_retry_run() is outer
+
+
+def test_cli_summary_includes_retry_stats() -> None:
+    args = resize_core._build_arg_parser().parse_args(["-s", "in", "-d", "out", "--retry-budget", "5"])
+    assert args.retry_budget == 5
+
+    summary = resize_core._build_cli_summary(
+        status="success",
+        source=Path("in"),
+        dest=Path("out"),
+        total_files=1,
+        processed_count=1,
+        failed_count=0,
+        dry_run=False,
+        output_format="jpeg",
+        width=100,
+        quality=85,
+        recursive=True,
+        extensions=[".jpg"],
+        elapsed_seconds=0.1,
+        retries={"retries": 2, "recovered": 1},
+    )
+    assert summary["retries"] == {"retries": 2, "recovered": 1}
+
+
+def test_gui_batch_save_runs_under_retry_budget(monkeypatch, tmp_path: Path) -> None:
+    seen: list[RetryRun] = []
+    monkeypatch.setattr(ui_bootstrap, "bootstrap_prepare_batch_ui", lambda _app: None)
+    monkeypatch.setattr(
+        ui_bootstrap, "bootstrap_process_single_batch_job", lambda *_a, **_k: seen.append(active_retry_run())
+    )
+    app = SimpleNamespace(
+        jobs=[SimpleNamespace(path=tmp_path / "a.jpg"), SimpleNamespace(path=tmp_path / "b.jpg")],
+        _create_batch_stats=lambda: SimpleNamespace(processed_count=0, failed_count=0),
+        _cancel_batch=False,
+        after=lambda _ms, _func: None,
+    )
+
+    thread = ui_bootstrap.bootstrap_run_batch_save_async(
+        app,
+        output_dir=tmp_path,
+        reference_target=(100, 100),
+        resize_plan=None,
+        output_format_id="jpeg",
+        reference_output_format="jpeg",
+        batch_options=SimpleNamespace(dry_run=False),
+    )
+    thread.join(timeout=5)
+
+    assert len(seen) == 2 and seen[0] is seen[1]
+    assert seen[0].budget.max_retries == DEFAULT_RETRY_BUDGET
+    assert active_retry_run() is not seen[0]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+import queue
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from PIL import Image
+
+from karuku_resizer.gui_app import ImageJob
+from karuku_resizer.preview_service import ResizedPreviewCache
+from karuku_resizer.ui.main_layout import session_status_text
+from karuku_resizer.ui_file_load_helpers import (
+    EncodedSource,
+    decode_image_file,
+    load_paths_worker,
+    read_encoded_source,
+    resolve_source_decoder,
+    source_orientation,
+)
+from karuku_resizer.ui_text_presenter import build_file_load_error_payload, build_memory_usage_text
+
+
+def _write_rotated_jpeg(path: Path) -> None:
+    image = Image.new("RGB", (64, 32), (200, 40, 40))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90° clockwise on display
+    image.save(path, format="JPEG", quality=90, exif=exif.tobytes())
+
+
+def test_encoded_source_reports_stored_geometry_and_orientation_without_keeping_pixels(tmp_path: Path) -> None:
+    path = tmp_path / "rotated.jpg"
+    _write_rotated_jpeg(path)
+
+    source = read_encoded_source(path)
+
+    assert source.data == path.read_bytes()
+    assert source.size == (64, 32)
+    assert source_orientation(source) == source.orientation == 6
+    assert ImageJob(path, source, orientation=source.orientation).size == (32, 64)
+    assert (source.mode, source.getbands()) == ("RGB", ("R", "G", "B"))
+    assert source.decode().tobytes() == decode_image_file(path).tobytes()
+    assert resolve_source_decoder("compressed") is read_encoded_source
+    assert resolve_source_decoder("unknown") is decode_image_file
+
+
+def test_load_worker_delivers_encoded_sources(tmp_path: Path) -> None:
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (10 + i, 10)).save(path)
+        paths.append(path)
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    load_paths_worker(
+        paths + [broken],
+        threading.Event(),
+        out_queue,
+        build_file_load_error_payload=build_file_load_error_payload,
+        decode=read_encoded_source,
+    )
+
+    messages = [out_queue.get_nowait() for _ in range(out_queue.qsize())]
+    loaded = [m for m in messages if m["type"] == "loaded"]
+    assert all(isinstance(m["image"], EncodedSource) for m in loaded)
+    assert [m["file_size"] for m in loaded] == [p.stat().st_size for p in paths]
+    assert [m["type"] for m in messages].count("load_error") == 1
+
+
+def test_job_decodes_on_demand_through_the_shared_lru() -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), (10, 120, 200)).save(buffer, format="JPEG", quality=80)
+    data = buffer.getvalue()
+    source = EncodedSource(data=data, size=(400, 300), mode="RGB", bands=("R", "G", "B"))
+    cache = ResizedPreviewCache(max_bytes=16 * 1024 * 1024)
+    job = ImageJob(Path("a.jpg"), source, decode_cache=cache)
+
+    assert job.load_image(cache=False).size == (400, 300)
+    assert len(cache) == 0
+    first = job.image
+    assert job.image is first
+    assert (cache.stats.hits, len(cache)) == (1, 1)
+    assert job.resident_bytes == len(data) < source.decoded_nbytes // 10
+
+
+def test_session_summary_reports_memory_saving() -> None:
+    source = EncodedSource(data=b"x" * 1024 * 1024, size=(2048, 1024), mode="RGB", bands=("R", "G", "B"))
+    app = SimpleNamespace(jobs=[ImageJob(Path("a.jpg"), source)], _preview_cache=ResizedPreviewCache(max_bytes=1))
+
+    text = session_status_text(app, file_filter_label_to_id={}, file_filter_id_to_label={})
+
+    assert text.endswith("画像メモリ 1.0MB（展開時 6.0MB）")
+    assert build_memory_usage_text(resident_bytes=6 * 1024 * 1024, decoded_bytes=6 * 1024 * 1024, cache_bytes=0) == (
+        "画像メモリ 6.0MB"
+    )
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+from PIL import Image
+
+from karuku_resizer.gui_app import ImageJob, ResizeApp
+from karuku_resizer.ui_file_load_helpers import (
+    CandidateStream,
+    load_candidates_in_order,
+    scan_and_load_images_worker,
+)
+from karuku_resizer.ui_text_presenter import build_file_load_error_payload
+
+
+def _drain(out_queue: "queue.Queue[Dict[str, Any]]") -> List[Dict[str, Any]]:
+    messages = []
+    while not out_queue.empty():
+        messages.append(out_queue.get_nowait())
+    return messages
+
+
+def _make_images(root: Path, relative_paths: List[str]) -> List[Path]:
+    paths = []
+    for rel in relative_paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGB", (4, 4)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_loading_starts_before_discovery_finishes(tmp_path: Path) -> None:
+    first, second = _make_images(tmp_path, ["a.png", "b.png"])
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    release = threading.Event()
+
+    def _discover(emit: Callable[[Path], None]) -> None:
+        emit(first)
+        # Discovery stalls until the loader has delivered the first result.
+        assert release.wait(5)
+        emit(second)
+        out_queue.put({"type": "scan_done", "total": 2, "streaming": True})
+
+    loader = threading.Thread(
+        target=load_candidates_in_order,
+        args=(CandidateStream(_discover), threading.Event(), out_queue),
+        kwargs={"build_file_load_error_payload": build_file_load_error_payload},
+    )
+    loader.start()
+    early = out_queue.get(timeout=5)
+    release.set()
+    loader.join(timeout=5)
+
+    assert early["type"] == "loaded" and early["path"] == first
+    rest = _drain(out_queue)
+    assert [m["type"] for m in rest] == ["scan_done", "loaded"]
+    assert rest[1]["index"] == 2
+
+
+def test_discovery_errors_surface_after_found_candidates(tmp_path: Path) -> None:
+    (only,) = _make_images(tmp_path, ["a.png"])
+
+    def _discover(emit: Callable[[Path], None]) -> None:
+        emit(only)
+        raise RuntimeError("walk failed")
+
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    with pytest.raises(RuntimeError, match="walk failed"):
+        load_candidates_in_order(
+            CandidateStream(_discover),
+            threading.Event(),
+            out_queue,
+            build_file_load_error_payload=build_file_load_error_payload,
+        )
+    assert [m["type"] for m in _drain(out_queue)] == ["loaded"]
+
+
+def test_recursive_worker_keeps_max_files_semantics(tmp_path: Path) -> None:
+    _make_images(tmp_path, ["1.png", "2.png", "sub/3.png", "sub/4.png", "sub/5.png"])
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    scan_and_load_images_worker(
+        tmp_path,
+        threading.Event(),
+        out_queue,
+        3,
+        recursive_exts=(".png",),
+        build_file_load_error_payload=build_file_load_error_payload,
+    )
+
+    messages = _drain(out_queue)
+    scan_done = [m for m in messages if m["type"] == "scan_done"]
+    assert scan_done == [{"type": "scan_done", "total": 3, "reached_limit": True, "streaming": True}]
+    assert [m["index"] for m in messages if m["type"] == "loaded"] == [1, 2, 3]
+    assert messages[-1] == {"type": "done", "canceled": False}
+
+
+def test_cancel_stops_discovery_and_loading() -> None:
+    cancel_event = threading.Event()
+    emitted: List[int] = []
+
+    def _discover(emit: Callable[[Path], None]) -> None:
+        while not cancel_event.is_set():
+            emitted.append(len(emitted))
+            emit(Path(f"{len(emitted)}.jpg"))
+            time.sleep(0.002)
+
+    stream = CandidateStream(_discover)
+    out_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    threading.Timer(0.05, cancel_event.set).start()
+
+    begin = time.perf_counter()
+    completed = load_candidates_in_order(
+        stream,
+        cancel_event,
+        out_queue,
+        build_file_load_error_payload=build_file_load_error_payload,
+        decode=lambda _path: Image.new("RGB", (1, 1)),
+    )
+    stream.join(timeout=1)
+
+    assert completed is False
+    assert time.perf_counter() - begin < 1.0
+    assert _drain(out_queue)[-1] == {"type": "done", "canceled": True}
+    count = len(emitted)
+    time.sleep(0.02)
+    assert len(emitted) == count
+
+
+def test_sorted_insert_keeps_path_order_and_selection() -> None:
+    app = SimpleNamespace(jobs=[], current_index=None)
+    append = ResizeApp._append_loaded_job.__get__(app)
+    image = Image.new("RGB", (1, 1))
+
+    append(Path("/in/b/2.jpg"), image, file_size=1, sorted_insert=True)
+    append(Path("/in/c.jpg"), image, file_size=1, sorted_insert=True)
+    app.current_index = 1
+    append(Path("/in/A.jpg"), image, file_size=1, sorted_insert=True)
+    append(Path("/in/b/1.jpg"), image, file_size=1, sorted_insert=True)
+
+    assert [job.path.as_posix() for job in app.jobs] == ["/in/A.jpg", "/in/b/1.jpg", "/in/b/2.jpg", "/in/c.jpg"]
+    assert all(isinstance(job, ImageJob) for job in app.jobs)
+    assert app.jobs[app.current_index].path == Path("/in/c.jpg")